@@ -11,6 +11,7 @@ Includes:
 import sys
 import time
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 from weex_client import WeexClient
 
@@ -108,29 +109,45 @@ def cancel_all(client: WeexClient):
     print("🗑️ CANCELING ALL ORDERS")
     print("="*60)
     
-    for symbol in SYMBOLS:
+    # 1. Cancel Regular Orders: one open-orders read, then batch cancels by id
+    try:
+        orders = client.get_open_orders()
+        if isinstance(orders, dict) and 'data' in orders:
+            orders = orders['data']
+        order_ids = [o.get('order_id') or o.get('orderId') for o in orders or []]
+        order_ids = [oid for oid in order_ids if oid]
+        if order_ids:
+            results = client.cancel_orders(order_ids)
+            failed = [r for r in results if not r['result']]
+            print(f"   🗑️ Cancelled {len(results) - len(failed)}/{len(results)} orders")
+            for r in failed:
+                print(f"   ⚠️ {r['order_id']}: {r['err_msg']}")
+    except Exception as e:
+        print(f"   ❌ Error cancelling orders: {e}")
+    
+    def cancel_plans(symbol):
         print(f"   Processing {symbol}...", end='\r')
         try:
-            # 1. Cancel Regular Orders
-            client.cancel_all_orders(symbol)
-            
             # 2. Cancel Plan Orders (if separate endpoint needed)
             # The previous script used /capi/v2/order/cancelPlan
-            # We add a raw request here since it's missing in client wrapper methods
-            client._request("POST", "/capi/v2/order/cancelPlan", data={
+            client.request("POST", "/capi/v2/order/cancelPlan", data={
                 "symbol": symbol,
                 "marginCoin": "USDT"
             })
             
             # 3. Cancel Trigger/STOP Orders
             # Previous script used /capi/v2/order/cancelAllTrigger
-            client._request("POST", "/capi/v2/order/cancelAllTrigger", data={
+            client.request("POST", "/capi/v2/order/cancelAllTrigger", data={
                 "symbol": symbol,
                 "marginCoin": "USDT"
             })
             
         except Exception as e:
             print(f"   ❌ Error {symbol}: {e}")
+    
+    # Plan orders have no batch endpoint: one request per symbol, all at once
+    with ThreadPoolExecutor(max_workers=len(SYMBOLS)) as pool:
+        list(pool.map(cancel_plans, SYMBOLS))
             
     print("   ✅ Done.                               ")
     time.sleep(1)
@@ -167,6 +184,7 @@ def close_all(client: WeexClient):
 
     # 2. Close them
     print(f"   Found {len(positions_to_close)} positions to close...")
+    orders = []
     for pos in positions_to_close:
         symbol = pos.get('symbol')
         side = pos.get('holdSide') # 'long' or 'short' (usually lowercase from API)
@@ -188,17 +206,22 @@ def close_all(client: WeexClient):
             continue
             
         print(f"   Closing {symbol} ({side})...")
-        try:
-            client.place_order(
-                symbol=symbol,
-                side=close_side,
-                size=str(size),
-                order_type='market',
-                trade_side='close'
-            )
-            time.sleep(0.2)
-        except Exception as e:
-            print(f"   ❌ Failed to close {symbol}: {e}")
+        orders.append({
+            'symbol': symbol,
+            'side': close_side,
+            'size': str(size),
+            'order_type': 'market',
+            'trade_side': 'close'
+        })
+    
+    # One batch request per symbol, sent concurrently
+    try:
+        results = client.place_orders(orders, max_workers=len(SYMBOLS)) if orders else []
+        for order, result in zip(orders, results):
+            if not result['result']:
+                print(f"   ❌ Failed to close {order['symbol']}: {result['err_msg']}")
+    except Exception as e:
+        print(f"   ❌ Failed to close positions: {e}")
             
     print("   ✅ Close sequence finished.")
     time.sleep(1)
@@ -0,0 +1,14 @@
+# Backtest Package
+from .sim_client import SimulatedWeexClient, SimTrade, load_candles
+from .engine import (
+    BacktestEngine, BacktestResult, StrategyAdapter, ADAPTERS,
+    GridStrategyAdapter, ConservativeGridAdapter, SmartScalperAdapter, UltraScalperAdapter,
+)
+from .optimizer import Optimizer, rank, load_results, grid_points, random_points
+
+__all__ = [
+    'SimulatedWeexClient', 'SimTrade', 'load_candles',
+    'BacktestEngine', 'BacktestResult', 'StrategyAdapter', 'ADAPTERS',
+    'GridStrategyAdapter', 'ConservativeGridAdapter', 'SmartScalperAdapter', 'UltraScalperAdapter',
+    'Optimizer', 'rank', 'load_results', 'grid_points', 'random_points',
+]
@@ -0,0 +1,609 @@
+"""
+⏪ Backtest Engine
+Replays 1m candles through the live strategies against SimulatedWeexClient
+
+Each bar is replayed as a short price path (open -> nearer extreme ->
+farther extreme -> close, interpolated) when the bot holds the symbol or
+the bar's range reaches a resting order or a liquidation price, so limit
+fills and the bots' own TP/SL/trailing logic see intrabar moves; other
+bars jump straight to the close. Once every symbol has reached the bar's
+close the bot runs one cycle of its main loop. Bots run unchanged: their module clock
+(time/datetime) follows the replay, sleeps return immediately, and the
+network-only inputs (CoinGecko, DeepSeek) are replaced by neutral
+offline stand-ins.
+
+Usage:
+    sim = SimulatedWeexClient(load_candles("candles.db"), balance=1000)
+    result = BacktestEngine(sim, UltraScalperAdapter(sim)).run()
+    print(result.summary())
+"""
+
+import contextlib
+import csv
+import dataclasses
+import importlib
+import logging
+import os
+import sys
+import time as _time
+from dataclasses import dataclass, field
+from datetime import datetime as _datetime, timezone
+from types import ModuleType
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.contracts import ContractRegistry
+from utils.parallel_scan import ParallelScanner
+from .sim_client import SimulatedWeexClient, SimTrade
+
+MINUTE_MS = 60_000
+HOUR_MS = 3_600_000
+DAY_MS = 86_400_000
+YEAR_MS = 365 * DAY_MS
+
+
+# ==================== SIMULATED CLOCK ====================
+
+class _SimTime:
+    """Stand-in for the `time` module inside a bot module"""
+
+    def __init__(self, sim: SimulatedWeexClient):
+        self._sim = sim
+
+    def time(self) -> float:
+        return self._sim.now_ms / 1000
+
+    monotonic = time
+
+    def sleep(self, seconds: float):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(_time, name)
+
+
+def _sim_datetime(sim: SimulatedWeexClient):
+    """datetime subclass whose now() is the replay time (local naive, like datetime.now())"""
+
+    class SimDatetime(_datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls.fromtimestamp(sim.now_ms / 1000, tz)
+
+        @classmethod
+        def utcnow(cls):
+            return cls.fromtimestamp(sim.now_ms / 1000, timezone.utc).replace(tzinfo=None)
+
+    return SimDatetime
+
+
+def _quiet_log_decision(message: str, data: dict = None):
+    """log_decision replacement: no files written during a backtest"""
+
+
+@contextlib.contextmanager
+def sim_clock(sim: SimulatedWeexClient, modules: Iterable[ModuleType], quiet: bool = True):
+    """
+    Run bot code on replay time
+
+    Patches `time`, `datetime` and `log_decision` in the given modules,
+    and silences stdout/logging if `quiet`. Everything is restored on exit.
+    """
+    sim_time, sim_datetime = _SimTime(sim), _sim_datetime(sim)
+    saved = []
+    for module in modules:
+        for name, value in (('time', sim_time), ('datetime', sim_datetime),
+                            ('log_decision', _quiet_log_decision)):
+            current = module.__dict__.get(name)
+            if current is None:
+                continue
+            if name == 'time' and current is not _time:
+                continue
+            if name == 'datetime' and current is not _datetime:
+                continue
+            saved.append((module, name, current))
+            setattr(module, name, value)
+
+    with contextlib.ExitStack() as stack:
+        if quiet:
+            devnull = stack.enter_context(open(os.devnull, 'w'))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+            logging.disable(logging.CRITICAL)
+            stack.callback(logging.disable, logging.NOTSET)
+        try:
+            yield
+        finally:
+            for module, name, value in saved:
+                setattr(module, name, value)
+
+
+# ==================== OFFLINE MARKET INTEL ====================
+
+class OfflineCoinGecko:
+    """CoinGeckoIntel stand-in: neutral Fear & Greed, no opportunities"""
+
+    WEEX_MAPPING: Dict[str, str] = {}
+
+    def get_fear_greed_index(self) -> Dict:
+        return {'value': 50, 'classification': 'Neutral', 'signal': 'neutral'}
+
+    def find_opportunities(self) -> List:
+        return []
+
+
+class OfflineSentiment:
+    """DeepSeekSentiment stand-in (disabled, like running without an API key)"""
+
+    enabled = False
+
+    def get_signal(self, coin: str, wait: bool = True) -> Dict:
+        return {'sentiment': 'neutral', 'confidence': 50}
+
+    def refresh_async(self, symbols) -> None:
+        pass
+
+
+class OfflineMarketIntel:
+    """CoinGeckoLite stand-in: the market filter always passes"""
+
+    def get_fear_greed(self) -> int:
+        return 50
+
+    def get_market_condition(self) -> Dict:
+        return {'btc_dominance': 50, 'market_change_24h': 0, 'total_volume': 0}
+
+    def is_market_safe(self):
+        return True, "✅ Backtest (market filter off)"
+
+
+# ==================== STRATEGY ADAPTERS ====================
+
+class StrategyAdapter:
+    """
+    Drives one bot inside the replay
+
+    Subclasses build the bot on the simulated client and map the engine
+    hooks onto the bot's own loop methods.
+    """
+
+    name = "strategy"
+    module_names: tuple = ()   # Modules whose clock must follow the replay
+
+    # Default search space for backtest.optimizer: parameter -> candidate values
+    PARAM_SPACE: Dict[str, list] = {}
+
+    def __init__(self, sim: SimulatedWeexClient, params: Dict = None):
+        """
+        Args:
+            sim: Simulated client the bot trades on
+            params: Overrides for the bot's tunables (module constants by default)
+        """
+        self.sim = sim
+        self.params = dict(params or {})
+        self.stopped = False
+        self.bot = None
+
+    @property
+    def modules(self) -> List[ModuleType]:
+        return [importlib.import_module(name) for name in self.module_names]
+
+    @contextlib.contextmanager
+    def tuned(self):
+        """Apply `params` to the bot module for the run, restoring the originals after"""
+        module = self.modules[0]
+        saved = []
+        try:
+            for name, value in self.params.items():
+                if not hasattr(module, name):
+                    raise ValueError(f"{module.__name__} has no parameter {name}")
+                saved.append((name, getattr(module, name)))
+                setattr(module, name, value)
+            yield
+        finally:
+            for name, value in saved:
+                setattr(module, name, value)
+
+    def build(self):
+        """Create the bot (runs inside sim_clock, so its startup prints are silenced)"""
+        raise NotImplementedError
+
+    def contracts(self) -> ContractRegistry:
+        """Contract rules from the simulator only (never the live on-disk cache)"""
+        return ContractRegistry(self.sim, cache_path=None)
+
+    def wants_ticks(self, symbol: str) -> bool:
+        """True if the bot tracks a position in `symbol` (its stops need intrabar prices)"""
+        return False
+
+    def on_tick(self, symbol: str, price: float):
+        """Intrabar price of a symbol the bot or the exchange has something open on"""
+
+    def on_bar(self):
+        """One cycle of the bot's main loop at the bar close"""
+        raise NotImplementedError
+
+    def new_day(self):
+        """UTC day change: reset the bot's daily counters"""
+
+
+class GridStrategyAdapter(StrategyAdapter):
+    """strategies.GridTradingStrategy, one instance per symbol"""
+
+    name = "grid"
+    module_names = ('strategies.grid_trading', 'strategies.base_strategy')
+
+    PARAM_SPACE = {
+        'grid_levels': [2, 3, 4, 5],
+        'grid_spacing_percent': [0.2, 0.3, 0.5, 0.8],
+        'rebalance_threshold': [1.0, 1.5, 2.0, 3.0],
+        'max_leverage': [3, 5, 10],
+    }
+
+    def __init__(self, sim: SimulatedWeexClient, params: Dict = None,
+                 symbols: Iterable[str] = None, config: Dict = None):
+        super().__init__(sim, params)
+        self.symbols = list(symbols or sim.data)
+        self.config = config
+        self.strategies = []
+
+    @contextlib.contextmanager
+    def tuned(self):
+        """params are GridTradingStrategy config keys"""
+        yield
+
+    def build(self):
+        from strategies.grid_trading import GridTradingStrategy
+        config = {**(self.config or {}), **self.params} or None
+        self.strategies = [GridTradingStrategy(self.sim, s, config, candle_store=self.sim,
+                                               contracts=self.contracts())
+                           for s in self.symbols]
+        for strategy in self.strategies:
+            self.sim.set_leverage(strategy.symbol, strategy.config['max_leverage'])
+            strategy.start()
+
+    def on_bar(self):
+        for strategy in self.strategies:
+            try:
+                strategy.execute()
+            except Exception as e:
+                print(f"❌ Grid {strategy.symbol}: {e}")
+
+    def new_day(self):
+        for strategy in self.strategies:
+            strategy.daily_pnl = 0.0
+
+
+class ConservativeGridAdapter(StrategyAdapter):
+    """ConservativeGridBot (Bollinger + ATR scalper on its GRID_CONFIGS symbols)"""
+
+    name = "conservative"
+    module_names = ('conservative_grid',)
+
+    # find_opportunity sizes TP/SL from ATR, so GridConfig take_profit/stop_loss
+    # only matter for signals without explicit percentages
+    PARAM_SPACE = {
+        'ATR_SL_MULT': [1.0, 1.5, 2.0, 3.0],
+        'ATR_TP_MULT': [1.0, 1.5, 2.0, 3.0],
+        'RSI_SHORT_MIN': [60, 65, 70, 75],
+        'RSI_LONG_MAX': [25, 30, 35, 40],
+        'MIN_SPACING_PCT': [0.1, 0.2, 0.3],
+        'leverage': [5, 10, 15, 20],
+    }
+
+    @contextlib.contextmanager
+    def tuned(self):
+        """
+        GridConfig fields apply to every symbol ('take_profit') or to one
+        ('cmt_btcusdt.take_profit'); other names are module constants.
+        """
+        from conservative_grid import ConservativeGridBot, GridConfig
+        configs = dict(ConservativeGridBot.GRID_CONFIGS)
+        fields = {f.name for f in dataclasses.fields(GridConfig)}
+        constants = {}
+        for name, value in self.params.items():
+            symbol, _, field_name = name.rpartition('.')
+            if field_name in fields:
+                for s in ([symbol] if symbol else list(configs)):
+                    if s not in configs:
+                        raise ValueError(f"ConservativeGridBot has no config for {s}")
+                    configs[s] = dataclasses.replace(configs[s], **{field_name: value})
+            else:
+                constants[name] = value
+
+        original, params = ConservativeGridBot.GRID_CONFIGS, self.params
+        ConservativeGridBot.GRID_CONFIGS = configs
+        self.params = constants
+        try:
+            with super().tuned():
+                yield
+        finally:
+            ConservativeGridBot.GRID_CONFIGS = original
+            self.params = params
+
+    def build(self):
+        from conservative_grid import ConservativeGridBot
+        self.bot = ConservativeGridBot(client=self.sim, candle_store=self.sim,
+                                       market_intel=OfflineMarketIntel(),
+                                       contracts=self.contracts())
+
+    def wants_ticks(self, symbol: str) -> bool:
+        return symbol in self.bot.positions
+
+    def on_tick(self, symbol: str, price: float):
+        self.bot._handle_tick(symbol, price)  # Inline: the replay needs the close before the next price
+
+    def on_bar(self):
+        self.bot.run_cycle()
+
+    def new_day(self):
+        self.bot.daily_pnl = 0.0
+        self.bot.total_trades = 0
+
+
+class SmartScalperAdapter(StrategyAdapter):
+    """SmartScalper (technical signals; CoinGecko/DeepSeek neutral offline)"""
+
+    name = "smart"
+    module_names = ('smart_scalper',)
+
+    PARAM_SPACE = {
+        'MIN_SIGNAL_STRENGTH': [55, 60, 65, 70, 75],
+        'STOP_LOSS_PCT': [1.0, 1.5, 2.0],
+        'TAKE_PROFIT_PCT': [2.0, 3.0, 4.0, 6.0],
+        'TRAILING_STOP_PCT': [0.5, 1.0, 1.5],
+        'TRAILING_ACTIVATION': [1.0, 2.0, 3.0],
+    }
+
+    def build(self):
+        from smart_scalper import SmartScalper
+        self.bot = SmartScalper(client=self.sim, candle_store=self.sim,
+                                coingecko=OfflineCoinGecko(), sentiment=OfflineSentiment(),
+                                contracts=self.contracts())
+
+    def wants_ticks(self, symbol: str) -> bool:
+        return symbol in self.bot.positions
+
+    def on_tick(self, symbol: str, price: float):
+        self.bot._handle_tick(symbol, price)
+
+    def on_bar(self):
+        if not self.bot.run_cycle():
+            self.stopped = True
+
+    def new_day(self):
+        self.bot.daily_pnl = 0
+        self.bot.trades_today = 0
+
+
+class UltraScalperAdapter(StrategyAdapter):
+    """UltraScalper (RSI extremes + whale volume, trailing stops)"""
+
+    name = "ultra"
+    module_names = ('ultra_scalper',)
+
+    PARAM_SPACE = {
+        'RSI_OVERSOLD': [20, 25, 30, 35],
+        'RSI_OVERBOUGHT': [65, 70, 75, 80],
+        'TAKE_PROFIT_PCT': [2.0, 3.0, 4.0, 6.0],
+        'STOP_LOSS_PCT': [1.0, 1.5, 2.0, 3.0],
+        'TRAILING_STOP_PCT': [0.5, 1.0, 1.5, 2.0],
+        'TRAILING_ACTIVATION': [0.5, 1.0, 2.0],
+        'LEVERAGE': [10, 15, 20, 25],
+    }
+
+    def build(self):
+        import ultra_scalper
+        self.bot = ultra_scalper.UltraScalper(client=self.sim, candle_store=self.sim,
+                                              contracts=self.contracts())
+        self.bot.scanner = ParallelScanner(1)  # Replay is CPU-bound: scan inline, deterministic
+        # The live account has LEVERAGE set on the exchange; the bot never calls set_leverage
+        for coin in ultra_scalper.COINS:
+            self.sim.set_leverage(self.bot.get_symbol(coin), ultra_scalper.LEVERAGE)
+
+    def wants_ticks(self, symbol: str) -> bool:
+        return any(pos['symbol'] == symbol for pos in self.bot.trailing_data.values())
+
+    def on_tick(self, symbol: str, price: float):
+        self.bot._on_tick(symbol, price)
+
+    def on_bar(self):
+        if not self.bot.run_cycle():
+            self.stopped = True
+
+    def new_day(self):
+        self.bot.daily_pnl = 0
+        self.bot.trades_today = 0
+
+
+ADAPTERS = {
+    'grid': GridStrategyAdapter,
+    'conservative': ConservativeGridAdapter,
+    'smart': SmartScalperAdapter,
+    'ultra': UltraScalperAdapter,
+}
+
+
+# ==================== RESULTS ====================
+
+@dataclass
+class BacktestResult:
+    """Per-trade records and the equity curve of one run"""
+    strategy: str
+    initial_balance: float
+    trades: List[SimTrade]
+    equity_ts: np.ndarray
+    equity: np.ndarray
+    bars: int = 0
+    elapsed: float = 0.0
+    stopped_at: Optional[int] = None
+    extra: Dict = field(default_factory=dict)
+
+    @property
+    def final_equity(self) -> float:
+        return float(self.equity[-1]) if len(self.equity) else self.initial_balance
+
+    def max_drawdown(self) -> float:
+        """Largest peak-to-trough drop of the equity curve, in %"""
+        if len(self.equity) == 0:
+            return 0.0
+        peaks = np.maximum.accumulate(self.equity)
+        return float(((peaks - self.equity) / peaks).max() * 100)
+
+    def sharpe(self, period_ms: int = HOUR_MS) -> float:
+        """Annualized Sharpe ratio of equity returns sampled every `period_ms` (risk-free 0)"""
+        step = max(1, period_ms // MINUTE_MS)
+        curve = self.equity[::step]
+        if len(curve) < 3 or (curve <= 0).any():
+            return 0.0
+        returns = np.diff(curve) / curve[:-1]
+        std = returns.std()
+        if std == 0:
+            return 0.0
+        return float(returns.mean() / std * np.sqrt(YEAR_MS / (step * MINUTE_MS)))
+
+    def summary(self) -> Dict:
+        net = [t.net_pnl for t in self.trades]
+        wins = [p for p in net if p > 0]
+        losses = [p for p in net if p <= 0]
+        gross_loss = -sum(losses)
+        return {
+            'strategy': self.strategy,
+            'bars': self.bars,
+            'elapsed_s': round(self.elapsed, 2),
+            'initial_balance': round(self.initial_balance, 2),
+            'final_equity': round(self.final_equity, 2),
+            'return_pct': round((self.final_equity / self.initial_balance - 1) * 100, 2),
+            'max_drawdown_pct': round(self.max_drawdown(), 2),
+            'sharpe': round(self.sharpe(), 2),
+            'trades': len(net),
+            'win_rate': round(len(wins) / len(net) * 100, 1) if net else 0.0,
+            'profit_factor': round(sum(wins) / gross_loss, 2) if gross_loss > 0 else None,
+            'avg_trade': round(sum(net) / len(net), 4) if net else 0.0,
+            'fees': round(sum(t.fees for t in self.trades), 2),
+            'liquidations': sum(1 for t in self.trades if t.reason == 'liquidation'),
+        }
+
+    def save(self, prefix: str):
+        """Write <prefix>_trades.csv and <prefix>_equity.csv"""
+        with open(f"{prefix}_trades.csv", 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(SimTrade.__dataclass_fields__) + ['net_pnl'])
+            writer.writeheader()
+            for trade in self.trades:
+                writer.writerow(trade.to_dict())
+        with open(f"{prefix}_equity.csv", 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['ts', 'equity'])
+            writer.writerows(zip(self.equity_ts.astype(np.int64).tolist(), self.equity.tolist()))
+
+
+# ==================== ENGINE ====================
+
+class BacktestEngine:
+    """
+    Bar-by-bar replay of SimulatedWeexClient data through a StrategyAdapter
+
+    The bot runs one cycle per `decision_every` bars after `warmup` bars,
+    which is at least as often as the live loops at 1m resolution (they
+    scan every 10-60s, but their candles only change once per bar).
+    """
+
+    def __init__(self, sim: SimulatedWeexClient, adapter: StrategyAdapter,
+                 warmup: int = 500, decision_every: int = 1, tick_steps: int = 3,
+                 daily_reset: bool = True, close_at_end: bool = True, quiet: bool = True):
+        """
+        Args:
+            sim: Simulated client holding the candles
+            adapter: Bot to drive (see ADAPTERS)
+            warmup: Bars replayed before the first decision (indicator history)
+            decision_every: Bars between bot cycles
+            tick_steps: Interpolated ticks per leg of the intrabar path
+            daily_reset: Reset the bot's daily PnL/trade counters at 00:00 UTC
+            close_at_end: Close what is still open at the last price (reason 'end')
+            quiet: Silence the bots' prints and logging
+        """
+        self.sim = sim
+        self.adapter = adapter
+        self.warmup = warmup
+        self.decision_every = max(1, decision_every)
+        self.daily_reset = daily_reset
+        self.close_at_end = close_at_end
+        self.quiet = quiet
+        self._fractions = [j / tick_steps for j in range(1, tick_steps + 1)]
+
+    def _path(self, o: float, h: float, l: float, c: float) -> List[float]:
+        """Intrabar ticks after the open: nearer extreme first, then the other, then the close"""
+        points = (l, h, c) if c >= o else (h, l, c)
+        path, prev = [], o
+        for point in points:
+            path.extend(prev + (point - prev) * f for f in self._fractions)
+            prev = point
+        return path
+
+    def run(self) -> BacktestResult:
+        sim, adapter = self.sim, self.adapter
+        symbols = list(sim.data)
+        timeline = np.unique(np.concatenate([sim.data[s][0] for s in symbols])).astype(np.int64)
+        series = {s: sim.data[s][0].astype(np.int64).tolist() for s in symbols}
+        rows = {s: sim.data[s][1:5].T.tolist() for s in symbols}
+        pointer = dict.fromkeys(symbols, 0)
+
+        equity_ts = np.empty(len(timeline))
+        equity = np.empty(len(timeline))
+        stopped_at = None
+        started = _time.perf_counter()
+
+        sim.now_ms = int(timeline[0]) if len(timeline) else 0
+        with sim_clock(sim, adapter.modules, self.quiet), adapter.tuned():
+            adapter.build()
+            day = None
+
+            for step, t in enumerate(timeline.tolist()):
+                sim.now_ms = t
+                for s in symbols:
+                    i = pointer[s]
+                    if i >= len(series[s]) or series[s][i] != t:
+                        continue
+                    pointer[s] = i + 1
+                    sim.begin_bar(s, i)
+                    o, h, l, c = rows[s][i]
+                    if adapter.wants_ticks(s) or sim.would_trigger(s, h, l):
+                        path = self._path(o, h, l, c)
+                        dt = MINUTE_MS / (len(path) + 1)
+                        for n, price in enumerate(path, 1):
+                            sim.now_ms = t + int(n * dt)
+                            sim.tick(s, price)
+                            adapter.on_tick(s, price)
+                    else:
+                        sim.finish_bar(s)
+
+                sim.now_ms = t + MINUTE_MS - 1
+                if self.daily_reset and t // DAY_MS != day:
+                    if day is not None:
+                        adapter.new_day()
+                    day = t // DAY_MS
+                if step >= self.warmup and not adapter.stopped \
+                        and (step - self.warmup) % self.decision_every == 0:
+                    adapter.on_bar()
+                    if adapter.stopped:
+                        stopped_at = t
+
+                equity_ts[step] = t + MINUTE_MS
+                equity[step] = sim.equity()
+
+            if self.close_at_end:
+                sim.close_all('end')
+                equity[-1] = sim.equity()
+
+        return BacktestResult(
+            strategy=adapter.name,
+            initial_balance=sim.initial_balance,
+            trades=list(sim.trades),
+            equity_ts=equity_ts,
+            equity=equity,
+            bars=len(timeline),
+            elapsed=_time.perf_counter() - started,
+            stopped_at=stopped_at,
+        )
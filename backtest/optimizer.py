@@ -0,0 +1,262 @@
+"""
+🔧 Parameter Optimizer
+Grid or random search over a bot's tunables, one backtest per combination
+
+Candles are loaded once into a multiprocessing.shared_memory block; each
+worker of the process pool maps it read-only and replays its combinations
+against views of it, so N workers cost one copy of the data, not N.
+
+Every finished run is appended (and flushed) as one JSON line, keyed by
+its parameters. Re-running with the same file skips what is already
+there, so an interrupted 10,000-combination sweep resumes where it
+stopped. Random search is reproducible for a given seed.
+
+Usage:
+    opt = Optimizer(load_candles("candles.db"), "ultra", results_path="ultra_sweep.jsonl")
+    opt.run(samples=2000)
+    for row in rank(opt.results(), by='sharpe')[:10]:
+        print(row['params'], row['return_pct'], row['sharpe'])
+"""
+
+import itertools
+import json
+import math
+import multiprocessing as mp
+import os
+import random
+import time
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Iterator, List
+
+import numpy as np
+
+from .sim_client import SimulatedWeexClient
+from .engine import BacktestEngine, ADAPTERS
+
+# Ranking keys: summary field -> True if higher is better
+SORT_KEYS = {
+    'sharpe': True,
+    'return_pct': True,
+    'max_drawdown_pct': False,
+}
+
+
+# ==================== SEARCH SPACE ====================
+
+def params_key(params: Dict) -> str:
+    """Canonical id of a combination (the resume key in the results file)"""
+    return json.dumps(params, sort_keys=True)
+
+
+def space_size(space: Dict[str, list]) -> int:
+    return math.prod(len(values) for values in space.values())
+
+
+def grid_points(space: Dict[str, list]) -> Iterator[Dict]:
+    """Every combination, in a fixed order"""
+    names = list(space)
+    for values in itertools.product(*(space[n] for n in names)):
+        yield dict(zip(names, values))
+
+
+def random_points(space: Dict[str, list], samples: int, seed: int = 0) -> List[Dict]:
+    """
+    `samples` distinct combinations drawn uniformly from the grid
+
+    Draws indices into the product without enumerating it, so huge spaces
+    are fine. The same seed always gives the same list (needed to resume).
+    """
+    names = list(space)
+    total = space_size(space)
+    points = []
+    for index in random.Random(seed).sample(range(total), min(samples, total)):
+        params = {}
+        for name in reversed(names):
+            index, j = divmod(index, len(space[name]))
+            params[name] = space[name][j]
+        points.append({n: params[n] for n in names})
+    return points
+
+
+# ==================== RESULTS ====================
+
+def load_results(path: str) -> List[Dict]:
+    """Rows already written to a results file (a torn last line is ignored)"""
+    rows = []
+    if not os.path.exists(path):
+        return rows
+    with open(path) as f:
+        for line in f:
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return rows
+
+
+def rank(rows: Iterable[Dict], by: str = 'sharpe', min_trades: int = 1) -> List[Dict]:
+    """
+    Best first by `by` (see SORT_KEYS), ties broken by the other two keys
+
+    Failed runs and runs with fewer than `min_trades` trades are dropped.
+    """
+    if by not in SORT_KEYS:
+        raise ValueError(f"Unknown sort key {by} (use one of {list(SORT_KEYS)})")
+    order = [by] + [k for k in SORT_KEYS if k != by]
+
+    def key(row):
+        return tuple(-(row.get(k) or 0) if SORT_KEYS[k] else (row.get(k) or 0) for k in order)
+
+    valid = [r for r in rows if not r.get('error') and r.get('trades', 0) >= min_trades]
+    return sorted(valid, key=key)
+
+
+# ==================== WORKERS ====================
+
+# Per-process state set by _init_worker
+_worker: Dict = {}
+
+
+def _init_worker(shm_name: str, shape: tuple, layout: Dict[str, tuple],
+                 strategy: str, sim_kwargs: Dict, engine_kwargs: Dict):
+    """Attach to the shared candle block and keep read-only views of it"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    block.flags.writeable = False
+    _worker.update(
+        shm=shm,
+        candles={s: block[:, start:end] for s, (start, end) in layout.items()},
+        strategy=strategy,
+        sim_kwargs=sim_kwargs,
+        engine_kwargs=engine_kwargs,
+    )
+
+
+def _run_one(params: Dict) -> Dict:
+    """Backtest one combination in a worker"""
+    row = {'key': params_key(params), 'params': params}
+    try:
+        sim = SimulatedWeexClient(_worker['candles'], **_worker['sim_kwargs'])
+        adapter = ADAPTERS[_worker['strategy']](sim, params=params)
+        result = BacktestEngine(sim, adapter, **_worker['engine_kwargs']).run()
+        row.update(result.summary())
+        row['stopped_at'] = result.stopped_at
+    except Exception as e:
+        row['error'] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def _release_worker():
+    shm = _worker.pop('shm', None)
+    _worker.clear()
+    if shm is not None:
+        shm.close()
+
+
+# ==================== OPTIMIZER ====================
+
+class Optimizer:
+    """
+    Parallel, resumable parameter sweep for one strategy adapter
+    """
+
+    def __init__(self, candles: Dict[str, np.ndarray], strategy: str,
+                 space: Dict[str, list] = None,
+                 results_path: str = "optimizer_results.jsonl",
+                 workers: int = None,
+                 sim_kwargs: Dict = None,
+                 engine_kwargs: Dict = None):
+        """
+        Args:
+            candles: {symbol: (6, n) array} of 1m bars (see load_candles)
+            strategy: ADAPTERS key ('grid', 'conservative', 'smart', 'ultra')
+            space: {parameter: [values]} (default: the adapter's PARAM_SPACE)
+            results_path: JSONL file results are appended to (and resumed from)
+            workers: Processes (default: all cores)
+            sim_kwargs: SimulatedWeexClient options (balance, fees, slippage...)
+            engine_kwargs: BacktestEngine options (warmup, decision_every...)
+        """
+        if strategy not in ADAPTERS:
+            raise ValueError(f"Unknown strategy {strategy} (use one of {list(ADAPTERS)})")
+        self.candles = {s: np.asarray(c, dtype=np.float64) for s, c in candles.items()}
+        self.strategy = strategy
+        self.space = dict(space or ADAPTERS[strategy].PARAM_SPACE)
+        if not self.space:
+            raise ValueError(f"No parameter space for {strategy}")
+        self.results_path = results_path
+        self.workers = workers or os.cpu_count() or 1
+        self.sim_kwargs = dict(sim_kwargs or {})
+        self.engine_kwargs = {'quiet': True, **(engine_kwargs or {})}
+
+    def points(self, samples: int = None, seed: int = 0) -> List[Dict]:
+        """The full grid, or `samples` random combinations of it"""
+        if samples is None or samples >= space_size(self.space):
+            return list(grid_points(self.space))
+        return random_points(self.space, samples, seed)
+
+    def results(self) -> List[Dict]:
+        return load_results(self.results_path)
+
+    def _share(self):
+        """Copy all candles into one shared block; returns (shm, shape, layout)"""
+        layout, start = {}, 0
+        for symbol, data in self.candles.items():
+            layout[symbol] = (start, start + data.shape[1])
+            start += data.shape[1]
+        shape = (6, start)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, 6 * start * 8))
+        block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        for symbol, (lo, hi) in layout.items():
+            block[:, lo:hi] = self.candles[symbol]
+        return shm, shape, layout
+
+    def run(self, samples: int = None, seed: int = 0, progress: bool = True) -> List[Dict]:
+        """
+        Backtest every pending combination
+
+        Args:
+            samples: Random combinations to try (None = full grid)
+            seed: Random search seed (keep it to resume the same sample)
+            progress: Print a line every few finished runs
+
+        Returns:
+            All rows in the results file (previous runs included)
+        """
+        done = {row.get('key') for row in self.results()}
+        pending = [p for p in self.points(samples, seed) if params_key(p) not in done]
+        if progress:
+            print(f"🔧 {self.strategy}: {len(pending)} runs pending "
+                  f"({len(done)} already in {self.results_path}), {self.workers} workers")
+        if not pending:
+            return self.results()
+
+        shm, shape, layout = self._share()
+        initargs = (shm.name, shape, layout, self.strategy, self.sim_kwargs, self.engine_kwargs)
+        started = time.time()
+        try:
+            with open(self.results_path, 'a') as out:
+                if self.workers == 1:
+                    _init_worker(*initargs)
+                    try:
+                        self._collect(map(_run_one, pending), out, len(pending), started, progress)
+                    finally:
+                        _release_worker()
+                else:
+                    with mp.Pool(self.workers, initializer=_init_worker, initargs=initargs) as pool:
+                        self._collect(pool.imap_unordered(_run_one, pending), out,
+                                      len(pending), started, progress)
+        finally:
+            shm.close()
+            shm.unlink()
+
+        return self.results()
+
+    def _collect(self, rows: Iterable[Dict], out, total: int, started: float, progress: bool):
+        every = max(1, total // 20)
+        for n, row in enumerate(rows, 1):
+            out.write(json.dumps(row) + "\n")
+            out.flush()
+            if progress and (n % every == 0 or n == total):
+                elapsed = time.time() - started
+                eta = elapsed / n * (total - n)
+                print(f"   {n}/{total} done ({elapsed:.0f}s, ~{eta:.0f}s left)")
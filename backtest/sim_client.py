@@ -0,0 +1,662 @@
+"""
+🧪 Simulated WEEX Client
+Replays stored 1m candles behind the WeexClient interface for backtests
+
+The bots talk to it exactly like to the real client (same methods, same
+response shapes), so strategy code runs unchanged. The BacktestEngine
+moves the clock and the price; this class models what the exchange does
+with orders: market/limit fills, taker/maker fees, slippage, leverage,
+isolated margin and liquidation, in hedge mode (long and short positions
+are tracked separately, like WEEX open_long/open_short).
+"""
+
+import sqlite3
+import sys
+import os
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weex_client import order_type_code
+from utils.candle_store import GRANULARITY_MS
+from utils.ohlcv import OHLCV, parse_rows
+from utils.resampler import resample_arrays
+
+
+# WEEX futures fee schedule (VIP 0)
+TAKER_FEE = 0.0006
+MAKER_FEE = 0.0002
+MAINTENANCE_MARGIN = 0.005    # Isolated margin liquidation threshold (of notional)
+
+# placeOrder type -> (position side, opening?)
+_TYPE_SIDES = {
+    '1': ('long', True),
+    '2': ('short', True),
+    '3': ('long', False),
+    '4': ('short', False),
+}
+
+_EMPTY = np.empty((6, 0))
+_NO_TRIGGER = (-np.inf, np.inf)
+
+
+@dataclass
+class SimTrade:
+    """A closed (or partially closed) position"""
+    symbol: str
+    side: str                 # 'long' / 'short'
+    size: float
+    entry_price: float
+    exit_price: float
+    entry_time: int           # ms
+    exit_time: int            # ms
+    pnl: float                # gross, before fees
+    fees: float               # entry share + exit fee
+    reason: str               # 'close', 'liquidation', 'end'
+
+    @property
+    def net_pnl(self) -> float:
+        return self.pnl - self.fees
+
+    def to_dict(self) -> Dict:
+        return {**asdict(self), 'net_pnl': self.net_pnl}
+
+
+@dataclass
+class _Position:
+    symbol: str
+    side: str
+    size: float
+    entry_price: float
+    margin: float
+    leverage: int
+    fees: float               # entry fees not yet charged to a SimTrade
+    open_time: int
+
+    def pnl_at(self, price: float, size: float = None) -> float:
+        size = self.size if size is None else size
+        diff = price - self.entry_price if self.side == 'long' else self.entry_price - price
+        return diff * size
+
+
+@dataclass
+class _Order:
+    order_id: str
+    client_oid: Optional[str]
+    symbol: str
+    type: str                 # '1'..'4'
+    size: float
+    price: Optional[float]    # None for market orders
+    reserved: float           # margin + fee held while a limit open rests
+    create_time: int
+    status: str = 'open'      # 'open', 'filled', 'canceled'
+    fill_price: float = 0.0
+    fill_time: int = 0
+    fee: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'symbol': self.symbol,
+            'order_id': self.order_id,
+            'client_oid': self.client_oid,
+            'type': self.type,
+            'size': str(self.size),
+            'price': str(self.price) if self.price is not None else None,
+            'price_avg': str(self.fill_price) if self.status == 'filled' else '0',
+            'filled_qty': str(self.size) if self.status == 'filled' else '0',
+            'fee': str(self.fee),
+            'status': self.status,
+            'createTime': self.create_time,
+        }
+
+
+def load_candles(path: str = "candles.db", symbols: Iterable[str] = None,
+                 start_ms: int = None, end_ms: int = None,
+                 granularity: str = "1m") -> Dict[str, np.ndarray]:
+    """
+    Read candles collected by CandleStore from its SQLite file
+
+    CandleStore prunes to `max_bars` per key (5000 by default, ~3.5 days of
+    1m); run it with max_bars >= 43200 to keep a month of history.
+
+    Returns:
+        {symbol: (6, n) array [ts, open, high, low, close, volume]} sorted by ts
+    """
+    conn = sqlite3.connect(path)
+    try:
+        if symbols is None:
+            symbols = [r[0] for r in conn.execute(
+                "SELECT DISTINCT symbol FROM candles WHERE granularity = ?", (granularity,))]
+        data = {}
+        for symbol in symbols:
+            rows = conn.execute(
+                "SELECT ts, open, high, low, close, volume FROM candles "
+                "WHERE symbol = ? AND granularity = ? AND ts >= ? AND ts <= ? ORDER BY ts",
+                (symbol, granularity, start_ms or 0, end_ms or 2 ** 62)
+            ).fetchall()
+            if rows:
+                data[symbol] = np.array(rows, dtype=np.float64).T
+    finally:
+        conn.close()
+    return data
+
+
+class SimulatedWeexClient:
+    """
+    WeexClient stand-in backed by historical 1m candles
+
+    Also implements CandleStore.get_arrays, so the same object can be passed
+    as a bot's candle_store. Higher timeframes are resampled once per symbol
+    and the current bucket is rebuilt from the 1m bars seen so far, so a
+    strategy never sees a candle from the future.
+
+    Usage:
+        sim = SimulatedWeexClient(load_candles("candles.db"), balance=1000)
+        bot = UltraScalper(client=sim, candle_store=sim)
+    """
+
+    def __init__(self, candles: Dict[str, object], balance: float = 1000.0,
+                 taker_fee: float = TAKER_FEE, maker_fee: float = MAKER_FEE,
+                 slippage: float = 0.0, leverage: int = 20,
+                 maintenance_margin: float = MAINTENANCE_MARGIN):
+        """
+        Args:
+            candles: {symbol: OHLCV, (6, n) array or [[ts, o, h, l, c, v], ...]} of 1m bars
+                (float64 arrays are used as-is and only read)
+            balance: Starting USDT
+            taker_fee: Fee rate for market and marketable limit orders
+            maker_fee: Fee rate for resting limit orders
+            slippage: Fraction of price paid on market orders (0.0005 = 5 bps)
+            leverage: Leverage until set_leverage is called for a symbol
+            maintenance_margin: Liquidate when margin + unrealized PnL falls below this share of notional
+        """
+        self.data: Dict[str, np.ndarray] = {}
+        for symbol, bars in candles.items():
+            if isinstance(bars, OHLCV) or (isinstance(bars, np.ndarray) and bars.ndim == 2 and len(bars) == 6):
+                arr = np.asarray(bars, dtype=np.float64)  # not copied: shared-memory views stay shared
+                if arr.shape[1] > 1 and (np.diff(arr[0]) < 0).any():
+                    arr = arr[:, np.argsort(arr[0], kind='stable')]
+            else:
+                arr = parse_rows(bars)
+            if arr.shape[1]:
+                self.data[symbol] = arr
+
+        self.initial_balance = balance
+        self.cash = balance
+        self.taker_fee = taker_fee
+        self.maker_fee = maker_fee
+        self.slippage = slippage
+        self.default_leverage = leverage
+        self.maintenance_margin = maintenance_margin
+
+        self.now_ms = 0
+        self.market_cache = None
+        self.leverage: Dict[str, int] = {}
+        self.positions: Dict[Tuple[str, str], _Position] = {}
+        self.orders: Dict[str, _Order] = {}
+        self.open_orders: Dict[str, Dict[str, _Order]] = {}
+        self.trades: List[SimTrade] = []
+        self.fills: List[Dict] = []
+        self._next_id = 1
+
+        # Replay cursor per symbol: current bar index and the price path inside it
+        self._cursor: Dict[str, int] = {}
+        self._price: Dict[str, float] = {}
+        self._high: Dict[str, float] = {}
+        self._low: Dict[str, float] = {}
+        self._resampled: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+        # Prices at or beyond which something happens (limit fill or liquidation):
+        # symbol -> (at or below, at or above). Lets most ticks return immediately.
+        self._triggers: Dict[str, Tuple[float, float]] = {}
+        self._account: Optional[Tuple[float, float, float]] = None  # (upnl, margin, frozen)
+
+    # ==================== REPLAY (driven by BacktestEngine) ====================
+
+    def begin_bar(self, symbol: str, index: int):
+        """Move `symbol` to bar `index`; the price starts at its open"""
+        price = float(self.data[symbol][1, index])
+        self._cursor[symbol] = index
+        self._price[symbol] = self._high[symbol] = self._low[symbol] = price
+        self._account = None
+
+    def finish_bar(self, symbol: str):
+        """Jump to the close of the current bar without intermediate ticks"""
+        i = self._cursor[symbol]
+        bars = self.data[symbol]
+        self._high[symbol] = max(self._high[symbol], bars[2, i])
+        self._low[symbol] = min(self._low[symbol], bars[3, i])
+        self._price[symbol] = float(bars[4, i])
+        self._account = None
+
+    def tick(self, symbol: str, price: float):
+        """New trade price: fill crossed limit orders, liquidate broken positions"""
+        self._price[symbol] = price
+        self._account = None
+        if price > self._high[symbol]:
+            self._high[symbol] = price
+        elif price < self._low[symbol]:
+            self._low[symbol] = price
+
+        low, high = self._triggers.get(symbol, _NO_TRIGGER)
+        if low < price < high:
+            return
+
+        book = self.open_orders.get(symbol)
+        if book:
+            for order in list(book.values()):
+                side, opening = _TYPE_SIDES[order.type]
+                buying = (side == 'long') == opening
+                if (buying and price <= order.price) or (not buying and price >= order.price):
+                    self._fill(order, order.price, self.maker_fee)
+
+        for side in ('long', 'short'):
+            pos = self.positions.get((symbol, side))
+            if pos and pos.margin + pos.pnl_at(price) <= pos.size * price * self.maintenance_margin:
+                self._close(pos, pos.size, price, self.taker_fee, 'liquidation')
+
+    def would_trigger(self, symbol: str, high: float, low: float) -> bool:
+        """True if a price in [low, high] fills an order or liquidates a position"""
+        trigger_low, trigger_high = self._triggers.get(symbol, _NO_TRIGGER)
+        return low <= trigger_low or high >= trigger_high
+
+    def _update_triggers(self, symbol: str):
+        """Recompute the trigger band after the book or a position changed"""
+        self._account = None
+        low, high = _NO_TRIGGER
+        for order in self.open_orders.get(symbol, {}).values():
+            side, opening = _TYPE_SIDES[order.type]
+            if (side == 'long') == opening:
+                low = max(low, order.price)
+            else:
+                high = min(high, order.price)
+        mm = self.maintenance_margin
+        long_pos = self.positions.get((symbol, 'long'))
+        if long_pos:
+            low = max(low, (long_pos.entry_price * long_pos.size - long_pos.margin) / (long_pos.size * (1 - mm)))
+        short_pos = self.positions.get((symbol, 'short'))
+        if short_pos:
+            high = min(high, (short_pos.entry_price * short_pos.size + short_pos.margin) / (short_pos.size * (1 + mm)))
+        if (low, high) == _NO_TRIGGER:
+            self._triggers.pop(symbol, None)
+        else:
+            self._triggers[symbol] = (low, high)
+
+    def close_all(self, reason: str = 'end'):
+        """Cancel every order and close every position at the current price"""
+        for symbol in list(self.open_orders):
+            self.cancel_all_orders(symbol)
+        for pos in list(self.positions.values()):
+            self._close(pos, pos.size, self._price[pos.symbol], self.taker_fee, reason)
+
+    def _totals(self) -> Tuple[float, float, float]:
+        """(unrealized PnL, used margin, frozen), cached until a price or the book changes"""
+        if self._account is None:
+            self._account = (
+                sum(p.pnl_at(self._price[p.symbol]) for p in self.positions.values()),
+                sum(p.margin for p in self.positions.values()),
+                sum(o.reserved for book in self.open_orders.values() for o in book.values()),
+            )
+        return self._account
+
+    def unrealized_pnl(self) -> float:
+        return self._totals()[0]
+
+    def equity(self) -> float:
+        """Wallet balance plus unrealized PnL"""
+        if not self.positions:
+            return self.cash
+        return self.cash + self._totals()[0]
+
+    def available(self) -> float:
+        upnl, used, frozen = self._totals()
+        return max(0.0, self.cash + upnl - used - frozen)
+
+    # ==================== FILLS ====================
+
+    def _new_id(self) -> str:
+        oid = str(self._next_id)
+        self._next_id += 1
+        return oid
+
+    def _fill(self, order: _Order, price: float, fee_rate: float) -> bool:
+        side, opening = _TYPE_SIDES[order.type]
+        book = self.open_orders.get(order.symbol)
+        if book:
+            book.pop(order.order_id, None)
+
+        if opening:
+            leverage = self.leverage.get(order.symbol, self.default_leverage)
+            notional = order.size * price
+            fee = notional * fee_rate
+            margin = notional / leverage
+            if order.reserved == 0 and margin + fee > self.available():
+                order.status = 'canceled'
+                return False
+            order.reserved = 0.0
+            self.cash -= fee
+            pos = self.positions.get((order.symbol, side))
+            if pos:
+                total = pos.size + order.size
+                pos.entry_price = (pos.entry_price * pos.size + price * order.size) / total
+                pos.size = total
+                pos.margin += margin
+                pos.fees += fee
+            else:
+                self.positions[(order.symbol, side)] = _Position(
+                    order.symbol, side, order.size, price, margin, leverage, fee, self.now_ms)
+        else:
+            pos = self.positions.get((order.symbol, side))
+            if not pos:
+                order.status = 'canceled'
+                self._update_triggers(order.symbol)
+                return False
+            size = min(order.size, pos.size)
+            fee = self._close(pos, size, price, fee_rate, 'close')
+
+        self._update_triggers(order.symbol)
+        order.status = 'filled'
+        order.fill_price = price
+        order.fill_time = self.now_ms
+        order.fee = fee
+        self.fills.append({
+            'tradeId': str(len(self.fills) + 1),
+            'orderId': order.order_id,
+            'symbol': order.symbol,
+            'type': order.type,
+            'fillSize': str(order.size),
+            'fillValue': str(order.size * price),
+            'fillFee': str(fee),
+            'createdTime': self.now_ms,
+        })
+        return True
+
+    def _close(self, pos: _Position, size: float, price: float, fee_rate: float,
+               reason: str) -> float:
+        """Realize `size` of a position; returns the exit fee"""
+        share = size / pos.size
+        margin = pos.margin * share
+        pnl = pos.pnl_at(price, size)
+        if reason == 'liquidation':
+            pnl = max(pnl, -margin)  # isolated: lose at most the margin
+        fee = size * price * fee_rate
+        entry_fee = pos.fees * share
+        self.cash += pnl - fee
+
+        self.trades.append(SimTrade(
+            symbol=pos.symbol, side=pos.side, size=size,
+            entry_price=pos.entry_price, exit_price=price,
+            entry_time=pos.open_time, exit_time=self.now_ms,
+            pnl=pnl, fees=entry_fee + fee, reason=reason
+        ))
+
+        pos.size -= size
+        pos.margin -= margin
+        pos.fees -= entry_fee
+        if pos.size <= 1e-12:
+            del self.positions[(pos.symbol, pos.side)]
+        self._update_triggers(pos.symbol)
+        return fee
+
+    def _reject(self, client_oid: str, reason: str) -> Dict:
+        return {'order_id': None, 'client_oid': client_oid, 'result': False, 'err_msg': reason}
+
+    # ==================== CANDLES ====================
+
+    def _timeframe(self, symbol: str, granularity: str):
+        key = (symbol, granularity)
+        cached = self._resampled.get(key)
+        if cached is None:
+            bars, starts = resample_arrays(self.data[symbol], granularity)
+            bucket_of = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, self.data[symbol].shape[1])))
+            cached = self._resampled[key] = (bars, starts, bucket_of)
+        return cached
+
+    def get_arrays(self, symbol: str = "cmt_btcusdt", granularity: str = "1m",
+                   limit: int = 100) -> OHLCV:
+        """
+        Candles up to the current replay time as column arrays (CandleStore API)
+
+        The last bar is the forming one: its high/low/close follow the ticks
+        replayed so far (volume is the full bar's).
+        """
+        i = self._cursor.get(symbol, -1)
+        if i < 0 or limit <= 0:
+            return OHLCV(*_EMPTY)
+        data = self.data[symbol]
+
+        if granularity == '1m':
+            block = data[:, max(0, i - limit + 1):i + 1].copy()
+            block[2, -1] = self._high[symbol]
+            block[3, -1] = self._low[symbol]
+            block[4, -1] = self._price[symbol]
+            return OHLCV(*block)
+
+        if granularity not in GRANULARITY_MS:
+            return OHLCV(*_EMPTY)
+        bars, starts, bucket_of = self._timeframe(symbol, granularity)
+        k = int(bucket_of[i])
+        start = int(starts[k])
+        current = np.array([
+            bars[0, k],
+            data[1, start],
+            max(data[2, start:i].max(initial=-np.inf), self._high[symbol]),
+            min(data[3, start:i].min(initial=np.inf), self._low[symbol]),
+            self._price[symbol],
+            data[5, start:i + 1].sum(),
+        ])
+        block = np.concatenate([bars[:, max(0, k - limit + 1):k], current[:, None]], axis=1)
+        return OHLCV(*block)
+
+    # ==================== PUBLIC ENDPOINTS ====================
+
+    def attach_market_cache(self, cache, ticker_max_age: float = 2.0,
+                            candle_max_age: float = 10.0):
+        """No-op: the replay is the market data"""
+        self.market_cache = cache
+
+    def get_server_time(self) -> Dict:
+        return {
+            'epoch': f"{self.now_ms / 1000:.3f}",
+            'iso': datetime.fromtimestamp(self.now_ms / 1000, timezone.utc).isoformat(),
+            'timestamp': self.now_ms,
+        }
+
+    def get_ticker(self, symbol: str = "cmt_btcusdt") -> Dict:
+        i = self._cursor.get(symbol, -1)
+        if i < 0:
+            return {}
+        data = self.data[symbol]
+        price = self._price[symbol]
+        day = slice(max(0, i - 1439), i)
+        high = max(data[2, day].max(initial=-np.inf), self._high[symbol])
+        low = min(data[3, day].min(initial=np.inf), self._low[symbol])
+        first_open = data[1, day.start]
+        return {
+            'symbol': symbol,
+            'last': str(price),
+            'best_ask': str(price),
+            'best_bid': str(price),
+            'high_24h': str(high),
+            'low_24h': str(low),
+            'volume_24h': str(data[5, day.start:i + 1].sum()),
+            'priceChangePercent': str((price - first_open) / first_open if first_open else 0),
+            'timestamp': str(self.now_ms),
+        }
+
+    def get_candles(self, symbol: str = "cmt_btcusdt", granularity: str = "1m",
+                    limit: int = 100) -> List[List]:
+        return self.get_arrays(symbol, granularity, limit).rows()
+
+    def get_contracts(self) -> List[Dict]:
+        return [{'symbol': s, 'underlying_index': s.replace('cmt_', '').replace('usdt', '').upper(),
+                 'quote_currency': 'USDT', 'coin': 'USDT'} for s in self.data]
+
+    # ==================== PRIVATE ENDPOINTS ====================
+
+    def get_account_assets(self) -> List[Dict]:
+        upnl, _, frozen = self._totals()
+        return [{
+            'coinName': 'USDT',
+            'available': str(self.available()),
+            'equity': str(self.cash + upnl),
+            'frozen': str(frozen),
+            'unrealizePnl': str(upnl),
+        }]
+
+    def get_single_account(self, symbol: str = "cmt_btcusdt",
+                           margin_coin: str = "USDT") -> Dict:
+        return {
+            'symbol': symbol,
+            'marginCoin': margin_coin,
+            'available': str(self.available()),
+            'equity': str(self.equity()),
+            'leverage': str(self.leverage.get(symbol, self.default_leverage)),
+        }
+
+    def _position_dict(self, pos: _Position) -> Dict:
+        price = self._price[pos.symbol]
+        return {
+            'symbol': pos.symbol,
+            'holdSide': pos.side,
+            'total': str(pos.size),
+            'available': str(pos.size),
+            'averageOpenPrice': str(pos.entry_price),
+            'leverage': str(pos.leverage),
+            'margin': str(pos.margin),
+            'unrealizePnl': str(pos.pnl_at(price)),
+            'marketPrice': str(price),
+        }
+
+    def get_positions(self, symbol: str = None) -> List[Dict]:
+        return [self._position_dict(p) for p in self.positions.values()
+                if symbol is None or p.symbol == symbol]
+
+    def get_all_positions(self) -> List[Dict]:
+        return self.get_positions()
+
+    def set_leverage(self, symbol: str, leverage: int,
+                     margin_coin: str = "USDT") -> Dict:
+        self.leverage[symbol] = int(leverage)
+        return {'symbol': symbol, 'marginCoin': margin_coin, 'leverage': str(int(leverage)), 'result': True}
+
+    def place_order(self, symbol: str, side: str, order_type: str,
+                    size: str, price: str = None,
+                    margin_coin: str = "USDT",
+                    trade_side: str = "open",
+                    client_oid: str = None) -> Dict:
+        """
+        Same arguments as WeexClient.place_order
+
+        Market orders (and limits that would cross) fill at the current price
+        as taker; other limits rest and fill at their price as maker when a
+        tick reaches it. Opening orders need margin + fee in `available`.
+        """
+        if symbol not in self._price:
+            return self._reject(client_oid, f"unknown symbol {symbol}")
+        try:
+            size = float(size)
+            limit = float(price) if order_type == 'limit' and price is not None else None
+        except (TypeError, ValueError):
+            return self._reject(client_oid, "invalid size or price")
+        if size <= 0:
+            return self._reject(client_oid, "invalid size")
+
+        type_code = order_type_code(side, trade_side)
+        pos_side, opening = _TYPE_SIDES[type_code]
+        if not opening and (symbol, pos_side) not in self.positions:
+            return self._reject(client_oid, "no position to close")
+
+        order = _Order(self._new_id(), client_oid, symbol, type_code, size, limit, 0.0, self.now_ms)
+        self.orders[order.order_id] = order
+
+        current = self._price[symbol]
+        buying = (pos_side == 'long') == opening
+        if limit is None or (buying and limit >= current) or (not buying and limit <= current):
+            fill = current * (1 + self.slippage if buying else 1 - self.slippage)
+            if not self._fill(order, fill, self.taker_fee):
+                return self._reject(client_oid, "insufficient margin" if opening else "no position to close")
+        else:
+            if opening:
+                leverage = self.leverage.get(symbol, self.default_leverage)
+                reserve = size * limit / leverage + size * limit * self.maker_fee
+                if reserve > self.available():
+                    order.status = 'canceled'
+                    return self._reject(client_oid, "insufficient margin")
+                order.reserved = reserve
+            self.open_orders.setdefault(symbol, {})[order.order_id] = order
+            self._update_triggers(symbol)
+
+        return {'order_id': order.order_id, 'client_oid': client_oid, 'result': True, 'err_msg': None}
+
+    def cancel_order(self, symbol: str, order_id: str = None,
+                     client_oid: str = None,
+                     margin_coin: str = "USDT") -> Dict:
+        book = self.open_orders.get(symbol, {})
+        order = book.get(order_id) if order_id else next(
+            (o for o in book.values() if client_oid and o.client_oid == client_oid), None)
+        if order is None:
+            return {'order_id': order_id, 'client_oid': client_oid, 'result': False,
+                    'err_msg': 'order not found'}
+        del book[order.order_id]
+        order.status = 'canceled'
+        order.reserved = 0.0
+        self._update_triggers(symbol)
+        return {'order_id': order.order_id, 'client_oid': order.client_oid, 'result': True, 'err_msg': None}
+
+    def cancel_all_orders(self, symbol: str,
+                          margin_coin: str = "USDT") -> Dict:
+        cancelled = [self.cancel_order(symbol, oid)['order_id']
+                     for oid in list(self.open_orders.get(symbol, {}))]
+        return {'symbol': symbol, 'cancelled': cancelled, 'result': True}
+
+    def place_orders(self, orders: List[Dict], max_workers: int = 4) -> List[Dict]:
+        """Same as WeexClient.place_orders (filled one by one, in order)"""
+        results = []
+        for order in orders:
+            order = {k: v for k, v in order.items() if k != 'margin_coin'}
+            results.append(self.place_order(**order))
+        return results
+
+    def cancel_orders(self, order_ids: List[str], max_workers: int = 4) -> List[Dict]:
+        """Same as WeexClient.cancel_orders"""
+        results = []
+        for oid in order_ids:
+            symbol = next((s for s, book in self.open_orders.items() if oid in book), None)
+            if symbol is None:
+                results.append({'order_id': oid, 'result': False, 'err_msg': 'order not found'})
+                continue
+            result = self.cancel_order(symbol, oid)
+            results.append({'order_id': oid, 'result': result['result'], 'err_msg': result['err_msg']})
+        return results
+
+    def get_open_orders(self, symbol: str = None) -> List[Dict]:
+        return [o.to_dict() for s, book in self.open_orders.items()
+                if symbol is None or s == symbol for o in book.values()]
+
+    def get_order_detail(self, symbol: str, order_id: str) -> Dict:
+        order = self.orders.get(str(order_id))
+        return order.to_dict() if order and order.symbol == symbol else {}
+
+    def get_order_history(self, symbol: str,
+                          start_time: int = None,
+                          end_time: int = None,
+                          page_size: int = 20) -> List[Dict]:
+        history = [o for o in self.orders.values() if o.symbol == symbol and o.status != 'open'
+                   and (start_time is None or o.create_time >= start_time)
+                   and (end_time is None or o.create_time <= end_time)]
+        return [o.to_dict() for o in reversed(history[-page_size:])]
+
+    def get_trade_fills(self, symbol: str,
+                        start_time: int = None,
+                        end_time: int = None) -> List[Dict]:
+        return [f for f in self.fills if f['symbol'] == symbol
+                and (start_time is None or f['createdTime'] >= start_time)
+                and (end_time is None or f['createdTime'] <= end_time)]
+
+    def test_connectivity(self) -> bool:
+        return bool(self.data)
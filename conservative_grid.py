@@ -20,61 +20,62 @@ Timeframes:
 import os
 import sys
 import time
-import json
+import threading
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from dotenv import load_dotenv
-import requests
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from weex_client import WeexClient
+from utils.market_stream import MarketDataCache, MarketStream, TickDispatcher
+from utils.state_store import StateStore, ticker_prices
+from utils.candle_store import CandleStore
+from utils.contracts import ContractRegistry
+from utils.resampler import Resampler
+from utils.journal import DecisionJournal, migrate_json_log
+from utils.triggers import TriggerIndex
+from utils.market_intel import GLOBAL, get_market_intel
+from utils import indicators
 
 load_dotenv()
 
 # Log file for real-time decisions
 LOG_FILE = "bot_decisions.log"
-JSON_LOG_FILE = "bot_signals.json"
+JSON_LOG_FILE = "bot_signals.jsonl"  # Append-only, rotado por tamaño (utils.journal)
+LEGACY_JSON_LOG_FILE = "bot_signals.json"  # Formato anterior (array JSON), se migra una vez
+
+# Scalper V2: señales Bollinger + RSI, TP/SL dinámicos por ATR (5m)
+RSI_SHORT_MIN = 65        # SHORT si rompe banda superior y RSI > 65
+RSI_LONG_MAX = 35         # LONG si rompe banda inferior y RSI < 35
+ATR_SL_MULT = 2.0         # SL = 2x ATR
+ATR_TP_MULT = 1.5         # TP = 1.5x ATR
+MIN_SPACING_PCT = 0.2     # Distancia mínima del SL (TP: 1.5x) si el ATR es muy bajo
+
+
+_journal = None
+
+
+def get_journal() -> DecisionJournal:
+    """Journal del bot (se crea al primer uso: importar el módulo no arranca el hilo)"""
+    global _journal
+    if _journal is None:
+        migrate_json_log(LEGACY_JSON_LOG_FILE, JSON_LOG_FILE)
+        _journal = DecisionJournal(JSON_LOG_FILE, text_path=LOG_FILE)
+    return _journal
 
 
 def log_decision(message: str, data: dict = None):
-    """Log a decision to file with timestamp"""
+    """Log a decision with timestamp (disk writes happen on the journal thread)"""
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    log_entry = f"[{timestamp}] {message}"
     
     # Console print
-    print(log_entry)
-    
-    # File log
-    with open(LOG_FILE, 'a', encoding='utf-8') as f:
-        f.write(log_entry + "\n")
+    print(f"[{timestamp}] {message}")
     
-    # JSON log for structured data
-    if data:
-        try:
-            # Read existing
-            signals = []
-            if os.path.exists(JSON_LOG_FILE):
-                with open(JSON_LOG_FILE, 'r') as f:
-                    signals = json.load(f)
-            
-            # Add new entry
-            signals.append({
-                'timestamp': timestamp,
-                'message': message,
-                **data
-            })
-            
-            # Keep last 500 entries
-            signals = signals[-500:]
-            
-            # Write back
-            with open(JSON_LOG_FILE, 'w') as f:
-                json.dump(signals, f, indent=2)
-        except:
-            pass
+    # Text log + JSONL (bot_signals.jsonl) for structured data
+    get_journal().record(message, data, timestamp)
 
 
 @dataclass
@@ -90,42 +91,30 @@ class GridConfig:
 
 
 class CoinGeckoLite:
-    """Cliente ligero de CoinGecko para condiciones de mercado"""
+    """Condiciones de mercado de CoinGecko (vía el MarketIntelProvider compartido)"""
     
-    def __init__(self):
-        self.api_key = os.getenv("COINGECKO_API_KEY", "")
-        self.base_url = "https://pro-api.coingecko.com/api/v3" if self.api_key else "https://api.coingecko.com/api/v3"
-        self.headers = {'x-cg-pro-api-key': self.api_key} if self.api_key else {}
-        print(f"🦎 CoinGecko: {'Pro API' if self.api_key else 'Free API'}")
+    def __init__(self, intel=None):
+        """
+        Args:
+            intel: MarketIntelProvider (por defecto el compartido del proceso)
+        """
+        self.intel = intel or get_market_intel()
+        print(f"🦎 CoinGecko: {'Pro API' if self.intel.api_key else 'Free API'}")
     
     def get_fear_greed(self) -> int:
-        """Obtener Fear & Greed Index (0-100)"""
-        try:
-            resp = requests.get("https://api.alternative.me/fng/", timeout=10)
-            if resp.status_code == 200:
-                return int(resp.json()['data'][0]['value'])
-        except:
-            pass
-        return 50  # Neutral por defecto
+        """Obtener Fear & Greed Index (0-100), sin esperar a la red"""
+        return int(self.intel.fear_greed().get('value', 50))
     
     def get_market_condition(self) -> Dict:
-        """Obtener condición general del mercado"""
-        try:
-            resp = requests.get(
-                f"{self.base_url}/global",
-                headers=self.headers,
-                timeout=10
-            )
-            if resp.status_code == 200:
-                data = resp.json()['data']
-                return {
-                    'btc_dominance': data.get('market_cap_percentage', {}).get('btc', 50),
-                    'market_change_24h': data.get('market_cap_change_percentage_24h_usd', 0),
-                    'total_volume': data.get('total_volume', {}).get('usd', 0)
-                }
-        except:
-            pass
-        return {'btc_dominance': 50, 'market_change_24h': 0, 'total_volume': 0}
+        """Obtener condición general del mercado (último valor en caché)"""
+        data = self.intel.get(GLOBAL, default=None)
+        if not data:
+            return {'btc_dominance': 50, 'market_change_24h': 0, 'total_volume': 0}
+        return {
+            'btc_dominance': data.get('btc_dominance', 50),
+            'market_change_24h': data.get('market_cap_change_24h', 0),
+            'total_volume': data.get('total_volume_24h', 0)
+        }
     
     def is_market_safe(self) -> Tuple[bool, str]:
         """
@@ -195,29 +184,43 @@ class ConservativeGridBot:
         ),
     }
     
-    # Step sizes por moneda
-    STEP_SIZES = {
-        'cmt_btcusdt': 0.001,
-        'cmt_ethusdt': 0.01,
-        'cmt_solusdt': 0.1,
-        'cmt_bnbusdt': 0.1,
-        'cmt_adausdt': 10,
-        'cmt_dogeusdt': 100,
-        'cmt_ltcusdt': 0.1,
-        'cmt_xrpusdt': 10,
-    }
-    
-    def __init__(self):
-        """Inicializar bot"""
+    def __init__(self, client=None, candle_store=None, market_intel=None, contracts=None,
+                 state_store=None):
+        """
+        Inicializar bot
+        
+        Args:
+            client: WeexClient (se crea uno si no se pasa; el backtest usa SimulatedWeexClient)
+            candle_store: Fuente de velas (CandleStore sobre el cliente por defecto)
+            market_intel: Objeto con is_market_safe() (CoinGeckoLite por defecto)
+            contracts: ContractRegistry con lot step / tick por moneda (del exchange por defecto)
+            state_store: StateStore que lee el dashboard (solo se publica desde run())
+        """
         print("="*60)
         print("🏆 CONSERVATIVE GRID BOT")
         print("="*60)
         
-        self.client = WeexClient()
-        self.coingecko = CoinGeckoLite()
+        self.client = client or WeexClient()
+        self.contracts = contracts or ContractRegistry(self.client)
+        self.coingecko = market_intel or CoinGeckoLite()
+        self.state_store = state_store or StateStore()
+        
+        # Stream de precios: TP/SL se evalúan en cada tick
+        self._lock = threading.RLock()
+        self.market_cache = MarketDataCache()
+        self.client.attach_market_cache(self.market_cache)
+        self.candles = candle_store or CandleStore(self.client)
+        self.resampler = Resampler(self.candles)  # 5m/15m/1H desde velas 1m
+        # Los cierres corren en el hilo del dispatcher, nunca en el lector del WebSocket
+        self.tick_dispatcher = TickDispatcher(self._handle_tick, name="grid-ticks")
+        self.stream = MarketStream(
+            list(self.GRID_CONFIGS), granularities=('1m', '5m'),
+            cache=self.market_cache, on_tick=self._on_tick
+        )
         
         # Estado
         self.positions: Dict[str, Dict] = {}
+        self.triggers = TriggerIndex()  # TP/SL de cada posición, ordenados por precio
         self.pending_orders: Dict[str, List] = {}
         self.daily_pnl = 0.0
         self.total_trades = 0
@@ -246,6 +249,7 @@ class ConservativeGridBot:
                     if a.get('coinName') == 'USDT':
                         self.equity = float(a.get('equity', 0))
                         self.available = float(a.get('available', 0))
+                        self.frozen = float(a.get('frozen', 0))
                         self.unrealized = float(a.get('unrealizePnl', 0))
                         return True
         except Exception as e:
@@ -294,16 +298,19 @@ class ConservativeGridBot:
                             tp_price = entry_price * (1 - config.take_profit / 100)
                             sl_price = entry_price * (1 + config.stop_loss / 100)
 
-                        self.positions[symbol] = {
-                            'order_id': 'recovered_from_exchange',
-                            'side': side,
-                            'entry_price': entry_price,
-                            'size': size,
-                            'tp': tp_price,
-                            'sl': sl_price,
-                            'leverage': config.leverage,
-                            'open_time': datetime.now() # Reset timer
-                        }
+                        # Bajo el lock: el hilo de ticks lee positions y triggers
+                        with self._lock:
+                            self.positions[symbol] = {
+                                'order_id': 'recovered_from_exchange',
+                                'side': side,
+                                'entry_price': entry_price,
+                                'size': size,
+                                'tp': tp_price,
+                                'sl': sl_price,
+                                'leverage': config.leverage,
+                                'open_time': datetime.now() # Reset timer
+                            }
+                            self.triggers.add(symbol, symbol, side, stop=sl_price, target=tp_price)
                         count += 1
                         print(f"   ✅ Recovered {symbol}: {side.upper()} @ ${entry_price:.4f}")
             
@@ -315,10 +322,6 @@ class ConservativeGridBot:
         except Exception as e:
             print(f"❌ Error syncing state: {e}")
     
-    def get_step_size(self, symbol: str) -> float:
-        """Get step size for symbol"""
-        return self.STEP_SIZES.get(symbol, 0.01)
-    
     def check_safety(self) -> Tuple[bool, str]:
         """Verificar si es seguro operar"""
         # 1. Verificar mercado
@@ -372,20 +375,8 @@ class ConservativeGridBot:
             lows = [float(c[3]) for c in candles_sorted]
             closes = [float(c[4]) for c in candles_sorted]
             
-            tr_list = []
-            for i in range(1, len(closes)):
-                h = highs[i]
-                l = lows[i]
-                pc = closes[i-1]
-                
-                tr = max(h - l, abs(h - pc), abs(l - pc))
-                tr_list.append(tr)
-                
-            if not tr_list:
-                return 0.0
-                
-            # Simple average for ATR (or EMA-like smoothing)
-            return sum(tr_list[-period:]) / period
+            # Simple average of the last `period` true ranges
+            return indicators.atr(highs, lows, closes, period)
         except Exception as e:
             print(f"❌ ATR Error: {e}")
             return 0.0
@@ -396,20 +387,7 @@ class ConservativeGridBot:
         Returns: (upper, middle, lower)
         """
         try:
-            if len(closes) < period:
-                return 0, 0, 0
-                
-            # Simple Moving Average (Middle Band)
-            sma = sum(closes[-period:]) / period
-            
-            # Standard Deviation
-            variance = sum([((x - sma) ** 2) for x in closes[-period:]]) / period
-            std_dev = variance ** 0.5
-            
-            upper = sma + (multiplier * std_dev)
-            lower = sma - (multiplier * std_dev)
-            
-            return upper, sma, lower
+            return indicators.bollinger_bands(closes, period, multiplier)
         except Exception as e:
             print(f"❌ BB Error: {e}")
             return 0, 0, 0
@@ -417,35 +395,11 @@ class ConservativeGridBot:
     def calculate_rsi(self, symbol: str) -> float:
         """Calcular RSI para el símbolo"""
         try:
-            candles = self.client.get_candles(symbol, granularity='5m', limit=30)
-            if not candles or len(candles) < 15:
+            closes = self.candles.get_arrays(symbol, granularity='5m', limit=30).close
+            if len(closes) < 15:
                 return 50.0
             
-            # Sort by timestamp
-            candles_sorted = sorted(candles, key=lambda x: int(x[0]))
-            closes = [float(c[4]) for c in candles_sorted]
-            
-            # Calculate RSI
-            period = 14
-            gains = []
-            losses = []
-            
-            for i in range(1, len(closes)):
-                change = closes[i] - closes[i-1]
-                gains.append(max(0, change))
-                losses.append(max(0, -change))
-            
-            if len(gains) < period:
-                return 50.0
-            
-            avg_gain = sum(gains[-period:]) / period
-            avg_loss = sum(losses[-period:]) / period
-            
-            if avg_loss == 0:
-                return 100.0 if avg_gain > 0 else 50.0
-            
-            rs = avg_gain / avg_loss
-            return 100 - (100 / (1 + rs))
+            return indicators.rsi(closes, 14)
             
         except:
             return 50.0
@@ -469,9 +423,16 @@ class ConservativeGridBot:
         
         timeframes = [('1m', 20), ('5m', 20), ('15m', 12), ('1H', 6)]
         
+        # Una sola petición de velas 1m; 5m/15m/1H se agregan localmente
+        try:
+            view = self.resampler.view(symbol, dict(timeframes))
+        except Exception as e:
+            print(f"      ⚠️ Error candles {symbol}: {e}")
+            return analysis
+        
         for tf, limit in timeframes:
             try:
-                candles = self.client.get_candles(symbol, granularity=tf, limit=limit)
+                candles = view.get(tf, limit)
                 if not candles or len(candles) < 3:
                     continue
                 
@@ -524,23 +485,7 @@ class ConservativeGridBot:
                 if tf == '5m':
                     # RSI
                     if len(closes) >= 14:
-                        gains = []
-                        losses = []
-                        for i in range(1, len(closes)):
-                            change = closes[i] - closes[i-1]
-                            gains.append(max(0, change))
-                            losses.append(max(0, -change))
-                        
-                        avg_gain = sum(gains[-14:]) / 14 if len(gains) >= 14 else 0
-                        avg_loss = sum(losses[-14:]) / 14 if len(losses) >= 14 else 0
-                        
-                        if avg_loss > 0:
-                            rs = avg_gain / avg_loss
-                            rsi = 100 - (100 / (1 + rs))
-                        else:
-                            rsi = 100 if avg_gain > 0 else 50
-                        
-                        analysis['5m']['rsi'] = rsi
+                        analysis['5m']['rsi'] = indicators.rsi(closes, 14)
                     
                     # Bollinger Bands & ATR
                     bb_up, bb_mid, bb_low = self.calculate_bollinger_bands(closes, period=20, multiplier=2)
@@ -646,10 +591,8 @@ class ConservativeGridBot:
             print(f"      1h:  {h1.get('trend', '?'):8} | Δ {h1.get('change_pct', 0):+.3f}%")
             
             # Calculate size
-            step = self.get_step_size(symbol)
             notional = config.position_size * config.leverage
-            raw_size = notional / price
-            size = round(raw_size / step) * step
+            size = self.contracts.get(symbol).size_for_notional(notional, price)
             
             # Expected profit calculation
             expected_profit = notional * (config.take_profit / 100)
@@ -703,21 +646,19 @@ class ConservativeGridBot:
                 print(f"      ⏸️  Price inside bands - No signal")
                 continue
 
-            # Calculate Dynamic Risk (2x ATR for SL, 1.5x ATR for TP)
-            # Ensure minimum spacing (0.2% price) if ATR is too low
-            min_spacing = price * 0.002
-            sl_dist = max(atr * 2, min_spacing)
-            tp_dist = max(atr * 1.5, min_spacing * 1.5)
+            # Calculate Dynamic Risk (ATR_SL_MULT x ATR for SL, ATR_TP_MULT x ATR for TP)
+            # Ensure minimum spacing (MIN_SPACING_PCT of price) if ATR is too low
+            min_spacing = price * MIN_SPACING_PCT / 100
+            sl_dist = max(atr * ATR_SL_MULT, min_spacing)
+            tp_dist = max(atr * ATR_TP_MULT, min_spacing * 1.5)
             
             # Convert to percentages for logging
             sl_pct = (sl_dist / price) * 100
             tp_pct = (tp_dist / price) * 100
 
             # Calculate size
-            step = self.get_step_size(symbol)
             notional = config.position_size * config.leverage
-            raw_size = notional / price
-            size = round(raw_size / step) * step
+            size = self.contracts.get(symbol).size_for_notional(notional, price)
             
             signal = None
             reason = ""
@@ -728,16 +669,16 @@ class ConservativeGridBot:
             
             # CASO 1: SHORT (Price > Upper Band + RSI Overbought)
             if bb_status == 'upper_break' or price > bb_upper:
-                if rsi > 65:
+                if rsi > RSI_SHORT_MIN:
                     # Filter: Don't short if 15m is super bullish? Maybe just rely on RSI
                     signal = 'sell'
-                    reason = f"🔴 BB BREAK UP + RSI ({rsi:.0f}) > 65"
+                    reason = f"🔴 BB BREAK UP + RSI ({rsi:.0f}) > {RSI_SHORT_MIN}"
             
             # CASO 2: LONG (Price < Lower Band + RSI Oversold)
             elif bb_status == 'lower_break' or price < bb_lower:
-                if rsi < 35:
+                if rsi < RSI_LONG_MAX:
                     signal = 'buy'
-                    reason = f"🟢 BB BREAK DOWN + RSI ({rsi:.0f}) < 35"
+                    reason = f"🟢 BB BREAK DOWN + RSI ({rsi:.0f}) < {RSI_LONG_MAX}"
             
             # Execute
             if signal:
@@ -816,8 +757,9 @@ class ConservativeGridBot:
                 order_type='market'
             )
             
-            if result and result.get('orderId'):
-                print(f"   ✅ Order: {result['orderId']}")
+            order_id = (result.get('order_id') or result.get('orderId')) if result else None
+            if order_id:
+                print(f"   ✅ Order: {order_id}")
                 
                 # LOG THE TRADE DECISION
                 log_decision(f"🎯 OPENED {side.upper()} {symbol}", {
@@ -829,19 +771,22 @@ class ConservativeGridBot:
                     'take_profit': tp_price,
                     'stop_loss': sl_price,
                     'leverage': config.leverage,
-                    'order_id': result['orderId']
+                    'order_id': order_id
                 })
                 
-                self.positions[symbol] = {
-                    'order_id': result['orderId'],
-                    'side': side,
-                    'entry_price': price,
-                    'size': size,
-                    'tp': tp_price,
-                    'sl': sl_price,
-                    'leverage': config.leverage,
-                    'open_time': datetime.now()
-                }
+                # Bajo el lock: el hilo de ticks lee positions y triggers
+                with self._lock:
+                    self.positions[symbol] = {
+                        'order_id': order_id,
+                        'side': side,
+                        'entry_price': price,
+                        'size': size,
+                        'tp': tp_price,
+                        'sl': sl_price,
+                        'leverage': config.leverage,
+                        'open_time': datetime.now()
+                    }
+                    self.triggers.add(symbol, symbol, side, stop=sl_price, target=tp_price)
                 
                 self.total_trades += 1
                 return True
@@ -855,75 +800,104 @@ class ConservativeGridBot:
     
     def check_positions(self):
         """Verificar y cerrar posiciones si alcanzaron TP/SL"""
-        for symbol, pos in list(self.positions.items()):
+        for symbol in list(self.positions.keys()):
             try:
                 ticker = self.get_ticker_data(symbol)
                 if not ticker:
                     continue
                 
-                current_price = ticker['last']
-                entry_price = pos['entry_price']
-                side = pos['side']
-                
-                # Calcular PnL
-                if side == 'buy':
-                    pnl_pct = (current_price - entry_price) / entry_price * 100
-                    hit_tp = current_price >= pos['tp']
-                    hit_sl = current_price <= pos['sl']
-                else:
-                    pnl_pct = (entry_price - current_price) / entry_price * 100
-                    hit_tp = current_price <= pos['tp']
-                    hit_sl = current_price >= pos['sl']
-                
-                # PnL real con leverage
-                config = self.GRID_CONFIGS.get(symbol)
-                leverage = config.leverage if config else 10
-                position_value = pos['size'] * entry_price / leverage
-                actual_pnl = pnl_pct * leverage * position_value / 100
-                
-                # Mostrar estado
-                elapsed = (datetime.now() - pos['open_time']).total_seconds()
-                if elapsed % 60 < 10:  # Cada ~minuto
-                    print(f"   📍 {symbol}: {pnl_pct:+.2f}% (${actual_pnl:+.2f})")
-                
-                # Cerrar si TP o SL
-                if hit_tp or hit_sl:
-                    close_side = 'sell' if side == 'buy' else 'buy'
-                    
-                    emoji = "🎯 TP" if hit_tp else "🛑 SL"
-                    print(f"\n{emoji} CLOSING {symbol}")
-                    print(f"   Entry: ${entry_price:.4f} → Exit: ${current_price:.4f}")
-                    print(f"   PnL: {pnl_pct:+.2f}% (${actual_pnl:+.2f})")
-                    
-                    # LOG THE CLOSE
-                    log_decision(f"{emoji} CLOSED {symbol}", {
-                        'type': 'trade_closed',
-                        'symbol': symbol,
-                        'side': side,
-                        'entry_price': entry_price,
-                        'exit_price': current_price,
-                        'pnl_pct': pnl_pct,
-                        'pnl_usd': actual_pnl,
-                        'reason': 'take_profit' if hit_tp else 'stop_loss'
-                    })
-                    
-                    # Close position
-                    self.client.place_order(
-                        symbol=symbol,
-                        side=close_side,
-                        size=pos['size'],
-                        order_type='market'
-                    )
-                    
-                    self.daily_pnl += actual_pnl
-                    if actual_pnl > 0:
-                        self.winning_trades += 1
-                    
-                    del self.positions[symbol]
+                with self._lock:
+                    self.evaluate_position(symbol, ticker['last'], verbose=True)
                     
             except Exception as e:
                 print(f"❌ Error checking {symbol}: {e}")
     
+    def _on_tick(self, symbol: str, price: float):
+        """Callback del stream: encolar ticks de posiciones abiertas y volver"""
+        if symbol in self.positions:
+            self.tick_dispatcher.submit(symbol, price)
+    
+    def _handle_tick(self, symbol: str, price: float):
+        """Evaluar TP/SL de un tick (hilo del dispatcher; puede enviar el cierre)"""
+        if symbol not in self.positions:
+            return
+        try:
+            with self._lock:
+                self.evaluate_position(symbol, price)
+        except Exception as e:
+            print(f"❌ Error on tick {symbol}: {e}")
+    
+    def evaluate_position(self, symbol: str, current_price: float, verbose: bool = False):
+        """Cerrar la posición si `current_price` toca TP o SL"""
+        pos = self.positions.get(symbol)
+        if not pos or current_price <= 0:
+            return
+        
+        # El índice solo devuelve algo si el tick cruzó el TP o el SL
+        hits = self.triggers.tick(symbol, current_price)
+        if not hits and not verbose:
+            return
+        hit_tp = bool(hits) and hits[0].kind == 'target'
+        hit_sl = bool(hits) and hits[0].kind == 'stop'
+        
+        entry_price = pos['entry_price']
+        side = pos['side']
+        
+        # Calcular PnL
+        if side == 'buy':
+            pnl_pct = (current_price - entry_price) / entry_price * 100
+        else:
+            pnl_pct = (entry_price - current_price) / entry_price * 100
+        
+        # PnL real con leverage
+        config = self.GRID_CONFIGS.get(symbol)
+        leverage = config.leverage if config else 10
+        position_value = pos['size'] * entry_price / leverage
+        actual_pnl = pnl_pct * leverage * position_value / 100
+        
+        # Mostrar estado
+        if verbose:
+            elapsed = (datetime.now() - pos['open_time']).total_seconds()
+            if elapsed % 60 < 10:  # Cada ~minuto
+                print(f"   📍 {symbol}: {pnl_pct:+.2f}% (${actual_pnl:+.2f})")
+        
+        # Cerrar si TP o SL
+        if hit_tp or hit_sl:
+            close_side = 'sell' if side == 'buy' else 'buy'
+            
+            emoji = "🎯 TP" if hit_tp else "🛑 SL"
+            print(f"\n{emoji} CLOSING {symbol}")
+            print(f"   Entry: ${entry_price:.4f} → Exit: ${current_price:.4f}")
+            print(f"   PnL: {pnl_pct:+.2f}% (${actual_pnl:+.2f})")
+            
+            # LOG THE CLOSE
+            log_decision(f"{emoji} CLOSED {symbol}", {
+                'type': 'trade_closed',
+                'symbol': symbol,
+                'side': side,
+                'entry_price': entry_price,
+                'exit_price': current_price,
+                'pnl_pct': pnl_pct,
+                'pnl_usd': actual_pnl,
+                'reason': 'take_profit' if hit_tp else 'stop_loss'
+            })
+            
+            # Close position
+            self.client.place_order(
+                symbol=symbol,
+                side=close_side,
+                size=pos['size'],
+                order_type='market',
+                trade_side='close'
+            )
+            
+            self.daily_pnl += actual_pnl
+            if actual_pnl > 0:
+                self.winning_trades += 1
+            
+            del self.positions[symbol]
+            self.triggers.remove(symbol)
+    
     def print_status(self):
         """Imprimir estado actual"""
         self.update_balance()
@@ -944,6 +918,57 @@ class ConservativeGridBot:
         for sym, pos in self.positions.items():
             print(f"      {sym}: {pos['side'].upper()} @ ${pos['entry_price']:.4f}")
     
+    def publish_state(self):
+        """Publicar balance, posiciones y precios del stream para el dashboard"""
+        prices = ticker_prices(self.market_cache.tickers())
+        positions = []
+        for symbol, pos in list(self.positions.items()):
+            price = prices.get(symbol, {}).get('last')
+            sign = 1 if pos['side'] == 'buy' else -1
+            positions.append({
+                'symbol': symbol,
+                'holdSide': 'long' if pos['side'] == 'buy' else 'short',
+                'total': pos['size'],
+                'averageOpenPrice': pos['entry_price'],
+                'unrealizedPL': round((price - pos['entry_price']) * float(pos['size']) * sign, 4) if price else 0,
+            })
+        self.state_store.publish(
+            "conservative_grid",
+            balance={'equity': self.equity, 'available': self.available,
+                     'frozen': getattr(self, 'frozen', 0)},
+            positions=positions,
+            prices=prices,
+        )
+    
+    def run_cycle(self) -> bool:
+        """
+        Un ciclo del bot (sin sleep); también lo usa el backtest
+        
+        Returns:
+            False si el mercado no es seguro (ciclo en pausa)
+        """
+        # Safety check
+        is_safe, reason = self.check_safety()
+        print(f"   {reason}")
+        
+        if not is_safe:
+            print("   ⏸️ Paused - waiting for safe conditions")
+            return False
+        
+        # Check positions first (maybe close for profit)
+        self.check_positions()
+        
+        # Find scalp opportunity
+        if len(self.positions) < 2:  # Max 2 positions (1 BTC + 1 ETH)
+            opp = self.find_opportunity()
+            if opp:
+                symbol, side, price, size, tp_pct, sl_pct = opp
+                self.open_position(symbol, side, price, size, tp_pct, sl_pct)
+        else:
+            print(f"   ⏳ Max positions reached ({len(self.positions)})")
+        
+        return True
+    
     def run(self, interval: int = 15):
         """Ejecutar bot - MICRO SCALPER MODE"""
         print(f"\n🚀 MICRO SCALPER STARTING...")
@@ -956,6 +981,8 @@ class ConservativeGridBot:
         cycle = 0
         last_status = 0
         
+        self.stream.start()
+        
         try:
             while True:
                 cycle += 1
@@ -964,27 +991,12 @@ class ConservativeGridBot:
                 print(f"\n{'─'*60}")
                 print(f"⚡ Cycle {cycle} - {datetime.now().strftime('%H:%M:%S')}")
                 
-                # Safety check
-                is_safe, reason = self.check_safety()
-                print(f"   {reason}")
-                
-                if not is_safe:
-                    print("   ⏸️ Paused - waiting for safe conditions")
+                cycle_ok = self.run_cycle()
+                self.publish_state()
+                if not cycle_ok:
                     time.sleep(interval * 2)
                     continue
                 
-                # Check positions first (maybe close for profit)
-                self.check_positions()
-                
-                # Find scalp opportunity
-                if len(self.positions) < 2:  # Max 2 positions (1 BTC + 1 ETH)
-                    opp = self.find_opportunity()
-                    if opp:
-                        symbol, side, price, size, tp_pct, sl_pct = opp
-                        self.open_position(symbol, side, price, size, tp_pct, sl_pct)
-                else:
-                    print(f"   ⏳ Max positions reached ({len(self.positions)})")
-                
                 # Status every 1 min (faster updates)
                 if now - last_status > 60:
                     self.print_status()
@@ -995,6 +1007,9 @@ class ConservativeGridBot:
         except KeyboardInterrupt:
             print("\n\n⛔ Stopped by user")
             self.print_status()
+        finally:
+            self.stream.stop()
+            self.tick_dispatcher.stop()
 
 
 if __name__ == "__main__":
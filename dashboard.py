@@ -7,10 +7,6 @@ Includes Peak Hunter alerts and Grid Trading status
 import os
 import sys
 import time
-import json
-import hmac
-import hashlib
-import base64
 import requests
 from datetime import datetime
 from dotenv import load_dotenv
@@ -18,48 +14,47 @@ from dotenv import load_dotenv
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 load_dotenv()
 
-# API Config
-API_KEY = os.getenv("WEEX_API_KEY")
-SECRET_KEY = os.getenv("WEEX_SECRET_KEY")
-PASSPHRASE = os.getenv("WEEX_PASSPHRASE")
-BASE_URL = "https://api-contract.weex.com"
+from utils.journal import tail_events
+from utils.market_intel import get_market_intel
+from utils.state_store import StateStore, ticker_prices
+from utils.trade_ledger import TradeLedger
+from weex_client import get_shared_client
 
 # Starting balance for hackathon
 STARTING_BALANCE = 1000.0
 
-# Peak Hunter trades log
-PEAK_TRADES_LOG = "peak_trades.json"
+# Peak Hunter trade ledger (SQLite, see utils.trade_ledger)
+PEAK_TRADES_DB = "peak_trades.db"
+PEAK_TRADES_LEGACY = "peak_trades.json"  # Older format, imported once into the ledger
+
+# Conservative Grid decision journal (JSONL, see utils.journal)
+DECISIONS_LOG = "bot_signals.jsonl"
 
 # Monedas monitoreadas por Peak Hunter
 PEAK_COINS = ["cmt_solusdt", "cmt_ethusdt", "cmt_bnbusdt", "cmt_dogeusdt", "cmt_adausdt", "cmt_ltcusdt"]
 
+# Bot state snapshots (utils.state_store); the exchange is only read for what bots don't publish
+STATE_MAX_AGE = 120
+LIVE_SOURCE = "dashboard"
+# Account-wide panels: each bot only knows its own positions (not Peak Hunter's or manual ones)
+# and none publishes orders or trades, so these always come from the exchange
+ACCOUNT_SECTIONS = ('positions', 'orders', 'trades')
 
-def sign_request(method, path, query="", body=""):
-    """Sign API request"""
-    ts = str(int(time.time() * 1000))
-    msg = ts + method + path + query + body
-    sig = base64.b64encode(
-        hmac.new(SECRET_KEY.encode(), msg.encode(), hashlib.sha256).digest()
-    ).decode()
-    return ts, sig
 
+_client = None
 
-def get_headers(ts, sig):
-    return {
-        "ACCESS-KEY": API_KEY,
-        "ACCESS-SIGN": sig,
-        "ACCESS-TIMESTAMP": ts,
-        "ACCESS-PASSPHRASE": PASSPHRASE,
-        "Content-Type": "application/json"
-    }
+
+def get_client():
+    """Shared WeexClient (one keep-alive pool for every panel)"""
+    global _client
+    if _client is None:
+        _client = get_shared_client()
+    return _client
 
 
 def get_balance():
     """Get current USDT balance"""
-    path = "/capi/v2/account/assets"
-    ts, sig = sign_request("GET", path)
-    resp = requests.get(f"{BASE_URL}{path}", headers=get_headers(ts, sig), timeout=10)
-    data = resp.json()
+    data = get_client().get_account_assets()
     
     if isinstance(data, list):
         for asset in data:
@@ -72,72 +67,63 @@ def get_balance():
     return {'available': 0, 'equity': 0, 'frozen': 0}
 
 
-def get_price(symbol="cmt_btcusdt"):
-    """Get current price"""
-    resp = requests.get(f"{BASE_URL}/capi/v2/market/ticker?symbol={symbol}", timeout=10)
-    data = resp.json()
-    return {
-        'price': float(data.get('last', 0)),
-        'high_24h': float(data.get('high_24h', 0)),
-        'low_24h': float(data.get('low_24h', 0)),
-        'change_24h': float(data.get('change_24h', 0)) if data.get('change_24h') else 0
-    }
-
-
 def get_open_orders(symbol="cmt_btcusdt"):
     """Get open orders"""
-    path = "/capi/v2/order/current"
-    query = f"?symbol={symbol}"
-    ts, sig = sign_request("GET", path, query)
-    resp = requests.get(f"{BASE_URL}{path}{query}", headers=get_headers(ts, sig), timeout=10)
-    data = resp.json()
+    data = get_client().get_open_orders(symbol)
     return data if isinstance(data, list) else []
 
 
 def get_positions(symbol="cmt_btcusdt"):
     """Get open positions"""
     try:
-        path = "/capi/v2/position/singlePosition"
-        query = f"?symbol={symbol}&marginCoin=USDT"
-        ts, sig = sign_request("GET", path, query)
-        resp = requests.get(f"{BASE_URL}{path}{query}", headers=get_headers(ts, sig), timeout=10)
-        if resp.text:
-            return resp.json()
-        return []
+        data = get_client().request("GET", "/capi/v2/position/singlePosition",
+                                    {"symbol": symbol, "marginCoin": "USDT"})
+        return data if isinstance(data, list) else []
     except:
         return []
 
 
 def get_trade_history(symbol="cmt_btcusdt"):
     """Get recent trades"""
-    path = "/capi/v2/order/history"
-    query = f"?symbol={symbol}&pageSize=10"
-    ts, sig = sign_request("GET", path, query)
-    resp = requests.get(f"{BASE_URL}{path}{query}", headers=get_headers(ts, sig), timeout=10)
-    data = resp.json()
+    data = get_client().get_order_history(symbol, page_size=10)
     
     if isinstance(data, dict) and 'list' in data:
         return data['list']
     return data if isinstance(data, list) else []
 
 
+_peak_ledger = None
+
+
 def get_peak_trades():
-    """Get Peak Hunter trades from log file"""
+    """Get today's Peak Hunter trades from the trade ledger (legacy JSON history imported once)"""
+    global _peak_ledger
     try:
-        if os.path.exists(PEAK_TRADES_LOG):
-            with open(PEAK_TRADES_LOG, 'r') as f:
-                data = json.load(f)
-                return {
-                    'trades': data.get('trades', []),
-                    'daily_pnl': data.get('daily_pnl', 0),
-                    'total': data.get('total_trades', 0),
-                    'updated': data.get('updated', '')
-                }
+        if os.path.exists(PEAK_TRADES_DB) or os.path.exists(PEAK_TRADES_LEGACY):
+            if _peak_ledger is None:
+                _peak_ledger = TradeLedger(PEAK_TRADES_DB)
+                _peak_ledger.import_json(PEAK_TRADES_LEGACY)
+            today = datetime.now().strftime("%Y-%m-%d")
+            summary = _peak_ledger.daily_summary(today)
+            return {
+                'trades': _peak_ledger.trades(day=today, limit=10),
+                'daily_pnl': summary['daily_pnl'],
+                'total': summary['total_trades'],
+                'updated': summary['updated']
+            }
     except:
         pass
     return {'trades': [], 'daily_pnl': 0, 'total': 0, 'updated': ''}
 
 
+def get_recent_decisions(n=5):
+    """Last bot decisions from the journal (reads only the end of the file)"""
+    try:
+        return tail_events(DECISIONS_LOG, n)
+    except:
+        return []
+
+
 def get_all_positions():
     """Get positions for all monitored coins"""
     all_positions = []
@@ -145,69 +131,105 @@ def get_all_positions():
     
     for symbol in symbols:
         try:
-            path = "/capi/v2/position/singlePosition"
-            query = f"?symbol={symbol}&marginCoin=USDT"
-            ts, sig = sign_request("GET", path, query)
-            resp = requests.get(f"{BASE_URL}{path}{query}", headers=get_headers(ts, sig), timeout=5)
-            if resp.text:
-                data = resp.json()
-                if isinstance(data, list):
-                    for pos in data:
-                        if float(pos.get('total', 0)) > 0:
-                            pos['symbol'] = symbol
-                            all_positions.append(pos)
+            for pos in get_positions(symbol):
+                if float(pos.get('total', 0)) > 0:
+                    pos['symbol'] = symbol
+                    all_positions.append(pos)
         except:
             pass
     
     return all_positions
 
 
-def get_volatile_prices():
-    """Get prices for all volatile coins"""
-    prices = {}
-    for symbol in PEAK_COINS:
+def get_prices(symbols):
+    """Tickers for the given symbols as a state-store price section"""
+    tickers = {}
+    for symbol in symbols:
         try:
-            resp = requests.get(f"{BASE_URL}/capi/v2/market/ticker?symbol={symbol}", timeout=5)
-            data = resp.json()
-            prices[symbol] = {
-                'price': float(data.get('last', 0)),
-                'change': float(data.get('chgUTC', 0)) if data.get('chgUTC') else 0
-            }
+            tickers[symbol] = get_client().get_ticker(symbol)
         except:
-            prices[symbol] = {'price': 0, 'change': 0}
-    return prices
+            tickers[symbol] = {}
+    return ticker_prices(tickers)
+
+
+_state_store = None
+
+
+def get_state_store():
+    """Snapshot store the bots publish to"""
+    global _state_store
+    if _state_store is None:
+        _state_store = StateStore(stale_after=STATE_MAX_AGE)
+    return _state_store
+
+
+def fetch_live_state(sections=None):
+    """
+    Read panels from the exchange
+    
+    Args:
+        sections: Only these sections (default: all); the rest are published empty
+    
+    The result is published as the dashboard's own snapshot, so other
+    viewers open at the same time render it instead of asking again.
+    """
+    readers = {
+        'balance': get_balance,
+        'positions': get_all_positions,
+        'prices': lambda: get_prices(["cmt_btcusdt"] + PEAK_COINS),
+        'orders': get_open_orders,
+        'trades': get_trade_history,
+    }
+    empty = {'balance': {}, 'positions': [], 'prices': {}, 'orders': [], 'trades': []}
+    state = {name: read() if sections is None or name in sections else empty[name]
+             for name, read in readers.items()}
+    get_state_store().publish(LIVE_SOURCE, **state)
+    return dict(state, signals=[], sources={LIVE_SOURCE: 0.0})
+
+
+def load_state(refresh_interval=30):
+    """
+    Dashboard data: bot snapshots, completed with live reads
+    
+    Balance, prices and signals come from the bots when any publishes;
+    positions, orders and trades (ACCOUNT_SECTIONS) always come from the
+    exchange. A live snapshot (from this or another viewer) younger than
+    the refresh interval is reused instead of reading again.
+    """
+    store = get_state_store()
+    state = store.merged(exclude=(LIVE_SOURCE,))
+    live = store.get(LIVE_SOURCE)
+    live_fresh = live is not None and live.age < refresh_interval
+    
+    if not state['sources']:
+        if live_fresh and live.balance:
+            return store.merged()
+        return fetch_live_state()
+    
+    if live_fresh:
+        account = {name: getattr(live, name) for name in ACCOUNT_SECTIONS}
+        age = live.age
+    else:
+        account = fetch_live_state(ACCOUNT_SECTIONS)
+        age = 0.0
+    state.update({name: account[name] for name in ACCOUNT_SECTIONS})
+    state['sources'][LIVE_SOURCE] = round(age, 1)
+    return state
 
 
 def get_fear_greed():
-    """Get Fear & Greed Index from Alternative.me"""
-    try:
-        resp = requests.get("https://api.alternative.me/fng/", timeout=10)
-        if resp.status_code == 200:
-            data = resp.json()['data'][0]
-            return {
-                'value': int(data['value']),
-                'classification': data['value_classification'],
-                'timestamp': data['timestamp']
-            }
-    except:
-        pass
-    return {'value': 50, 'classification': 'Neutral', 'timestamp': ''}
+    """Fear & Greed Index (Alternative.me, shared background-refreshed cache)"""
+    return get_market_intel().fear_greed()
 
 
 def get_market_global():
-    """Get global market data from CoinGecko"""
-    try:
-        resp = requests.get("https://api.coingecko.com/api/v3/global", timeout=10)
-        if resp.status_code == 200:
-            data = resp.json()['data']
-            return {
-                'btc_dominance': data.get('market_cap_percentage', {}).get('btc', 0),
-                'market_change_24h': data.get('market_cap_change_percentage_24h_usd', 0),
-                'active_cryptos': data.get('active_cryptocurrencies', 0)
-            }
-    except:
-        pass
-    return {'btc_dominance': 0, 'market_change_24h': 0, 'active_cryptos': 0}
+    """Global market data (CoinGecko, shared background-refreshed cache)"""
+    data = get_market_intel().global_market()
+    return {
+        'btc_dominance': data['btc_dominance'],
+        'market_change_24h': data['market_cap_change_24h'],
+        'active_cryptos': data['active_cryptocurrencies']
+    }
 
 
 def clear_screen():
@@ -215,18 +237,28 @@ def clear_screen():
     os.system('cls' if os.name == 'nt' else 'clear')
 
 
-def display_dashboard():
+def display_dashboard(refresh_interval=30):
     """Display the dashboard"""
+    state = load_state(refresh_interval)
     clear_screen()
     
-    # Get all data
-    balance = get_balance()
-    btc = get_price("cmt_btcusdt")
-    orders = get_open_orders()
-    positions = get_all_positions()
-    trades = get_trade_history()
+    # Get all data (local reads: bot snapshots, ledger, journal, intel cache)
+    balance = {'available': 0, 'equity': 0, 'frozen': 0, **state['balance']}
+    prices = state['prices']
+    btc_data = prices.get("cmt_btcusdt", {})
+    btc = {
+        'price': btc_data.get('last', 0),
+        'high_24h': btc_data.get('high_24h', 0),
+        'low_24h': btc_data.get('low_24h', 0)
+    }
+    orders = state['orders']
+    positions = state['positions']
+    trades = state['trades']
     peak_data = get_peak_trades()
-    volatile_prices = get_volatile_prices()
+    decisions = get_recent_decisions()
+    volatile_prices = {symbol: {'price': prices.get(symbol, {}).get('last', 0),
+                                'change': prices.get(symbol, {}).get('change', 0)}
+                       for symbol in PEAK_COINS}
     fear_greed = get_fear_greed()
     market_global = get_market_global()
     
@@ -239,6 +271,8 @@ def display_dashboard():
     print("  📊 WEEX HACKATHON DASHBOARD - CONSERVATIVE GRID BOT")
     print("═"*70)
     print(f"  ⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  |  🖥️  Server: 178.128.65.112")
+    sources = ", ".join(f"{name} ({age:.0f}s)" for name, age in state['sources'].items())
+    print(f"  📡 Data: {sources or 'no data'}")
     print("═"*70)
     
     # Fear & Greed Section
@@ -395,6 +429,21 @@ def display_dashboard():
     
     print("└─────────────────────────────────────────────────────────────────┘")
     
+    # Bot Decisions
+    print("\n┌─────────────────────────────────────────────────────────────────┐")
+    print("│                    🧠 BOT DECISIONS                             │")
+    print("├─────────────────────────────────────────────────────────────────┤")
+    
+    if decisions:
+        for event in reversed(decisions):
+            when = str(event.get('timestamp', ''))[11:19]
+            message = str(event.get('message', ''))[:52]
+            print(f"│  {when:<8} {message:<54} │")
+    else:
+        print("│  No decisions logged yet                                        │")
+    
+    print("└─────────────────────────────────────────────────────────────────┘")
+    
     # Recent Trades
     print("\n┌─────────────────────────────────────────────────────────────────┐")
     print("│                    📜 RECENT TRADES                             │")
@@ -445,11 +494,13 @@ def display_dashboard():
 def run_dashboard(refresh_interval=30):
     """Run dashboard in loop"""
     print("🚀 Starting Live Dashboard...")
+    if not get_state_store().read():
+        get_client().warm_up()  # No bot publishing: panels come from the exchange
     
     try:
         while True:
             try:
-                display_dashboard()
+                display_dashboard(refresh_interval)
                 time.sleep(refresh_interval)
             except requests.exceptions.RequestException as e:
                 print(f"\n❌ Connection error: {e}")
@@ -22,6 +22,11 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from weex_client import WeexClient
+from utils.candle_store import CandleStore
+from utils.contracts import ContractRegistry
+from utils.parallel_scan import ParallelScanner
+from utils.triggers import TriggerIndex
+from utils import indicators
 
 # ═══════════════════════════════════════════════════════════════
 # CONFIGURACIÓN AGRESIVA
@@ -34,7 +39,11 @@ STOP_LOSS_PCT = 2.5          # 2.5% stop loss (más ajustado)
 TAKE_PROFIT_PCT = 5.0        # 5% take profit
 TRAILING_STOP_PCT = 1.5      # 1.5% trailing (se activa cuando hay +2% ganancia)
 TRAILING_ACTIVATION = 1.0    # Activar trailing después de +1%
+USE_EXCHANGE_BRACKETS = False  # TP/SL como plan orders en WEEX (protegen aunque el bot se cuelgue)
+BRACKET_TRAIL_STEP_PCT = 0.2   # Mover el SL del exchange solo si el trailing avanzó >= 0.2%
 SCAN_INTERVAL = 15           # Escanear cada 15 segundos (más rápido)
+PARALLEL_SCAN = True         # Analizar todas las monedas a la vez (False: una por una)
+SCAN_WORKERS = 6             # Análisis simultáneos (uno por moneda)
 MAX_POSITIONS_PER_COIN = 2   # Máximo 2 posiciones por moneda
 MAX_TOTAL_POSITIONS = 10     # Máximo 10 posiciones totales
 COOLDOWN_SECONDS = 120       # 2 minutos entre trades misma moneda
@@ -42,68 +51,30 @@ COOLDOWN_SECONDS = 120       # 2 minutos entre trades misma moneda
 # Monedas a tradear
 COINS = ['SOL', 'ETH', 'BNB', 'DOGE', 'ADA', 'LTC']
 
-# Step sizes por moneda
-STEP_SIZES = {
-    'cmt_btcusdt': 0.001,
-    'cmt_ethusdt': 0.01,
-    'cmt_solusdt': 0.1,
-    'cmt_bnbusdt': 0.1,
-    'cmt_adausdt': 10,
-    'cmt_dogeusdt': 100,
-    'cmt_ltcusdt': 0.1,
-}
-
 class MomentumScalper:
     def __init__(self):
         self.client = WeexClient()
+        self.candles = CandleStore(self.client)
+        self.contracts = ContractRegistry(self.client)  # lot step / tick por moneda
+        self.scanner = ParallelScanner(SCAN_WORKERS if PARALLEL_SCAN else 1, client=self.client)
         self.active_positions = {}  # {symbol: [positions]}
         self.cooldowns = {}  # {symbol: last_trade_time}
         self.daily_pnl = 0
         self.trades_today = 0
-        self.trailing_stops = {}  # {order_id: {'highest': price, 'stop': price}}
+        self.trailing_stops = {}  # {order_id: {'symbol', 'side', 'entry_price', 'size', 'trailing_active'}}
+        self.triggers = TriggerIndex()  # SL / TP / trailing por símbolo, ordenados por precio
     
     def calculate_rsi(self, closes: list, period: int = 14) -> float:
-        """Calcular RSI manualmente"""
-        if len(closes) < period + 1:
-            return 50.0
-        
-        gains = []
-        losses = []
-        
-        for i in range(1, len(closes)):
-            change = closes[i] - closes[i-1]
-            if change > 0:
-                gains.append(change)
-                losses.append(0)
-            else:
-                gains.append(0)
-                losses.append(abs(change))
-        
-        if len(gains) < period:
-            return 50.0
-        
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
-        
-        if avg_loss == 0:
-            return 100.0
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        """Calcular RSI"""
+        return indicators.rsi(closes, period, flat=100.0)
         
     def get_symbol(self, coin: str) -> str:
         return f"cmt_{coin.lower()}usdt"
     
-    def get_step_size(self, symbol: str) -> float:
-        return STEP_SIZES.get(symbol, 0.01)
-    
     def calculate_size(self, symbol: str, price: float) -> float:
         """Calcular tamaño de posición"""
         notional = TRADE_SIZE_USD * LEVERAGE
-        raw_size = notional / price
-        step = self.get_step_size(symbol)
-        return round(raw_size / step) * step
+        return self.contracts.get(symbol).size_for_notional(notional, price)
     
     def is_on_cooldown(self, symbol: str) -> bool:
         """Verificar si la moneda está en cooldown"""
@@ -137,16 +108,9 @@ class MomentumScalper:
                 return None
             
             # Obtener velas para RSI y Momentum
-            candles = self.client.get_candles(symbol, granularity='1m', limit=50)
-            if not candles or not isinstance(candles, list) or len(candles) < 20:
-                return None
-            
-            # Ordenar por timestamp (más antiguo primero)
-            candles_sorted = sorted(candles, key=lambda x: int(x[0]))
-            
-            closes = [float(c[4]) for c in candles_sorted]
-            highs = [float(c[2]) for c in candles_sorted]
-            lows = [float(c[3]) for c in candles_sorted]
+            # Columnas (ya ordenadas, parseadas una sola vez)
+            bars = self.candles.get_arrays(symbol, granularity='1m', limit=50)
+            closes, highs, lows = bars.close, bars.high, bars.low
             
             if len(closes) < 20:
                 return None
@@ -158,8 +122,7 @@ class MomentumScalper:
             momentum = ((closes[-1] - closes[-5]) / closes[-5]) * 100 if closes[-5] > 0 else 0
             
             # Volatilidad: rango promedio
-            ranges = [(h - l) / l * 100 for h, l in zip(highs[-10:], lows[-10:]) if l > 0]
-            volatility = sum(ranges) / len(ranges) if ranges else 0
+            volatility = indicators.range_volatility(highs, lows, 10)
             
             # Generar señal
             signal = None
@@ -214,15 +177,25 @@ class MomentumScalper:
             take_profit = round(price * (1 - TAKE_PROFIT_PCT / 100), 6)
             side = 'open_short'
         
-        # Ejecutar orden de mercado
-        result = self.client.place_order(
-            symbol=symbol,
-            side=side,
-            order_type='market',
-            size=str(size),
-            margin_coin='USDT',
-            client_oid=str(uuid.uuid4())
-        )
+        # Ejecutar orden de mercado (con bracket, TP/SL quedan en el exchange)
+        bracket = None
+        if USE_EXCHANGE_BRACKETS:
+            bracket = self.client.place_bracket(
+                symbol, signal, size,
+                take_profit=self.contracts.round_price(symbol, take_profit),
+                stop_loss=self.contracts.round_price(symbol, stop_loss),
+                client_oid=str(uuid.uuid4())
+            )
+            result = {'order_id': bracket.entry_order_id} if bracket else None
+        else:
+            result = self.client.place_order(
+                symbol=symbol,
+                side=side,
+                order_type='market',
+                size=str(size),
+                margin_coin='USDT',
+                client_oid=str(uuid.uuid4())
+            )
         
         # Verificar respuesta - WEEX devuelve order_id directamente o en data
         order_id = None
@@ -235,11 +208,20 @@ class MomentumScalper:
                 'symbol': symbol,
                 'side': signal,  # 'long' o 'short'
                 'entry_price': price,
-                'highest': price if signal == 'long' else price,
-                'lowest': price if signal == 'short' else price,
                 'trailing_active': False,
+                'bracket': bracket,
                 'size': size
             }
+            # Con el trailing activo ya no aplican SL/TP fijos
+            sign = 1 if signal == 'long' else -1
+            self.triggers.add(
+                order_id, symbol, signal,
+                stop=price * (1 - sign * STOP_LOSS_PCT / 100),
+                target=price * (1 + sign * TAKE_PROFIT_PCT / 100),
+                trail_pct=TRAILING_STOP_PCT,
+                activation=price * (1 + sign * TRAILING_ACTIVATION / 100),
+                keep_armed=False
+            )
             
             # Actualizar cooldown
             self.cooldowns[symbol] = datetime.now()
@@ -262,15 +244,9 @@ class MomentumScalper:
             return {'success': False, 'error': error}
     
     def check_trailing_stops(self):
-        """Verificar y actualizar trailing stops"""
-        to_remove = []
-        
-        for order_id, data in self.trailing_stops.items():
+        """Verificar y actualizar trailing stops (un ticker por símbolo con posiciones)"""
+        for symbol in self.triggers.symbols():
             try:
-                symbol = data['symbol']
-                side = data['side']
-                entry_price = data['entry_price']
-                
                 # Obtener precio actual
                 ticker = self.client.get_ticker(symbol)
                 if not ticker or 'data' not in ticker:
@@ -280,138 +256,73 @@ class MomentumScalper:
                 if current_price <= 0:
                     continue
                 
-                # Calcular PnL actual
-                if side == 'long':
-                    pnl_pct = ((current_price - entry_price) / entry_price) * 100
-                    
-                    # Actualizar highest
-                    if current_price > data['highest']:
-                        data['highest'] = current_price
-                    
-                    # Activar trailing si ganancia > TRAILING_ACTIVATION
-                    if pnl_pct >= TRAILING_ACTIVATION and not data['trailing_active']:
-                        data['trailing_active'] = True
-                        print(f"   📈 Trailing activado para {symbol} (+{pnl_pct:.1f}%)")
-                    
-                    # Si trailing activo, verificar si cerrar
-                    if data['trailing_active']:
-                        drawdown = ((data['highest'] - current_price) / data['highest']) * 100
-                        if drawdown >= TRAILING_STOP_PCT:
-                            # Cerrar posición
-                            close_result = self.client.place_order(
-                                symbol=symbol,
-                                side='close_long',
-                                order_type='market',
-                                size=str(data['size']),
-                                margin_coin='USDT',
-                                client_oid=str(uuid.uuid4())
-                            )
-                            if close_result and 'data' in close_result:
-                                profit = (current_price - entry_price) * data['size']
-                                self.daily_pnl += profit
-                                print(f"   ✅ Trailing cerró {symbol}: +${profit:.2f}")
-                                to_remove.append(order_id)
+                # Solo las posiciones cuyo nivel se cruzó
+                for hit in self.triggers.tick(symbol, current_price):
+                    self.handle_trigger(hit, current_price)
                     
-                    # Stop loss normal
-                    elif pnl_pct <= -STOP_LOSS_PCT:
-                        close_result = self.client.place_order(
-                            symbol=symbol,
-                            side='close_long',
-                            order_type='market',
-                            size=str(data['size']),
-                            margin_coin='USDT',
-                            client_oid=str(uuid.uuid4())
-                        )
-                        if close_result and 'data' in close_result:
-                            loss = (current_price - entry_price) * data['size']
-                            self.daily_pnl += loss
-                            print(f"   ⛔ Stop loss {symbol}: ${loss:.2f}")
-                            to_remove.append(order_id)
-                    
-                    # Take profit
-                    elif pnl_pct >= TAKE_PROFIT_PCT:
-                        close_result = self.client.place_order(
-                            symbol=symbol,
-                            side='close_long',
-                            order_type='market',
-                            size=str(data['size']),
-                            margin_coin='USDT',
-                            client_oid=str(uuid.uuid4())
-                        )
-                        if close_result and 'data' in close_result:
-                            profit = (current_price - entry_price) * data['size']
-                            self.daily_pnl += profit
-                            print(f"   🎯 Take profit {symbol}: +${profit:.2f}")
-                            to_remove.append(order_id)
-                
-                else:  # short
-                    pnl_pct = ((entry_price - current_price) / entry_price) * 100
-                    
-                    # Actualizar lowest
-                    if current_price < data['lowest']:
-                        data['lowest'] = current_price
-                    
-                    # Activar trailing
-                    if pnl_pct >= TRAILING_ACTIVATION and not data['trailing_active']:
-                        data['trailing_active'] = True
-                        print(f"   📉 Trailing activado para {symbol} (+{pnl_pct:.1f}%)")
-                    
-                    # Si trailing activo
-                    if data['trailing_active']:
-                        drawdown = ((current_price - data['lowest']) / data['lowest']) * 100
-                        if drawdown >= TRAILING_STOP_PCT:
-                            close_result = self.client.place_order(
-                                symbol=symbol,
-                                side='close_short',
-                                order_type='market',
-                                size=str(data['size']),
-                                margin_coin='USDT',
-                                client_oid=str(uuid.uuid4())
-                            )
-                            if close_result and 'data' in close_result:
-                                profit = (entry_price - current_price) * data['size']
-                                self.daily_pnl += profit
-                                print(f"   ✅ Trailing cerró {symbol}: +${profit:.2f}")
-                                to_remove.append(order_id)
-                    
-                    # Stop loss
-                    elif pnl_pct <= -STOP_LOSS_PCT:
-                        close_result = self.client.place_order(
-                            symbol=symbol,
-                            side='close_short',
-                            order_type='market',
-                            size=str(data['size']),
-                            margin_coin='USDT',
-                            client_oid=str(uuid.uuid4())
-                        )
-                        if close_result and 'data' in close_result:
-                            loss = (entry_price - current_price) * data['size']
-                            self.daily_pnl += loss
-                            print(f"   ⛔ Stop loss {symbol}: ${loss:.2f}")
-                            to_remove.append(order_id)
-                    
-                    # Take profit
-                    elif pnl_pct >= TAKE_PROFIT_PCT:
-                        close_result = self.client.place_order(
-                            symbol=symbol,
-                            side='close_short',
-                            order_type='market',
-                            size=str(data['size']),
-                            margin_coin='USDT',
-                            client_oid=str(uuid.uuid4())
-                        )
-                        if close_result and 'data' in close_result:
-                            profit = (entry_price - current_price) * data['size']
-                            self.daily_pnl += profit
-                            print(f"   🎯 Take profit {symbol}: +${profit:.2f}")
-                            to_remove.append(order_id)
-                            
             except Exception as e:
                 continue
+    
+    def handle_trigger(self, hit, current_price: float):
+        """Activar el trailing o cerrar la posición de un trigger cruzado"""
+        data = self.trailing_stops.get(hit.key)
+        if data is None:
+            self.triggers.remove(hit.key)
+            return
+        
+        symbol = data['symbol']
+        side = data['side']
+        entry_price = data['entry_price']
+        
+        if side == 'long':
+            pnl_pct = ((current_price - entry_price) / entry_price) * 100
+            profit = (current_price - entry_price) * data['size']
+        else:
+            pnl_pct = ((entry_price - current_price) / entry_price) * 100
+            profit = (entry_price - current_price) * data['size']
+        
+        bracket = data.get('bracket')
+        
+        # Activar trailing si ganancia > TRAILING_ACTIVATION
+        if not hit.is_exit:
+            if hit.kind == 'activation':
+                data['trailing_active'] = True
+                arrow = "📈" if side == 'long' else "📉"
+                print(f"   {arrow} Trailing activado para {symbol} (+{pnl_pct:.1f}%)")
+                if bracket:
+                    self.client.cancel_bracket(bracket, stop_loss=False)  # Sin TP fijo con trailing
+            if bracket:
+                self.client.trail_bracket(bracket, self.contracts.round_price(symbol, hit.level),
+                                          BRACKET_TRAIL_STEP_PCT)
+            return
+        
+        if bracket:
+            # Cancela los plan orders; si el exchange ya cerró, no manda orden
+            close_result = self.client.close_bracket(bracket)
+        else:
+            close_result = self.client.place_order(
+                symbol=symbol,
+                side='close_long' if side == 'long' else 'close_short',
+                order_type='market',
+                size=str(data['size']),
+                margin_coin='USDT',
+                client_oid=str(uuid.uuid4())
+            )
+        if not (close_result and ('data' in close_result or close_result.get('order_id')
+                                  or close_result.get('closed_by_plan'))):
+            return  # El trigger sigue armado: se reintenta en el próximo chequeo
+        
+        self.daily_pnl += profit
+        if hit.kind == 'trail':
+            print(f"   ✅ Trailing cerró {symbol}: +${profit:.2f}")
+        elif hit.kind == 'stop':
+            print(f"   ⛔ Stop loss {symbol}: ${profit:.2f}")
+        else:
+            print(f"   🎯 Take profit {symbol}: +${profit:.2f}")
         
-        # Limpiar posiciones cerradas
-        for order_id in to_remove:
-            del self.trailing_stops[order_id]
+        # Limpiar posición cerrada
+        self.triggers.remove(hit.key)
+        del self.trailing_stops[hit.key]
     
     def print_status(self, analyses: list):
         """Mostrar estado actual"""
@@ -464,13 +375,8 @@ class MomentumScalper:
         
         try:
             while True:
-                # Analizar todas las monedas
-                analyses = []
-                for coin in COINS:
-                    analysis = self.analyze_coin(coin)
-                    if analysis:
-                        analyses.append(analysis)
-                    time.sleep(0.2)  # Rate limiting
+                # Analizar todas las monedas (en paralelo, resultados en el orden de COINS)
+                analyses = self.scanner.scan_all(COINS, self.analyze_coin)
                 
                 # Mostrar estado
                 self.print_status(analyses)
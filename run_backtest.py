@@ -0,0 +1,74 @@
+"""
+⏪ WEEX Backtest Runner
+Replays candles stored by CandleStore through one of the bots, offline
+
+Example:
+    python run_backtest.py ultra --db candles.db --days 30 --save results/ultra
+"""
+
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backtest import SimulatedWeexClient, BacktestEngine, ADAPTERS, load_candles
+from backtest.sim_client import TAKER_FEE, MAKER_FEE
+
+DAY_MS = 86_400_000
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='WEEX Strategy Backtest')
+    parser.add_argument('strategy', choices=sorted(ADAPTERS), help='Bot to replay')
+    parser.add_argument('--db', default='candles.db', help='CandleStore SQLite file')
+    parser.add_argument('--symbols', nargs='*', help='Symbols (default: all stored 1m)')
+    parser.add_argument('--days', type=float, default=None, help='Only the last N days of data')
+    parser.add_argument('--balance', type=float, default=1000, help='Starting USDT')
+    parser.add_argument('--taker-fee', type=float, default=TAKER_FEE, help='Taker fee rate')
+    parser.add_argument('--maker-fee', type=float, default=MAKER_FEE, help='Maker fee rate')
+    parser.add_argument('--slippage', type=float, default=0.0002, help='Market order slippage (fraction)')
+    parser.add_argument('--warmup', type=int, default=500, help='Bars before the first decision')
+    parser.add_argument('--every', type=int, default=1, help='Bars between bot cycles')
+    parser.add_argument('--save', default=None, help='Write <prefix>_trades.csv and <prefix>_equity.csv')
+    parser.add_argument('--verbose', action='store_true', help="Show the bot's own output")
+
+    args = parser.parse_args()
+
+    candles = load_candles(args.db, args.symbols)
+    if not candles:
+        print(f"❌ No 1m candles in {args.db}")
+        return
+    if args.days:
+        start_ms = max(c[0, -1] for c in candles.values()) - args.days * DAY_MS
+        candles = {s: c[:, c[0] >= start_ms] for s, c in candles.items()}
+        candles = {s: c for s, c in candles.items() if c.shape[1]}
+
+    bars = sum(c.shape[1] for c in candles.values())
+    print(f"📂 {len(candles)} symbols, {bars} bars from {args.db}")
+
+    sim = SimulatedWeexClient(candles, balance=args.balance, taker_fee=args.taker_fee,
+                              maker_fee=args.maker_fee, slippage=args.slippage)
+    engine = BacktestEngine(sim, ADAPTERS[args.strategy](sim), warmup=args.warmup,
+                            decision_every=args.every, quiet=not args.verbose)
+    result = engine.run()
+
+    print("\n" + "=" * 50)
+    print(f"   BACKTEST - {args.strategy.upper()}")
+    print("=" * 50)
+    for key, value in result.summary().items():
+        print(f"   {key:<18} {value}")
+    if result.stopped_at:
+        print(f"   ⛔ Bot stopped itself at {result.stopped_at}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or '.', exist_ok=True)
+        result.save(args.save)
+        print(f"\n💾 Saved {args.save}_trades.csv and {args.save}_equity.csv")
+
+
+if __name__ == "__main__":
+    main()
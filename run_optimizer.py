@@ -0,0 +1,103 @@
+"""
+🔧 WEEX Parameter Optimizer
+Parallel grid/random search over a bot's tunables on stored candles
+
+Results go to a JSONL file and the sweep resumes from it when re-run
+with the same arguments.
+
+Examples:
+    python run_optimizer.py ultra --samples 10000 --out ultra_sweep.jsonl
+    python run_optimizer.py conservative --param ATR_TP_MULT=1,1.5,2 --param leverage=5,10
+    python run_optimizer.py ultra --out ultra_sweep.jsonl --report --sort max_drawdown_pct
+"""
+
+import json
+import os
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backtest import ADAPTERS, Optimizer, load_candles, load_results, rank
+from backtest.optimizer import SORT_KEYS, space_size
+from backtest.sim_client import TAKER_FEE, MAKER_FEE
+
+
+def parse_param(text: str):
+    """'NAME=1,2.5,true' -> ('NAME', [1, 2.5, True])"""
+    name, _, values = text.partition('=')
+    if not name or not values:
+        raise ValueError(f"Expected NAME=v1,v2,... got {text!r}")
+    parsed = []
+    for value in values.split(','):
+        try:
+            parsed.append(json.loads(value))
+        except json.JSONDecodeError:
+            parsed.append(value)
+    return name.strip(), parsed
+
+
+def print_top(rows, sort: str, top: int, min_trades: int):
+    ranked = rank(rows, by=sort, min_trades=min_trades)
+    failed = sum(1 for r in rows if r.get('error'))
+    print("\n" + "=" * 70)
+    print(f"   TOP {min(top, len(ranked))} of {len(ranked)} runs by {sort}"
+          + (f" ({failed} failed)" if failed else ""))
+    print("=" * 70)
+    for n, row in enumerate(ranked[:top], 1):
+        print(f"{n:3}. PnL {row['return_pct']:+7.2f}% | DD {row['max_drawdown_pct']:5.2f}% | "
+              f"Sharpe {row['sharpe']:6.2f} | {row['trades']:4} trades | {row['params']}")
+
+
+def main():
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='WEEX Parameter Optimizer')
+    parser.add_argument('strategy', choices=sorted(ADAPTERS), help='Bot to tune')
+    parser.add_argument('--db', default='candles.db', help='CandleStore SQLite file')
+    parser.add_argument('--symbols', nargs='*', help='Symbols (default: all stored 1m)')
+    parser.add_argument('--param', action='append', default=[],
+                        help='NAME=v1,v2,... (repeatable; default: the strategy PARAM_SPACE)')
+    parser.add_argument('--samples', type=int, default=None, help='Random combinations (default: full grid)')
+    parser.add_argument('--seed', type=int, default=0, help='Random search seed')
+    parser.add_argument('--workers', type=int, default=None, help='Processes (default: all cores)')
+    parser.add_argument('--out', default=None, help='Results JSONL (default: <strategy>_sweep.jsonl)')
+    parser.add_argument('--balance', type=float, default=1000, help='Starting USDT')
+    parser.add_argument('--taker-fee', type=float, default=TAKER_FEE, help='Taker fee rate')
+    parser.add_argument('--maker-fee', type=float, default=MAKER_FEE, help='Maker fee rate')
+    parser.add_argument('--slippage', type=float, default=0.0002, help='Market order slippage (fraction)')
+    parser.add_argument('--warmup', type=int, default=500, help='Bars before the first decision')
+    parser.add_argument('--every', type=int, default=1, help='Bars between bot cycles')
+    parser.add_argument('--sort', choices=list(SORT_KEYS), default='sharpe', help='Ranking key')
+    parser.add_argument('--top', type=int, default=20, help='Rows to show')
+    parser.add_argument('--min-trades', type=int, default=5, help='Ignore runs with fewer trades')
+    parser.add_argument('--report', action='store_true', help='Only rank what is already in --out')
+
+    args = parser.parse_args()
+    out = args.out or f"{args.strategy}_sweep.jsonl"
+
+    if args.report:
+        print_top(load_results(out), args.sort, args.top, args.min_trades)
+        return
+
+    space = dict(parse_param(p) for p in args.param) or None
+    candles = load_candles(args.db, args.symbols)
+    if not candles:
+        print(f"❌ No 1m candles in {args.db}")
+        return
+
+    optimizer = Optimizer(
+        candles, args.strategy, space=space, results_path=out, workers=args.workers,
+        sim_kwargs={'balance': args.balance, 'taker_fee': args.taker_fee,
+                    'maker_fee': args.maker_fee, 'slippage': args.slippage},
+        engine_kwargs={'warmup': args.warmup, 'decision_every': args.every},
+    )
+    bars = sum(c.shape[1] for c in candles.values())
+    print(f"📂 {len(candles)} symbols, {bars} bars | space: {space_size(optimizer.space)} combinations")
+    rows = optimizer.run(samples=args.samples, seed=args.seed)
+    print_top(rows, args.sort, args.top, args.min_trades)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,11 +13,6 @@ Configuración:
 import os
 import sys
 import time
-import json
-import hmac
-import hashlib
-import base64
-import requests
 from datetime import datetime
 from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
@@ -26,11 +21,10 @@ from dotenv import load_dotenv
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 load_dotenv()
 
-# API Config
-API_KEY = os.getenv("WEEX_API_KEY")
-SECRET_KEY = os.getenv("WEEX_SECRET_KEY")
-PASSPHRASE = os.getenv("WEEX_PASSPHRASE")
-BASE_URL = "https://api-contract.weex.com"
+from utils import indicators
+from utils.trade_ledger import TradeLedger
+from weex_client import PLAN_TYPES, get_shared_client
+from utils.parallel_scan import ParallelScanner
 
 # =================== CONFIGURACIÓN ===================
 TRADE_SIZE_USD = 15        # Monto por trade
@@ -52,8 +46,9 @@ MONITORED_COINS = [
     "cmt_ltcusdt",     # LTC
 ]
 
-# Archivo de log para dashboard
-TRADES_LOG = "peak_trades.json"
+# Historial de trades para dashboard (SQLite, ver utils.trade_ledger)
+TRADES_DB = "peak_trades.db"
+LEGACY_TRADES_LOG = "peak_trades.json"  # Formato anterior, se importa una vez
 
 
 @dataclass
@@ -83,11 +78,14 @@ class PeakHunterAuto:
     """
     
     def __init__(self):
-        self.session = requests.Session()
+        # Cliente compartido: una sesión keep-alive, firma y rate limit comunes
+        self.client = get_shared_client(warm=True)
+        self.scanner = ParallelScanner(len(MONITORED_COINS), client=self.client)
         self.trades_today: List[Trade] = []
         self.daily_pnl = 0.0
         self.last_trade_time = {}  # Para cooldown por moneda
         self.trade_cooldown = 300  # 5 min cooldown por moneda
+        self.ledger = TradeLedger(TRADES_DB)
         
         # Cargar trades previos
         self._load_trades()
@@ -105,94 +103,40 @@ class PeakHunterAuto:
         print("="*60)
     
     def _load_trades(self):
-        """Cargar trades del día desde archivo"""
+        """Cargar trades del día desde el ledger (consulta indexada por día)"""
         try:
-            if os.path.exists(TRADES_LOG):
-                with open(TRADES_LOG, 'r') as f:
-                    data = json.load(f)
-                    today = datetime.now().strftime("%Y-%m-%d")
-                    # Solo cargar trades de hoy
-                    self.trades_today = [
-                        Trade(**t) for t in data.get('trades', [])
-                        if t.get('timestamp', '').startswith(today)
-                    ]
-                    self.daily_pnl = sum(t.pnl for t in self.trades_today)
+            self.ledger.import_json(LEGACY_TRADES_LOG)
+            today = datetime.now().strftime("%Y-%m-%d")
+            self.trades_today = [Trade(**t) for t in self.ledger.trades(day=today)]
+            self.daily_pnl = self.ledger.daily_pnl(today)
         except Exception as e:
             print(f"⚠️ No se pudo cargar historial: {e}")
             self.trades_today = []
     
-    def _save_trades(self):
-        """Guardar trades al archivo para dashboard"""
+    def _save_trade(self, trade: Trade):
+        """Guardar un trade en el ledger para dashboard (un INSERT, sin reescribir el historial)"""
         try:
-            data = {
-                'updated': datetime.now().isoformat(),
-                'daily_pnl': self.daily_pnl,
-                'total_trades': len(self.trades_today),
-                'trades': [asdict(t) for t in self.trades_today]
-            }
-            with open(TRADES_LOG, 'w') as f:
-                json.dump(data, f, indent=2)
+            self.ledger.record(asdict(trade))
         except Exception as e:
-            print(f"⚠️ Error guardando trades: {e}")
-    
-    def _sign(self, method: str, path: str, query: str = "", body: str = "") -> tuple:
-        """Generar firma para API"""
-        ts = str(int(time.time() * 1000))
-        msg = ts + method + path + query + body
-        sig = base64.b64encode(
-            hmac.new(SECRET_KEY.encode(), msg.encode(), hashlib.sha256).digest()
-        ).decode()
-        return ts, sig
-    
-    def _headers(self, ts: str, sig: str) -> dict:
-        return {
-            "ACCESS-KEY": API_KEY,
-            "ACCESS-SIGN": sig,
-            "ACCESS-TIMESTAMP": ts,
-            "ACCESS-PASSPHRASE": PASSPHRASE,
-            "Content-Type": "application/json"
-        }
+            print(f"⚠️ Error guardando trade: {e}")
     
     def get_ticker(self, symbol: str) -> Dict:
         """Obtener precio actual"""
         try:
-            resp = self.session.get(
-                f"{BASE_URL}/capi/v2/market/ticker?symbol={symbol}",
-                timeout=10
-            )
-            return resp.json()
+            return self.client.get_ticker(symbol)
         except:
             return {}
     
     def get_candles(self, symbol: str, limit: int = 50) -> List:
         """Obtener velas para RSI"""
         try:
-            resp = self.session.get(
-                f"{BASE_URL}/capi/v2/market/candles",
-                params={"symbol": symbol, "granularity": "5m", "limit": str(limit)},
-                timeout=10
-            )
-            return resp.json()
+            return self.client.get_candles(symbol, "5m", limit)
         except:
             return []
     
     def calculate_rsi(self, prices: List[float], period: int = 14) -> float:
         """Calcular RSI"""
-        if len(prices) < period + 1:
-            return 50.0
-        
-        deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-        gains = [d if d > 0 else 0 for d in deltas]
-        losses = [-d if d < 0 else 0 for d in deltas]
-        
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
-        
-        if avg_loss == 0:
-            return 100.0
-        
-        rs = avg_gain / avg_loss
-        return 100 - (100 / (1 + rs))
+        return indicators.rsi(prices, period, flat=100.0)
     
     def analyze_coin(self, symbol: str) -> Dict:
         """
@@ -373,11 +317,11 @@ class PeakHunterAuto:
         if action == 'long':
             sl_price = price * (1 - STOP_LOSS_PCT / 100)
             tp_price = price * (1 + TAKE_PROFIT_PCT / 100)
-            order_type = "1"  # open_long
+            side = "buy"  # open_long
         else:  # short
             sl_price = price * (1 + STOP_LOSS_PCT / 100)
             tp_price = price * (1 - TAKE_PROFIT_PCT / 100)
-            order_type = "2"  # open_short
+            side = "sell"  # open_short
         
         coin = symbol.replace('cmt_', '').replace('usdt', '').upper()
         action_emoji = "🟢" if action == 'long' else "🔴"
@@ -389,25 +333,12 @@ class PeakHunterAuto:
         print(f"   🎯 TP: ${tp_price:,.4f} ({TAKE_PROFIT_PCT}%)")
         print(f"   📊 Señal: {signal['signal_strength']}% | RSI: {signal['rsi']}")
         
-        # Colocar orden
-        path = "/capi/v2/order/placeOrder"
-        
-        body = {
-            "symbol": symbol,
-            "client_oid": f"peak_{action}_{int(time.time())}",
-            "size": str(size),
-            "type": order_type,
-            "order_type": "0",     # Normal
-            "match_price": "1",    # Market order
-        }
-        body_str = json.dumps(body)
-        
-        ts, sig = self._sign("POST", path, "", body_str)
-        headers = self._headers(ts, sig)
-        
+        # Colocar orden (market)
         try:
-            resp = requests.post(f"{BASE_URL}{path}", headers=headers, data=body_str, timeout=30)
-            result = resp.json()
+            result = self.client.place_order(
+                symbol, side, "market", str(size),
+                client_oid=f"peak_{action}_{int(time.time())}"
+            )
             
             if result.get('order_id'):
                 print(f"   ✅ Order ID: {result['order_id']}")
@@ -431,7 +362,7 @@ class PeakHunterAuto:
                 
                 self.trades_today.append(trade)
                 self.last_trade_time[symbol] = time.time()
-                self._save_trades()
+                self._save_trade(trade)
                 
                 # Intentar colocar TP/SL
                 self._place_tp_sl(symbol, action, size, sl_price, tp_price)
@@ -447,79 +378,89 @@ class PeakHunterAuto:
             return None
     
     def _place_tp_sl(self, symbol: str, action: str, size: float, sl_price: float, tp_price: float):
-        """Colocar órdenes de Stop Loss y Take Profit"""
-        
-        # Tipo de cierre: close_long (3) o close_short (4)
-        if action == 'long':
-            close_type = "3"  # close_long
-        else:
-            close_type = "4"  # close_short
-        
-        # TP Order
-        tp_body = {
-            "symbol": symbol,
-            "client_oid": f"tp_{int(time.time())}",
-            "size": str(size),
-            "type": close_type,
-            "order_type": "0",
-            "price": str(round(tp_price, 4)),
-            "match_price": "0",
-        }
-        
-        # SL Order  
-        sl_body = {
-            "symbol": symbol,
-            "client_oid": f"sl_{int(time.time())}",
-            "size": str(size),
-            "type": close_type,
-            "order_type": "0",
-            "price": str(round(sl_price, 4)),
-            "match_price": "0",
-        }
-        
-        path = "/capi/v2/order/placeOrder"
-        
-        for name, body in [("TP", tp_body), ("SL", sl_body)]:
+        """Colocar TP y SL como plan orders: esperan en el exchange hasta que el precio los dispare"""
+        for name, plan_type, price in [("TP", PLAN_TYPES['take_profit'], tp_price),
+                                       ("SL", PLAN_TYPES['stop_loss'], sl_price)]:
             try:
-                body_str = json.dumps(body)
-                ts, sig = self._sign("POST", path, "", body_str)
-                headers = self._headers(ts, sig)
-                resp = requests.post(f"{BASE_URL}{path}", headers=headers, data=body_str, timeout=30)
-                result = resp.json()
-                if result.get('order_id'):
-                    print(f"   📍 {name} colocado: {result['order_id']}")
+                result = self.client.place_tp_sl(
+                    symbol, plan_type, round(price, 4), size, action,
+                    client_oid=f"{name.lower()}_{int(time.time() * 1000)}"
+                )
+                data = result.get('data', result) if isinstance(result, dict) else result
+                if isinstance(data, list):
+                    data = data[0] if data else {}
+                order_id = (data.get('order_id') or data.get('orderId')) if isinstance(data, dict) else None
+                if order_id:
+                    print(f"   📍 {name} colocado: {order_id}")
+                else:
+                    print(f"   ⚠️ {name} rechazado: {result}")
             except Exception as e:
                 print(f"   ⚠️ Error colocando {name}: {e}")
     
     def check_positions(self):
-        """Verificar posiciones abiertas y actualizar P&L"""
-        path = "/capi/v2/position/positions"
-        query = "?symbol=cmt_btcusdt"  # Endpoint requiere symbol
+        """Verificar posiciones abiertas, actualizar P&L y cerrar en el ledger las que ya no están"""
+        path = "/capi/v2/position/positions"  # Endpoint requiere symbol
+        
+        # Verificar cada símbolo monitoreado
+        for symbol in MONITORED_COINS:
+            try:
+                data = self.client.request("GET", path, {"symbol": symbol})
+            except Exception:
+                continue  # Sin datos no se cierra nada
+            if not isinstance(data, list):
+                continue
+            
+            held = set()
+            for pos in data:
+                if float(pos.get('total', 0)) > 0:
+                    pnl = float(pos.get('unrealizedPL', 0))
+                    side = pos.get('holdSide', '')
+                    held.add(str(side).lower())
+                    coin = symbol.replace('cmt_', '').replace('usdt', '').upper()
+                    
+                    emoji = "🟢" if pnl >= 0 else "🔴"
+                    print(f"   {emoji} {coin} {side}: P&L ${pnl:,.2f}")
+            
+            # Trades abiertos sin posición: los cerró el TP/SL en el exchange
+            for trade in self.trades_today:
+                if trade.symbol == symbol and trade.status == 'open' and trade.action not in held:
+                    self._close_trade(trade)
+    
+    def _close_trade(self, trade: Trade):
+        """
+        Registrar el cierre de un trade (precio de salida, P&L, estado)
         
-        ts, sig = self._sign("GET", path, query)
-        headers = self._headers(ts, sig)
+        El precio de salida es el nivel de TP/SL que el precio actual ya
+        cruzó (ahí se disparan los plan orders); si no cruzó ninguno, el
+        último precio (cierre manual).
+        """
+        last = float(self.get_ticker(trade.symbol).get('last', 0) or 0)
+        if last <= 0:
+            return  # Sin precio se reintenta en el próximo ciclo
+        
+        direction = 1 if trade.action == 'long' else -1
+        if (last - trade.take_profit) * direction >= 0:
+            status, exit_price = 'closed_tp', trade.take_profit
+        elif (last - trade.stop_loss) * direction <= 0:
+            status, exit_price = 'closed_sl', trade.stop_loss
+        else:
+            status, exit_price = 'closed_manual', last
+        
+        trade.status = status
+        trade.exit_price = exit_price
+        trade.pnl = round((exit_price - trade.entry_price) * trade.size * direction, 4)
+        trade.closed_at = datetime.now().isoformat()
+        self.daily_pnl += trade.pnl
         
         try:
-            # Verificar cada símbolo monitoreado
-            for symbol in MONITORED_COINS:
-                query = f"?symbol={symbol}"
-                ts, sig = self._sign("GET", path, query)
-                headers = self._headers(ts, sig)
-                
-                resp = requests.get(f"{BASE_URL}{path}{query}", headers=headers, timeout=10)
-                data = resp.json()
-                
-                if data and isinstance(data, list):
-                    for pos in data:
-                        if float(pos.get('total', 0)) > 0:
-                            pnl = float(pos.get('unrealizedPL', 0))
-                            side = pos.get('holdSide', '')
-                            coin = symbol.replace('cmt_', '').replace('usdt', '').upper()
-                            
-                            emoji = "🟢" if pnl >= 0 else "🔴"
-                            print(f"   {emoji} {coin} {side}: P&L ${pnl:,.2f}")
+            self.ledger.update(trade.id, status=trade.status, pnl=trade.pnl,
+                               exit_price=trade.exit_price, closed_at=trade.closed_at)
         except Exception as e:
-            pass  # Silenciar errores de posición
+            print(f"⚠️ Error guardando cierre: {e}")
+        
+        coin = trade.symbol.replace('cmt_', '').replace('usdt', '').upper()
+        emoji = "🎯" if status == 'closed_tp' else "🛑" if status == 'closed_sl' else "✋"
+        print(f"   {emoji} {coin} {trade.action} cerrado ({status}) @ ${exit_price:,.4f} | P&L ${trade.pnl:+,.2f}")
     
     def scan_and_trade(self):
         """Escanear todas las monedas y ejecutar trades si hay señales fuertes"""
@@ -529,10 +470,12 @@ class PeakHunterAuto:
         
         opportunities = []
         
-        for symbol in MONITORED_COINS:
+        # Todas las monedas a la vez; cada fila se imprime al llegar su análisis
+        for symbol, signal, error in self.scanner.scan(MONITORED_COINS, self.analyze_coin):
+            if error:
+                print(f"❌ Error {symbol}: {error}")
+                continue
             try:
-                signal = self.analyze_coin(symbol)
-                
                 coin = symbol.replace('cmt_', '').replace('usdt', '').upper()
                 
                 # Mostrar estado
@@ -561,8 +504,6 @@ class PeakHunterAuto:
                 if strength >= MIN_SIGNAL_STRENGTH and signal['action'] != 'wait':
                     opportunities.append(signal)
                 
-                time.sleep(0.2)  # Rate limit
-                
             except Exception as e:
                 print(f"❌ Error {symbol}: {e}")
         
@@ -608,7 +549,6 @@ class PeakHunterAuto:
             print("\n\n🛑 Peak Hunter detenido")
             print(f"   Total trades hoy: {len(self.trades_today)}")
             print(f"   P&L del día: ${self.daily_pnl:,.2f}")
-            self._save_trades()
 
 
 def main():
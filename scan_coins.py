@@ -3,11 +3,12 @@
 Escanea todas las monedas y muestra oportunidades
 """
 
-import requests
-import time
 from datetime import datetime
 
-BASE_URL = "https://api-contract.weex.com"
+from utils import indicators
+from utils.parallel_scan import ParallelScanner
+from weex_client import get_shared_client
+
 COINS = [
     "cmt_dogeusdt", 
     "cmt_solusdt", 
@@ -19,38 +20,88 @@ COINS = [
 ]
 
 
+def get_client():
+    """Cliente compartido, creado al primer uso (importar el módulo no abre sesión)"""
+    # Sólo endpoints públicos: no requiere credenciales
+    return get_shared_client(require_auth=False)
+
+
 def get_ticker(symbol):
     try:
-        resp = requests.get(f"{BASE_URL}/capi/v2/market/ticker?symbol={symbol}", timeout=10)
-        return resp.json()
+        return get_client().get_ticker(symbol)
     except:
         return {}
 
 
 def get_candles(symbol, limit=50):
     try:
-        resp = requests.get(
-            f"{BASE_URL}/capi/v2/market/candles",
-            params={"symbol": symbol, "granularity": "5m", "limit": str(limit)},
-            timeout=10
-        )
-        return resp.json()
+        return get_client().get_candles(symbol, "5m", limit)
     except:
         return []
 
 
 def calc_rsi(prices, period=14):
-    if len(prices) < period + 1:
-        return 50
-    deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-    gains = [d if d > 0 else 0 for d in deltas]
-    losses = [-d if d < 0 else 0 for d in deltas]
-    avg_gain = sum(gains[-period:]) / period
-    avg_loss = sum(losses[-period:]) / period
-    if avg_loss == 0:
-        return 100
-    rs = avg_gain / avg_loss
-    return 100 - (100 / (1 + rs))
+    return indicators.rsi(prices, period, flat=100)
+
+
+def analyze_coin(symbol):
+    """Ticker + velas 5m de una moneda → fila de la tabla"""
+    ticker = get_ticker(symbol)
+    candles = get_candles(symbol)
+    
+    price = float(ticker.get('last', 0))
+    high = float(ticker.get('high_24h', price))
+    low = float(ticker.get('low_24h', price))
+    
+    # RSI
+    if candles and isinstance(candles, list):
+        prices = [float(c[4]) for c in candles if isinstance(c, list) and len(c) > 4]
+        rsi = calc_rsi(prices)
+    else:
+        rsi = 50
+    
+    # Volatilidad
+    rango = high - low
+    vol = (rango / price * 100) if price > 0 else 0
+    
+    # Posición en rango (0-100)
+    if rango > 0:
+        pos_rango = ((price - low) / rango) * 100
+    else:
+        pos_rango = 50
+    
+    coin = symbol.replace('cmt_', '').replace('usdt', '').upper()
+    
+    # Determinar señal
+    signal_strength = 0
+    if rsi > 75:
+        signal = "🔴 SHORT!"
+        signal_strength = (rsi - 70) * 3
+    elif rsi > 70:
+        signal = "🟡 short?"
+        signal_strength = (rsi - 70) * 2
+    elif rsi < 25:
+        signal = "🟢 LONG!"
+        signal_strength = (30 - rsi) * 3
+    elif rsi < 30:
+        signal = "🟡 long?"
+        signal_strength = (30 - rsi) * 2
+    else:
+        signal = "⚪ neutral"
+        signal_strength = 0
+    
+    return {
+        'coin': coin,
+        'symbol': symbol,
+        'price': price,
+        'high': high,
+        'low': low,
+        'rsi': rsi,
+        'vol': vol,
+        'pos_rango': pos_rango,
+        'signal': signal,
+        'strength': min(signal_strength, 100)
+    }
 
 
 def main():
@@ -62,69 +113,14 @@ def main():
     
     results = []
     
-    for symbol in COINS:
-        try:
-            ticker = get_ticker(symbol)
-            candles = get_candles(symbol)
-            
-            price = float(ticker.get('last', 0))
-            high = float(ticker.get('high_24h', price))
-            low = float(ticker.get('low_24h', price))
-            
-            # RSI
-            if candles and isinstance(candles, list):
-                prices = [float(c[4]) for c in candles if isinstance(c, list) and len(c) > 4]
-                rsi = calc_rsi(prices)
-            else:
-                rsi = 50
-            
-            # Volatilidad
-            rango = high - low
-            vol = (rango / price * 100) if price > 0 else 0
-            
-            # Posición en rango (0-100)
-            if rango > 0:
-                pos_rango = ((price - low) / rango) * 100
-            else:
-                pos_rango = 50
-            
-            coin = symbol.replace('cmt_', '').replace('usdt', '').upper()
-            
-            # Determinar señal
-            signal_strength = 0
-            if rsi > 75:
-                signal = "🔴 SHORT!"
-                signal_strength = (rsi - 70) * 3
-            elif rsi > 70:
-                signal = "🟡 short?"
-                signal_strength = (rsi - 70) * 2
-            elif rsi < 25:
-                signal = "🟢 LONG!"
-                signal_strength = (30 - rsi) * 3
-            elif rsi < 30:
-                signal = "🟡 long?"
-                signal_strength = (30 - rsi) * 2
-            else:
-                signal = "⚪ neutral"
-                signal_strength = 0
-            
-            results.append({
-                'coin': coin,
-                'symbol': symbol,
-                'price': price,
-                'high': high,
-                'low': low,
-                'rsi': rsi,
-                'vol': vol,
-                'pos_rango': pos_rango,
-                'signal': signal,
-                'strength': min(signal_strength, 100)
-            })
-            
-            time.sleep(0.2)
-            
-        except Exception as e:
-            print(f"Error {symbol}: {e}")
+    # Todas las monedas a la vez (el RateLimiter del cliente marca el ritmo)
+    scanner = ParallelScanner(len(COINS), client=get_client())
+    for symbol, result, error in scanner.scan(COINS, analyze_coin):
+        if error:
+            print(f"Error {symbol}: {error}")
+        else:
+            results.append(result)
+    scanner.close()
     
     # Ordenar por volatilidad
     results.sort(key=lambda x: x['vol'], reverse=True)
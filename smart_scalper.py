@@ -24,6 +24,7 @@ import sys
 import time
 import json
 import os
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -34,6 +35,14 @@ sys.path.insert(0, str(Path(__file__).parent))
 from weex_client import WeexClient
 from utils.coingecko_intel import CoinGeckoIntel, MarketOpportunity
 from utils.sentiment import DeepSeekSentiment
+from utils.market_stream import MarketDataCache, MarketStream, TickDispatcher
+from utils.state_store import StateStore, ticker_prices
+from utils.candle_store import CandleStore
+from utils.contracts import ContractRegistry
+from utils.scheduler import TaskScheduler
+from utils.triggers import TriggerIndex
+from utils.incremental import IndicatorStream
+from utils import indicators
 
 # ═══════════════════════════════════════════════════════════════
 # CONFIGURACIÓN INTELIGENTE
@@ -64,33 +73,29 @@ SCAN_INTERVAL = 20               # Escanear cada 20 segundos
 POSITION_CHECK_INTERVAL = 5      # Verificar posiciones cada 5 segundos
 COINGECKO_REFRESH = 120          # Actualizar CoinGecko cada 2 minutos
 SENTIMENT_REFRESH = 300          # Actualizar sentiment cada 5 minutos
+STATUS_INTERVAL = 60             # Imprimir estado cada minuto
+STATE_PUBLISH_INTERVAL = 5       # Publicar estado para el dashboard (utils.state_store)
+USE_MARKET_STREAM = True         # Stops por tick vía WebSocket (fallback: polling REST)
+USE_EXCHANGE_BRACKETS = False    # TP/SL como plan orders en WEEX; el trailing mueve el SL
+BRACKET_CHECK_INTERVAL = 30      # Con brackets el sweep REST de posiciones puede ser más lento
+BRACKET_TRAIL_STEP_PCT = 0.2     # Mover el SL del exchange solo si el trailing avanzó >= 0.2%
+USE_INCREMENTAL_INDICATORS = False  # RSI/MACD O(1) por vela nueva; el MACD conserva su semilla EMA y difiere del de la ventana de 50 velas
 
 # Filters
 MIN_SIGNAL_STRENGTH = 65         # Mínimo 65/100 para entrar
 MAX_POSITIONS = 5                # Máximo 5 posiciones simultáneas
 COOLDOWN_MINUTES = 3             # Cooldown entre trades misma coin
 
-# Step sizes por moneda
-STEP_SIZES = {
-    'cmt_btcusdt': 0.001,
-    'cmt_ethusdt': 0.01,
-    'cmt_solusdt': 0.1,
-    'cmt_bnbusdt': 0.1,
-    'cmt_adausdt': 10,
-    'cmt_dogeusdt': 100,
-    'cmt_ltcusdt': 0.1,
-    'cmt_xrpusdt': 10,
-    'cmt_avaxusdt': 0.1,
-    'cmt_dotusdt': 0.1,
-    'cmt_linkusdt': 0.1,
-    'cmt_nearusdt': 1,
-    'cmt_uniusdt': 0.1,
-    'cmt_arbusdt': 1,
-    'cmt_suiusdt': 1,
-    'cmt_aptusdt': 0.1,
-    'cmt_pepeusdt': 1000000,
-    'cmt_shibusdt': 100000,
-}
+# Symbols streamed for tick-level stops (lot steps come from the ContractRegistry)
+STREAM_SYMBOLS = [
+    'cmt_btcusdt', 'cmt_ethusdt', 'cmt_solusdt', 'cmt_bnbusdt', 'cmt_adausdt',
+    'cmt_dogeusdt', 'cmt_ltcusdt', 'cmt_xrpusdt', 'cmt_avaxusdt', 'cmt_dotusdt',
+    'cmt_linkusdt', 'cmt_nearusdt', 'cmt_uniusdt', 'cmt_arbusdt', 'cmt_suiusdt',
+    'cmt_aptusdt', 'cmt_pepeusdt', 'cmt_shibusdt',
+]
+
+# Close reason per trigger kind (utils.triggers)
+EXIT_REASONS = {'stop': "Stop Loss", 'target': "Take Profit", 'trail': "Trailing Stop"}
 
 
 @dataclass
@@ -116,20 +121,33 @@ class SmartScalper:
     decisiones de trading informadas.
     """
     
-    def __init__(self):
+    def __init__(self, client=None, candle_store=None, coingecko=None, sentiment=None,
+                 contracts=None, state_store=None):
+        """
+        Args:
+            client: WeexClient (created if not provided; backtests pass a SimulatedWeexClient)
+            candle_store: Candle source with get_arrays (CandleStore on the client by default)
+            coingecko: CoinGeckoIntel or an offline stand-in
+            sentiment: DeepSeekSentiment or an offline stand-in
+            contracts: ContractRegistry with per-symbol lot step / tick (loaded from the exchange by default)
+            state_store: StateStore the dashboard reads (published from run() only)
+        """
         print("="*60)
         print("🧠 SMART AI SCALPER - WEEX HACKATHON")
         print("="*60)
         
         # Clients
-        self.weex = WeexClient()
-        self.coingecko = CoinGeckoIntel()
-        self.sentiment = DeepSeekSentiment()
+        self.weex = client or WeexClient()
+        self.contracts = contracts or ContractRegistry(self.weex)
+        self.coingecko = coingecko or CoinGeckoIntel()
+        self.sentiment = sentiment or DeepSeekSentiment(cache_ttl=SENTIMENT_REFRESH)
+        self.state_store = state_store or StateStore()
         
         # State
         self.positions = {}
         self.cooldowns = {}
         self.trailing_data = {}
+        self.triggers = TriggerIndex()  # SL / TP / trailing levels of every open position
         self.daily_pnl = 0
         self.total_pnl = 0
         self.trades_today = 0
@@ -138,10 +156,25 @@ class SmartScalper:
         
         # Cache
         self.market_opportunities = []
+        self.last_signals: List[TradeSignal] = []
         self.last_coingecko_update = 0
-        self.last_sentiment_cache = {}
+        self.last_scan = 0
+        self.scheduler: Optional[TaskScheduler] = None  # Set by run()
         self.fear_greed = {'value': 50, 'signal': 'neutral'}
         
+        # Streaming: ticks evalúan stops al instante, REST solo como respaldo
+        self._lock = threading.RLock()
+        self.market_cache = MarketDataCache()
+        self.weex.attach_market_cache(self.market_cache)
+        self.candles = candle_store or CandleStore(self.weex)
+        self.indicator_streams: Dict[str, IndicatorStream] = {}
+        # Closes run on the dispatcher thread, never on the WebSocket reader
+        self.tick_dispatcher = TickDispatcher(self._handle_tick, name="smart-ticks")
+        self.stream = MarketStream(
+            STREAM_SYMBOLS, granularities=('5m',),
+            cache=self.market_cache, on_tick=self._on_tick
+        ) if USE_MARKET_STREAM else None
+        
         # Initialize
         self._update_balance()
         self._print_status()
@@ -183,45 +216,14 @@ class SmartScalper:
     
     def calculate_rsi(self, closes: List[float], period: int = 14) -> float:
         """Calculate RSI"""
-        if len(closes) < period + 1:
-            return 50.0
-        
-        gains = []
-        losses = []
-        
-        for i in range(1, len(closes)):
-            change = closes[i] - closes[i-1]
-            gains.append(max(0, change))
-            losses.append(max(0, -change))
-        
-        if len(gains) < period:
-            return 50.0
-        
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
-        
-        if avg_loss == 0:
-            return 100.0 if avg_gain > 0 else 50.0
-        
-        rs = avg_gain / avg_loss
-        return 100 - (100 / (1 + rs))
+        return indicators.rsi(closes, period)
     
     def calculate_macd(self, closes: List[float]) -> Tuple[float, float, float]:
         """Calculate MACD, Signal, and Histogram"""
         if len(closes) < 26:
             return 0, 0, 0
         
-        # EMA calculation
-        def ema(data, period):
-            multiplier = 2 / (period + 1)
-            ema_val = sum(data[:period]) / period
-            for price in data[period:]:
-                ema_val = (price - ema_val) * multiplier + ema_val
-            return ema_val
-        
-        ema12 = ema(closes, 12)
-        ema26 = ema(closes, 26)
-        macd_line = ema12 - ema26
+        macd_line = indicators.ema(closes, 12) - indicators.ema(closes, 26)
         
         # Simple signal approximation
         signal_line = macd_line * 0.9  # Simplified
@@ -231,39 +233,39 @@ class SmartScalper:
     
     def calculate_volatility(self, closes: List[float], period: int = 14) -> float:
         """Calculate volatility (ATR-like)"""
-        if len(closes) < period:
-            return 0.01
-        
-        changes = [abs(closes[i] - closes[i-1]) / closes[i-1] for i in range(1, len(closes))]
-        return sum(changes[-period:]) / period * 100  # As percentage
+        return indicators.volatility(closes, period)
     
     def analyze_technical(self, symbol: str) -> Dict:
         """Full technical analysis for a symbol"""
         try:
             # Get candles
-            candles = self.weex.get_candles(symbol, granularity='5m', limit=50)
-            if not candles or len(candles) < 20:
+            bars = self.candles.get_arrays(symbol, granularity='5m', limit=50)
+            if len(bars.ts) < 20:
                 return None
             
-            # Sort by timestamp
-            candles_sorted = sorted(candles, key=lambda x: int(x[0]))
+            # Column views, already sorted and parsed
+            closes, highs, lows, volumes = bars.close, bars.high, bars.low, bars.volume
             
-            closes = [float(c[4]) for c in candles_sorted]
-            highs = [float(c[2]) for c in candles_sorted]
-            lows = [float(c[3]) for c in candles_sorted]
-            volumes = [float(c[5]) for c in candles_sorted]
-            
-            current_price = closes[-1]
+            current_price = float(closes[-1])
             
             # Calculate indicators
-            rsi = self.calculate_rsi(closes)
-            macd, signal, histogram = self.calculate_macd(closes)
+            if USE_INCREMENTAL_INDICATORS:
+                # Solo procesa las velas nuevas desde el último análisis
+                stream = self.indicator_streams.get(symbol)
+                if stream is None:
+                    stream = self.indicator_streams[symbol] = IndicatorStream()
+                values = stream.sync(bars)
+                rsi = values['rsi']
+                macd = values['macd'] or 0
+                signal = macd * 0.9  # Misma aproximación que calculate_macd
+                histogram = macd - signal
+            else:
+                rsi = self.calculate_rsi(closes)
+                macd, signal, histogram = self.calculate_macd(closes)
             volatility = self.calculate_volatility(closes)
             
             # Volume analysis
-            avg_volume = sum(volumes[-10:]) / 10
-            current_volume = volumes[-1]
-            volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1
+            volume_ratio = indicators.volume_ratio(volumes, 10)
             
             # Price momentum (% change last 5 candles)
             momentum = (closes[-1] - closes[-5]) / closes[-5] * 100 if len(closes) >= 5 else 0
@@ -336,11 +338,11 @@ class SmartScalper:
     # MARKET INTELLIGENCE
     # ═══════════════════════════════════════════════════════════════
     
-    def update_market_intel(self):
-        """Update market intelligence from CoinGecko"""
+    def update_market_intel(self, force: bool = False):
+        """Update market intelligence from CoinGecko (at most every COINGECKO_REFRESH unless forced)"""
         now = time.time()
         
-        if now - self.last_coingecko_update < COINGECKO_REFRESH:
+        if not force and now - self.last_coingecko_update < COINGECKO_REFRESH:
             return
         
         print("\n🦎 Updating CoinGecko intelligence...")
@@ -356,21 +358,17 @@ class SmartScalper:
         self.last_coingecko_update = now
     
     def get_sentiment_signal(self, coin: str) -> Dict:
-        """Get AI sentiment for a coin"""
+        """
+        Latest AI sentiment for a coin, without waiting on DeepSeek
+        
+        Stale or missing entries are refreshed in the background (batched
+        with the other coins of the scan) and show up on a later scan.
+        """
         if not self.sentiment.enabled:
             return {'sentiment': 'neutral', 'confidence': 50}
         
-        # Check cache
-        cache_key = coin.upper()
-        if cache_key in self.last_sentiment_cache:
-            cached, timestamp = self.last_sentiment_cache[cache_key]
-            if time.time() - timestamp < SENTIMENT_REFRESH:
-                return cached
-        
         try:
-            result = self.sentiment.get_signal(coin)
-            self.last_sentiment_cache[cache_key] = (result, time.time())
-            return result
+            return self.sentiment.get_signal(coin, wait=False)
         except:
             return {'sentiment': 'neutral', 'confidence': 50}
     
@@ -378,12 +376,19 @@ class SmartScalper:
     # SIGNAL GENERATION
     # ═══════════════════════════════════════════════════════════════
     
-    def generate_signals(self) -> List[TradeSignal]:
-        """Generate trading signals from all sources"""
+    def generate_signals(self, refresh_intel: bool = True) -> List[TradeSignal]:
+        """
+        Generate trading signals from all sources
+        
+        Args:
+            refresh_intel: Refresh CoinGecko data first if stale (the scheduler
+                           refreshes it in its own task instead)
+        """
         signals = []
         
         # Update market intelligence
-        self.update_market_intel()
+        if refresh_intel:
+            self.update_market_intel()
         
         # Get tradeable coins from CoinGecko opportunities
         tradeable = set()
@@ -398,6 +403,11 @@ class SmartScalper:
         
         print(f"\n🔍 Analyzing {len(tradeable)} coins...")
         
+        # One batched DeepSeek request for every coin whose sentiment is stale
+        if self.sentiment.enabled:
+            self.sentiment.refresh_async(sym.replace('cmt_', '').replace('usdt', '').upper()
+                                         for sym in tradeable)
+        
         for symbol in tradeable:
             # Skip if in cooldown
             if self.is_on_cooldown(symbol):
@@ -520,20 +530,9 @@ class SmartScalper:
     # POSITION MANAGEMENT
     # ═══════════════════════════════════════════════════════════════
     
-    def get_step_size(self, symbol: str) -> float:
-        """Get step size for symbol"""
-        return STEP_SIZES.get(symbol, 0.01)
-    
     def calculate_quantity(self, symbol: str, price: float, size_usd: float, leverage: int) -> float:
-        """Calculate order quantity"""
-        notional = size_usd * leverage
-        raw_qty = notional / price
-        step = self.get_step_size(symbol)
-        qty = round(raw_qty / step) * step
-        
-        # Ensure proper decimals
-        decimals = len(str(step).split('.')[-1]) if '.' in str(step) else 0
-        return round(qty, decimals)
+        """Calculate order quantity (rounded to the contract's lot step)"""
+        return self.contracts.get(symbol).size_for_notional(size_usd * leverage, price)
     
     def is_on_cooldown(self, symbol: str) -> bool:
         """Check if symbol is on cooldown"""
@@ -581,35 +580,42 @@ class SmartScalper:
                 print("❌ Invalid quantity")
                 return False
             
+            # Shutdown in progress (close_all_positions may already have run)
+            if self.scheduler is not None and self.scheduler.stopped:
+                print(f"🛑 Shutting down, not opening {signal.symbol}")
+                return False
+            
             # Place order
             side = 'buy' if signal.direction == 'long' else 'sell'
             
-            result = self.weex.place_order(
-                symbol=signal.symbol,
-                side=side,
-                size=qty,
-                order_type='market'
-            )
-            
-            if result and result.get('orderId'):
-                print(f"✅ Order placed: {result['orderId']}")
+            bracket = None
+            if USE_EXCHANGE_BRACKETS:
+                # Entry + exchange-side TP/SL as one unit
+                bracket = result = self.weex.place_bracket(
+                    signal.symbol, signal.direction, qty,
+                    take_profit=self.contracts.round_price(signal.symbol, signal.take_profit),
+                    stop_loss=self.contracts.round_price(signal.symbol, signal.stop_loss)
+                )
+                order_id = bracket.entry_order_id if bracket else None
+            else:
+                result = self.weex.place_order(
+                    symbol=signal.symbol,
+                    side=side,
+                    size=qty,
+                    order_type='market'
+                )
+                order_id = (result.get('order_id') or result.get('orderId')) if result else None
+            
+            if order_id:
+                print(f"✅ Order placed: {order_id}")
+                if bracket and not bracket.protected:
+                    print("⚠️ Exchange stop not placed, protecting client-side only")
                 
                 # Track position
-                self.positions[signal.symbol] = {
-                    'order_id': result['orderId'],
-                    'direction': signal.direction,
-                    'entry_price': signal.entry_price,
-                    'quantity': qty,
-                    'stop_loss': signal.stop_loss,
-                    'take_profit': signal.take_profit,
-                    'leverage': signal.leverage,
-                    'size_usd': signal.size_usd,
-                    'highest_price': signal.entry_price,
-                    'lowest_price': signal.entry_price,
-                    'trailing_active': False,
-                    'open_time': datetime.now(),
-                    'reasons': signal.reasons
-                }
+                with self._lock:
+                    self.positions[signal.symbol] = self._new_position(signal, order_id, qty)
+                    self.positions[signal.symbol]['bracket'] = bracket
+                    self._arm_triggers(signal)
                 
                 self.set_cooldown(signal.symbol)
                 self.trades_today += 1
@@ -623,14 +629,41 @@ class SmartScalper:
             print(f"❌ Error opening position: {e}")
             return False
     
+    def _new_position(self, signal: TradeSignal, order_id: str, qty: float) -> Dict:
+        """Position record tracked for SL/TP/trailing"""
+        return {
+            'order_id': order_id,
+            'direction': signal.direction,
+            'entry_price': signal.entry_price,
+            'quantity': qty,
+            'stop_loss': signal.stop_loss,
+            'take_profit': signal.take_profit,
+            'leverage': signal.leverage,
+            'size_usd': signal.size_usd,
+            'trailing_active': False,
+            'open_time': datetime.now(),
+            'reasons': signal.reasons
+        }
+    
+    def _arm_triggers(self, signal: TradeSignal):
+        """Index the position's SL / TP and trailing activation (keyed by symbol)"""
+        sign = 1 if signal.direction == 'long' else -1
+        self.triggers.add(
+            signal.symbol, signal.symbol, signal.direction,
+            stop=signal.stop_loss,
+            target=signal.take_profit,
+            trail_pct=TRAILING_STOP_PCT,
+            activation=signal.entry_price * (1 + sign * TRAILING_ACTIVATION / 100)
+        )
+    
     def check_positions(self):
-        """Check and manage open positions"""
+        """Check and manage open positions (REST fallback / periodic sweep)"""
         if not self.positions:
             return
         
-        for symbol, pos in list(self.positions.items()):
+        for symbol in list(self.positions.keys()):
             try:
-                # Get current price
+                # Get current price (served from the stream cache when fresh)
                 ticker = self.weex.get_ticker(symbol)
                 if not ticker:
                     continue
@@ -641,69 +674,76 @@ class SmartScalper:
                 if current_price <= 0:
                     continue
                 
-                entry = pos['entry_price']
-                direction = pos['direction']
-                
-                # Calculate P&L %
-                if direction == 'long':
-                    pnl_pct = (current_price - entry) / entry * 100
-                    pos['highest_price'] = max(pos['highest_price'], current_price)
-                else:
-                    pnl_pct = (entry - current_price) / entry * 100
-                    pos['lowest_price'] = min(pos['lowest_price'], current_price)
-                
-                pnl_usd = pnl_pct * pos['size_usd'] * pos['leverage'] / 100
-                
-                should_close = False
-                reason = ""
-                
-                # Check stop loss
-                if direction == 'long' and current_price <= pos['stop_loss']:
-                    should_close = True
-                    reason = "Stop Loss"
-                elif direction == 'short' and current_price >= pos['stop_loss']:
-                    should_close = True
-                    reason = "Stop Loss"
-                
-                # Check take profit
-                if direction == 'long' and current_price >= pos['take_profit']:
-                    should_close = True
-                    reason = "Take Profit"
-                elif direction == 'short' and current_price <= pos['take_profit']:
-                    should_close = True
-                    reason = "Take Profit"
-                
-                # Trailing stop logic
-                if pnl_pct >= TRAILING_ACTIVATION:
-                    pos['trailing_active'] = True
-                
-                if pos['trailing_active']:
-                    if direction == 'long':
-                        trailing_stop = pos['highest_price'] * (1 - TRAILING_STOP_PCT / 100)
-                        if current_price <= trailing_stop:
-                            should_close = True
-                            reason = "Trailing Stop"
-                    else:
-                        trailing_stop = pos['lowest_price'] * (1 + TRAILING_STOP_PCT / 100)
-                        if current_price >= trailing_stop:
-                            should_close = True
-                            reason = "Trailing Stop"
-                
-                # Close if needed
-                if should_close:
-                    self.close_position(symbol, reason, pnl_usd)
-                else:
-                    # Print update every 30 seconds
-                    elapsed = (datetime.now() - pos['open_time']).total_seconds()
-                    if elapsed % 30 < POSITION_CHECK_INTERVAL:
-                        trailing_str = "🎯" if pos['trailing_active'] else ""
-                        print(f"   {symbol}: {pnl_pct:+.2f}% (${pnl_usd:+.2f}) {trailing_str}")
+                with self._lock:
+                    self.evaluate_position(symbol, current_price, verbose=True)
                 
             except Exception as e:
                 print(f"❌ Error checking {symbol}: {e}")
     
+    def _on_tick(self, symbol: str, price: float):
+        """Stream callback: hand ticks of open positions to the dispatcher and return"""
+        if symbol in self.positions:
+            self.tick_dispatcher.submit(symbol, price)
+    
+    def _handle_tick(self, symbol: str, price: float):
+        """Evaluate stops for one tick (dispatcher thread; may place the close order)"""
+        if symbol not in self.positions:
+            return
+        try:
+            with self._lock:
+                self.evaluate_position(symbol, price)
+        except Exception as e:
+            print(f"❌ Error on tick {symbol}: {e}")
+    
+    def position_pnl(self, pos: Dict, current_price: float) -> Tuple[float, float]:
+        """(P&L %, P&L USD) of a position at `current_price`"""
+        entry = pos['entry_price']
+        if pos['direction'] == 'long':
+            pnl_pct = (current_price - entry) / entry * 100
+        else:
+            pnl_pct = (entry - current_price) / entry * 100
+        return pnl_pct, pnl_pct * pos['size_usd'] * pos['leverage'] / 100
+    
+    def evaluate_position(self, symbol: str, current_price: float, verbose: bool = False):
+        """
+        Apply SL / TP / trailing logic to one position at `current_price`
+        
+        The trigger index only reports levels the price crossed, so a tick
+        that crosses nothing costs two bisects. When several exits cross at
+        once the trailing stop wins over the take profit, then the stop loss.
+        """
+        pos = self.positions.get(symbol)
+        if not pos or current_price <= 0:
+            return
+        
+        for hit in self.triggers.tick(symbol, current_price):
+            if not hit.is_exit:
+                if hit.kind == 'activation':
+                    pos['trailing_active'] = True
+                if pos.get('bracket'):
+                    self.weex.trail_bracket(pos['bracket'], self.contracts.round_price(symbol, hit.level),
+                                            BRACKET_TRAIL_STEP_PCT)
+                continue
+            
+            _, pnl_usd = self.position_pnl(pos, current_price)
+            self._close_position(symbol, EXIT_REASONS[hit.kind], pnl_usd)
+            return
+        
+        if verbose:
+            # Print update every 30 seconds
+            elapsed = (datetime.now() - pos['open_time']).total_seconds()
+            if elapsed % 30 < POSITION_CHECK_INTERVAL:
+                pnl_pct, pnl_usd = self.position_pnl(pos, current_price)
+                trailing_str = "🎯" if pos['trailing_active'] else ""
+                print(f"   {symbol}: {pnl_pct:+.2f}% (${pnl_usd:+.2f}) {trailing_str}")
+    
     def close_position(self, symbol: str, reason: str, pnl_usd: float):
         """Close a position"""
+        with self._lock:
+            self._close_position(symbol, reason, pnl_usd)
+    
+    def _close_position(self, symbol: str, reason: str, pnl_usd: float):
+        """Close a position (caller holds the lock)"""
         try:
             pos = self.positions.get(symbol)
             if not pos:
@@ -712,12 +752,17 @@ class SmartScalper:
             # Close by placing opposite order
             side = 'sell' if pos['direction'] == 'long' else 'buy'
             
-            result = self.weex.place_order(
-                symbol=symbol,
-                side=side,
-                size=pos['quantity'],
-                order_type='market'
-            )
+            if pos.get('bracket'):
+                # Drops the plan legs; sends nothing if the exchange already closed it
+                result = self.weex.close_bracket(pos['bracket'])
+            else:
+                result = self.weex.place_order(
+                    symbol=symbol,
+                    side=side,
+                    size=pos['quantity'],
+                    order_type='market',
+                    trade_side='close'
+                )
             
             if result:
                 # Update stats
@@ -737,6 +782,7 @@ class SmartScalper:
                 
                 # Remove from tracking
                 del self.positions[symbol]
+                self.triggers.remove(symbol)
                 
         except Exception as e:
             print(f"❌ Error closing {symbol}: {e}")
@@ -751,6 +797,112 @@ class SmartScalper:
     # MAIN LOOP
     # ═══════════════════════════════════════════════════════════════
     
+    def run_cycle(self, now: float = None) -> bool:
+        """
+        One iteration of the main loop (no sleeping), also driven by the backtest
+        
+        Returns:
+            False when the bot must stop (balance or daily loss limit)
+        """
+        now = time.time() if now is None else now
+        
+        if not self.check_safety():
+            return False
+        
+        # Check existing positions
+        self.check_positions()
+        
+        # Generate new signals (every SCAN_INTERVAL seconds)
+        if now - self.last_scan >= SCAN_INTERVAL:
+            self.scan_and_trade()
+            self.last_scan = now
+        
+        return True
+    
+    def check_safety(self) -> bool:
+        """
+        Refresh the balance and apply the account-level stops
+        
+        Returns:
+            False when the bot must stop (balance or daily loss limit)
+        """
+        self._update_balance()
+        
+        if self.equity < MIN_BALANCE_TO_TRADE:
+            print(f"\n🛑 Balance too low (${self.equity:.2f}). Stopping.")
+            return False
+        
+        if abs(self.daily_pnl) > self.equity * MAX_DAILY_LOSS:
+            print(f"\n🛑 Daily loss limit reached (${self.daily_pnl:.2f}). Stopping.")
+            return False
+        
+        return True
+    
+    def scan_and_trade(self, refresh_intel: bool = True):
+        """Generate signals and open a position on the best one"""
+        signals = self.generate_signals(refresh_intel)
+        self.last_signals = signals[:5]
+        
+        if signals:
+            print(f"\n📊 Top signals:")
+            for s in signals[:3]:
+                print(f"   {s.symbol}: {s.direction.upper()} "
+                      f"({s.confidence:.0f}%) - {', '.join(s.reasons[:2])}")
+            
+            # Try to open position on best signal
+            for signal in signals[:2]:  # Top 2 signals
+                if len(self.positions) < MAX_POSITIONS:
+                    if self.open_position(signal):
+                        break
+    
+    def build_scheduler(self) -> TaskScheduler:
+        """
+        Main-loop tasks, each on its own cadence
+        
+        Position protection runs on the scheduler thread; scans, CoinGecko
+        refreshes and status prints run on background workers, so a slow
+        CoinGecko or DeepSeek call never delays a stop-loss check.
+        """
+        scheduler = TaskScheduler(background_workers=3)
+        # Exchange-side brackets protect between sweeps, so the REST sweep can slow down
+        position_interval = BRACKET_CHECK_INTERVAL if USE_EXCHANGE_BRACKETS else POSITION_CHECK_INTERVAL
+        scheduler.add("positions", self.check_positions, position_interval,
+                      priority=0, deadline=POSITION_CHECK_INTERVAL)
+        scheduler.add("safety", self.check_safety, POSITION_CHECK_INTERVAL,
+                      priority=1, deadline=POSITION_CHECK_INTERVAL)
+        scheduler.add("intel", lambda: self.update_market_intel(force=True), COINGECKO_REFRESH,
+                      background=True)
+        scheduler.add("scan", lambda: self.scan_and_trade(refresh_intel=False), SCAN_INTERVAL,
+                      background=True, deadline=SCAN_INTERVAL)
+        scheduler.add("status", self._print_status, STATUS_INTERVAL,
+                      background=True, delay=STATUS_INTERVAL)
+        scheduler.add("state", self.publish_state, STATE_PUBLISH_INTERVAL, background=True)
+        return scheduler
+    
+    def publish_state(self):
+        """Publish balance, positions, stream prices and the last signals for the dashboard"""
+        prices = ticker_prices(self.market_cache.tickers())
+        positions = []
+        for symbol, pos in list(self.positions.items()):
+            price = prices.get(symbol, {}).get('last')
+            positions.append({
+                'symbol': symbol,
+                'holdSide': pos['direction'],
+                'total': pos['quantity'],
+                'averageOpenPrice': pos['entry_price'],
+                'unrealizedPL': round(self.position_pnl(pos, price)[1], 4) if price else 0,
+            })
+        self.state_store.publish(
+            "smart_scalper",
+            balance={'equity': self.equity, 'available': self.available,
+                     'frozen': getattr(self, 'frozen', 0)},
+            positions=positions,
+            prices=prices,
+            signals=[{'symbol': s.symbol, 'direction': s.direction,
+                      'confidence': s.confidence, 'reasons': s.reasons[:3]}
+                     for s in self.last_signals],
+        )
+    
     def run(self):
         """Main trading loop"""
         print("\n🚀 Starting Smart AI Scalper...")
@@ -759,54 +911,22 @@ class SmartScalper:
         print(f"   Max Positions: {MAX_POSITIONS}")
         print(f"   Min Signal Strength: {MIN_SIGNAL_STRENGTH}")
         
-        last_scan = 0
+        if self.stream:
+            self.stream.start()
+        
+        self.scheduler = self.build_scheduler()
         
         try:
-            while True:
-                now = time.time()
-                
-                # Update balance
-                self._update_balance()
-                
-                # Safety checks
-                if self.equity < MIN_BALANCE_TO_TRADE:
-                    print(f"\n🛑 Balance too low (${self.equity:.2f}). Stopping.")
-                    break
-                
-                if abs(self.daily_pnl) > self.equity * MAX_DAILY_LOSS:
-                    print(f"\n🛑 Daily loss limit reached (${self.daily_pnl:.2f}). Stopping.")
-                    break
-                
-                # Check existing positions
-                self.check_positions()
-                
-                # Generate new signals (every SCAN_INTERVAL seconds)
-                if now - last_scan >= SCAN_INTERVAL:
-                    signals = self.generate_signals()
-                    
-                    if signals:
-                        print(f"\n📊 Top signals:")
-                        for s in signals[:3]:
-                            print(f"   {s.symbol}: {s.direction.upper()} "
-                                  f"({s.confidence:.0f}%) - {', '.join(s.reasons[:2])}")
-                        
-                        # Try to open position on best signal
-                        for signal in signals[:2]:  # Top 2 signals
-                            if len(self.positions) < MAX_POSITIONS:
-                                if self.open_position(signal):
-                                    break
-                    
-                    last_scan = now
-                
-                # Status update
-                if int(now) % 60 == 0:
-                    self._print_status()
-                
-                time.sleep(POSITION_CHECK_INTERVAL)
+            self.scheduler.run()
                 
         except KeyboardInterrupt:
             print("\n\n⚠️ Interrupted by user")
             self.close_all_positions()
+        finally:
+            self.scheduler.stop()
+            if self.stream:
+                self.stream.stop()
+            self.tick_dispatcher.stop()
         
         print("\n" + "="*60)
         print("📊 FINAL STATS:")
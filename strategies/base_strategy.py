@@ -8,6 +8,8 @@ from typing import Dict, Any, Optional, List
 import logging
 from datetime import datetime
 
+from utils.contracts import ContractRegistry
+
 
 class BaseStrategy(ABC):
     """
@@ -20,7 +22,8 @@ class BaseStrategy(ABC):
     - Order management
     """
     
-    def __init__(self, client, symbol: str = "cmt_btcusdt", config: Dict = None):
+    def __init__(self, client, symbol: str = "cmt_btcusdt", config: Dict = None,
+                 contracts: ContractRegistry = None):
         """
         Initialize strategy
         
@@ -28,10 +31,12 @@ class BaseStrategy(ABC):
             client: WeexClient instance
             symbol: Trading pair
             config: Strategy-specific configuration
+            contracts: Contract rules (lot step, tick size); loaded from the client if not provided
         """
         self.client = client
         self.symbol = symbol
         self.config = config or {}
+        self.contracts = contracts or ContractRegistry(client)
         
         # Risk Management Defaults
         self.max_position_size = self.config.get('max_position_size', 100)  # $100 max
@@ -139,16 +144,10 @@ class BaseStrategy(ABC):
         # Account for leverage
         position_value = trade_value * self.max_leverage
         
-        # Convert to asset quantity
-        quantity = position_value / price
-        
-        # Round to appropriate precision (BTC = 4 decimals)
-        if 'btc' in self.symbol.lower():
-            quantity = round(quantity, 4)
-        elif 'eth' in self.symbol.lower():
-            quantity = round(quantity, 3)
-        else:
-            quantity = round(quantity, 2)
+        # Convert to asset quantity, rounded down to the contract's lot step
+        spec = self.contracts.get(self.symbol)
+        position_value = min(position_value, trade_value * spec.max_leverage)
+        quantity = spec.size_for_notional(position_value, price, mode="down")
         
         return str(quantity)
     
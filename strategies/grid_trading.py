@@ -17,6 +17,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from typing import Dict, Any, Optional, List
 from .base_strategy import BaseStrategy
+from utils.contracts import ContractRegistry
+from utils.grid_reconciler import GridPlan, GridReconciler
 
 
 class GridTradingStrategy(BaseStrategy):
@@ -30,10 +32,19 @@ class GridTradingStrategy(BaseStrategy):
     Risk: Price breakout beyond grid boundaries
     """
     
-    def __init__(self, client, symbol: str = "cmt_btcusdt", config: Dict = None):
+    def __init__(self, client, symbol: str = "cmt_btcusdt", config: Dict = None,
+                 candle_store=None, contracts: ContractRegistry = None):
         """
         Initialize Grid Trading Strategy
         
+        Args:
+            client: WeexClient (or backtest.SimulatedWeexClient)
+            symbol: Trading pair
+            config: Overrides for the options below
+            candle_store: Candle source for the filters (a CandleStore on the client if not provided)
+            contracts: ContractRegistry with the tick size / lot step / min notional
+                       (loaded from the exchange if not provided)
+        
         Config options:
             grid_levels: Number of grid levels (default: 3)
             grid_spacing_percent: Spacing between levels as % (default: 0.5%)
@@ -41,6 +52,7 @@ class GridTradingStrategy(BaseStrategy):
             rebalance_threshold: % move to trigger grid rebalance (default: 2%)
             use_filters: Enable RSI/MACD filters (default: True)
             use_sentiment: Enable DeepSeek AI (default: False)
+            order_workers: Grid order requests sent concurrently (default: 8)
         """
         # Default grid config
         default_config = {
@@ -52,6 +64,7 @@ class GridTradingStrategy(BaseStrategy):
             'max_position_size': 100,      # $100 max total
             'use_filters': True,           # Use RSI/MACD filters
             'use_sentiment': False,        # Use DeepSeek AI
+            'order_workers': 8,            # Concurrent place/cancel requests
         }
         
         # Merge with user config
@@ -63,8 +76,11 @@ class GridTradingStrategy(BaseStrategy):
         # Grid state
         self.grid_orders: Dict[str, Dict] = {}  # order_id -> order info
         self.grid_center_price = 0.0
+        self.grid_step = 0.0                    # Level spacing in price, fixed by the first grid
         self.grid_levels_prices: List[float] = []
         self.last_filled_level = None
+        self.reconciler = GridReconciler(client, symbol, max_workers=self.config['order_workers'])
+        self.contracts = contracts or ContractRegistry(client)
         
         # Technical indicators
         self.indicators = None
@@ -73,7 +89,7 @@ class GridTradingStrategy(BaseStrategy):
         if self.config['use_filters']:
             try:
                 from utils.indicators import TechnicalIndicators
-                self.indicators = TechnicalIndicators(client, symbol)
+                self.indicators = TechnicalIndicators(client, symbol, candle_store=candle_store)
                 self.logger.info("📊 Technical filters enabled (RSI/MACD)")
             except ImportError as e:
                 self.logger.warning(f"⚠️ Could not load indicators: {e}")
@@ -151,23 +167,26 @@ class GridTradingStrategy(BaseStrategy):
         """
         Calculate grid price levels around center price
         
+        Levels sit `grid_step` apart; the step is fixed when the first grid
+        is placed, so a re-centred grid shares its levels with the old one.
+        
         Returns:
             Dict with 'buy' and 'sell' price lists
         """
         levels = self.config['grid_levels']
-        spacing = self.config['grid_spacing_percent'] / 100
+        step = self.grid_step or center_price * self.config['grid_spacing_percent'] / 100
         
         buy_levels = []
         sell_levels = []
         
         for i in range(1, levels + 1):
             # Buy levels below current price
-            buy_price = center_price * (1 - spacing * i)
-            buy_levels.append(round(buy_price, 1))
+            buy_price = center_price - step * i
+            buy_levels.append(self.contracts.round_price(self.symbol, buy_price))
             
             # Sell levels above current price
-            sell_price = center_price * (1 + spacing * i)
-            sell_levels.append(round(sell_price, 1))
+            sell_price = center_price + step * i
+            sell_levels.append(self.contracts.round_price(self.symbol, sell_price))
         
         return {
             'buy': buy_levels,
@@ -175,6 +194,13 @@ class GridTradingStrategy(BaseStrategy):
             'center': center_price
         }
     
+    def snap_center(self, price: float) -> float:
+        """Nearest point of the current grid lattice to `price` (the price itself before the first grid)"""
+        if not self.grid_step or not self.grid_center_price:
+            return price
+        steps = round((price - self.grid_center_price) / self.grid_step)
+        return self.grid_center_price + steps * self.grid_step
+    
     def analyze(self) -> Dict[str, Any]:
         """
         Analyze if grid needs rebalancing
@@ -212,6 +238,23 @@ class GridTradingStrategy(BaseStrategy):
             'message': 'Grid operating normally'
         }
     
+    def grid_order_size(self, price: float) -> float:
+        """Contracts per grid order for `price` (rounded down to the lot step)"""
+        notional = self.config['order_size_usd'] * self.config['max_leverage']
+        return self.contracts.get(self.symbol).size_for_notional(notional, price, mode="down")
+    
+    def tradable_levels(self, levels: Dict[str, List[float]], size: float) -> Dict[str, List[float]]:
+        """`levels` without the prices where `size` misses the min size / min notional"""
+        spec = self.contracts.get(self.symbol)
+        tradable = dict(levels)
+        for side in ('buy', 'sell'):
+            tradable[side] = [price for price in levels[side] if spec.is_valid(size, price)]
+            skipped = len(levels[side]) - len(tradable[side])
+            if skipped:
+                self.logger.warning(f"⚠️ Skipping {skipped} {side} level(s) below the exchange minimum "
+                                    f"(size {size})")
+        return tradable
+    
     def place_grid_orders(self, levels: Dict[str, List[float]]) -> Dict[str, Any]:
         """
         Place buy and sell orders at grid levels
@@ -222,181 +265,50 @@ class GridTradingStrategy(BaseStrategy):
         Returns:
             Summary of placed orders
         """
-        current_price = levels['center']
-        order_size_usd = self.config['order_size_usd']
-        
-        placed_orders = {'buy': [], 'sell': []}
-        
-        # Calculate order size in BTC
-        size = round(order_size_usd * self.config['max_leverage'] / current_price, 4)
+        size = self.grid_order_size(levels['center'])
+        levels = self.tradable_levels(levels, size)
         
         self.logger.info(f"📊 Placing grid orders: {len(levels['buy'])} buys, "
-                        f"{len(levels['sell'])} sells, size: {size} BTC each")
-        
-        # Place buy orders (below current price)
-        for i, price in enumerate(levels['buy']):
-            try:
-                order = self._place_limit_order(
-                    side='buy',
-                    price=price,
-                    size=str(size),
-                    label=f"grid_buy_{i}"
-                )
-                if order.get('order_id'):
-                    placed_orders['buy'].append({
-                        'order_id': order['order_id'],
-                        'price': price,
-                        'size': size,
-                        'level': i
-                    })
-                    self.grid_orders[order['order_id']] = {
-                        'type': 'buy', 
-                        'price': price,
-                        'level': i
-                    }
-                time.sleep(0.2)  # Rate limit
-            except Exception as e:
-                self.logger.error(f"Failed to place buy order at ${price}: {e}")
+                        f"{len(levels['sell'])} sells, size: {size} each")
         
-        # Place sell orders (above current price)
-        for i, price in enumerate(levels['sell']):
-            try:
-                order = self._place_limit_order(
-                    side='sell',
-                    price=price,
-                    size=str(size),
-                    label=f"grid_sell_{i}"
-                )
-                if order.get('order_id'):
-                    placed_orders['sell'].append({
-                        'order_id': order['order_id'],
-                        'price': price,
-                        'size': size,
-                        'level': i
-                    })
-                    self.grid_orders[order['order_id']] = {
-                        'type': 'sell',
-                        'price': price,
-                        'level': i
-                    }
-                time.sleep(0.2)
-            except Exception as e:
-                self.logger.error(f"Failed to place sell order at ${price}: {e}")
+        plan = GridPlan(place=[(side, price, i) for side in ('buy', 'sell')
+                               for i, price in enumerate(levels[side])])
+        placed_orders = self.reconciler.apply(plan, self.grid_orders, str(size))
         
         self.logger.info(f"✅ Placed {len(placed_orders['buy'])} buys, "
                         f"{len(placed_orders['sell'])} sells")
         
         return placed_orders
     
-    def _place_limit_order(self, side: str, price: float, size: str, 
-                          label: str = "") -> Dict:
+    def rebalance_grid(self, center_price: float) -> Dict[str, Any]:
         """
-        Place a limit order
+        Move the grid to `center_price`, touching only the levels that changed
         
-        Args:
-            side: 'buy' or 'sell'
-            price: Limit price
-            size: Order size
-            label: Client order ID label
-        """
-        import json
-        import hmac
-        import hashlib
-        import base64
-        
-        # Order type: 1=open_long, 2=open_short, 3=close_long, 4=close_short
-        order_type = "1" if side == 'buy' else "2"
-        
-        body = {
-            "symbol": self.symbol,
-            "client_oid": f"{label}_{int(time.time())}",
-            "size": size,
-            "type": order_type,
-            "order_type": "0",     # 0 = normal order
-            "match_price": "0",    # 0 = limit order
-            "price": str(int(price))
-        }
+        Filled orders are dropped first (one open-orders request), then live
+        orders on a target level are kept; the others are cancelled and the
+        missing levels placed.
         
-        # Use client's internal request method
-        ts = str(int(time.time() * 1000))
-        path = "/capi/v2/order/placeOrder"
-        body_str = json.dumps(body)
-        
-        msg = ts + "POST" + path + body_str
-        sig = base64.b64encode(
-            hmac.new(
-                self.client.secret_key.encode(),
-                msg.encode(),
-                hashlib.sha256
-            ).digest()
-        ).decode()
-        
-        headers = {
-            "ACCESS-KEY": self.client.api_key,
-            "ACCESS-SIGN": sig,
-            "ACCESS-TIMESTAMP": ts,
-            "ACCESS-PASSPHRASE": self.client.passphrase,
-            "Content-Type": "application/json"
-        }
+        Returns:
+            Summary of placed orders with 'cancelled' and 'kept' counts, or
+            None if the open orders could not be read (nothing is sent)
+        """
+        if self.reconciler.sync(self.grid_orders) is None:
+            self.logger.warning("⚠️ Open orders unavailable, rebalance skipped this cycle")
+            return None
         
-        import requests
-        resp = requests.post(
-            f"{self.client.BASE_URL}{path}",
-            headers=headers,
-            data=body_str,
-            timeout=30
-        )
+        size = self.grid_order_size(center_price)
+        levels = self.tradable_levels(self.calculate_grid_levels(center_price), size)
+        plan = self.reconciler.plan(self.grid_orders, levels, tolerance=self.grid_step * 0.1)
         
-        return resp.json()
+        result = self.reconciler.apply(plan, self.grid_orders, str(size))
+        self.logger.info(f"   Kept {result['kept']}, cancelled {result['cancelled']}, "
+                        f"placed {len(result['buy']) + len(result['sell'])} orders")
+        return result
     
     def cancel_all_grid_orders(self) -> int:
         """Cancel all grid orders"""
-        import json
-        import hmac
-        import hashlib
-        import base64
-        import requests
-        
-        cancelled = 0
-        path = "/capi/v2/order/cancel_order"
-        
-        for order_id in list(self.grid_orders.keys()):
-            try:
-                ts = str(int(time.time() * 1000))
-                body = json.dumps({"symbol": self.symbol, "orderId": order_id})
-                msg = ts + "POST" + path + body
-                sig = base64.b64encode(
-                    hmac.new(
-                        self.client.secret_key.encode(),
-                        msg.encode(),
-                        hashlib.sha256
-                    ).digest()
-                ).decode()
-                
-                headers = {
-                    "ACCESS-KEY": self.client.api_key,
-                    "ACCESS-SIGN": sig,
-                    "ACCESS-TIMESTAMP": ts,
-                    "ACCESS-PASSPHRASE": self.client.passphrase,
-                    "Content-Type": "application/json"
-                }
-                
-                resp = requests.post(
-                    f"{self.client.BASE_URL}{path}",
-                    headers=headers,
-                    data=body,
-                    timeout=10
-                )
-                
-                if resp.status_code == 200:
-                    del self.grid_orders[order_id]
-                    cancelled += 1
-                
-                time.sleep(0.1)
-            except Exception as e:
-                self.logger.error(f"Failed to cancel order {order_id}: {e}")
-        
-        return cancelled
+        result = self.reconciler.apply(GridPlan(cancel=list(self.grid_orders)), self.grid_orders, "0")
+        return result['cancelled']
     
     def execute(self) -> Optional[Dict]:
         """
@@ -414,6 +326,7 @@ class GridTradingStrategy(BaseStrategy):
         if analysis['action'] == 'initialize':
             # First time setup
             self.grid_center_price = analysis['current_price']
+            self.grid_step = self.grid_center_price * self.config['grid_spacing_percent'] / 100
             levels = self.calculate_grid_levels(self.grid_center_price)
             
             self.logger.info(f"🎯 Initializing grid at ${self.grid_center_price:,.2f}")
@@ -426,15 +339,12 @@ class GridTradingStrategy(BaseStrategy):
             # Price moved too far, rebalance grid
             self.logger.info(f"🔄 Rebalancing grid (deviation: {analysis['deviation']})")
             
-            # Cancel existing orders
-            cancelled = self.cancel_all_grid_orders()
-            self.logger.info(f"   Cancelled {cancelled} old orders")
-            
-            # Set new center and place new orders
-            self.grid_center_price = analysis['current_price']
-            levels = self.calculate_grid_levels(self.grid_center_price)
-            
-            return self.place_grid_orders(levels)
+            # New center on the same lattice: only the changed levels are sent
+            center = self.snap_center(analysis['current_price'])
+            result = self.rebalance_grid(center)
+            if result is not None:
+                self.grid_center_price = center  # Otherwise retried next cycle
+            return result
         
         else:
             # Normal monitoring
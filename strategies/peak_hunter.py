@@ -16,11 +16,6 @@ Monedas más volátiles: DOGE, SOL, XRP, ADA
 import os
 import sys
 import time
-import json
-import hmac
-import hashlib
-import base64
-import requests
 from datetime import datetime
 from dataclasses import dataclass
 from typing import List, Dict, Optional
@@ -29,11 +24,9 @@ from dotenv import load_dotenv
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 load_dotenv()
 
-# API Config
-API_KEY = os.getenv("WEEX_API_KEY")
-SECRET_KEY = os.getenv("WEEX_SECRET_KEY")
-PASSPHRASE = os.getenv("WEEX_PASSPHRASE")
-BASE_URL = "https://api-contract.weex.com"
+from utils import indicators
+from weex_client import get_shared_client
+from utils.parallel_scan import ParallelScanner
 
 # Monedas ordenadas por volatilidad
 VOLATILE_COINS = [
@@ -69,7 +62,9 @@ class PeakHunter:
     """
     
     def __init__(self):
-        self.session = requests.Session()
+        # Cliente compartido (el escaneo sólo usa endpoints públicos)
+        self.client = get_shared_client(require_auth=False)
+        self.scanner = ParallelScanner(len(VOLATILE_COINS), client=self.client)
         
         # Configuración
         self.rsi_overbought = 70      # RSI para considerar sobrecomprado
@@ -77,64 +72,23 @@ class PeakHunter:
         self.change_threshold = 5     # % cambio mínimo para considerar
         self.min_signal_strength = 60 # Fuerza mínima para recomendar
     
-    def _sign(self, method: str, path: str, query: str = "", body: str = "") -> tuple:
-        """Generar firma para API"""
-        ts = str(int(time.time() * 1000))
-        msg = ts + method + path + query + body
-        sig = base64.b64encode(
-            hmac.new(SECRET_KEY.encode(), msg.encode(), hashlib.sha256).digest()
-        ).decode()
-        return ts, sig
-    
-    def _headers(self, ts: str, sig: str) -> dict:
-        return {
-            "ACCESS-KEY": API_KEY,
-            "ACCESS-SIGN": sig,
-            "ACCESS-TIMESTAMP": ts,
-            "ACCESS-PASSPHRASE": PASSPHRASE,
-            "Content-Type": "application/json"
-        }
-    
     def get_ticker(self, symbol: str) -> Dict:
         """Obtener precio y cambio 24h"""
         try:
-            resp = self.session.get(
-                f"{BASE_URL}/capi/v2/market/ticker?symbol={symbol}",
-                timeout=10
-            )
-            return resp.json()
+            return self.client.get_ticker(symbol)
         except:
             return {}
     
     def get_candles(self, symbol: str, granularity: str = "5m", limit: int = 50) -> List:
         """Obtener velas para calcular RSI"""
         try:
-            resp = self.session.get(
-                f"{BASE_URL}/capi/v2/market/candles",
-                params={"symbol": symbol, "granularity": granularity, "limit": str(limit)},
-                timeout=10
-            )
-            return resp.json()
+            return self.client.get_candles(symbol, granularity, limit)
         except:
             return []
     
     def calculate_rsi(self, prices: List[float], period: int = 14) -> float:
         """Calcular RSI"""
-        if len(prices) < period + 1:
-            return 50.0
-        
-        deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-        gains = [d if d > 0 else 0 for d in deltas]
-        losses = [-d if d < 0 else 0 for d in deltas]
-        
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
-        
-        if avg_loss == 0:
-            return 100.0
-        
-        rs = avg_gain / avg_loss
-        return 100 - (100 / (1 + rs))
+        return indicators.rsi(prices, period, flat=100.0)
     
     def analyze_coin(self, symbol: str) -> Optional[PeakSignal]:
         """
@@ -254,9 +208,12 @@ class PeakHunter:
         print("\n🔍 Escaneando monedas volátiles...")
         print("="*60)
         
-        for symbol in VOLATILE_COINS:
+        # Todas las monedas a la vez; cada fila se imprime al llegar su análisis
+        for symbol, signal, error in self.scanner.scan(VOLATILE_COINS, self.analyze_coin):
+            if error:
+                print(f"❌ Error {symbol}: {error}")
+                continue
             try:
-                signal = self.analyze_coin(symbol)
                 if signal:
                     signals.append(signal)
                     
@@ -269,8 +226,6 @@ class PeakHunter:
                           f"RSI: {signal.rsi:>5.1f} | "
                           f"[{strength_bar}] {signal.signal_strength:>5.1f}%")
                 
-                time.sleep(0.2)  # Rate limit
-                
             except Exception as e:
                 print(f"❌ Error {symbol}: {e}")
         
@@ -383,35 +338,11 @@ class QuickShort:
         print(f"   SL: ${sl_price:,.4f} (+2%)")
         print(f"   TP: ${tp_price:,.4f} (-3%)")
         
-        # Colocar orden
-        ts = str(int(time.time() * 1000))
-        path = "/capi/v2/order/placeOrder"
-        
-        body = {
-            "symbol": symbol,
-            "client_oid": f"short_{int(time.time())}",
-            "size": str(size),
-            "type": "2",           # 2 = open_short
-            "order_type": "0",     # Normal
-            "match_price": "1",    # Market order
-        }
-        body_str = json.dumps(body)
-        
-        msg = ts + "POST" + path + body_str
-        sig = base64.b64encode(
-            hmac.new(SECRET_KEY.encode(), msg.encode(), hashlib.sha256).digest()
-        ).decode()
-        
-        headers = {
-            "ACCESS-KEY": API_KEY,
-            "ACCESS-SIGN": sig,
-            "ACCESS-TIMESTAMP": ts,
-            "ACCESS-PASSPHRASE": PASSPHRASE,
-            "Content-Type": "application/json"
-        }
-        
-        resp = requests.post(f"{BASE_URL}{path}", headers=headers, data=body_str, timeout=30)
-        result = resp.json()
+        # Colocar orden (open_short a mercado, requiere credenciales)
+        result = self.hunter.client.place_order(
+            symbol, "sell", "market", str(size),
+            client_oid=f"short_{int(time.time())}"
+        )
         
         if result.get('order_id'):
             print(f"   ✅ Order ID: {result['order_id']}")
@@ -13,11 +13,6 @@ Tasks:
 import os
 import sys
 import time
-import hmac
-import hashlib
-import base64
-import json
-import requests
 from dotenv import load_dotenv
 
 # Add parent directory to path
@@ -25,58 +20,21 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 load_dotenv()
 
-# Credentials
-API_KEY = os.getenv("WEEX_API_KEY")
-SECRET_KEY = os.getenv("WEEX_SECRET_KEY")
-PASSPHRASE = os.getenv("WEEX_PASSPHRASE")
-
-BASE_URL = "https://api-contract.weex.com"
+from weex_client import get_shared_client
 
 
 class WeexAPITest:
     """WEEX API Test Suite for Hackathon Qualification"""
     
     def __init__(self):
-        self.session = requests.Session()
+        self.client = get_shared_client()
         self.results = {}
     
-    def _timestamp(self) -> str:
-        return str(int(time.time() * 1000))
-    
-    def _sign_get(self, timestamp: str, path: str, query: str = "") -> str:
-        message = timestamp + "GET" + path + query
-        sig = hmac.new(SECRET_KEY.encode(), message.encode(), hashlib.sha256).digest()
-        return base64.b64encode(sig).decode()
-    
-    def _sign_post(self, timestamp: str, path: str, body: str) -> str:
-        message = timestamp + "POST" + path + body
-        sig = hmac.new(SECRET_KEY.encode(), message.encode(), hashlib.sha256).digest()
-        return base64.b64encode(sig).decode()
-    
-    def _headers(self, signature: str, timestamp: str) -> dict:
-        return {
-            "ACCESS-KEY": API_KEY,
-            "ACCESS-SIGN": signature,
-            "ACCESS-TIMESTAMP": timestamp,
-            "ACCESS-PASSPHRASE": PASSPHRASE,
-            "Content-Type": "application/json",
-            "locale": "en-US"
-        }
-    
-    def _get(self, path: str, query: str = "") -> dict:
-        ts = self._timestamp()
-        sig = self._sign_get(ts, path, query)
-        url = f"{BASE_URL}{path}{query}"
-        resp = self.session.get(url, headers=self._headers(sig, ts), timeout=30)
-        return resp.json() if resp.text else {"status": resp.status_code}
+    def _get(self, path: str, params: dict = None) -> dict:
+        return self.client.request("GET", path, params)
     
     def _post(self, path: str, body: dict) -> dict:
-        ts = self._timestamp()
-        body_str = json.dumps(body)
-        sig = self._sign_post(ts, path, body_str)
-        url = f"{BASE_URL}{path}"
-        resp = self.session.post(url, headers=self._headers(sig, ts), data=body_str, timeout=30)
-        return resp.json() if resp.text else {"status": resp.status_code}
+        return self.client.request("POST", path, data=body)
     
     # ==================== TEST TASKS ====================
     
@@ -115,11 +73,8 @@ class WeexAPITest:
         
         try:
             # Public endpoint - no auth needed
-            resp = self.session.get(
-                f"{BASE_URL}/capi/v2/market/ticker?symbol=cmt_btcusdt",
-                timeout=10
-            )
-            result = resp.json()
+            result = self.client.request("GET", "/capi/v2/market/ticker",
+                                         {"symbol": "cmt_btcusdt"}, signed=False)
             
             price = result.get('last', 'N/A')
             high = result.get('high_24h', 'N/A')
@@ -231,7 +186,7 @@ class WeexAPITest:
         try:
             # Get open orders
             print("\n   📂 Open Orders:")
-            open_orders = self._get("/capi/v2/order/current", "?symbol=cmt_btcusdt")
+            open_orders = self._get("/capi/v2/order/current", {"symbol": "cmt_btcusdt"})
             
             if isinstance(open_orders, list):
                 print(f"   Found {len(open_orders)} open order(s)")
@@ -244,7 +199,7 @@ class WeexAPITest:
             
             # Get order history
             print("\n   📜 Order History:")
-            history = self._get("/capi/v2/order/history", "?symbol=cmt_btcusdt&pageSize=5")
+            history = self._get("/capi/v2/order/history", {"symbol": "cmt_btcusdt", "pageSize": 5})
             
             if isinstance(history, dict) and history.get('list'):
                 orders = history['list']
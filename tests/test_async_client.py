@@ -0,0 +1,100 @@
+"""
+Tests for AsyncWeexClient fan-out (no network - uses a stub client)
+"""
+
+import asyncio
+import threading
+import time
+
+from weex_client import AsyncWeexClient
+
+
+class StubClient:
+    """Blocking stand-in for WeexClient that records concurrency"""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def _enter(self):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _exit(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def get_ticker(self, symbol):
+        self._enter()
+        try:
+            time.sleep(self.delay)
+            if symbol == "cmt_badusdt":
+                raise RuntimeError("boom")
+            return {"symbol": symbol, "last": "1.0"}
+        finally:
+            self._exit()
+
+    def get_candles(self, symbol, granularity="1m", limit=100):
+        self._enter()
+        try:
+            time.sleep(self.delay)
+            return [[str(i), "1", "1", "1", "1", "1"] for i in range(limit)]
+        finally:
+            self._exit()
+
+
+def test_gather_tickers_runs_concurrently():
+    stub = StubClient(delay=0.1)
+    symbols = [f"cmt_c{i}usdt" for i in range(8)]
+
+    async def scan():
+        async with AsyncWeexClient(client=stub, max_in_flight=8) as aclient:
+            return await aclient.gather_tickers(symbols)
+
+    start = time.time()
+    tickers = asyncio.run(scan())
+    elapsed = time.time() - start
+
+    assert list(tickers) == symbols
+    assert all(t["symbol"] == s for s, t in tickers.items())
+    assert elapsed < 0.1 * len(symbols) / 2
+
+
+def test_in_flight_cap_is_respected():
+    stub = StubClient(delay=0.05)
+    symbols = [f"cmt_c{i}usdt" for i in range(10)]
+
+    async def scan():
+        async with AsyncWeexClient(client=stub, max_in_flight=3) as aclient:
+            return await aclient.gather_candles(symbols, "5m", 5)
+
+    candles = asyncio.run(scan())
+
+    assert stub.max_in_flight <= 3
+    assert all(len(c) == 5 for c in candles.values())
+
+
+def test_failed_symbol_maps_to_none():
+    stub = StubClient(delay=0)
+
+    async def scan():
+        async with AsyncWeexClient(client=stub) as aclient:
+            return await aclient.gather_tickers(["cmt_btcusdt", "cmt_badusdt"])
+
+    tickers = asyncio.run(scan())
+
+    assert tickers["cmt_btcusdt"]["last"] == "1.0"
+    assert tickers["cmt_badusdt"] is None
+
+
+def test_endpoint_surface_is_mirrored():
+    stub = StubClient(delay=0)
+
+    async def call():
+        async with AsyncWeexClient(client=stub) as aclient:
+            return await aclient.get_ticker("cmt_ethusdt")
+
+    assert asyncio.run(call())["symbol"] == "cmt_ethusdt"
@@ -0,0 +1,129 @@
+"""
+Tests for the simulated WEEX client and the backtest engine
+"""
+
+import numpy as np
+import pytest
+
+from weex_client import order_type_code
+from backtest import SimulatedWeexClient, BacktestEngine, ADAPTERS
+
+MINUTE = 60_000
+HOUR = 60 * MINUTE
+
+
+def flat_bars(n: int, price: float = 100.0, start: int = 10 * HOUR):
+    """1m bars at a constant price, volume 1"""
+    ts = start + np.arange(n) * MINUTE
+    p = np.full(n, price)
+    return np.vstack([ts, p, p + 1, p - 1, p, np.ones(n)])
+
+
+def random_walk(n: int, seed: int, p0: float = 100.0, start: int = 0):
+    rng = np.random.default_rng(seed)
+    close = p0 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.r_[p0, close[:-1]]
+    spread = np.abs(rng.normal(0, 0.001, n)) * close
+    ts = start + np.arange(n) * MINUTE
+    return np.vstack([ts, open_, np.maximum(open_, close) + spread,
+                      np.minimum(open_, close) - spread, close, rng.uniform(10, 100, n)])
+
+
+def at_bar(sim: SimulatedWeexClient, symbol: str, i: int):
+    sim.now_ms = int(sim.data[symbol][0, i])
+    sim.begin_bar(symbol, i)
+
+
+def test_order_type_codes():
+    assert order_type_code("buy") == "1"
+    assert order_type_code("sell") == "2"
+    assert order_type_code("sell", "close") == "3"
+    assert order_type_code("buy", "close") == "4"
+    assert order_type_code("open_short") == "2"
+
+
+def test_market_round_trip_charges_taker_fees():
+    sim = SimulatedWeexClient({"cmt_btcusdt": flat_bars(10)}, balance=1000, slippage=0.0)
+    sim.set_leverage("cmt_btcusdt", 10)
+    at_bar(sim, "cmt_btcusdt", 0)
+
+    result = sim.place_order("cmt_btcusdt", "buy", "market", "2")
+    assert result["result"] and result["order_id"]
+    assert sim.get_positions()[0]["holdSide"] == "long"
+    assert float(sim.get_account_assets()[0]["available"]) == pytest.approx(1000 - 20 - 200 * 0.0006)
+
+    sim.tick("cmt_btcusdt", 105.0)
+    assert sim.place_order("cmt_btcusdt", "sell", "market", "2", trade_side="close")["result"]
+    trade = sim.trades[0]
+    assert trade.pnl == pytest.approx(10.0)
+    assert trade.fees == pytest.approx(200 * 0.0006 + 210 * 0.0006)
+    assert sim.equity() == pytest.approx(1000 + trade.net_pnl)
+    assert not sim.place_order("cmt_btcusdt", "sell", "market", "1", trade_side="close")["result"]
+
+
+def test_resting_limit_fills_as_maker_and_cancel_releases_margin():
+    sim = SimulatedWeexClient({"cmt_ethusdt": flat_bars(10)}, balance=100)
+    sim.set_leverage("cmt_ethusdt", 5)
+    at_bar(sim, "cmt_ethusdt", 0)
+
+    buy = sim.place_order("cmt_ethusdt", "buy", "limit", "1", price="99")
+    sell = sim.place_order("cmt_ethusdt", "sell", "limit", "1", price="101")
+    assert len(sim.get_open_orders("cmt_ethusdt")) == 2
+    assert not sim.would_trigger("cmt_ethusdt", 100.5, 99.5)
+    assert sim.would_trigger("cmt_ethusdt", 100.5, 98.9)
+
+    sim.tick("cmt_ethusdt", 99.0)
+    assert sim.get_order_detail("cmt_ethusdt", buy["order_id"])["status"] == "filled"
+    assert float(sim.fills[0]["fillFee"]) == pytest.approx(99 * 0.0002)
+    assert sim.positions[("cmt_ethusdt", "long")].entry_price == 99.0
+
+    assert sim.cancel_order("cmt_ethusdt", order_id=sell["order_id"])["result"]
+    assert sim.get_open_orders() == []
+    assert float(sim.get_account_assets()[0]["frozen"]) == 0
+
+
+def test_liquidation_loses_only_the_margin():
+    sim = SimulatedWeexClient({"cmt_solusdt": flat_bars(10)}, balance=100, taker_fee=0.0)
+    sim.set_leverage("cmt_solusdt", 20)
+    at_bar(sim, "cmt_solusdt", 0)
+    sim.place_order("cmt_solusdt", "buy", "market", "10")  # 1000 notional, 50 margin
+
+    sim.tick("cmt_solusdt", 96.0)
+    assert sim.positions
+    sim.tick("cmt_solusdt", 90.0)
+    assert not sim.positions
+    assert sim.trades[-1].reason == "liquidation"
+    assert sim.equity() == pytest.approx(50.0)
+
+
+def test_candles_never_include_the_future():
+    data = random_walk(300, seed=1, start=10 * HOUR)
+    sim = SimulatedWeexClient({"cmt_btcusdt": data})
+    at_bar(sim, "cmt_btcusdt", 137)
+    sim.tick("cmt_btcusdt", 55.0)
+
+    one = sim.get_arrays("cmt_btcusdt", "1m", 50)
+    assert one.ts[-1] == data[0, 137] and len(one.ts) == 50
+    assert one.close[-1] == 55.0 and one.low[-1] == 55.0
+
+    five = sim.get_arrays("cmt_btcusdt", "5m", 10)
+    assert five.ts[-1] == data[0, 135]
+    assert five.open[-1] == data[1, 135]
+    assert five.close[-1] == 55.0
+    assert five.volume[-1] == pytest.approx(data[5, 135:138].sum())
+    assert sim.get_candles("cmt_btcusdt", "5m", 3)[-1][0] == int(data[0, 135])
+
+
+@pytest.mark.parametrize("name", ["grid", "ultra"])
+def test_engine_replays_strategies(name):
+    candles = {"cmt_btcusdt": random_walk(900, seed=2, p0=60000),
+               "cmt_ethusdt": random_walk(900, seed=3, p0=3000)}
+    sim = SimulatedWeexClient(candles, balance=1000)
+    result = BacktestEngine(sim, ADAPTERS[name](sim), warmup=300).run()
+
+    summary = result.summary()
+    assert summary["strategy"] == name
+    assert summary["bars"] == 900
+    assert len(result.equity) == 900
+    assert not sim.positions and not sim.get_open_orders()
+    assert result.final_equity == pytest.approx(1000 + sum(t.net_pnl for t in result.trades))
@@ -0,0 +1,79 @@
+"""
+Tests for batch order placement / cancellation on WeexClient (no network - recorded requests)
+"""
+
+import threading
+
+from weex_client import WeexClient
+
+
+class RecordingClient(WeexClient):
+    """WeexClient whose batch requests are recorded and answered from a script"""
+
+    def __init__(self, reject=(), fail_symbol=None):
+        super().__init__(api_key="key", secret_key="secret", passphrase="pass")
+        self.calls = []
+        self.reject = set(reject)
+        self.fail_symbol = fail_symbol
+        self._lock = threading.Lock()
+
+    def _request(self, method, endpoint, params=None, data=None):
+        with self._lock:
+            self.calls.append((endpoint.rsplit('/', 1)[-1], data))
+        if endpoint.endswith('batchOrders'):
+            if data['symbol'] == self.fail_symbol:
+                raise ConnectionError("timeout")
+            # Answered out of order: results are matched by client_oid
+            return {'order_info': [{
+                'client_oid': item['client_oid'],
+                'order_id': None if item['client_oid'] in self.reject else f"id_{item['client_oid']}",
+                'result': item['client_oid'] not in self.reject,
+                'error_message': 'price out of range' if item['client_oid'] in self.reject else '',
+            } for item in reversed(data['orderDataList'])]}
+        if endpoint.endswith('cancel_batch_orders'):
+            return {'cancelOrderResultList': [{
+                'order_id': oid, 'result': oid not in self.reject,
+                'err_msg': 'order not found' if oid in self.reject else '',
+            } for oid in data['ids']]}
+        return {}
+
+
+def grid(symbol, n, offset=0):
+    return [{'symbol': symbol, 'side': 'buy', 'order_type': 'limit', 'size': '0.01',
+             'price': str(100 - i), 'client_oid': f"{symbol}_{i + offset}"} for i in range(n)]
+
+
+def test_place_chunks_per_symbol_and_keeps_input_order():
+    client = RecordingClient(reject={'cmt_btcusdt_7'})
+    orders = grid('cmt_btcusdt', 45) + grid('cmt_ethusdt', 5)
+
+    results = client.place_orders(orders)
+
+    assert sorted((data['symbol'], len(data['orderDataList'])) for _, data in client.calls) == [
+        ('cmt_btcusdt', 5), ('cmt_btcusdt', 20), ('cmt_btcusdt', 20), ('cmt_ethusdt', 5)]
+    assert all('symbol' not in item for _, data in client.calls for item in data['orderDataList'])
+    assert [r['client_oid'] for r in results] == [o['client_oid'] for o in orders]
+    assert results[0] == {'order_id': 'id_cmt_btcusdt_0', 'client_oid': 'cmt_btcusdt_0',
+                          'result': True, 'err_msg': None}
+    assert results[7]['result'] is False and results[7]['err_msg'] == 'price out of range'
+    assert sum(r['result'] for r in results) == 49
+
+
+def test_failed_chunk_only_fails_its_orders():
+    client = RecordingClient(fail_symbol='cmt_ethusdt')
+    results = client.place_orders(grid('cmt_btcusdt', 3) + grid('cmt_ethusdt', 2))
+
+    assert [r['result'] for r in results] == [True, True, True, False, False]
+    assert 'timeout' in results[3]['err_msg'] and results[3]['order_id'] is None
+
+
+def test_cancel_chunks_ids_and_maps_each_result():
+    client = RecordingClient(reject={'o3'})
+    ids = [f"o{i}" for i in range(25)]
+
+    results = client.cancel_orders(ids, max_workers=1)
+
+    assert [len(data['ids']) for _, data in client.calls] == [20, 5]
+    assert [r['order_id'] for r in results] == ids
+    assert [r['order_id'] for r in results if not r['result']] == ['o3']
+    assert results[3]['err_msg'] == 'order not found'
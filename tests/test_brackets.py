@@ -0,0 +1,76 @@
+"""
+Tests for exchange-side bracket orders on WeexClient (no network - recorded requests)
+"""
+
+from weex_client import WeexClient
+
+
+class RecordingClient(WeexClient):
+    """WeexClient whose signed requests are recorded and answered from a script"""
+
+    def __init__(self, positions=None, reject_entry=False):
+        super().__init__(api_key="key", secret_key="secret", passphrase="pass")
+        self.calls = []
+        self.positions = positions or []
+        self.reject_entry = reject_entry
+
+    def _request(self, method, endpoint, params=None, data=None):
+        self.calls.append((endpoint.rsplit('/', 1)[-1], data or params))
+        if endpoint.endswith('placeOrder'):
+            if self.reject_entry:
+                return {'code': '40015', 'msg': 'insufficient margin'}
+            return {'order_id': f"o{len(self.calls)}"}
+        if endpoint.endswith('placeTpSlOrder'):
+            return [{'orderId': f"p{len(self.calls)}", 'success': True}]
+        if endpoint.endswith('singlePosition'):
+            return self.positions
+        return {'code': '00000', 'msg': 'success'}
+
+    def endpoints(self):
+        return [name for name, _ in self.calls]
+
+
+def test_bracket_places_entry_then_both_legs():
+    client = RecordingClient()
+    bracket = client.place_bracket('cmt_solusdt', 'long', 1.5, take_profit=104, stop_loss=98)
+
+    assert client.endpoints() == ['placeOrder', 'placeTpSlOrder', 'placeTpSlOrder']
+    entry, tp, sl = (data for _, data in client.calls)
+    assert entry['type'] == '1' and entry['match_price'] == '1'
+    assert tp['planType'] == 'profit_plan' and tp['triggerPrice'] == '104' and tp['positionSide'] == 'long'
+    assert sl['planType'] == 'loss_plan' and sl['executePrice'] == '0' and sl['size'] == '1.5'
+    assert bracket.entry_order_id == 'o1' and bracket.tp_order_id == 'p2' and bracket.sl_order_id == 'p3'
+    assert bracket.protected
+
+    rejected = RecordingClient(reject_entry=True)
+    assert rejected.place_bracket('cmt_solusdt', 'sell', 1, 95, 102) is None
+    assert rejected.endpoints() == ['placeOrder']
+
+
+def test_trailing_only_tightens_the_stop():
+    client = RecordingClient()
+    bracket = client.place_bracket('cmt_ethusdt', 'short', 0.1, take_profit=95, stop_loss=102)
+    client.calls.clear()
+
+    assert not client.trail_bracket(bracket, 103)              # would loosen it
+    assert not client.trail_bracket(bracket, 101.9, 0.2)       # below the minimum step
+    assert client.trail_bracket(bracket, 100, 0.2)
+    assert client.calls == [('modifyTpSlOrder', {'orderId': 'p3', 'triggerPrice': '100',
+                                                  'executePrice': '0'})]
+    assert bracket.stop_loss == 100
+
+
+def test_close_skips_the_order_when_a_leg_already_closed_it():
+    client = RecordingClient()
+    bracket = client.place_bracket('cmt_solusdt', 'long', 2, take_profit=104, stop_loss=98)
+    client.calls.clear()
+
+    assert client.close_bracket(bracket) == {'closed_by_plan': True}
+    assert client.endpoints() == ['cancel_plan', 'cancel_plan', 'singlePosition']
+    assert bracket.tp_order_id is None and not bracket.protected
+
+    client.positions = [{'holdSide': 'long', 'total': '2'}]
+    client.calls.clear()
+    assert client.close_bracket(bracket)['order_id']
+    (name, order), = [call for call in client.calls if call[0] == 'placeOrder']
+    assert order['type'] == '3' and order['size'] == '2'
@@ -0,0 +1,86 @@
+"""
+Tests for the contract registry (no network - stub client)
+"""
+
+import json
+import os
+import time
+
+from utils.contracts import ContractRegistry, ContractSpec, parse_contract, quantize, step_decimals
+
+
+WEEX_CONTRACTS = [
+    {'symbol': 'cmt_btcusdt', 'tick_size': '1', 'priceEndStep': '5', 'size_increment': '3',
+     'minOrderSize': '0.001', 'maxLeverage': 125},
+    {'symbol': 'cmt_dogeusdt', 'tick_size': '5', 'priceEndStep': '1', 'size_increment': '0',
+     'minOrderSize': '100', 'maxLeverage': '50'},
+]
+
+
+class StubClient:
+    def __init__(self, contracts=None, fail=False):
+        self.contracts = contracts or WEEX_CONTRACTS
+        self.fail = fail
+        self.calls = 0
+
+    def get_contracts(self):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("down")
+        return self.contracts
+
+
+def test_quantize_modes_and_float_noise():
+    assert step_decimals(0.001) == 3 and step_decimals(100) == 0 and step_decimals(0.5) == 1
+    assert quantize(0.1 + 0.2, 0.1) == 0.3
+    assert quantize(1234.5, 100) == 1200
+    assert quantize(0.12345, 0.001, mode="down") == 0.123
+    assert quantize(0.1231, 0.001, mode="up") == 0.124
+    assert quantize(0.3, 0.1, mode="down") == 0.3  # exact multiples stay put
+    assert quantize(97123.456, 0) == 97123.456
+
+
+def test_parse_weex_precision_fields():
+    btc = parse_contract(WEEX_CONTRACTS[0])
+    assert btc.tick_size == 0.5 and btc.lot_step == 0.001
+    assert btc.min_size == 0.001 and btc.max_leverage == 125
+    assert btc.round_price(97123.3) == 97123.5
+    assert btc.size_for_notional(150, 97000) == 0.002
+
+    # Simulator entries carry no rules: fall back to the known lot steps
+    doge = parse_contract({'symbol': 'cmt_dogeusdt', 'quote_currency': 'USDT'})
+    assert doge.lot_step == 100 and doge.tick_size == 0
+    assert parse_contract({'quote_currency': 'USDT'}) is None
+
+
+def test_registry_fetches_once_and_uses_disk_cache(tmp_path):
+    path = str(tmp_path / "contracts.json")
+    client = StubClient()
+    registry = ContractRegistry(client, cache_path=path)
+
+    assert registry.lot_step('cmt_dogeusdt') == 1
+    assert registry.max_leverage('cmt_btcusdt') == 125
+    assert registry.round_size('cmt_btcusdt', 0.0016) == 0.002
+    assert client.calls == 1 and os.path.exists(path)
+
+    # New process within the TTL: no request
+    other = StubClient()
+    assert ContractRegistry(other, cache_path=path).tick_size('cmt_btcusdt') == 0.5
+    assert other.calls == 0
+
+
+def test_registry_falls_back_to_stale_cache_then_defaults(tmp_path):
+    path = str(tmp_path / "contracts.json")
+    with open(path, 'w') as f:
+        json.dump({'fetched_at': time.time() - 10 * 86400,
+                   'contracts': [ContractSpec('cmt_ethusdt', 0.01, 0.01).to_dict()]}, f)
+
+    down = StubClient(fail=True)
+    registry = ContractRegistry(down, cache_path=path)
+    assert registry.tick_size('cmt_ethusdt') == 0.01
+    assert down.calls == 1
+
+    offline = ContractRegistry(None, cache_path=None)
+    assert offline.lot_step('cmt_solusdt') == 0.1
+    assert offline.lot_step('cmt_newusdt') == 0.01
+    assert not offline.get('cmt_solusdt').is_valid(0, 100)
@@ -0,0 +1,143 @@
+"""
+Tests for the incremental grid rebalance (diff of target levels vs resting orders)
+"""
+
+import numpy as np
+
+from backtest import SimulatedWeexClient
+from strategies.grid_trading import GridTradingStrategy
+from utils.contracts import ContractRegistry
+from utils.grid_reconciler import GridPlan, GridReconciler
+
+MINUTE = 60_000
+
+
+class BatchClient:
+    """Records batch calls and accepts every order"""
+
+    def __init__(self):
+        self.batches = []
+
+    def place_orders(self, orders, max_workers=4):
+        self.batches.append(('place', len(orders)))
+        return [{'order_id': f"n{i}", 'result': True} for i, _ in enumerate(orders)]
+
+    def cancel_orders(self, order_ids, max_workers=4):
+        self.batches.append(('cancel', len(order_ids)))
+        return [{'order_id': oid, 'result': oid != 'old0'} for oid in order_ids]
+
+
+def test_plan_keeps_matching_levels_only():
+    grid_orders = {
+        'a': {'type': 'buy', 'price': 99.5, 'level': 0},
+        'b': {'type': 'buy', 'price': 99.0, 'level': 1},
+        'c': {'type': 'sell', 'price': 100.5, 'level': 0},   # now below the center
+        'd': {'type': 'sell', 'price': 101.0, 'level': 1},
+    }
+    levels = {'buy': [100.5, 100.0, 99.5], 'sell': [101.5, 102.0, 102.5], 'center': 101.0}
+
+    plan = GridReconciler(BatchClient(), "cmt_btcusdt", max_workers=1).plan(grid_orders, levels, tolerance=0.01)
+
+    assert plan.keep == ['a']
+    assert sorted(plan.cancel) == ['b', 'c', 'd']
+    assert plan.place == [('buy', 100.5, 0), ('buy', 100.0, 1), ('sell', 101.5, 0),
+                          ('sell', 102.0, 1), ('sell', 102.5, 2)]
+    assert grid_orders['a']['level'] == 2
+
+
+def test_apply_cancels_then_places_in_batches():
+    client = BatchClient()
+    reconciler = GridReconciler(client, "cmt_btcusdt")
+    grid_orders = {f"old{i}": {'type': 'buy', 'price': 90.0 + i, 'level': i} for i in range(8)}
+    plan = GridPlan(cancel=list(grid_orders),
+                    place=[('sell', 110.0 + i, i) for i in range(16)])
+
+    placed = reconciler.apply(plan, grid_orders, "0.01")
+
+    assert client.batches == [('cancel', 8), ('place', 16)]
+    assert placed['cancelled'] == 7 and len(placed['sell']) == 16
+    assert [o['level'] for o in placed['sell']] == list(range(16))
+    assert set(grid_orders) == {'old0'} | {f"n{i}" for i in range(16)}   # failed cancel stays tracked
+
+
+def test_rebalance_reuses_resting_levels():
+    n = 10
+    ts = np.arange(n) * MINUTE
+    p = np.full(n, 100.0)
+    sim = SimulatedWeexClient({'cmt_btcusdt': np.vstack([ts, p, p, p, p, np.ones(n)])},
+                              balance=10_000, slippage=0.0)
+    sim.begin_bar('cmt_btcusdt', 0)
+    strategy = GridTradingStrategy(sim, 'cmt_btcusdt', {
+        'grid_levels': 10, 'grid_spacing_percent': 0.5, 'rebalance_threshold': 1.5,
+        'use_filters': False,
+    }, contracts=ContractRegistry(sim, cache_path=None))
+
+    strategy.execute()
+    assert len(sim.get_open_orders()) == 20
+    first_ids = set(strategy.grid_orders)
+
+    sim.tick('cmt_btcusdt', 102.1)            # fills the sells up to 102.0
+    result = strategy.execute()
+
+    assert strategy.grid_center_price == 102.0
+    assert result['kept'] == 12 and result['cancelled'] == 4
+    assert len(result['buy']) + len(result['sell']) == 4 + 4
+    assert len(first_ids & set(strategy.grid_orders)) == 12
+    assert len(sim.get_open_orders()) == 20
+
+
+def test_failed_sync_skips_rebalance_until_book_is_known():
+    n = 10
+    ts = np.arange(n) * MINUTE
+    p = np.full(n, 100.0)
+    sim = SimulatedWeexClient({'cmt_btcusdt': np.vstack([ts, p, p, p, p, np.ones(n)])},
+                              balance=10_000, slippage=0.0)
+    sim.begin_bar('cmt_btcusdt', 0)
+    strategy = GridTradingStrategy(sim, 'cmt_btcusdt', {
+        'grid_levels': 10, 'grid_spacing_percent': 0.5, 'rebalance_threshold': 1.5,
+        'use_filters': False,
+    }, contracts=ContractRegistry(sim, cache_path=None))
+    strategy.execute()
+    sim.tick('cmt_btcusdt', 102.1)            # fills the sells up to 102.0
+    tracked = dict(strategy.grid_orders)
+
+    get_open_orders = sim.get_open_orders
+    for broken in (ConnectionError("timeout"), {'code': 'busy'}):
+        def fail(symbol=None, broken=broken):
+            if isinstance(broken, Exception):
+                raise broken
+            return broken
+        sim.get_open_orders = fail
+        assert strategy.reconciler.sync(strategy.grid_orders) is None
+        # Filled sells still look resting: no diff is planned against them
+        assert strategy.execute() is None
+        assert strategy.grid_orders == tracked
+        assert strategy.grid_center_price == 100.0
+
+    sim.get_open_orders = get_open_orders
+    result = strategy.execute()
+    assert strategy.grid_center_price == 102.0
+    assert result['kept'] == 12 and result['cancelled'] == 4
+    assert len(sim.get_open_orders()) == 20
+
+
+def test_grid_prices_and_sizes_follow_contract_rules():
+    class DogeClient(BatchClient):
+        def get_contracts(self):
+            return [{'symbol': 'cmt_dogeusdt', 'tick_size': '5', 'size_increment': '0',
+                     'minNotional': '49.9'}]
+
+    client = DogeClient()
+    strategy = GridTradingStrategy(client, 'cmt_dogeusdt', {
+        'grid_levels': 3, 'grid_spacing_percent': 0.5, 'order_size_usd': 10, 'max_leverage': 5,
+        'use_filters': False,
+    }, contracts=ContractRegistry(client, cache_path=None))
+
+    levels = strategy.calculate_grid_levels(0.123456)
+    assert levels['buy'][0] == 0.12284 and levels['sell'][0] == 0.12407   # 5 decimals, not 1
+    assert strategy.grid_order_size(0.123456) == 405.0                    # 50 / 0.1235 rounded down to lots
+
+    # At 0.1 a 500-lot order is worth < 49.9 USDT on every buy level: those are skipped
+    placed = strategy.place_grid_orders(strategy.calculate_grid_levels(0.1))
+    assert len(placed['buy']) == 0 and len(placed['sell']) == 3
+    assert client.batches == [('place', 3)]
@@ -0,0 +1,154 @@
+"""
+Incremental indicators vs the batch NumPy engine
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from utils import indicators
+from utils.incremental import (IncrementalEMA, IncrementalRSI, IncrementalMACD,
+                               RollingBollinger, IncrementalATR, IndicatorStream)
+from tests.test_indicator_engine import make_series
+
+
+def make_candles(n: int = 300, seed: int = 7):
+    closes, highs, lows, volumes = make_series(n, seed)
+    return [[1_700_000_000_000 + i * 300_000, c, h, l, c, v]
+            for i, (c, h, l, v) in enumerate(zip(closes, highs, lows, volumes))]
+
+
+@pytest.mark.parametrize("method", ["sma", "wilder"])
+def test_rsi_matches_batch(method):
+    closes = make_series(400)[0]
+    rsi = IncrementalRSI(14, method)
+    for i, close in enumerate(closes):
+        assert rsi.preview(close) == pytest.approx(indicators.rsi(closes[:i + 1], 14, method), rel=1e-9)
+        rsi.update(close)
+    assert rsi.value == pytest.approx(indicators.rsi(closes, 14, method), rel=1e-9)
+
+
+def test_ema_macd_bands_atr_match_batch():
+    closes, highs, lows, _ = make_series(300)
+    ema, macd = IncrementalEMA(20), IncrementalMACD()
+    bands, atr = RollingBollinger(20), IncrementalATR(14)
+    for h, l, c in zip(highs, lows, closes):
+        ema.update(c)
+        macd.update(c)
+        bands.update(c)
+        atr.update(h, l, c)
+
+    assert ema.value == pytest.approx(indicators.ema(closes, 20), rel=1e-9)
+    macd_line, signal_line = indicators.macd(closes)
+    assert macd.value[0] == pytest.approx(macd_line[-1], rel=1e-9)
+    assert macd.value[1] == pytest.approx(signal_line[-1], rel=1e-9)
+    np.testing.assert_allclose(bands.value, indicators.bollinger_bands(closes), rtol=1e-9)
+    assert atr.value == pytest.approx(indicators.atr(highs, lows, closes), rel=1e-9)
+
+
+def test_bands_keep_precision_at_large_prices():
+    closes = [97_000 + 0.01 * (i % 7) for i in range(5000)]
+    bands = RollingBollinger(20)
+    for c in closes:
+        bands.update(c)
+    np.testing.assert_allclose(bands.value, indicators.bollinger_bands(closes), rtol=1e-12)
+
+
+def test_stream_commits_only_new_bars_and_previews_forming():
+    candles = make_candles(300)
+    stream = IndicatorStream()
+
+    values = stream.sync(candles[:200])
+    assert stream.bars == 199  # last bar is still forming
+    closes = [c[4] for c in candles[:200]]
+    assert values['rsi'] == pytest.approx(indicators.rsi(closes), rel=1e-9)
+    assert values['macd'] == pytest.approx(indicators.macd(closes)[0][-1], rel=1e-9)
+
+    # Overlapping window: only the bars after the last committed one are fed
+    values = stream.sync(candles[150:201])
+    assert stream.bars == 200
+    closes = [c[4] for c in candles[:201]]
+    assert values['rsi'] == pytest.approx(indicators.rsi(closes), rel=1e-9)
+
+    # A tick re-prices the forming bar without committing it
+    ticked = stream.tick(closes[-1] * 1.01)
+    assert ticked['rsi'] == pytest.approx(indicators.rsi(closes[:-1] + [closes[-1] * 1.01]), rel=1e-9)
+    assert stream.bars == 200
+
+
+def test_snapshot_restore_roundtrip():
+    candles = make_candles(300)
+    stream = IndicatorStream(rsi_method="wilder")
+    stream.sync(candles[:150])
+
+    restored = IndicatorStream.restore(json.loads(json.dumps(stream.snapshot())))
+    for s in (stream, restored):
+        s.sync(candles[100:300])
+    assert restored.values() == pytest.approx(stream.values(), rel=1e-12)
+
+
+def test_combined_signal_streaming_matches_batch():
+    import time
+    from utils.candle_store import CandleStore
+    from utils.indicators import TechnicalIndicators
+
+    step = 300_000
+    now = int(time.time() * 1000) // step * step
+    candles = [[now - (49 - i) * step] + c[1:] for i, c in enumerate(make_candles(50))]
+
+    class FakeClient:
+        def get_candles(self, symbol, granularity, limit):
+            return candles[-limit:]
+
+    results = []
+    for streaming in (False, True):
+        client = FakeClient()
+        ti = TechnicalIndicators(client, candle_store=CandleStore(client, ":memory:"),
+                                 streaming=streaming)
+        results.append(ti.get_combined_signal())
+    batch, stream = results
+    assert stream['rsi'] == batch['rsi']
+    assert stream['macd'].value == pytest.approx(batch['macd'].value, abs=1e-4)
+    assert stream['signal'] == batch['signal']
+
+
+def test_stream_accepts_column_arrays():
+    from utils.ohlcv import OHLCVBuffer
+
+    candles = make_candles(120)
+    buf = OHLCVBuffer(200)
+    buf.extend(candles[:100])
+
+    by_rows, by_columns = IndicatorStream(), IndicatorStream()
+    by_rows.sync(candles[:100])
+    by_columns.sync(buf.window())
+    buf.extend(candles[100:])
+    assert by_columns.sync(buf.window(50)) == pytest.approx(by_rows.sync(candles[50:]), rel=1e-12)
+    assert by_columns.bars == by_rows.bars == 119
+
+
+def test_stream_over_rolling_window_vs_windowed_batch():
+    """The bots sync a sliding 50-bar window: fixed-lookback values match, MACD does not"""
+    candles = make_candles(300)
+    stream = IndicatorStream()
+    macd_gaps = []
+    for end in range(50, len(candles) + 1):
+        window = candles[end - 50:end]
+        values = stream.sync(window)
+        closes = [c[4] for c in window]
+        highs = [c[2] for c in window]
+        lows = [c[3] for c in window]
+
+        assert values['rsi'] == pytest.approx(indicators.rsi(closes, 14), rel=1e-9)
+        np.testing.assert_allclose((values['bb_upper'], values['bb_middle'], values['bb_lower']),
+                                   indicators.bollinger_bands(closes), rtol=1e-9)
+        assert values['atr'] == pytest.approx(indicators.atr(highs, lows, closes), rel=1e-9)
+
+        windowed = indicators.ema(closes, 12) - indicators.ema(closes, 26)
+        macd_gaps.append(abs(values['macd'] - windowed))
+
+    # The stream keeps the EMA seed from the first bar it saw; the batch reseeds each window
+    full = [c[4] for c in candles]
+    assert values['macd'] == pytest.approx(indicators.macd(full)[0][-1], rel=1e-9)
+    assert max(macd_gaps) > 1e-6
@@ -0,0 +1,124 @@
+"""
+Parity tests: NumPy indicator engine vs the original pure-Python formulas
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from utils import indicators
+
+
+def make_series(n: int = 1000, seed: int = 7):
+    rng = random.Random(seed)
+    closes, highs, lows, volumes = [], [], [], []
+    price = 100.0
+    for _ in range(n):
+        price *= 1 + rng.uniform(-0.01, 0.01)
+        closes.append(price)
+        highs.append(price * (1 + rng.uniform(0, 0.005)))
+        lows.append(price * (1 - rng.uniform(0, 0.005)))
+        volumes.append(rng.uniform(10, 1000))
+    return closes, highs, lows, volumes
+
+
+# ---- reference implementations (as they were in the bots) ----
+
+def ref_rsi(closes, period=14):
+    if len(closes) < period + 1:
+        return 50.0
+    gains, losses = [], []
+    for i in range(1, len(closes)):
+        change = closes[i] - closes[i - 1]
+        gains.append(max(0, change))
+        losses.append(max(0, -change))
+    avg_gain = sum(gains[-period:]) / period
+    avg_loss = sum(losses[-period:]) / period
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else 50.0
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def ref_wilder_rsi(closes, period=14):
+    deltas = [closes[i] - closes[i - 1] for i in range(1, len(closes))]
+    avg_gain = sum(max(d, 0) for d in deltas[:period]) / period
+    avg_loss = sum(max(-d, 0) for d in deltas[:period]) / period
+    for d in deltas[period:]:
+        avg_gain = (avg_gain * (period - 1) + max(d, 0)) / period
+        avg_loss = (avg_loss * (period - 1) + max(-d, 0)) / period
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def ref_ema(data, period):
+    multiplier = 2 / (period + 1)
+    values = [sum(data[:period]) / period]
+    for price in data[period:]:
+        values.append((price * multiplier) + (values[-1] * (1 - multiplier)))
+    return values
+
+
+def ref_atr(highs, lows, closes, period=14):
+    tr = [max(highs[i] - lows[i], abs(highs[i] - closes[i - 1]), abs(lows[i] - closes[i - 1]))
+          for i in range(1, len(closes))]
+    return sum(tr[-period:]) / period
+
+
+# ---- tests ----
+
+@pytest.mark.parametrize("n", [15, 50, 1000])
+def test_rsi_matches(n):
+    closes = make_series(n)[0]
+    assert indicators.rsi(closes) == pytest.approx(ref_rsi(closes), rel=1e-9)
+    assert indicators.rsi(np.array(closes)) == pytest.approx(ref_rsi(closes), rel=1e-9)
+
+
+def test_rsi_edge_cases():
+    assert indicators.rsi([1.0] * 5) == 50.0
+    assert indicators.rsi([1.0] * 20) == 50.0
+    assert indicators.rsi([1.0] * 20, flat=100.0) == 100.0
+    assert indicators.rsi(list(range(20))) == 100.0
+
+
+def test_wilder_rsi_matches():
+    closes = make_series(500)[0]
+    assert indicators.rsi(closes, 14, method="wilder") == pytest.approx(
+        ref_wilder_rsi(closes), rel=1e-9)
+
+
+@pytest.mark.parametrize("period", [2, 9, 12, 26, 200])
+def test_ema_series_matches(period):
+    closes = make_series(1000)[0]
+    np.testing.assert_allclose(indicators.ema_series(closes, period),
+                               ref_ema(closes, period), rtol=1e-10)
+
+
+def test_macd_matches():
+    closes = make_series(300)[0]
+    macd_line, signal_line = indicators.macd(closes)
+    ema_fast, ema_slow = ref_ema(closes, 12), ref_ema(closes, 26)
+    ref_line = [ema_fast[i + 14] - ema_slow[i] for i in range(len(ema_slow))]
+    np.testing.assert_allclose(macd_line, ref_line, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(signal_line, ref_ema(ref_line, 9), rtol=1e-9, atol=1e-12)
+
+
+def test_bands_atr_volatility_volume():
+    closes, highs, lows, volumes = make_series(100)
+
+    window = closes[-20:]
+    sma = sum(window) / 20
+    std = (sum((x - sma) ** 2 for x in window) / 20) ** 0.5
+    assert indicators.bollinger_bands(closes) == pytest.approx((sma + 2 * std, sma, sma - 2 * std))
+
+    assert indicators.atr(highs, lows, closes) == pytest.approx(ref_atr(highs, lows, closes))
+
+    changes = [abs(closes[i] - closes[i - 1]) / closes[i - 1] for i in range(1, len(closes))]
+    assert indicators.volatility(closes) == pytest.approx(sum(changes[-14:]) / 14 * 100)
+    assert indicators.volatility(closes[:5]) == 0.01
+
+    assert indicators.volume_ratio(volumes, 10) == pytest.approx(volumes[-1] / (sum(volumes[-10:]) / 10))
+    assert indicators.volume_ratio(volumes, 19, exclude_last=True) == pytest.approx(
+        volumes[-1] / (sum(volumes[-20:-1]) / 19))
+
+    ranges = [(h - l) / l * 100 for h, l in zip(highs[-10:], lows[-10:])]
+    assert indicators.range_volatility(highs, lows, 10) == pytest.approx(sum(ranges) / len(ranges))
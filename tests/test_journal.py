@@ -0,0 +1,65 @@
+"""
+Tests for the append-only decision journal
+"""
+
+import json
+import os
+
+from utils.journal import DecisionJournal, tail_events, migrate_json_log
+
+
+def test_record_writes_jsonl_and_text(tmp_path):
+    path, text = str(tmp_path / "signals.jsonl"), str(tmp_path / "decisions.log")
+    journal = DecisionJournal(path, text_path=text, flush_interval=0.05)
+
+    assert journal.record("🎯 SIGNAL BUY", {'symbol': 'cmt_btcusdt', 'price': 97000.5}, "2026-01-21 19:00:00")
+    assert journal.record("⏸️ waiting", None, "2026-01-21 19:00:01")
+    journal.flush()
+
+    with open(path) as f:
+        lines = [json.loads(line) for line in f]
+    assert lines == [{'timestamp': "2026-01-21 19:00:00", 'message': "🎯 SIGNAL BUY",
+                      'symbol': 'cmt_btcusdt', 'price': 97000.5}]
+    with open(text, encoding='utf-8') as f:
+        assert f.read().splitlines() == ["[2026-01-21 19:00:00] 🎯 SIGNAL BUY",
+                                         "[2026-01-21 19:00:01] ⏸️ waiting"]
+    journal.close()
+    assert not journal.record("late", {'x': 1})
+
+
+def test_rotation_keeps_history_and_tail_spans_files(tmp_path):
+    path = str(tmp_path / "signals.jsonl")
+    journal = DecisionJournal(path, max_bytes=400, backups=3, flush_interval=0.05)
+    for i in range(42):  # ~80 bytes per line: 5 events per file
+        journal.record(f"event {i}", {'i': i, 'pad': 'x' * 20})
+    journal.flush()
+    journal.close()
+
+    assert os.path.exists(path + ".3") and not os.path.exists(path + ".4")
+    assert os.path.getsize(path + ".1") >= 400
+
+    events = tail_events(path, 12, backups=3)
+    assert [e['i'] for e in events] == list(range(30, 42))
+    assert len(tail_events(path, 100, backups=3)) == 17
+    assert tail_events(path, 3)[-1]["message"] == "event 41"
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    journal = DecisionJournal(str(tmp_path / "s.jsonl"), queue_size=1, flush_interval=0.05)
+    results = [journal.record("e", {'i': i}) for i in range(500)]
+    assert journal.dropped == results.count(False)
+    journal.close()
+
+
+def test_tail_skips_partial_lines_and_migrates_legacy(tmp_path):
+    legacy, path = str(tmp_path / "old.json"), str(tmp_path / "new.jsonl")
+    with open(legacy, 'w') as f:
+        json.dump([{'message': 'a'}, {'message': 'b'}], f)
+
+    assert migrate_json_log(legacy, path) == 2
+    assert migrate_json_log(legacy, path) == 0
+    with open(path, 'a') as f:
+        f.write('{"message": "c"}\n{"message": "tru')  # writer mid-line
+
+    assert [e['message'] for e in tail_events(path, 10)] == ['a', 'b', 'c']
+    assert tail_events(str(tmp_path / "missing.jsonl")) == []
@@ -0,0 +1,73 @@
+"""
+Tests for the shared market-intel provider (stale-while-revalidate, disk snapshot)
+"""
+
+import threading
+import time
+
+from utils.market_intel import FEAR_GREED, GLOBAL, MarketIntelProvider
+
+
+class Clock:
+    def __init__(self, now=1_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class SlowFeed:
+    """Fetcher that blocks until released and counts its calls"""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.release.wait(5)
+        return self.value
+
+
+def test_reads_never_wait_and_revalidate_once():
+    feed = SlowFeed({'value': 20, 'classification': 'Extreme Fear', 'timestamp': '1'})
+    intel = MarketIntelProvider({FEAR_GREED: feed}, snapshot_path=None, clock=Clock())
+
+    # Nothing fetched yet: neutral default right away, one refresh in flight
+    assert intel.fear_greed()['value'] == 50
+    assert intel.fear_greed()['value'] == 50
+    feed.release.set()
+    deadline = time.time() + 5
+    while intel.age(FEAR_GREED) is None and time.time() < deadline:
+        time.sleep(0.01)
+    assert feed.calls == 1
+    assert intel.fear_greed()['value'] == 20
+
+
+def test_failed_refresh_keeps_last_good_value():
+    clock = Clock()
+    values = [{'btc_dominance': 55.0}, None, None]
+    intel = MarketIntelProvider({GLOBAL: lambda: values.pop(0)}, intervals={GLOBAL: 60},
+                                snapshot_path=None, clock=clock)
+
+    assert intel.refresh(GLOBAL) and intel.age(GLOBAL) == 0
+    clock.now += 120
+    assert not intel.refresh(GLOBAL)
+    assert intel.feeds[GLOBAL].failures == 1 and intel.age(GLOBAL) == 120
+    assert intel.get(GLOBAL)['btc_dominance'] == 55.0
+
+
+def test_snapshot_seeds_the_next_process(tmp_path):
+    path = str(tmp_path / "intel.json")
+    clock = Clock()
+    first = MarketIntelProvider({FEAR_GREED: lambda: {'value': 81}}, snapshot_path=path, clock=clock)
+    first.refresh(FEAR_GREED)
+
+    calls = []
+    clock.now += 30
+    restarted = MarketIntelProvider({FEAR_GREED: lambda: calls.append(1) or {'value': 10}},
+                                    snapshot_path=path, clock=clock)
+
+    assert restarted.fear_greed()['value'] == 81     # served from disk, still fresh
+    assert calls == [] and restarted.age(FEAR_GREED) == 30
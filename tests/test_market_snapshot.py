@@ -0,0 +1,97 @@
+"""
+Tests for the columnar CoinGecko markets snapshot behind CoinGeckoIntel scans
+"""
+
+import random
+
+from utils.coingecko_intel import CoinGeckoIntel, MarketSnapshot
+from utils.market_intel import FEAR_GREED, MarketIntelProvider
+
+MAPPING = CoinGeckoIntel.WEEX_MAPPING
+
+
+class ScriptedIntel(CoinGeckoIntel):
+    """CoinGeckoIntel answering API calls from a fixed markets list"""
+
+    def __init__(self, coins, trending=()):
+        offline = MarketIntelProvider({FEAR_GREED: lambda: {'value': 50, 'classification': 'Neutral'}},
+                                      snapshot_path=None)
+        super().__init__(api_key="", intel=offline)
+        self.min_interval = 0
+        self.coins = coins
+        self.trending = list(trending)
+        self.calls = []
+
+    def _request(self, endpoint, params=None):
+        self.calls.append((endpoint, params))
+        if endpoint == "/search/trending":
+            return {'coins': [{'item': item} for item in self.trending]}
+        if endpoint == "/coins/markets":
+            start = (params['page'] - 1) * params['per_page']
+            return self.coins[start:start + params['per_page']]
+        return None
+
+
+def make_coins(n, seed=7):
+    rng = random.Random(seed)
+    ids = list(MAPPING) + [f"coin{i}" for i in range(n)]
+    rng.shuffle(ids)
+    coins = []
+    for rank, coin_id in enumerate(ids[:n], 1):
+        cap = rng.choice([rng.uniform(1e8, 1e11), 0])
+        coins.append({
+            'id': coin_id, 'symbol': coin_id[:4], 'name': coin_id.title(),
+            'current_price': rng.uniform(0.01, 100), 'market_cap': cap, 'market_cap_rank': rank,
+            'total_volume': cap * rng.choice([0.01, 0.05, 0.09, 0.2, 0.2]),
+            'price_change_percentage_24h': rng.choice([None, -15.0, -12.5, 0.0, 3.2, 11.0, 11.0, 25.0]),
+            'price_change_percentage_1h_in_currency': rng.uniform(-2, 2),
+        })
+    return coins
+
+
+def legacy_movers(coins, limit):
+    weex = [c for c in coins if c.get('id') in MAPPING]
+    ranked = sorted(weex, key=lambda x: x.get('price_change_percentage_24h', 0) or 0, reverse=True)
+    return {'gainers': ranked[:limit], 'losers': ranked[-limit:][::-1]}
+
+
+def legacy_spikes(coins):
+    spikes = []
+    for c in coins:
+        if c['id'] in MAPPING and c['market_cap'] > 0 and c['total_volume'] / c['market_cap'] > 0.08:
+            spikes.append((c['id'], c['total_volume'] / c['market_cap']))
+    return sorted(spikes, key=lambda x: x[1], reverse=True)
+
+
+def test_queries_match_the_row_by_row_scans():
+    coins = make_coins(100)
+    intel = ScriptedIntel(coins)
+
+    for limit in (1, 5, 10, 20):
+        assert intel.get_top_gainers_losers(limit) == legacy_movers(coins, limit)
+    assert [(s['id'], s['volume_ratio']) for s in intel.get_volume_spikes()] == legacy_spikes(coins)
+
+
+def test_one_markets_download_per_scan():
+    coins = make_coins(100)
+    trending = [{'id': 'solana', 'symbol': 'sol', 'name': 'Solana', 'score': 0, 'market_cap_rank': 5}]
+    intel = ScriptedIntel(coins, trending)
+
+    opportunities = intel.find_opportunities()
+
+    assert [endpoint for endpoint, _ in intel.calls].count("/coins/markets") == 1
+    assert opportunities[0].signal_type == 'trending' and opportunities[0].strength == 100
+    assert [o.strength for o in opportunities] == sorted((o.strength for o in opportunities), reverse=True)
+    intel.find_opportunities()
+    assert [endpoint for endpoint, _ in intel.calls].count("/coins/markets") == 1    # cached
+
+
+def test_snapshot_pages_and_handles_missing_fields():
+    intel = ScriptedIntel(make_coins(300))
+    assert len(intel.get_market_snapshot(300)) == 300
+    assert [params['page'] for _, params in intel.calls] == [1, 2]
+
+    snapshot = MarketSnapshot([{'id': 'bitcoin', 'market_cap': None, 'total_volume': 5},
+                               {'id': 'ethereum', 'total_volume': 0.5}], MAPPING)
+    assert list(snapshot.volume_spikes()) == [1]            # missing cap counts as 1, null cap is skipped
+    assert list(snapshot.movers(5)['gainers']) == [0, 1]
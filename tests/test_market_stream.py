@@ -0,0 +1,148 @@
+"""
+Tests for the WebSocket market stream against a local WebSocket stand-in
+"""
+
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+import time
+
+import pytest
+
+from utils.market_stream import MarketDataCache, MarketStream
+
+pytest.importorskip("websocket")
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class LocalWebSocketServer:
+    """
+    Minimal RFC 6455 server: accepts one client, records its text frames
+    and pushes the given messages once the client has subscribed.
+    """
+
+    def __init__(self, pushes):
+        self.pushes = pushes
+        self.received = []
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(1)
+        self.port = self.sock.getsockname()[1]
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}"
+
+    def _serve(self):
+        conn, _ = self.sock.accept()
+        conn.settimeout(5)
+        request = b""
+        while b"\r\n\r\n" not in request:
+            request += conn.recv(4096)
+        key = [line.split(b":", 1)[1].strip() for line in request.split(b"\r\n")
+               if line.lower().startswith(b"sec-websocket-key")][0]
+        accept = base64.b64encode(hashlib.sha1(key + WS_GUID.encode()).digest())
+        conn.sendall(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                     b"Connection: Upgrade\r\nSec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+
+        # Wait for the first subscribe frame, then push
+        self.received.append(self._read_frame(conn))
+        for message in self.pushes:
+            self._send_text(conn, json.dumps(message))
+        self.done.wait(5)
+        conn.close()
+        self.sock.close()
+
+    @staticmethod
+    def _read_frame(conn) -> str:
+        header = conn.recv(2)
+        length = header[1] & 0x7F
+        if length == 126:
+            length = struct.unpack(">H", conn.recv(2))[0]
+        elif length == 127:
+            length = struct.unpack(">Q", conn.recv(8))[0]
+        mask = conn.recv(4)
+        payload = b""
+        while len(payload) < length:
+            payload += conn.recv(length - len(payload))
+        return bytes(b ^ mask[i % 4] for i, b in enumerate(payload)).decode()
+
+    @staticmethod
+    def _send_text(conn, text: str):
+        data = text.encode()
+        if len(data) < 126:
+            header = struct.pack(">BB", 0x81, len(data))
+        else:
+            header = struct.pack(">BBH", 0x81, 126, len(data))
+        conn.sendall(header + data)
+
+
+def wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_stream_feeds_cache_and_ticks():
+    server = LocalWebSocketServer([
+        {"channel": "ticker.cmt_btcusdt", "data": [{"lastPrice": "97000.5", "high24h": "98000"}]},
+        {"channel": "kline.LAST_PRICE.cmt_btcusdt.MINUTE_1",
+         "data": [["1700000000000", "1", "2", "0.5", "1.5", "10"]]},
+    ])
+    ticks = []
+    stream = MarketStream(["cmt_btcusdt"], granularities=("1m",), url=server.url,
+                          on_tick=lambda s, p: ticks.append((s, p)))
+    try:
+        assert stream.start()
+        assert wait_for(lambda: stream.cache.get_candles("cmt_btcusdt", "1m", 1) is not None)
+
+        ticker = stream.cache.get_ticker("cmt_btcusdt")
+        assert ticker["last"] == 97000.5
+        assert ticker["high_24h"] == "98000"
+        candles = stream.cache.get_candles("cmt_btcusdt", "1m", 1)
+        assert candles == [[1700000000000, 1.0, 2.0, 0.5, 1.5, 10.0]]
+    finally:
+        server.done.set()
+        stream.stop()
+
+    assert json.loads(server.received[0]) == {"event": "subscribe", "channel": "ticker.cmt_btcusdt"}
+    assert ticks == [("cmt_btcusdt", 97000.5)]
+
+
+def test_cache_freshness_and_seeding():
+    cache = MarketDataCache(max_candles=3)
+    cache.update_ticker("cmt_ethusdt", {"last": "3000"})
+    assert cache.get_price("cmt_ethusdt") == 3000.0
+    assert cache.get_ticker("cmt_ethusdt", max_age=-1) is None
+
+    # REST history alone never counts as fresh
+    cache.seed_candles("cmt_ethusdt", "5m", [[str(t), "1", "1", "1", "1", "1"] for t in (1, 2, 3)])
+    assert cache.get_candles("cmt_ethusdt", "5m", 3) is None
+
+    # A streamed bar replaces the same timestamp and trims to capacity
+    cache.update_candle("cmt_ethusdt", "5m", ["3", "1", "9", "1", "8", "5"])
+    cache.update_candle("cmt_ethusdt", "5m", ["4", "8", "8", "8", "8", "1"])
+    candles = cache.get_candles("cmt_ethusdt", "5m", 3)
+    assert [c[0] for c in candles] == [2, 3, 4]
+    assert candles[1][4] == 8.0
+
+
+def test_client_reads_from_fresh_cache():
+    from weex_client import WeexClient
+
+    client = WeexClient(api_key="k", secret_key="s", passphrase="p")
+    cache = MarketDataCache()
+    client.attach_market_cache(cache)
+    cache.update_ticker("cmt_solusdt", {"last": "150.25"})
+
+    assert client.get_ticker("cmt_solusdt")["last"] == 150.25
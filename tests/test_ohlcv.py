@@ -0,0 +1,58 @@
+"""
+Tests for the columnar OHLCV ring buffer
+"""
+
+import numpy as np
+
+from utils.ohlcv import OHLCVBuffer, parse_rows
+from utils.candle_store import CandleStore
+
+
+def rows(start: int, n: int):
+    return [[str(t), str(t + 0.1), str(t + 0.5), str(t - 0.5), str(t + 0.2), "1"]
+            for t in range(start, start + n)]
+
+
+def test_wraparound_windows_are_contiguous_views():
+    buf = OHLCVBuffer(capacity=5)
+    buf.extend(rows(0, 13))
+
+    bars = buf.window()
+    assert len(buf) == 5
+    assert bars.ts.tolist() == [8, 9, 10, 11, 12]
+    assert bars.close.base is not None  # a view, not a copy
+    assert bars.close.flags['C_CONTIGUOUS']
+    assert buf.window(2).rows() == [[11, 11.1, 11.5, 10.5, 11.2, 1.0],
+                                    [12, 12.1, 12.5, 11.5, 12.2, 1.0]]
+
+
+def test_same_timestamp_replaces_and_old_bars_merge():
+    buf = OHLCVBuffer(capacity=10)
+    buf.extend(rows(0, 5))
+    assert buf.append(4, 1, 2, 0, 9, 3)
+    assert buf.window().close[-1] == 9
+    assert not buf.append(1, 1, 1, 1, 1, 1)
+
+    # Filling a hole: unsorted input, stored bars with the same ts are replaced
+    buf = OHLCVBuffer(capacity=10)
+    buf.extend([r for r in rows(0, 6) if r[0] != "2"])
+    buf.extend([["2", 0, 0, 0, 7, 0], ["1", 0, 0, 0, 8, 0]])
+    assert buf.window().ts.tolist() == [0, 1, 2, 3, 4, 5]
+    assert buf.window().close.tolist()[1:3] == [8, 7]
+
+
+def test_parse_rows_skips_bad_rows_and_sorts():
+    data = parse_rows([["3", 1, 1, 1, 1, 1], ["x", 1], ["1", 2, 2, 2, 2, 2]])
+    assert data.shape == (6, 2)
+    assert data[0].tolist() == [1, 3]
+
+
+def test_store_arrays_match_rows():
+    class FakeClient:
+        def get_candles(self, symbol, granularity, limit):
+            return rows(1_700_000_000, limit)
+
+    store = CandleStore(FakeClient(), ":memory:")
+    bars = store.get_arrays("cmt_btcusdt", "5m", 20)
+    assert bars.rows() == store.read("cmt_btcusdt", "5m", 20)
+    np.testing.assert_array_equal(bars.close, [r[4] for r in store.read("cmt_btcusdt", "5m", 20)])
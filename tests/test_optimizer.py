@@ -0,0 +1,74 @@
+"""
+Tests for the parallel, resumable parameter sweep
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+import ultra_scalper
+from backtest import Optimizer, rank, load_results, grid_points, random_points
+from backtest.optimizer import space_size
+
+MINUTE = 60_000
+
+
+def random_walk(n: int, seed: int, p0: float = 100.0):
+    rng = np.random.default_rng(seed)
+    close = p0 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    open_ = np.r_[p0, close[:-1]]
+    spread = np.abs(rng.normal(0, 0.001, n)) * close
+    return np.vstack([np.arange(n) * MINUTE, open_, np.maximum(open_, close) + spread,
+                      np.minimum(open_, close) - spread, close, rng.uniform(10, 100, n)])
+
+
+def test_random_points_are_distinct_and_reproducible():
+    space = {'a': [1, 2, 3], 'b': [10, 20], 'c': list(range(50))}
+    assert space_size(space) == 300
+    points = random_points(space, 40, seed=7)
+    assert points == random_points(space, 40, seed=7)
+    assert len({json.dumps(p, sort_keys=True) for p in points}) == 40
+    assert all(p['c'] in space['c'] for p in points)
+    assert len(random_points(space, 1000)) == 300
+    assert list(grid_points({'a': [1, 2], 'b': [3]})) == [{'a': 1, 'b': 3}, {'a': 2, 'b': 3}]
+
+
+def test_rank_orders_and_breaks_ties():
+    rows = [
+        {'key': 'a', 'sharpe': 1.0, 'return_pct': 5, 'max_drawdown_pct': 3, 'trades': 4},
+        {'key': 'b', 'sharpe': 2.0, 'return_pct': 1, 'max_drawdown_pct': 9, 'trades': 4},
+        {'key': 'c', 'sharpe': 1.0, 'return_pct': 5, 'max_drawdown_pct': 1, 'trades': 4},
+        {'key': 'd', 'error': 'boom'},
+        {'key': 'e', 'sharpe': 9.0, 'return_pct': 9, 'max_drawdown_pct': 0, 'trades': 0},
+    ]
+    assert [r['key'] for r in rank(rows)] == ['b', 'c', 'a']
+    assert [r['key'] for r in rank(rows, by='max_drawdown_pct')] == ['c', 'a', 'b']
+    with pytest.raises(ValueError):
+        rank(rows, by='pnl')
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_sweep_resumes_and_restores_constants(tmp_path, workers):
+    candles = {'cmt_solusdt': random_walk(700, 1), 'cmt_ethusdt': random_walk(700, 2, 3000)}
+    path = str(tmp_path / "sweep.jsonl")
+    space = {'RSI_OVERSOLD': [25, 40], 'TAKE_PROFIT_PCT': [1.0, 4.0]}
+    opt = Optimizer(candles, 'ultra', space=space, results_path=path, workers=workers,
+                    engine_kwargs={'warmup': 200})
+
+    rows = opt.run(samples=2, seed=3, progress=False)
+    assert len(rows) == 2 and not any(r.get('error') for r in rows)
+    assert {r['key'] for r in rows} <= {json.dumps(p, sort_keys=True) for p in grid_points(space)}
+
+    rows = opt.run(progress=False)  # full grid: only the 2 missing runs execute
+    assert len(rows) == 4 == len(load_results(path))
+    assert len({r['key'] for r in rows}) == 4
+    assert ultra_scalper.RSI_OVERSOLD == 30 and ultra_scalper.TAKE_PROFIT_PCT == 4.0
+
+
+def test_unknown_parameter_is_reported_per_run(tmp_path):
+    opt = Optimizer({'cmt_solusdt': random_walk(300, 1)}, 'ultra', space={'NOPE': [1]},
+                    results_path=str(tmp_path / "bad.jsonl"), workers=1,
+                    engine_kwargs={'warmup': 100})
+    row = opt.run(progress=False)[0]
+    assert 'NOPE' in row['error']
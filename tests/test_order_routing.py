@@ -0,0 +1,67 @@
+"""
+Tests pinning how WeexClient routes live orders (placeOrder type code and price fields)
+"""
+
+import pytest
+
+from weex_client import ORDER_TYPES, WeexClient, order_type_code
+
+
+class RecordingClient(WeexClient):
+    """WeexClient whose requests are recorded instead of sent"""
+
+    def __init__(self):
+        super().__init__(api_key="key", secret_key="secret", passphrase="pass")
+        self.calls = []
+
+    def _request(self, method, endpoint, params=None, data=None):
+        self.calls.append((endpoint, data))
+        return {'order_id': '1'}
+
+
+@pytest.mark.parametrize("side, trade_side, code", [
+    ("buy", "open", "1"),            # open long
+    ("sell", "open", "2"),           # open short
+    ("sell", "close", "3"),          # close long
+    ("buy", "close", "4"),           # close short
+    ("buy", "CLOSE", "4"),
+    ("open_long", "open", "1"),
+    ("open_short", "open", "2"),
+    ("close_long", "open", "3"),     # explicit sides ignore trade_side
+    ("close_short", "close", "4"),
+])
+def test_side_and_trade_side_map_to_type_code(side, trade_side, code):
+    assert order_type_code(side, trade_side) == code
+
+
+def test_explicit_sides_match_order_types():
+    assert ORDER_TYPES == {'open_long': '1', 'open_short': '2',
+                           'close_long': '3', 'close_short': '4'}
+
+
+def test_place_order_sends_type_code():
+    client = RecordingClient()
+    client.place_order("cmt_btcusdt", "sell", "market", "0.01", client_oid="a")
+    client.place_order("cmt_btcusdt", "sell", "market", "0.01", trade_side="close", client_oid="b")
+
+    assert [data['type'] for _, data in client.calls] == ["2", "3"]
+    assert all(endpoint == "/capi/v2/order/placeOrder" for endpoint, _ in client.calls)
+
+
+def test_market_order_uses_market_price():
+    client = RecordingClient()
+    client.place_order("cmt_btcusdt", "buy", "market", "0.01", price="50000", client_oid="a")
+
+    data = client.calls[0][1]
+    assert data['match_price'] == "1"
+    assert 'price' not in data
+
+
+def test_limit_order_sends_price():
+    client = RecordingClient()
+    client.place_order("cmt_btcusdt", "buy", "limit", "0.01", price=50000.5, client_oid="a")
+
+    data = client.calls[0][1]
+    assert data['match_price'] == "0"
+    assert data['price'] == "50000.5"
+    assert data['size'] == "0.01"
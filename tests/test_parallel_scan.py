@@ -0,0 +1,72 @@
+"""
+Tests for the thread-pool symbol scanner (no network)
+"""
+
+import threading
+import time
+
+from utils.parallel_scan import ParallelScanner
+
+
+def slow_analysis(delay: float):
+    def analyze(coin):
+        time.sleep(delay if coin != 'SOL' else delay * 3)
+        if coin == 'BAD':
+            raise RuntimeError("boom")
+        if coin == 'NONE':
+            return None
+        return {'coin': coin, 'thread': threading.current_thread().name}
+    return analyze
+
+
+def test_scan_runs_concurrently_and_yields_in_completion_order():
+    scanner = ParallelScanner(max_workers=6)
+    coins = ['SOL', 'ETH', 'BNB', 'DOGE', 'ADA', 'LTC']
+
+    start = time.time()
+    done = [coin for coin, _, _ in scanner.scan(coins, slow_analysis(0.1))]
+    elapsed = time.time() - start
+
+    assert elapsed < 0.5  # serial would be 0.8s
+    assert sorted(done) == sorted(coins) and done[-1] == 'SOL'
+    scanner.close()
+
+
+def test_scan_all_keeps_input_order_and_skips_failures():
+    scanner = ParallelScanner(max_workers=4)
+    coins = ['SOL', 'BAD', 'ETH', 'NONE', 'ADA']
+    results = scanner.scan_all(coins, slow_analysis(0.02))
+    assert [r['coin'] for r in results] == ['SOL', 'ETH', 'ADA']
+
+    errors = {coin: e for coin, _, e in scanner.scan(coins, slow_analysis(0))}
+    assert isinstance(errors['BAD'], RuntimeError) and errors['ETH'] is None
+    scanner.close()
+
+
+def test_single_worker_runs_inline():
+    scanner = ParallelScanner(max_workers=1)
+    results = scanner.scan_all(['ETH', 'ADA'], slow_analysis(0))
+    assert {r['thread'] for r in results} == {threading.current_thread().name}
+    assert scanner._executor is None
+
+
+def test_pool_of_client_is_sized_to_workers():
+    class Client:
+        size = 0
+
+        def ensure_pool(self, size):
+            self.size = size
+
+    client = Client()
+    ParallelScanner(max_workers=8, client=client)
+    assert client.size == 8
+
+
+def test_scan_coins_import_does_not_create_client(monkeypatch):
+    import importlib
+    import weex_client
+
+    monkeypatch.setattr(weex_client, "_shared_client", None)
+    import scan_coins
+    importlib.reload(scan_coins)
+    assert weex_client._shared_client is None
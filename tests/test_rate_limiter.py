@@ -0,0 +1,94 @@
+"""
+Tests for the token-bucket rate limiter (fake clock - no sleeping)
+"""
+
+import pytest
+
+from utils.rate_limiter import TokenBucket, RateLimiter
+
+
+class FakeClock:
+    """Monotonic clock that only moves when something sleeps"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_burst_then_throttle():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, capacity=5, clock=clock, sleep=clock.sleep)
+
+    # Full burst goes out without waiting
+    for _ in range(5):
+        assert bucket.acquire() == 0
+
+    # Sixth request waits for one token (1/10 s)
+    assert bucket.acquire() == pytest.approx(0.1)
+    assert clock.now == pytest.approx(0.1)
+
+
+def test_refill_is_capped_at_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=4, clock=clock, sleep=clock.sleep)
+
+    for _ in range(4):
+        bucket.acquire()
+    clock.now += 100
+    for _ in range(4):
+        assert bucket.acquire() == 0
+    assert bucket.acquire() > 0
+
+
+def test_weights_and_separate_buckets():
+    clock = FakeClock()
+    limiter = RateLimiter(
+        buckets={'public': (10, 10), 'private': (1, 1), 'trade': (1, 1)},
+        weights={'/capi/v2/market/contracts': ('public', 10)},
+        clock=clock, sleep=clock.sleep
+    )
+
+    # One heavy public call drains the public bucket...
+    assert limiter.acquire('/capi/v2/market/contracts') == 0
+    # ...but order traffic has its own budget
+    assert limiter.acquire('/capi/v2/order/placeOrder', 'POST') == 0
+    assert limiter.acquire('/capi/v2/market/ticker') == pytest.approx(0.1)
+    assert limiter.waited['public'] == pytest.approx(0.1)
+    assert limiter.waited['trade'] == 0
+
+
+def test_classify_fallbacks():
+    limiter = RateLimiter()
+    assert limiter.classify('/capi/v2/market/depth')[0] == 'public'
+    assert limiter.classify('/capi/v2/order/plan_order', 'POST')[0] == 'trade'
+    assert limiter.classify('/capi/v2/order/plan_current')[0] == 'private'
+    assert limiter.classify('/capi/v2/account/assets?x=1')[0] == 'private'
+
+
+def test_batch_weight_scales_with_orders_on_trade_bucket():
+    clock = FakeClock()
+    limiter = RateLimiter(
+        buckets={'public': (20, 20), 'private': (10, 10), 'trade': (20, 20)},
+        clock=clock, sleep=clock.sleep
+    )
+    batch = {'symbol': 'cmt_btcusdt', 'orderDataList': [{'client_oid': str(i)} for i in range(20)]}
+
+    assert limiter.classify('/capi/v2/order/batchOrders', 'POST', batch) == ('trade', 20)
+    assert limiter.classify('/capi/v2/order/cancel_batch_orders', 'POST', {'ids': ['1', '2', '3']}) == ('trade', 3)
+    assert limiter.classify('/capi/v2/order/placeTpSlOrder', 'POST')[0] == 'trade'
+    assert limiter.classify('/capi/v2/order/currentPlan')[0] == 'private'
+
+    # A 20-order batch drains the trade bucket; market data is untouched
+    assert limiter.acquire('/capi/v2/order/batchOrders', 'POST', batch) == 0
+    assert limiter.buckets['trade'].tokens == pytest.approx(0)
+    assert limiter.acquire('/capi/v2/market/ticker') == 0
+    assert limiter.acquire('/capi/v2/order/placeOrder', 'POST') == pytest.approx(1 / 20)
+    assert limiter.waited['trade'] == pytest.approx(1 / 20)
+    assert limiter.waited['public'] == 0
@@ -0,0 +1,60 @@
+"""
+Tests for local 1m -> 5m/15m/1H resampling
+"""
+
+import numpy as np
+
+from utils.resampler import resample, resample_arrays, MultiTimeframeView, Resampler
+
+MINUTE = 60_000
+HOUR = 60 * MINUTE
+
+
+def minute_bars(start_ts: int, n: int):
+    """1m bars whose close is the minute index, high/low +-0.5, volume 1"""
+    return [[start_ts + i * MINUTE, i, i + 0.5, i - 0.5, i + 0.25, 1.0] for i in range(n)]
+
+
+def test_resample_ohlcv_and_alignment():
+    bars = resample(minute_bars(10 * HOUR + 3 * MINUTE, 12), "5m")
+
+    # 10:00 bucket only has minutes 3-4, then 10:05 full, then 10:10 partial
+    assert [b[0] for b in bars] == [10 * HOUR, 10 * HOUR + 5 * MINUTE, 10 * HOUR + 10 * MINUTE]
+    assert bars[1] == [10 * HOUR + 5 * MINUTE, 2, 6.5, 1.5, 6.25, 5.0]
+    assert bars[2][5] == 5.0
+
+
+def test_resample_arrays_matches_loop():
+    rows = minute_bars(10 * HOUR + 3 * MINUTE, 200)
+    del rows[50:53]  # gap inside a bucket
+    for granularity, minutes in (("5m", 5), ("15m", 15), ("1H", 60)):
+        bars, starts = resample_arrays(np.array(rows).T, granularity)
+        np.testing.assert_allclose(bars.T, resample(rows, granularity))
+        # starts point at the first 1m bar of each bucket
+        step = minutes * MINUTE
+        assert [rows[i][0] - rows[i][0] % step for i in starts] == list(bars[0])
+
+
+def test_view_drops_truncated_first_bucket_and_flags_partial():
+    view = MultiTimeframeView(minute_bars(10 * HOUR + 40 * MINUTE, 100))
+
+    hourly = view.get("1H")
+    assert [b[0] for b in hourly] == [11 * HOUR, 12 * HOUR]
+    assert view.is_partial("1H")
+    assert not view.is_partial("5m")  # last minute is :19 -> 12:15 bucket closes
+    # Every timeframe ends on the same close
+    assert {view.get(tf)[-1][4] for tf in ("1m", "5m", "15m", "1H")} == {99.25}
+
+
+def test_one_request_for_all_timeframes():
+    calls = []
+
+    class FakeSource:
+        def get_candles(self, symbol, granularity, limit):
+            calls.append((granularity, limit))
+            return minute_bars(0, limit)
+
+    view = Resampler(FakeSource()).view("cmt_btcusdt", {'1m': 20, '5m': 20, '15m': 12, '1H': 6})
+    assert calls == [("1m", 420)]
+    assert len(view.get("1H", 6)) == 6
+    assert len(view.get("15m", 12)) == 12
@@ -0,0 +1,110 @@
+"""
+Tests for the per-task cadence scheduler
+"""
+
+import threading
+import time
+
+from utils.scheduler import TaskScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cadence_and_priority_with_fake_clock():
+    clock = FakeClock()
+    scheduler = TaskScheduler(clock=clock)
+    order = []
+    scheduler.add("scan", lambda: order.append("scan"), 20, priority=5)
+    scheduler.add("positions", lambda: order.append("positions"), 5, priority=0)
+
+    assert scheduler.run_pending() == 1005.0
+    assert order == ["positions", "scan"]
+
+    for _ in range(4):
+        clock.now += 5
+        scheduler.run_pending()
+    assert order.count("positions") == 5 and order.count("scan") == 2
+
+    # Fell far behind: run once, don't replay every missed slot
+    clock.now += 60
+    scheduler.run_pending()
+    assert order.count("positions") == 6
+    assert scheduler.tasks["positions"].next_run == clock.now + 5
+
+
+def test_slow_background_task_never_blocks_foreground():
+    scheduler = TaskScheduler(background_workers=2)
+    release = threading.Event()
+    checks = []
+    scheduler.add("intel", lambda: release.wait(2), 0.01, background=True)
+    scheduler.add("positions", lambda: checks.append(time.time()), 0.01, priority=0, deadline=0.5)
+
+    thread = scheduler.start()
+    time.sleep(0.3)
+    release.set()
+    scheduler.stop()
+    thread.join(2)
+
+    assert len(checks) >= 10  # kept its cadence while intel hung
+    intel = scheduler.tasks["intel"]
+    assert intel.runs <= 1 and intel.skipped > 0
+    assert scheduler.tasks["positions"].overruns == 0
+
+
+def test_false_stops_and_errors_are_counted():
+    clock = FakeClock()
+    scheduler = TaskScheduler(clock=clock)
+
+    def boom():
+        raise RuntimeError("api down")
+
+    scheduler.add("flaky", boom, 1)
+    scheduler.add("safety", lambda: False, 1, priority=0)
+    scheduler.run_pending()
+
+    assert scheduler.stopped
+    assert scheduler.stats()["flaky"]["runs"] == 0  # stopped before it started
+    del scheduler.tasks["safety"]
+    scheduler._stop.clear()
+    clock.now += 1
+    scheduler.run_pending()
+    assert scheduler.stats()["flaky"]["failures"] == 1
+    assert scheduler.stats()["flaky"]["last_error"] == "api down"
+
+
+def test_run_returns_only_after_background_tasks_finish():
+    scheduler = TaskScheduler(background_workers=1, shutdown_timeout=2)
+    placed = []
+
+    def scan():
+        time.sleep(0.3)            # Still placing orders when the loop is stopped
+        placed.append(time.time())
+
+    scheduler.add("scan", scan, 10, background=True)
+    thread = scheduler.start()
+    time.sleep(0.05)
+    scheduler.stop()
+    thread.join(3)
+    stopped_at = time.time()
+
+    # Cleanup after run() (close_all_positions) can no longer race the scan
+    assert placed and placed[0] <= stopped_at
+    assert scheduler.stopped
+
+
+def test_shutdown_wait_is_bounded():
+    scheduler = TaskScheduler(background_workers=1)
+    release = threading.Event()
+    scheduler.add("hung", lambda: release.wait(5), 10, background=True)
+    scheduler.run_pending()
+
+    started = time.time()
+    assert scheduler.shutdown(timeout=0.2) is False
+    assert time.time() - started < 1
+    release.set()
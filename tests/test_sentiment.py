@@ -0,0 +1,118 @@
+"""
+Tests for the sentiment cache and batched DeepSeek requests (local stand-in server)
+"""
+
+import json
+import re
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.sentiment import DeepSeekSentiment, SentimentCache, SentimentResult
+
+
+class StandInServer:
+    """Chat-completions stand-in: bullish on every symbol named in the prompt"""
+
+    def __init__(self):
+        self.prompts = []
+        self.release = threading.Event()
+        self.release.set()
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                prompt = body['messages'][-1]['content']
+                owner.prompts.append(prompt)
+                owner.release.wait(5)
+                symbols = re.findall(r"([A-Z]+)/USDT", prompt)
+                content = json.dumps({s: {'sentiment': 'bullish', 'score': 40, 'confidence': 75,
+                                          'summary': f"{s} up", 'factors': ['flows']}
+                                      for s in symbols if s != 'XYZ'})
+                reply = json.dumps({'choices': [{'message': {'content': f"```json\n{content}\n```"}}]})
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(reply.encode())
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1/chat/completions"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    srv = StandInServer()
+    yield srv
+    srv.release.set()
+    srv.close()
+
+
+def make_ai(server, tmp_path):
+    ai = DeepSeekSentiment(api_key="test", api_url=server.url,
+                           cache_path=str(tmp_path / "sentiment.json"), timeout=5)
+    ai.min_interval = 0
+    return ai
+
+
+def test_batch_is_one_completion_parsed_per_symbol(server, tmp_path):
+    ai = make_ai(server, tmp_path)
+
+    results = ai.analyze_batch(['btc', 'ETH', 'XYZ'])
+
+    assert len(server.prompts) == 1
+    assert results['BTC'].sentiment == 'bullish' and results['ETH'].summary == 'ETH up'
+    assert results['XYZ'].sentiment == 'neutral' and 'XYZ' not in ai.cache   # missing from the reply
+    ai.analyze_batch(['BTC', 'ETH'])
+    assert ai.get_signal('eth')['signal'] == 'buy'
+    assert len(server.prompts) == 1                                        # served from the cache
+
+    reloaded = DeepSeekSentiment(api_key="test", api_url=server.url,
+                                 cache_path=str(tmp_path / "sentiment.json"))
+    assert reloaded.cache.get('BTC').confidence == 75
+
+
+def test_cache_expires_and_evicts_least_recent():
+    now = [0.0]
+    cache = SentimentCache(max_entries=2, ttl=60, path=None, clock=lambda: now[0])
+    result = SentimentResult('bearish', -30, 70, '', [], datetime.now())
+
+    cache.put('BTC', result)
+    cache.put('ETH', result)
+    cache.get('BTC')
+    cache.put('SOL', result)
+    assert 'ETH' not in cache and len(cache) == 2
+
+    now[0] = 61
+    assert cache.get('BTC') is None
+    assert cache.get('BTC', allow_stale=True) is result
+
+
+def test_non_blocking_signal_refreshes_in_background(server, tmp_path):
+    ai = make_ai(server, tmp_path)
+    server.release.clear()
+
+    started = time.time()
+    assert ai.get_signal('SOL', wait=False)['sentiment'] == 'neutral'
+    while not server.prompts and time.time() - started < 1:
+        time.sleep(0.01)
+    ai.refresh_async(['SOL', 'DOGE'])                  # SOL already in flight
+    assert time.time() - started < 1
+
+    server.release.set()
+    deadline = time.time() + 5
+    while not (ai.cache.is_fresh('SOL') and ai.cache.is_fresh('DOGE')) and time.time() < deadline:
+        time.sleep(0.01)
+    assert ai.get_signal('SOL', wait=False)['signal'] == 'buy'
+    assert len(server.prompts) == 2 and 'SOL/USDT' not in server.prompts[1]
@@ -0,0 +1,85 @@
+"""
+Tests for the shared bot-state snapshot store the dashboard renders from
+"""
+
+import json
+import os
+import time
+
+from utils.market_stream import MarketDataCache
+from utils.state_store import StateStore, ticker_prices
+
+
+def test_publish_merges_sections_and_sources(tmp_path):
+    store = StateStore(str(tmp_path))
+    store.publish("grid", balance={'equity': 990.0}, prices={'cmt_btcusdt': {'last': 100.0}},
+                  positions=[{'symbol': 'cmt_btcusdt', 'holdSide': 'long', 'total': 0.01}])
+    store.publish("scalper", balance={'equity': 1000.0}, prices={'cmt_btcusdt': {'last': 101.0}},
+                  signals=[{'symbol': 'cmt_solusdt', 'direction': 'long'}])
+    store.publish("grid", positions=[])                 # other sections are kept
+
+    state = store.merged()
+
+    assert set(state['sources']) == {'grid', 'scalper'}
+    assert state['balance'] == {'equity': 990.0}        # newest publisher wins
+    assert state['prices']['cmt_btcusdt']['last'] == 100.0
+    assert state['positions'] == [] and state['signals'][0]['source'] == 'scalper'
+    assert set(store.merged(exclude=('grid',))['sources']) == {'scalper'}
+    assert [n for n in os.listdir(tmp_path) if n.endswith('.tmp')] == []
+
+
+def test_stale_and_unreadable_snapshots_are_ignored(tmp_path):
+    store = StateStore(str(tmp_path), stale_after=60)
+    store.publish("old", balance={'equity': 1.0})
+    snapshot = store.get("old")
+    snapshot.updated_at = time.time() - 120
+    (tmp_path / "old.json").write_text(json.dumps(snapshot.__dict__))
+    (tmp_path / "broken.json").write_text("{not json")
+
+    assert store.read() == {}
+    assert store.merged()['balance'] == {}
+    assert StateStore(str(tmp_path / "missing")).merged()['sources'] == {}
+
+
+def test_prices_from_the_stream_cache():
+    cache = MarketDataCache()
+    cache.update_ticker('cmt_ethusdt', {'last': '2000.5', 'high24h': '2100', 'chgUTC': '0.012'})
+
+    prices = ticker_prices(cache.tickers())
+
+    assert prices == {'cmt_ethusdt': {'last': 2000.5, 'high_24h': 2100.0, 'low_24h': 0.0, 'change': 0.012}}
+    assert cache.tickers(max_age=-1) == {}
+
+
+def test_dashboard_fills_account_panels_bots_do_not_publish(tmp_path, monkeypatch):
+    import dashboard
+
+    reads = []
+
+    def reader(name, value):
+        return lambda *args: reads.append(name) or value
+
+    monkeypatch.setattr(dashboard, "get_balance", reader('balance', {'equity': 1.0}))
+    monkeypatch.setattr(dashboard, "get_prices", reader('prices', {}))
+    monkeypatch.setattr(dashboard, "get_all_positions",
+                        reader('positions', [{'symbol': 'cmt_solusdt', 'holdSide': 'short'}]))
+    monkeypatch.setattr(dashboard, "get_open_orders", reader('orders', [{'type': 'open_long', 'price': '99'}]))
+    monkeypatch.setattr(dashboard, "get_trade_history", reader('trades', [{'orderId': '1'}]))
+    store = StateStore(str(tmp_path))
+    monkeypatch.setattr(dashboard, "_state_store", store)
+    # The scalper publishes no orders/trades and only the position it tracks
+    store.publish("smart_scalper", balance={'equity': 990.0}, prices={'cmt_btcusdt': {'last': 100.0}},
+                  positions=[{'symbol': 'cmt_btcusdt', 'holdSide': 'long'}])
+
+    state = dashboard.load_state(refresh_interval=30)
+
+    assert state['balance'] == {'equity': 990.0} and state['prices']['cmt_btcusdt']['last'] == 100.0
+    assert state['orders'] == [{'type': 'open_long', 'price': '99'}]
+    assert state['trades'] == [{'orderId': '1'}]
+    assert state['positions'] == [{'symbol': 'cmt_solusdt', 'holdSide': 'short'}]   # account-wide
+    assert sorted(reads) == ['orders', 'positions', 'trades']       # balance/prices from the bot
+    assert set(state['sources']) == {'smart_scalper', 'dashboard'}
+
+    # A second viewer within the refresh interval reuses the live read
+    assert dashboard.load_state(refresh_interval=30)['orders'] == state['orders']
+    assert len(reads) == 3
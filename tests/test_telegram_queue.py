@@ -0,0 +1,120 @@
+"""
+Tests for the background Telegram sender (coalescing, backpressure, rate limits)
+"""
+
+import threading
+import time
+
+from utils.telegram_notifier import TelegramNotifier
+
+
+class Response:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self._body = body or {}
+
+    def json(self):
+        return self._body
+
+
+class FakeSession:
+    """Records sendMessage posts; blocks while `gate` is clear"""
+
+    def __init__(self, statuses=()):
+        self.posts = []
+        self.statuses = list(statuses)
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def post(self, url, json=None, timeout=None):
+        self.gate.wait(5)
+        self.posts.append(json)
+        if self.statuses:
+            status = self.statuses.pop(0)
+            return Response(status, {'parameters': {'retry_after': 0.05}})
+        return Response(200)
+
+
+def make_notifier(**kwargs):
+    notifier = TelegramNotifier(token="t", chat_id="42", min_interval=0, **kwargs)
+    notifier.session = FakeSession()
+    return notifier
+
+
+def test_fill_burst_becomes_one_digest_without_blocking():
+    notifier = make_notifier(coalesce_window=0.2)
+    notifier.session.gate.clear()                       # Telegram hangs
+
+    started = time.time()
+    for i in range(20):
+        assert notifier.notify_order_filled("cmt_btcusdt", "buy", 100 + i, "0.01")
+    assert time.time() - started < 0.1
+
+    notifier.session.gate.set()
+    assert notifier.flush(5)
+    (post,) = notifier.session.posts
+    assert "20 ORDERS FILLED" in post['text'] and post['chat_id'] == "42"
+    assert "CMT_BTCUSDT BUY 0.01 @ $119.00" in post['text'] and "and 0 more" not in post['text']
+
+
+def test_backpressure_drops_fills_but_keeps_warnings():
+    notifier = make_notifier(max_queue=3, coalesce_window=0.2)
+    notifier.session.gate.clear()
+    notifier.send("first")                              # picked up by the sender
+    time.sleep(0.3)
+
+    notifier.notify_warning("margin low")
+    for i in range(5):
+        notifier.notify_order_filled("cmt_ethusdt", "sell", 2000 + i, "0.1")
+    assert notifier.pending == 3
+
+    notifier.session.gate.set()
+    assert notifier.flush(5)
+    text = notifier.session.posts[-1]['text']
+    assert "margin low" in text and "2 ORDERS FILLED" in text
+    assert "3 notifications dropped" in text
+
+
+def test_rate_limit_waits_out_retry_after():
+    notifier = make_notifier(async_send=False)
+    notifier.session.statuses = [429]
+
+    started = time.time()
+    assert notifier.send("hello")
+    assert len(notifier.session.posts) == 2 and time.time() - started >= 0.05
+
+
+def test_queued_messages_are_sent_at_exit():
+    import json
+    import os
+    import subprocess
+    import sys
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers['Content-Length']))))
+            self.send_response(200)
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'{}')
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    script = (
+        "from utils.telegram_notifier import TelegramNotifier\n"
+        f"n = TelegramNotifier(token='t', chat_id='42', min_interval=0, coalesce_window=0.3, "
+        f"api_url='http://127.0.0.1:{server.server_port}')\n"
+        "n.notify_error('bot crashed')\n"        # Script ends without calling flush()
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", script], cwd=root, timeout=30, check=True,
+                   capture_output=True)
+    server.shutdown()
+
+    assert len(received) == 1 and "bot crashed" in received[0]['text']
@@ -0,0 +1,76 @@
+"""
+Tests for TickDispatcher: tick handlers run off the stream thread
+"""
+
+import threading
+import time
+
+from utils.market_stream import MarketDataCache, TickDispatcher
+
+
+def test_slow_handler_does_not_block_ticker_updates():
+    release = threading.Event()
+    handled = []
+
+    def handler(symbol, price):
+        release.wait(5)              # A close order stuck on REST
+        handled.append((symbol, price))
+
+    dispatcher = TickDispatcher(handler)
+    cache = MarketDataCache()
+    cache.add_listener(dispatcher)
+
+    started = time.time()
+    for price in (100.0, 99.0, 98.0):
+        cache.update_ticker("cmt_btcusdt", {'last': price})
+    cache.update_ticker("cmt_ethusdt", {'last': 2000.0})
+    assert time.time() - started < 0.5
+    assert cache.get_ticker("cmt_ethusdt")['last'] == 2000.0
+    assert dispatcher.pending == 4
+
+    release.set()
+    assert dispatcher.drain()
+    assert handled == [("cmt_btcusdt", 100.0), ("cmt_btcusdt", 99.0),
+                       ("cmt_btcusdt", 98.0), ("cmt_ethusdt", 2000.0)]
+    dispatcher.stop()
+
+
+def test_ticks_are_handled_one_at_a_time():
+    active, overlaps = [], []
+
+    def handler(symbol, price):
+        active.append(symbol)
+        if len(active) > 1:
+            overlaps.append(price)
+        time.sleep(0.005)
+        active.pop()
+
+    dispatcher = TickDispatcher(handler)
+    threads = [threading.Thread(target=lambda i=i: dispatcher.submit("cmt_btcusdt", float(i)))
+               for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert dispatcher.drain()
+    assert overlaps == []
+    dispatcher.stop()
+
+
+def test_handler_error_keeps_worker_alive():
+    handled = []
+
+    def handler(symbol, price):
+        if price < 0:
+            raise ValueError("bad tick")
+        handled.append(price)
+
+    dispatcher = TickDispatcher(handler)
+    dispatcher.submit("cmt_btcusdt", -1.0)
+    dispatcher.submit("cmt_btcusdt", 1.0)
+
+    assert dispatcher.drain()
+    assert handled == [1.0]
+    dispatcher.stop()
+    assert dispatcher.pending == 0
@@ -0,0 +1,160 @@
+"""
+Tests for the SQLite trade ledger behind PeakHunterAuto and the dashboard
+"""
+
+import json
+
+from utils.trade_ledger import TradeLedger
+
+
+def trade(trade_id: str, timestamp: str, symbol: str = "cmt_solusdt", pnl: float = 0.0,
+          status: str = "open"):
+    return {
+        'id': trade_id, 'timestamp': timestamp, 'symbol': symbol, 'action': 'long',
+        'entry_price': 140.5, 'size': 1.1, 'size_usd': 15, 'leverage': 10,
+        'stop_loss': 137.7, 'take_profit': 144.7, 'signal_strength': 55, 'rsi': 29.6,
+        'status': status, 'pnl': pnl, 'exit_price': 0.0, 'closed_at': "",
+    }
+
+
+def test_per_day_queries_and_aggregates(tmp_path):
+    ledger = TradeLedger(str(tmp_path / "trades.db"))
+    assert ledger.record(trade("1", "2026-01-20T23:59:00", pnl=5.0, status="closed_tp"))
+    assert ledger.record(trade("2", "2026-01-21T10:00:00", pnl=3.0, status="closed_tp"))
+    assert ledger.record(trade("3", "2026-01-21T09:00:00", "cmt_ethusdt", pnl=-1.5, status="closed_sl"))
+    assert ledger.record(trade("4", "2026-01-21T11:00:00"))
+    assert not ledger.record(trade("4", "2026-01-21T11:00:00"))
+
+    today = ledger.trades(day="2026-01-21")
+    assert [t['id'] for t in today] == ["3", "2", "4"]
+    assert today[0]['rsi'] == 29.6 and today[0]['closed_at'] == ""
+    assert [t['id'] for t in ledger.trades(day="2026-01-21", limit=2)] == ["2", "4"]
+    assert [t['id'] for t in ledger.trades(symbol="cmt_ethusdt")] == ["3"]
+
+    summary = ledger.daily_summary("2026-01-21")
+    assert summary['total_trades'] == 3 and summary['daily_pnl'] == 1.5
+    assert (summary['wins'], summary['losses'], summary['open']) == (1, 1, 1)
+    assert ledger.daily_pnl("2026-01-21", "cmt_solusdt") == 3.0
+    assert ledger.daily_summary("2026-02-01")['total_trades'] == 0
+
+    assert ledger.update("4", status="closed_tp", pnl=2.0, closed_at="2026-01-21T12:00:00")
+    assert ledger.daily_pnl("2026-01-21") == 3.5
+    assert ledger.daily_summary("2026-01-21")['updated'] == "2026-01-21T12:00:00"
+
+
+def test_legacy_json_is_imported_once(tmp_path):
+    legacy = tmp_path / "peak_trades.json"
+    legacy.write_text(json.dumps({'daily_pnl': 0.0, 'trades': [
+        trade("706769703556613119", "2026-01-15T15:57:08.704797", "cmt_ethusdt")]}))
+    path = str(tmp_path / "trades.db")
+
+    ledger = TradeLedger(path)
+    assert ledger.import_json(str(legacy)) == 1
+    assert ledger.import_json(str(legacy)) == 0
+    ledger.close()
+
+    reopened = TradeLedger(path)
+    assert reopened.import_json(str(legacy)) == 0
+    assert reopened.trades(day="2026-01-15")[0]['symbol'] == "cmt_ethusdt"
+
+
+def test_summary_time_with_legacy_rows_without_closed_at(tmp_path):
+    ledger = TradeLedger(str(tmp_path / "trades.db"))
+    legacy = trade("1", "2026-01-21T09:00:00")
+    del legacy['closed_at']                      # Old JSON rows -> NULL closed_at
+    ledger.record(legacy)
+    ledger.record(trade("2", "2026-01-21T08:00:00"))
+
+    assert ledger.trades(day="2026-01-21")[1]['closed_at'] is None
+    assert ledger.daily_summary("2026-01-21")['updated'] == "2026-01-21T09:00:00"
+
+    ledger.update("2", status="closed_sl", closed_at="2026-01-21T10:30:00")
+    assert ledger.daily_summary("2026-01-21")['updated'] == "2026-01-21T10:30:00"
+
+
+class PositionsClient:
+    """Answers the Peak Hunter's position and ticker requests from fixed data"""
+
+    def __init__(self, positions, last):
+        self.positions = positions
+        self.last = last
+
+    def request(self, method, path, params=None):
+        if params['symbol'] in self.positions:
+            return self.positions[params['symbol']]
+        raise ConnectionError("timeout")
+
+    def get_ticker(self, symbol):
+        return {'last': self.last[symbol]}
+
+
+def test_peak_hunter_records_closed_trades(tmp_path):
+    from run_peak_hunter import PeakHunterAuto, Trade
+
+    hunter = PeakHunterAuto.__new__(PeakHunterAuto)
+    hunter.ledger = TradeLedger(str(tmp_path / "trades.db"))
+    hunter.daily_pnl = 0.0
+    hunter.trades_today = [
+        Trade(**dict(trade("sol", "2026-01-21T09:00:00"))),
+        Trade(**dict(trade("eth", "2026-01-21T09:05:00", "cmt_ethusdt"))),
+        Trade(**dict(trade("bnb", "2026-01-21T09:10:00", "cmt_bnbusdt"))),
+    ]
+    for t in hunter.trades_today:
+        hunter.ledger.record(t.__dict__)
+    hunter.client = PositionsClient(
+        positions={
+            'cmt_solusdt': [],                                               # closed by the TP
+            'cmt_ethusdt': [{'total': '1.1', 'holdSide': 'long', 'unrealizedPL': '0.4'}],
+        },                                                                   # bnb: request fails
+        last={'cmt_solusdt': 145.0, 'cmt_ethusdt': 141.0, 'cmt_bnbusdt': 130.0},
+    )
+
+    hunter.check_positions()
+
+    sol, eth, bnb = (hunter.ledger.trades(symbol=s)[0] for s in ("cmt_solusdt", "cmt_ethusdt", "cmt_bnbusdt"))
+    assert sol['status'] == "closed_tp" and sol['exit_price'] == 144.7
+    assert sol['pnl'] == round((144.7 - 140.5) * 1.1, 4) and sol['closed_at']
+    assert eth['status'] == bnb['status'] == "open"
+    assert hunter.daily_pnl == sol['pnl']
+    assert hunter.ledger.daily_pnl(sol['timestamp'][:10]) == sol['pnl']
+
+
+def test_peak_hunter_protects_positions_with_plan_orders():
+    from run_peak_hunter import PeakHunterAuto
+
+    class PlanClient:
+        def __init__(self):
+            self.plans, self.orders = [], []
+
+        def place_tp_sl(self, symbol, plan_type, trigger_price, size, position_side, client_oid=None):
+            self.plans.append((plan_type, trigger_price, size, position_side))
+            return {'data': [{'orderId': f"p{len(self.plans)}"}]}
+
+        def place_order(self, *args, **kwargs):
+            self.orders.append(args)
+
+    hunter = PeakHunterAuto.__new__(PeakHunterAuto)
+    hunter.client = PlanClient()
+    hunter._place_tp_sl("cmt_solusdt", "short", 1.1, sl_price=143.31, tp_price=136.285)
+
+    # The SL waits for its trigger instead of going out as a marketable limit close
+    assert hunter.client.plans == [('profit_plan', 136.285, 1.1, 'short'),
+                                   ('loss_plan', 143.31, 1.1, 'short')]
+    assert hunter.client.orders == []
+
+
+def test_dashboard_reads_legacy_history_without_db(tmp_path, monkeypatch):
+    import dashboard
+    from datetime import datetime
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    legacy = tmp_path / "peak_trades.json"
+    legacy.write_text(json.dumps({'trades': [trade("7", f"{today}T09:00:00", pnl=2.5, status="closed_tp")]}))
+    monkeypatch.setattr(dashboard, "PEAK_TRADES_DB", str(tmp_path / "peak_trades.db"))
+    monkeypatch.setattr(dashboard, "PEAK_TRADES_LEGACY", str(legacy))
+    monkeypatch.setattr(dashboard, "_peak_ledger", None)
+
+    peak = dashboard.get_peak_trades()
+
+    assert [t['id'] for t in peak['trades']] == ["7"]
+    assert peak['daily_pnl'] == 2.5 and peak['total'] == 1
@@ -0,0 +1,101 @@
+"""
+Tests for the shared, pooled WeexClient transport (no network - fake session calls)
+"""
+
+import base64
+import hashlib
+import hmac
+import threading
+
+import pytest
+
+import weex_client
+from weex_client import WeexClient, get_shared_client
+
+
+class FakeResponse:
+    status_code = 200
+    text = "{}"
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+@pytest.fixture
+def no_env_credentials(monkeypatch):
+    for name in ("WEEX_API_KEY", "WEEX_SECRET_KEY", "WEEX_PASSPHRASE"):
+        monkeypatch.setenv(name, "")
+
+
+@pytest.fixture
+def fresh_shared(monkeypatch):
+    monkeypatch.setattr(weex_client, "_shared_client", None)
+
+
+def make_client(**kwargs):
+    return WeexClient(api_key="key", secret_key="secret", passphrase="pass", **kwargs)
+
+
+def test_signed_request_goes_through_session(monkeypatch):
+    client = make_client()
+    calls = []
+    monkeypatch.setattr(client.session, "get",
+                        lambda url, **kw: calls.append((url, kw)) or FakeResponse([{"total": "1"}]))
+
+    data = client.request("GET", "/capi/v2/position/positions", {"symbol": "cmt_solusdt"})
+
+    assert data == [{"total": "1"}]
+    url, kw = calls[0]
+    assert url == "https://api-contract.weex.com/capi/v2/position/positions?symbol=cmt_solusdt"
+    headers = kw["headers"]
+    prehash = headers["ACCESS-TIMESTAMP"] + "GET/capi/v2/position/positions?symbol=cmt_solusdt"
+    expected = base64.b64encode(hmac.new(b"secret", prehash.encode(), hashlib.sha256).digest()).decode()
+    assert headers["ACCESS-SIGN"] == expected
+    assert headers["ACCESS-KEY"] == "key" and headers["ACCESS-PASSPHRASE"] == "pass"
+
+
+def test_pool_only_grows():
+    client = make_client(pool_size=4)
+    adapter = client.session.get_adapter("https://api-contract.weex.com")
+    assert client.pool_size == 4 and adapter._pool_maxsize == 4
+
+    client.ensure_pool(16)
+    client.ensure_pool(8)
+    assert client.pool_size == 16
+    assert client.session.get_adapter("https://x")._pool_maxsize == 16
+
+
+def test_warm_up_opens_pool_concurrently(monkeypatch):
+    client = make_client(pool_size=6)
+    barrier = threading.Barrier(6, timeout=2)
+
+    def fake_get(url, **kw):
+        barrier.wait()  # all six in flight at once
+        return FakeResponse({"epoch": "1"})
+
+    monkeypatch.setattr(client.session, "get", fake_get)
+    assert client.warm_up() == 6
+
+
+def test_public_only_client_refuses_signed_calls(no_env_credentials):
+    with pytest.raises(ValueError):
+        WeexClient()
+
+    client = WeexClient(require_auth=False)
+    assert not client.has_credentials
+    with pytest.raises(ValueError):
+        client.request("GET", "/capi/v2/account/assets")
+
+
+def test_shared_client_is_a_singleton(no_env_credentials, fresh_shared):
+    public = get_shared_client(require_auth=False)
+    assert get_shared_client(require_auth=False, pool_size=24) is public
+    assert public.pool_size == 24
+    with pytest.raises(ValueError):
+        get_shared_client()
+
+    public.api_key, public.secret_key, public.passphrase = "k", "s", "p"
+    assert get_shared_client() is public
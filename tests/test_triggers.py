@@ -0,0 +1,65 @@
+"""
+Tests for the per-symbol stop/target/trailing trigger index
+"""
+
+from utils.triggers import TriggerIndex
+
+
+def kinds(hits):
+    return [(hit.key, hit.kind) for hit in hits]
+
+
+def test_only_crossed_positions_are_returned():
+    index = TriggerIndex()
+    for i in range(100):
+        index.add(i, 'cmt_solusdt', 'long', stop=90 - i * 0.1, target=110 + i)
+    index.add('short', 'cmt_solusdt', 'short', stop=105, target=95)
+    index.add('eth', 'cmt_ethusdt', 'long', stop=1, target=2)
+
+    assert index.tick('cmt_solusdt', 100) == []
+    assert kinds(index.tick('cmt_solusdt', 89.85)) == [(1, 'stop'), (0, 'stop'), ('short', 'target')]
+    assert kinds(index.tick('cmt_solusdt', 106)) == [('short', 'stop')]
+    assert index.tick('cmt_btcusdt', 100) == []
+
+    # Exits stay armed until the close went through
+    assert kinds(index.tick('cmt_solusdt', 106)) == [('short', 'stop')]
+    index.remove('short')
+    assert index.tick('cmt_solusdt', 106) == []
+    assert len(index) == 101
+
+
+def test_trailing_stop_moves_in_place():
+    index = TriggerIndex()
+    index.add('a', 'cmt_solusdt', 'long', stop=98, target=110, trail_pct=1.0, activation=101)
+
+    assert index.tick('cmt_solusdt', 100.5) == []
+    assert kinds(index.tick('cmt_solusdt', 101.5)) == [('a', 'activation')]
+    assert index.get('a').trail_stop == 101.5 * 0.99
+
+    assert kinds(index.tick('cmt_solusdt', 104)) == [('a', 'ratchet')]   # new high moves the trail
+    assert index.get('a').extreme == 104
+    assert index.tick('cmt_solusdt', 103.5) == []      # pullback above the trail
+    hits = index.tick('cmt_solusdt', 102.9)
+    assert kinds(hits) == [('a', 'trail')] and hits[0].level == 104 * 0.99
+
+
+def test_short_trailing_and_disarmed_stop_target():
+    index = TriggerIndex()
+    index.add('s', 'cmt_ethusdt', 'sell', stop=102, target=95, trail_pct=2.0,
+              activation=99, keep_armed=False)
+
+    assert kinds(index.tick('cmt_ethusdt', 98)) == [('s', 'activation')]
+    assert kinds(index.tick('cmt_ethusdt', 94)) == [('s', 'ratchet')]   # target disarmed once trailing
+    assert index.get('s').trail_stop == 94 * 1.02
+    assert kinds(index.tick('cmt_ethusdt', 96)) == [('s', 'trail')]
+
+
+def test_trailing_wins_over_target_on_the_same_tick():
+    index = TriggerIndex()
+    index.add('a', 'cmt_solusdt', 'long', target=100, trail_pct=5, price=110)
+    assert index.get('a').trailing_active
+    hits = index.tick('cmt_solusdt', 101)       # above the target, below the 104.5 trail
+    assert kinds(hits) == [('a', 'trail')]
+
+    index.remove('a')
+    assert index.symbols() == []
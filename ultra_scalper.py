@@ -24,6 +24,12 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from weex_client import WeexClient
+from utils.candle_store import CandleStore
+from utils.contracts import ContractRegistry
+from utils.parallel_scan import ParallelScanner
+from utils.triggers import TriggerIndex
+from utils.incremental import IndicatorStream
+from utils import indicators
 
 # ═══════════════════════════════════════════════════════════════
 # CONFIGURACIÓN ULTRA AGRESIVA
@@ -40,6 +46,7 @@ MAX_DAILY_LOSS = 100         # Máximo pérdida diaria $100
 RSI_OVERSOLD = 30            # RSI < 30 = LONG
 RSI_OVERBOUGHT = 70          # RSI > 70 = SHORT
 RSI_PERIOD = 14
+USE_INCREMENTAL_INDICATORS = True  # RSI O(1) por vela nueva; el RSI 'sma' solo usa las últimas 14 velas, igual que la ventana
 
 # Whale Detection (volumen anormal)
 WHALE_VOLUME_MULTIPLIER = 2.0  # Volumen > 2x promedio = ballena
@@ -51,28 +58,33 @@ STOP_LOSS_PCT = 2.0          # 2% SL (tight, protege capital)
 TRAILING_STOP_PCT = 1.5      # 1.5% trailing 
 TRAILING_ACTIVATION = 1.0    # Activa trailing después de +1%
 
+# Protección en el exchange (bracket: entrada + TP/SL como plan orders de WEEX)
+USE_EXCHANGE_BRACKETS = False  # True: el exchange cierra aunque el bot se cuelgue
+BRACKET_TRAIL_STEP_PCT = 0.2   # Mover el SL del exchange solo si el trailing avanzó >= 0.2%
+
 # Timing
 SCAN_INTERVAL = 10           # Escanear cada 10 segundos (más rápido)
+PARALLEL_SCAN = True         # Analizar todas las monedas a la vez (False: una por una)
+SCAN_WORKERS = 6             # Análisis simultáneos (uno por moneda)
 COOLDOWN_SECONDS = 60        # 1 minuto entre trades misma moneda
 
 # Monedas a tradear (las más volátiles)
 COINS = ['SOL', 'ETH', 'DOGE', 'ADA', 'LTC', 'BNB']
 
-# Step sizes por moneda
-STEP_SIZES = {
-    'cmt_btcusdt': 0.001,
-    'cmt_ethusdt': 0.01,
-    'cmt_solusdt': 0.1,
-    'cmt_bnbusdt': 0.1,
-    'cmt_adausdt': 10,
-    'cmt_dogeusdt': 100,
-    'cmt_ltcusdt': 0.1,
-}
-
 
 class UltraScalper:
-    def __init__(self):
-        self.client = WeexClient()
+    def __init__(self, client=None, candle_store=None, contracts=None):
+        """
+        Args:
+            client: WeexClient (se crea uno si no se pasa; el backtest usa SimulatedWeexClient)
+            candle_store: Fuente de velas con get_arrays (CandleStore sobre el cliente por defecto)
+            contracts: ContractRegistry con lot step / tick por moneda (del exchange por defecto)
+        """
+        self.client = client or WeexClient()
+        self.candles = candle_store or CandleStore(self.client)
+        self.contracts = contracts or ContractRegistry(self.client)
+        self.scanner = ParallelScanner(SCAN_WORKERS if PARALLEL_SCAN else 1, client=self.client)
+        self.indicator_streams = {}
         self.positions = {}
         self.cooldowns = {}
         self.daily_pnl = 0
@@ -80,6 +92,7 @@ class UltraScalper:
         self.wins = 0
         self.losses = 0
         self.trailing_data = {}
+        self.triggers = TriggerIndex()  # TP / SL / trailing de todas las posiciones, por símbolo
         
         # Verificar balance inicial
         self.check_balance()
@@ -103,9 +116,6 @@ class UltraScalper:
     def get_symbol(self, coin: str) -> str:
         return f"cmt_{coin.lower()}usdt"
     
-    def get_step_size(self, symbol: str) -> float:
-        return STEP_SIZES.get(symbol, 0.01)
-    
     def calculate_size(self, symbol: str, price: float) -> float:
         """Calcular tamaño usando el margen disponible"""
         # Usar porcentaje del margen disponible
@@ -117,51 +127,20 @@ class UltraScalper:
         
         # Calcular notional con leverage
         notional = trade_margin * LEVERAGE
-        raw_size = notional / price
-        step = self.get_step_size(symbol)
-        size = round(raw_size / step) * step
-        
-        # Asegurar decimales correctos
-        decimals = len(str(step).split('.')[-1]) if '.' in str(step) else 0
-        return round(size, decimals)
+        # Redondear al lot step del contrato
+        return self.contracts.get(symbol).size_for_notional(notional, price)
     
     def calculate_rsi(self, closes: list, period: int = RSI_PERIOD) -> float:
         """Calcular RSI"""
-        if len(closes) < period + 1:
-            return 50.0
-        
-        gains = []
-        losses = []
-        
-        for i in range(1, len(closes)):
-            change = closes[i] - closes[i-1]
-            gains.append(max(0, change))
-            losses.append(max(0, -change))
-        
-        if len(gains) < period:
-            return 50.0
-        
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
-        
-        if avg_loss == 0:
-            return 100.0 if avg_gain > 0 else 50.0
-        
-        rs = avg_gain / avg_loss
-        return 100 - (100 / (1 + rs))
+        return indicators.rsi(closes, period)
     
     def detect_whale(self, volumes: list) -> tuple:
         """Detectar actividad de ballena (volumen anormal)"""
         if len(volumes) < 20:
             return False, 1.0
         
-        avg_volume = sum(volumes[-20:-1]) / 19  # Promedio sin la última vela
-        current_volume = volumes[-1]
-        
-        if avg_volume <= 0:
-            return False, 1.0
-        
-        volume_ratio = current_volume / avg_volume
+        # Promedio de 19 velas sin la última
+        volume_ratio = indicators.volume_ratio(volumes, 19, exclude_last=True)
         is_whale = volume_ratio >= WHALE_VOLUME_MULTIPLIER
         
         return is_whale, volume_ratio
@@ -188,27 +167,28 @@ class UltraScalper:
                 return None
             
             # Obtener velas
-            candles = self.client.get_candles(symbol, granularity='1m', limit=50)
-            if not candles or len(candles) < 25:
+            bars = self.candles.get_arrays(symbol, granularity='1m', limit=50)
+            if len(bars.ts) < 25:
                 return None
             
-            candles_sorted = sorted(candles, key=lambda x: int(x[0]))
-            
-            closes = [float(c[4]) for c in candles_sorted]
-            volumes = [float(c[5]) for c in candles_sorted]
-            highs = [float(c[2]) for c in candles_sorted]
-            lows = [float(c[3]) for c in candles_sorted]
+            closes, volumes = bars.close, bars.volume
+            highs, lows = bars.high, bars.low
             
             # Calcular indicadores
-            rsi = self.calculate_rsi(closes)
+            if USE_INCREMENTAL_INDICATORS:
+                stream = self.indicator_streams.get(symbol)
+                if stream is None:
+                    stream = self.indicator_streams[symbol] = IndicatorStream(rsi_period=RSI_PERIOD)
+                rsi = stream.sync(bars)['rsi']
+            else:
+                rsi = self.calculate_rsi(closes)
             is_whale, volume_ratio = self.detect_whale(volumes)
             
             # Momentum: cambio % en últimas 3 velas
             momentum = ((closes[-1] - closes[-4]) / closes[-4]) * 100 if closes[-4] > 0 else 0
             
             # Volatilidad
-            ranges = [(h - l) / l * 100 for h, l in zip(highs[-10:], lows[-10:]) if l > 0]
-            volatility = sum(ranges) / len(ranges) if ranges else 0
+            volatility = indicators.range_volatility(highs, lows, 10)
             
             # Generar señal
             signal = None
@@ -281,13 +261,22 @@ class UltraScalper:
             stop_loss = round(price * (1 + STOP_LOSS_PCT / 100), 6)
             take_profit = round(price * (1 - TAKE_PROFIT_PCT / 100), 6)
         
-        # Ejecutar orden
-        result = self.client.place_order(
-            symbol=symbol,
-            side=side,
-            order_type='market',
-            size=str(size)
-        )
+        # Ejecutar orden (con bracket, TP/SL quedan en el exchange)
+        bracket = None
+        if USE_EXCHANGE_BRACKETS:
+            bracket = self.client.place_bracket(
+                symbol, signal, size,
+                take_profit=self.contracts.round_price(symbol, take_profit),
+                stop_loss=self.contracts.round_price(symbol, stop_loss)
+            )
+            result = {'order_id': bracket.entry_order_id} if bracket else None
+        else:
+            result = self.client.place_order(
+                symbol=symbol,
+                side=side,
+                order_type='market',
+                size=str(size)
+            )
         
         # Verificar resultado
         order_id = None
@@ -302,11 +291,18 @@ class UltraScalper:
                 'side': signal,
                 'entry_price': price,
                 'size': size,
-                'highest': price if signal == 'long' else 999999,
-                'lowest': price if signal == 'short' else 0,
                 'trailing_active': False,
+                'bracket': bracket,
                 'entry_time': datetime.now()
             }
+            sign = 1 if signal == 'long' else -1
+            self.triggers.add(
+                order_id, symbol, signal,
+                stop=price * (1 - sign * STOP_LOSS_PCT / 100),
+                target=price * (1 + sign * TAKE_PROFIT_PCT / 100),
+                trail_pct=TRAILING_STOP_PCT,
+                activation=price * (1 + sign * TRAILING_ACTIVATION / 100)
+            )
             
             self.cooldowns[symbol] = datetime.now()
             self.trades_today += 1
@@ -325,91 +321,90 @@ class UltraScalper:
             return {'success': False, 'error': error}
     
     def manage_positions(self):
-        """Gestionar posiciones abiertas con trailing stop"""
-        to_close = []
-        
-        for order_id, pos in list(self.trailing_data.items()):
+        """Gestionar posiciones abiertas: un ticker por símbolo, el índice decide qué cerrar"""
+        for symbol in self.triggers.symbols():
             try:
-                symbol = pos['symbol']
-                side = pos['side']
-                entry = pos['entry_price']
-                size = pos['size']
-                
-                # Obtener precio actual
                 ticker = self.client.get_ticker(symbol)
                 if not ticker:
                     continue
                 
                 ticker_data = ticker.get('data', ticker) if isinstance(ticker, dict) else ticker
-                current = float(ticker_data.get('last', 0))
-                if current <= 0:
-                    continue
-                
-                # Calcular PnL
-                if side == 'long':
-                    pnl_pct = ((current - entry) / entry) * 100
-                    pos['highest'] = max(pos['highest'], current)
-                    drawdown = ((pos['highest'] - current) / pos['highest']) * 100
-                else:
-                    pnl_pct = ((entry - current) / entry) * 100
-                    pos['lowest'] = min(pos['lowest'], current)
-                    drawdown = ((current - pos['lowest']) / pos['lowest']) * 100 if pos['lowest'] > 0 else 0
-                
-                should_close = False
-                close_reason = ""
-                
-                # Activar trailing
-                if pnl_pct >= TRAILING_ACTIVATION and not pos['trailing_active']:
+                self._on_tick(symbol, float(ticker_data.get('last', 0)))
+            except Exception as e:
+                continue
+    
+    def _on_tick(self, symbol: str, current: float):
+        """Aplicar un precio: solo se evalúan las posiciones cuyo trigger se cruzó"""
+        for hit in self.triggers.tick(symbol, current):
+            pos = self.trailing_data.get(hit.key)
+            if pos is None:
+                self.triggers.remove(hit.key)
+                continue
+            
+            entry = pos['entry_price']
+            if pos['side'] == 'long':
+                pnl_pct = ((current - entry) / entry) * 100
+            else:
+                pnl_pct = ((entry - current) / entry) * 100
+            
+            # Activar trailing / el trailing avanzó
+            if not hit.is_exit:
+                if hit.kind == 'activation':
                     pos['trailing_active'] = True
                     print(f"   📈 Trailing activado {pos['coin']} (+{pnl_pct:.1f}%)")
-                
-                # Trailing stop hit
-                if pos['trailing_active'] and drawdown >= TRAILING_STOP_PCT:
-                    should_close = True
-                    close_reason = f"Trailing ({pnl_pct:+.1f}%)"
-                
-                # Take profit
-                elif pnl_pct >= TAKE_PROFIT_PCT:
-                    should_close = True
-                    close_reason = f"TP ({pnl_pct:+.1f}%)"
-                
-                # Stop loss
-                elif pnl_pct <= -STOP_LOSS_PCT:
-                    should_close = True
-                    close_reason = f"SL ({pnl_pct:+.1f}%)"
-                
-                if should_close:
-                    close_side = 'close_long' if side == 'long' else 'close_short'
-                    
-                    close_result = self.client.place_order(
-                        symbol=symbol,
-                        side=close_side,
-                        order_type='market',
-                        size=str(size)
-                    )
-                    
-                    if close_result and (close_result.get('order_id') or close_result.get('data')):
-                        # Calcular PnL real basado en el tamaño de posición
-                        pnl_usd = pnl_pct * size * entry / 100
-                        
-                        self.daily_pnl += pnl_usd
-                        
-                        if pnl_usd > 0:
-                            self.wins += 1
-                            emoji = "✅"
-                        else:
-                            self.losses += 1
-                            emoji = "❌"
-                        
-                        print(f"   {emoji} {pos['coin']} {close_reason}: ${pnl_usd:+.2f}")
-                        to_close.append(order_id)
-                        
+                if pos.get('bracket'):
+                    self.client.trail_bracket(pos['bracket'], self.contracts.round_price(symbol, hit.level),
+                                              BRACKET_TRAIL_STEP_PCT)
+                continue
+            
+            if hit.kind == 'trail':
+                close_reason = f"Trailing ({pnl_pct:+.1f}%)"
+            elif hit.kind == 'target':
+                close_reason = f"TP ({pnl_pct:+.1f}%)"
+            else:
+                close_reason = f"SL ({pnl_pct:+.1f}%)"
+            
+            try:
+                if self.close_position(pos, pnl_pct, close_reason):
+                    self.triggers.remove(hit.key)
+                    del self.trailing_data[hit.key]
             except Exception as e:
                 continue
+    
+    def close_position(self, pos: dict, pnl_pct: float, close_reason: str) -> bool:
+        """Cerrar a mercado; True si el exchange aceptó la orden"""
+        close_side = 'close_long' if pos['side'] == 'long' else 'close_short'
+        size = pos['size']
         
-        for oid in to_close:
-            if oid in self.trailing_data:
-                del self.trailing_data[oid]
+        if pos.get('bracket'):
+            # Cancela los plan orders; si el exchange ya cerró, no manda orden
+            close_result = self.client.close_bracket(pos['bracket'])
+        else:
+            close_result = self.client.place_order(
+                symbol=pos['symbol'],
+                side=close_side,
+                order_type='market',
+                size=str(size)
+            )
+        
+        if not (close_result and (close_result.get('order_id') or close_result.get('data')
+                                  or close_result.get('closed_by_plan'))):
+            return False
+        
+        # Calcular PnL real basado en el tamaño de posición
+        pnl_usd = pnl_pct * size * pos['entry_price'] / 100
+        
+        self.daily_pnl += pnl_usd
+        
+        if pnl_usd > 0:
+            self.wins += 1
+            emoji = "✅"
+        else:
+            self.losses += 1
+            emoji = "❌"
+        
+        print(f"   {emoji} {pos['coin']} {close_reason}: ${pnl_usd:+.2f}")
+        return True
     
     def display_status(self, analyses: list):
         """Mostrar estado actual"""
@@ -453,6 +448,72 @@ class UltraScalper:
         print(f"📊 Posiciones: {len(self.trailing_data)} | Trades: {self.trades_today} | W/L: {self.wins}/{self.losses} ({win_rate:.0f}%)")
         print(f"💰 PnL Hoy: ${self.daily_pnl:+.2f} | Balance: ${self.equity:,.2f} | Disponible: ${self.available:,.2f}")
     
+    def run_cycle(self) -> bool:
+        """
+        Un scan completo del loop principal (sin sleep); también lo usa el backtest
+        
+        Returns:
+            False si hay que detener el bot (pérdida máxima diaria)
+        """
+        # Check si hay margen
+        self.check_balance()
+        
+        # Gestionar posiciones existentes
+        if self.trailing_data:
+            self.manage_positions()
+        
+        # Verificar pérdida máxima diaria
+        if self.daily_pnl <= -MAX_DAILY_LOSS:
+            print(f"\n⛔ Pérdida máxima diaria alcanzada: ${self.daily_pnl:.2f}")
+            print("   Deteniendo bot para proteger capital...")
+            return False
+        
+        # Analizar todas las monedas (en paralelo, resultados en el orden de COINS)
+        analyses = self.scanner.scan_all(COINS, self.analyze_coin)
+        
+        # Mostrar estado
+        self.display_status(analyses)
+        
+        # Filtrar señales - AGRESIVO: 40% mínimo
+        signals = [a for a in analyses if a and a['signal'] and a['strength'] >= 40]
+        
+        # Ordenar por fuerza (whale primero, luego por strength)
+        signals.sort(key=lambda x: (x.get('is_whale', False), x['strength']), reverse=True)
+        
+        # Ejecutar trades
+        for a in signals[:2]:  # Máximo 2 trades por scan
+            symbol = a['symbol']
+            
+            if self.is_on_cooldown(symbol):
+                continue
+            
+            if len(self.trailing_data) >= MAX_POSITIONS:
+                print(f"   ⚠️ Máximo {MAX_POSITIONS} posiciones alcanzado")
+                break
+            
+            whale = "🐋" if a.get('is_whale') else ""
+            signal_type = "LONG" if a['signal'] == 'long' else "SHORT"
+            color = "🟢" if a['signal'] == 'long' else "🔴"
+            
+            print(f"\n{'🔥' * 10}")
+            print(f"   {whale} ¡SEÑAL {a['strength']}%!")
+            print(f"{'🔥' * 10}")
+            print(f"\n{color} {signal_type} en {a['coin']}")
+            print(f"   💰 Precio: ${a['price']:,.4f}")
+            print(f"   📊 RSI: {a['rsi']} | Vol: {a['volume_ratio']}x")
+            
+            result = self.execute_trade(a)
+            
+            if result['success']:
+                print(f"   ✅ Orden ejecutada: {result['order_id']}")
+                print(f"   📦 Size: {result['size']}")
+                print(f"   🛑 SL: ${result['stop_loss']:,.4f}")
+                print(f"   🎯 TP: ${result['take_profit']:,.4f}")
+            else:
+                print(f"   ⚠️ Error: {result['error']}")
+        
+        return True
+    
     def run(self):
         """Loop principal"""
         self.check_balance()
@@ -479,70 +540,9 @@ class UltraScalper:
         
         try:
             while True:
-                # Check si hay margen
-                self.check_balance()
-                
-                # Gestionar posiciones existentes
-                if self.trailing_data:
-                    self.manage_positions()
-                
-                # Verificar pérdida máxima diaria
-                if self.daily_pnl <= -MAX_DAILY_LOSS:
-                    print(f"\n⛔ Pérdida máxima diaria alcanzada: ${self.daily_pnl:.2f}")
-                    print("   Deteniendo bot para proteger capital...")
+                if not self.run_cycle():
                     break
                 
-                # Analizar todas las monedas
-                analyses = []
-                for coin in COINS:
-                    a = self.analyze_coin(coin)
-                    if a:
-                        analyses.append(a)
-                    time.sleep(0.2)
-                
-                # Mostrar estado
-                self.display_status(analyses)
-                
-                # Filtrar señales - AGRESIVO: 40% mínimo
-                signals = [a for a in analyses if a and a['signal'] and a['strength'] >= 40]
-                
-                # Ordenar por fuerza (whale primero, luego por strength)
-                signals.sort(key=lambda x: (x.get('is_whale', False), x['strength']), reverse=True)
-                
-                # Ejecutar trades
-                for a in signals[:2]:  # Máximo 2 trades por scan
-                    symbol = a['symbol']
-                    
-                    if self.is_on_cooldown(symbol):
-                        continue
-                    
-                    if len(self.trailing_data) >= MAX_POSITIONS:
-                        print(f"   ⚠️ Máximo {MAX_POSITIONS} posiciones alcanzado")
-                        break
-                    
-                    whale = "🐋" if a.get('is_whale') else ""
-                    signal_type = "LONG" if a['signal'] == 'long' else "SHORT"
-                    color = "🟢" if a['signal'] == 'long' else "🔴"
-                    
-                    print(f"\n{'🔥' * 10}")
-                    print(f"   {whale} ¡SEÑAL {a['strength']}%!")
-                    print(f"{'🔥' * 10}")
-                    print(f"\n{color} {signal_type} en {a['coin']}")
-                    print(f"   💰 Precio: ${a['price']:,.4f}")
-                    print(f"   📊 RSI: {a['rsi']} | Vol: {a['volume_ratio']}x")
-                    
-                    result = self.execute_trade(a)
-                    
-                    if result['success']:
-                        print(f"   ✅ Orden ejecutada: {result['order_id']}")
-                        print(f"   📦 Size: {result['size']}")
-                        print(f"   🛑 SL: ${result['stop_loss']:,.4f}")
-                        print(f"   🎯 TP: ${result['take_profit']:,.4f}")
-                    else:
-                        print(f"   ⚠️ Error: {result['error']}")
-                    
-                    time.sleep(0.5)
-                
                 print(f"\n⏳ Próximo scan en {SCAN_INTERVAL}s...")
                 time.sleep(SCAN_INTERVAL)
                 
@@ -1,7 +1,22 @@
 # Utils Package
 from .risk_manager import RiskManager, RiskLimits
 from .indicators import TechnicalIndicators, IndicatorSignal
-from .sentiment import DeepSeekSentiment, SentimentResult
+from .sentiment import DeepSeekSentiment, SentimentResult, SentimentCache
+from .rate_limiter import RateLimiter, TokenBucket
+from .market_stream import MarketDataCache, MarketStream, TickDispatcher
+from .candle_store import CandleStore
+from .ohlcv import OHLCV, OHLCVBuffer
+from .resampler import Resampler, MultiTimeframeView
+from .journal import DecisionJournal, tail_events, migrate_json_log
+from .trade_ledger import TradeLedger
+from .contracts import ContractRegistry, ContractSpec, quantize
+from .parallel_scan import ParallelScanner
+from .scheduler import TaskScheduler, ScheduledTask
+from .triggers import TriggerIndex, TriggerHit
+from .grid_reconciler import GridReconciler, GridPlan
+from .market_intel import MarketIntelProvider, get_market_intel
+from .state_store import StateStore, StateSnapshot
+from .incremental import IndicatorStream, IncrementalRSI, IncrementalEMA, IncrementalMACD, RollingBollinger, IncrementalATR
 
 __all__ = [
     'RiskManager', 
@@ -9,5 +24,40 @@ __all__ = [
     'TechnicalIndicators',
     'IndicatorSignal',
     'DeepSeekSentiment',
-    'SentimentResult'
+    'SentimentResult',
+    'SentimentCache',
+    'RateLimiter',
+    'TokenBucket',
+    'MarketDataCache',
+    'MarketStream',
+    'TickDispatcher',
+    'CandleStore',
+    'OHLCV',
+    'OHLCVBuffer',
+    'Resampler',
+    'MultiTimeframeView',
+    'DecisionJournal',
+    'tail_events',
+    'migrate_json_log',
+    'TradeLedger',
+    'ContractRegistry',
+    'ContractSpec',
+    'quantize',
+    'ParallelScanner',
+    'TaskScheduler',
+    'ScheduledTask',
+    'TriggerIndex',
+    'TriggerHit',
+    'GridReconciler',
+    'GridPlan',
+    'MarketIntelProvider',
+    'get_market_intel',
+    'StateStore',
+    'StateSnapshot',
+    'IndicatorStream',
+    'IncrementalRSI',
+    'IncrementalEMA',
+    'IncrementalMACD',
+    'RollingBollinger',
+    'IncrementalATR'
 ]
@@ -0,0 +1,251 @@
+"""
+🗄️ Persistent Candle Store
+SQLite-backed OHLCV cache keyed by (symbol, granularity) with incremental sync
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from .ohlcv import OHLCV, OHLCVBuffer
+
+
+# Candle interval length in milliseconds (WEEX granularity naming)
+GRANULARITY_MS = {
+    '1m': 60_000,
+    '5m': 300_000,
+    '15m': 900_000,
+    '30m': 1_800_000,
+    '1H': 3_600_000,
+    '4H': 14_400_000,
+    '1D': 86_400_000,
+    '1W': 604_800_000,
+}
+
+
+class CandleStore:
+    """
+    Local candle database in front of WeexClient.get_candles
+
+    Each sync only asks the exchange for the bars after the last stored
+    timestamp (plus that bar again, since it may have been stored while
+    still forming) and for any hole inside the requested window. In steady
+    state that is one bar per symbol per cycle instead of the full window.
+
+    Drop-in for the client call:
+        store = CandleStore(client)
+        candles = store.get_candles("cmt_btcusdt", "5m", 50)
+
+    Hot paths should use get_arrays() instead: synced bars are also kept in
+    an in-memory OHLCVBuffer per (symbol, granularity), parsed once.
+    """
+
+    MAX_FETCH = 1000  # WEEX candle endpoint limit
+
+    def __init__(self, client, path: str = "candles.db", max_bars: int = 5000,
+                 buffer_size: int = 1000):
+        """
+        Args:
+            client: WeexClient (or anything with get_candles(symbol, granularity, limit))
+            path: SQLite file (":memory:" for a throwaway store)
+            max_bars: Bars kept per (symbol, granularity); older rows are pruned
+            buffer_size: Bars kept in memory per (symbol, granularity) for get_arrays
+        """
+        self.client = client
+        self.path = path
+        self.max_bars = max_bars
+        self.buffer_size = buffer_size
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS candles (
+                symbol TEXT NOT NULL,
+                granularity TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                open REAL, high REAL, low REAL, close REAL, volume REAL,
+                PRIMARY KEY (symbol, granularity, ts)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+        # Bars the exchange has no data for (no trades) - don't refetch forever
+        self._holes: Dict[Tuple[str, str], Set[int]] = {}
+        self._buffers: Dict[Tuple[str, str], OHLCVBuffer] = {}
+
+        self.fetched_bars = 0
+        self.requests = 0
+
+    # ==================== PUBLIC API ====================
+
+    def get_candles(self, symbol: str = "cmt_btcusdt", granularity: str = "1m",
+                    limit: int = 100) -> List[List]:
+        """
+        Latest `limit` candles, syncing only what is missing
+
+        Args:
+            symbol: Trading pair (e.g., "cmt_btcusdt")
+            granularity: Candle interval (1m, 5m, 15m, 30m, 1H, 4H, 1D, 1W)
+            limit: Number of candles
+
+        Returns:
+            [[ts, open, high, low, close, volume], ...] oldest first
+        """
+        try:
+            self.sync(symbol, granularity, limit)
+        except Exception as e:
+            print(f"⚠️ Candle sync failed {symbol} {granularity}: {e}")
+        return self.read(symbol, granularity, limit)
+
+    def get_arrays(self, symbol: str = "cmt_btcusdt", granularity: str = "1m",
+                   limit: int = 100) -> OHLCV:
+        """
+        Latest `limit` candles as column arrays, syncing only what is missing
+
+        Returns:
+            OHLCV of zero-copy views (oldest first); valid until the next sync
+        """
+        try:
+            self.sync(symbol, granularity, limit)
+        except Exception as e:
+            print(f"⚠️ Candle sync failed {symbol} {granularity}: {e}")
+        with self._lock:
+            return self._buffer(symbol, granularity, limit).window(limit)
+
+    def _buffer(self, symbol: str, granularity: str, limit: int) -> OHLCVBuffer:
+        """In-memory window for a key, loaded from SQLite the first time (caller holds the lock)"""
+        key = (symbol, granularity)
+        buf = self._buffers.get(key)
+        if buf is None or buf.capacity < limit:
+            buf = OHLCVBuffer(max(self.buffer_size, limit))
+            rows = self._conn.execute(
+                "SELECT ts, open, high, low, close, volume FROM candles "
+                "WHERE symbol = ? AND granularity = ? ORDER BY ts DESC LIMIT ?",
+                (symbol, granularity, buf.capacity)
+            ).fetchall()
+            buf.extend(rows[::-1])
+            self._buffers[key] = buf
+        return buf
+
+    def read(self, symbol: str, granularity: str, limit: int = 100) -> List[List]:
+        """Stored candles only (no network), oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ts, open, high, low, close, volume FROM candles "
+                "WHERE symbol = ? AND granularity = ? ORDER BY ts DESC LIMIT ?",
+                (symbol, granularity, limit)
+            ).fetchall()
+        return [list(r) for r in reversed(rows)]
+
+    def last_timestamp(self, symbol: str, granularity: str) -> Optional[int]:
+        """Open time of the newest stored bar"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(ts) FROM candles WHERE symbol = ? AND granularity = ?",
+                (symbol, granularity)
+            ).fetchone()
+        return row[0] if row else None
+
+    # ==================== SYNC ====================
+
+    def bars_needed(self, symbol: str, granularity: str, limit: int,
+                    now_ms: int = None) -> int:
+        """
+        How many of the most recent bars must be fetched to complete the window
+
+        Covers new bars since the last stored one (re-fetching that one) and
+        the oldest hole inside the last `limit` intervals.
+        """
+        step = GRANULARITY_MS.get(granularity)
+        if step is None:
+            return min(limit, self.MAX_FETCH)
+
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        current_open = now_ms - now_ms % step
+        window_start = current_open - (limit - 1) * step
+
+        with self._lock:
+            stored = {r[0] for r in self._conn.execute(
+                "SELECT ts FROM candles WHERE symbol = ? AND granularity = ? AND ts >= ?",
+                (symbol, granularity, window_start)
+            )}
+        if not stored:
+            return min(limit, self.MAX_FETCH)
+
+        holes = self._holes.get((symbol, granularity), set())
+        last_ts = max(stored)
+        oldest_needed = last_ts  # always refresh the newest stored bar
+        for ts in range(window_start, last_ts, step):
+            if ts not in stored and ts not in holes:
+                oldest_needed = ts
+                break
+
+        return min((current_open - oldest_needed) // step + 1, self.MAX_FETCH)
+
+    def sync(self, symbol: str, granularity: str = "1m", limit: int = 100) -> int:
+        """
+        Fetch and store the bars missing from the last `limit` intervals
+
+        Returns:
+            Number of bars received from the exchange
+        """
+        need = self.bars_needed(symbol, granularity, limit)
+        candles = self.client.get_candles(symbol, granularity, need)
+        self.requests += 1
+        if isinstance(candles, dict):
+            candles = candles.get('data', [])
+        if not isinstance(candles, list) or not candles:
+            return 0
+
+        rows = []
+        for c in candles:
+            try:
+                rows.append((symbol, granularity, int(float(c[0])), float(c[1]),
+                             float(c[2]), float(c[3]), float(c[4]), float(c[5])))
+            except (TypeError, ValueError, IndexError):
+                continue
+        if not rows:
+            return 0
+
+        self._record_holes(symbol, granularity, [r[2] for r in rows])
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO candles "
+                "(symbol, granularity, ts, open, high, low, close, volume) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            step = GRANULARITY_MS.get(granularity)
+            if step:
+                cutoff = max(r[2] for r in rows) - self.max_bars * step
+                self._conn.execute(
+                    "DELETE FROM candles WHERE symbol = ? AND granularity = ? AND ts < ?",
+                    (symbol, granularity, cutoff)
+                )
+            self._conn.commit()
+
+            buf = self._buffers.get((symbol, granularity))
+            if buf is not None:
+                buf.extend([r[2:] for r in rows])
+
+        self.fetched_bars += len(rows)
+        return len(rows)
+
+    def _record_holes(self, symbol: str, granularity: str, timestamps: List[int]):
+        """Remember intervals the exchange skipped inside a fetched range"""
+        step = GRANULARITY_MS.get(granularity)
+        if not step or len(timestamps) < 2:
+            return
+        received = set(timestamps)
+        holes = self._holes.setdefault((symbol, granularity), set())
+        for ts in range(min(received), max(received), step):
+            if ts not in received:
+                holes.add(ts)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
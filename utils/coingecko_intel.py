@@ -11,14 +11,23 @@ Features:
 
 import os
 import time
+import numpy as np
 import requests
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+from .market_intel import FEAR_GREED, GLOBAL, get_market_intel
+
 load_dotenv()
 
+# /coins/markets page size limit
+MARKETS_PAGE_SIZE = 250
+
+# Volume / market cap above this is unusual activity (normal is about 2-5%)
+VOLUME_SPIKE_RATIO = 0.08
+
 
 @dataclass
 class MarketOpportunity:
@@ -37,6 +46,56 @@ class MarketOpportunity:
     reason: str
 
 
+def _column(coins: List[Dict], key: str, default: float, null: float = np.nan) -> np.ndarray:
+    """float64 column of a /coins/markets field (missing -> default, null -> null)"""
+    values = [c.get(key, default) for c in coins]
+    return np.array([null if v is None else v for v in values], dtype=np.float64)
+
+
+class MarketSnapshot:
+    """
+    One /coins/markets listing as columns, for vectorized scans
+    
+    `rows` keeps the API dicts in market-cap order; every query returns
+    row positions (or the rows themselves), so results carry exactly the
+    fields the API sent.
+    """
+    
+    def __init__(self, coins: List[Dict], mapping: Dict[str, str], fetched_at: float = None):
+        self.rows = coins
+        self.fetched_at = fetched_at or time.time()
+        self.ids = np.array([c.get('id') for c in coins], dtype=object)
+        self.on_weex = np.array([c.get('id') in mapping for c in coins], dtype=bool)
+        self.change_24h = _column(coins, 'price_change_percentage_24h', 0, null=0)
+        # A null volume or cap leaves the coin out of the volume ratio
+        self.volume = _column(coins, 'total_volume', 0)
+        self.market_cap = _column(coins, 'market_cap', 1)
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+    
+    def select(self, positions) -> List[Dict]:
+        return [self.rows[i] for i in positions]
+    
+    def movers(self, limit: int) -> Dict[str, np.ndarray]:
+        """WEEX coins by 24h change: top `limit` gainers and losers (row positions)"""
+        weex = np.flatnonzero(self.on_weex)
+        # Stable descending order: ties keep market-cap order
+        ranked = weex[np.argsort(-self.change_24h[weex], kind='stable')]
+        return {'gainers': ranked[:limit], 'losers': ranked[-limit:][::-1] if limit else ranked[:0]}
+    
+    def volume_ratio(self) -> np.ndarray:
+        """24h volume / market cap (nan where the cap is missing or not positive)"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.market_cap > 0, self.volume / self.market_cap, np.nan)
+    
+    def volume_spikes(self, min_ratio: float = VOLUME_SPIKE_RATIO) -> np.ndarray:
+        """WEEX coins trading more than `min_ratio` of their cap, highest ratio first"""
+        ratio = self.volume_ratio()
+        hits = np.flatnonzero(self.on_weex & (ratio > min_ratio))
+        return hits[np.argsort(-ratio[hits], kind='stable')]
+
+
 class CoinGeckoIntel:
     """
     Market Intelligence usando CoinGecko API
@@ -73,19 +132,23 @@ class CoinGeckoIntel:
         'arbitrum': 'cmt_arbusdt',
     }
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, intel=None):
         """
         Initialize CoinGecko client
         
         Args:
             api_key: CoinGecko Pro API key (optional for basic usage)
+            intel: MarketIntelProvider for global data and Fear & Greed
+                   (defaults to the shared one)
         """
+        self.intel = intel or get_market_intel()
         self.api_key = api_key or os.getenv("COINGECKO_API_KEY", "CG-Eu1NbbK2sLt64PhW8TFY8Hor")
         self.session = requests.Session()
         
         # Cache to avoid rate limits
         self.cache = {}
         self.cache_ttl = 60  # 60 seconds cache
+        self._snapshots: Dict[int, MarketSnapshot] = {}
         
         # Rate limiting
         self.last_call = 0
@@ -184,54 +247,65 @@ class CoinGeckoIntel:
     
     def get_global_market(self) -> Dict:
         """
-        Get global market stats
+        Get global market stats (shared cache, never waits on the network)
         
         Returns:
             Dict with market cap, volume, BTC dominance, fear/greed
         """
-        data = self._request("/global")
-        if not data or 'data' not in data:
-            return {}
-        
-        d = data['data']
-        return {
-            'total_market_cap_usd': d.get('total_market_cap', {}).get('usd', 0),
-            'total_volume_24h': d.get('total_volume', {}).get('usd', 0),
-            'btc_dominance': d.get('market_cap_percentage', {}).get('btc', 0),
-            'eth_dominance': d.get('market_cap_percentage', {}).get('eth', 0),
-            'market_cap_change_24h': d.get('market_cap_change_percentage_24h_usd', 0),
-            'active_cryptocurrencies': d.get('active_cryptocurrencies', 0),
-        }
+        return self.intel.get(GLOBAL, default={})
     
     def get_fear_greed_index(self) -> Dict:
         """
-        Get Fear & Greed Index from alternative.me
+        Get Fear & Greed Index from alternative.me (shared cache)
         
         0-24: Extreme Fear (potential buy)
         25-49: Fear
         50-74: Greed
         75-100: Extreme Greed (potential sell)
         """
-        try:
-            resp = requests.get(
-                "https://api.alternative.me/fng/",
-                timeout=10
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                if data.get('data'):
-                    fng = data['data'][0]
-                    value = int(fng.get('value', 50))
-                    return {
-                        'value': value,
-                        'classification': fng.get('value_classification', 'Neutral'),
-                        'signal': 'buy' if value < 30 else ('sell' if value > 70 else 'neutral'),
-                        'timestamp': fng.get('timestamp')
-                    }
-        except:
-            pass
-        
-        return {'value': 50, 'classification': 'Neutral', 'signal': 'neutral'}
+        fng = self.intel.get(FEAR_GREED)
+        value = int(fng.get('value', 50))
+        fng['signal'] = 'buy' if value < 30 else ('sell' if value > 70 else 'neutral')
+        return fng
+    
+    def get_market_snapshot(self, limit: int = 100) -> MarketSnapshot:
+        """
+        Top coins by market cap as one columnar snapshot
+        
+        Fetched in 250-coin pages and reused for cache_ttl seconds, so the
+        movers and volume scans of one refresh share a single download.
+        
+        Args:
+            limit: Number of coins (by market cap)
+            
+        Returns:
+            MarketSnapshot (empty if the API did not answer)
+        """
+        snapshot = self._snapshots.get(limit)
+        if snapshot is not None and time.time() - snapshot.fetched_at < self.cache_ttl:
+            return snapshot
+        
+        coins = []
+        per_page = min(limit, MARKETS_PAGE_SIZE)
+        for page in range(1, -(-limit // per_page) + 1):
+            data = self._request("/coins/markets", params={
+                'vs_currency': 'usd',
+                'order': 'market_cap_desc',
+                'per_page': per_page,
+                'page': page,
+                'sparkline': 'false',
+                'price_change_percentage': '1h,24h,7d'
+            })
+            if not data:
+                break
+            coins.extend(data)
+            if len(data) < per_page:
+                break
+        
+        snapshot = MarketSnapshot(coins[:limit], self.WEEX_MAPPING)
+        if coins:
+            self._snapshots[limit] = snapshot
+        return snapshot
     
     def get_top_coins(self, limit: int = 50) -> List[Dict]:
         """
@@ -243,89 +317,60 @@ class CoinGeckoIntel:
         Returns:
             List of coins with price, volume, changes
         """
-        data = self._request("/coins/markets", params={
-            'vs_currency': 'usd',
-            'order': 'market_cap_desc',
-            'per_page': limit,
-            'page': 1,
-            'sparkline': 'false',
-            'price_change_percentage': '1h,24h,7d'
-        })
-        
-        if not data:
-            return []
-        
-        return data
+        return self.get_market_snapshot(limit).rows
     
-    def get_top_gainers_losers(self, limit: int = 20) -> Dict[str, List[Dict]]:
+    def get_top_gainers_losers(self, limit: int = 20,
+                               snapshot: MarketSnapshot = None) -> Dict[str, List[Dict]]:
         """
-        Get top gainers and losers in 24h
+        Get top gainers and losers in 24h (coins available on WEEX)
+        
+        Args:
+            limit: Coins per list
+            snapshot: Markets snapshot to scan (fetched if omitted)
         
         Returns:
             Dict with 'gainers' and 'losers' lists
         """
-        coins = self.get_top_coins(100)
-        if not coins:
-            return {'gainers': [], 'losers': []}
-        
-        # Filter coins available on WEEX
-        weex_coins = [c for c in coins if c.get('id') in self.WEEX_MAPPING]
-        
-        # Sort by 24h change
-        sorted_coins = sorted(weex_coins, key=lambda x: x.get('price_change_percentage_24h', 0) or 0, reverse=True)
-        
-        gainers = sorted_coins[:limit]
-        losers = sorted_coins[-limit:][::-1]
-        
+        snapshot = snapshot or self.get_market_snapshot(100)
+        movers = snapshot.movers(limit)
         return {
-            'gainers': gainers,
-            'losers': losers
+            'gainers': snapshot.select(movers['gainers']),
+            'losers': snapshot.select(movers['losers'])
         }
     
-    def get_volume_spikes(self, threshold: float = 2.0) -> List[Dict]:
+    def get_volume_spikes(self, threshold: float = 2.0,
+                          snapshot: MarketSnapshot = None) -> List[Dict]:
         """
         Detect coins with abnormal volume (potential whale activity)
         
+        High volume relative to market cap = unusual activity: more than
+        VOLUME_SPIKE_RATIO (8%) of the cap traded in 24h.
+        
         Args:
             threshold: Volume multiplier vs average (2.0 = 2x normal volume)
+            snapshot: Markets snapshot to scan (fetched if omitted)
             
         Returns:
-            List of coins with volume spikes
+            List of coins with volume spikes, highest ratio first
         """
-        coins = self.get_top_coins(100)
-        if not coins:
-            return []
-        
+        snapshot = snapshot or self.get_market_snapshot(100)
+        ratios = snapshot.volume_ratio()
         spikes = []
-        for coin in coins:
-            if coin.get('id') not in self.WEEX_MAPPING:
-                continue
-            
-            # Calculate volume to market cap ratio
-            volume = coin.get('total_volume', 0)
-            market_cap = coin.get('market_cap', 1)
-            
-            if market_cap > 0:
-                vol_ratio = volume / market_cap
-                
-                # High volume relative to market cap = unusual activity
-                # Normal is about 0.02-0.05 (2-5%)
-                if vol_ratio > 0.08:  # >8% is high
-                    spikes.append({
-                        'id': coin.get('id'),
-                        'symbol': coin.get('symbol', '').upper(),
-                        'name': coin.get('name'),
-                        'price': coin.get('current_price'),
-                        'volume_24h': volume,
-                        'market_cap': market_cap,
-                        'volume_ratio': vol_ratio,
-                        'change_24h': coin.get('price_change_percentage_24h', 0),
-                        'weex_symbol': self.WEEX_MAPPING.get(coin.get('id')),
-                        'signal': 'high_activity'
-                    })
-        
-        # Sort by volume ratio
-        return sorted(spikes, key=lambda x: x['volume_ratio'], reverse=True)
+        for i in snapshot.volume_spikes():
+            coin = snapshot.rows[i]
+            spikes.append({
+                'id': coin.get('id'),
+                'symbol': coin.get('symbol', '').upper(),
+                'name': coin.get('name'),
+                'price': coin.get('current_price'),
+                'volume_24h': coin.get('total_volume', 0),
+                'market_cap': coin.get('market_cap', 1),
+                'volume_ratio': float(ratios[i]),
+                'change_24h': coin.get('price_change_percentage_24h', 0),
+                'weex_symbol': self.WEEX_MAPPING.get(coin.get('id')),
+                'signal': 'high_activity'
+            })
+        return spikes
     
     # ═══════════════════════════════════════════════════════════════
     # OPPORTUNITY DETECTION
@@ -345,6 +390,7 @@ class CoinGeckoIntel:
             List of MarketOpportunity sorted by strength
         """
         opportunities = []
+        snapshot = self.get_market_snapshot(100)  # One markets download for steps 2 and 3
         
         # 1. Check trending coins
         print("🔍 Scanning trending coins...")
@@ -368,7 +414,7 @@ class CoinGeckoIntel:
         
         # 2. Check top movers
         print("🔍 Scanning top gainers/losers...")
-        movers = self.get_top_gainers_losers(10)
+        movers = self.get_top_gainers_losers(10, snapshot)
         
         # Gainers with extreme moves might reverse
         for coin in movers['gainers'][:5]:
@@ -410,7 +456,7 @@ class CoinGeckoIntel:
         
         # 3. Check volume spikes
         print("🔍 Scanning volume spikes (whale activity)...")
-        spikes = self.get_volume_spikes()
+        spikes = self.get_volume_spikes(snapshot=snapshot)
         for coin in spikes[:5]:
             opportunities.append(MarketOpportunity(
                 coin_id=coin['id'],
@@ -511,6 +557,7 @@ def main():
     print("="*60)
     
     intel = CoinGeckoIntel()
+    intel.intel.refresh_all()  # One-shot script: wait for fresh data
     
     # Global market
     print("\n📊 GLOBAL MARKET:")
@@ -0,0 +1,287 @@
+"""
+📐 Contract Registry
+Per-symbol trading rules (tick size, lot step, minimums, leverage) from the
+exchange's contract list, cached on disk
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+
+
+# Lot steps used when the exchange list can't be loaded (and by the backtest
+# simulator, whose contract list carries no trading rules)
+FALLBACK_LOT_STEPS = {
+    'cmt_btcusdt': 0.001,
+    'cmt_ethusdt': 0.01,
+    'cmt_solusdt': 0.1,
+    'cmt_bnbusdt': 0.1,
+    'cmt_adausdt': 10,
+    'cmt_dogeusdt': 100,
+    'cmt_ltcusdt': 0.1,
+    'cmt_xrpusdt': 10,
+    'cmt_avaxusdt': 0.1,
+    'cmt_dotusdt': 0.1,
+    'cmt_linkusdt': 0.1,
+    'cmt_nearusdt': 1,
+    'cmt_uniusdt': 0.1,
+    'cmt_arbusdt': 1,
+    'cmt_suiusdt': 1,
+    'cmt_aptusdt': 0.1,
+    'cmt_pepeusdt': 1000000,
+    'cmt_shibusdt': 100000,
+}
+DEFAULT_LOT_STEP = 0.01
+DEFAULT_MAX_LEVERAGE = 20
+
+CACHE_FILE = "contracts_cache.json"
+CACHE_TTL = 6 * 3600  # Contract rules rarely change; refresh a few times a day
+
+
+def step_decimals(step: float) -> int:
+    """Decimals needed to print a multiple of `step` exactly (0.001 -> 3, 100 -> 0)"""
+    if step <= 0 or step >= 1:
+        return 0
+    return max(0, -int(math.floor(math.log10(step) + 1e-9)))
+
+
+def quantize(value: float, step: float, decimals: int = None, mode: str = "nearest") -> float:
+    """
+    Round `value` to a multiple of `step`
+
+    Args:
+        value: Price or size
+        step: Tick size / lot step (<= 0 returns value unchanged)
+        decimals: Precomputed step_decimals(step) (hot paths)
+        mode: "nearest", "down" (never above value) or "up"
+
+    Returns:
+        The multiple, without float noise (0.30000000000000004 -> 0.3)
+    """
+    if step <= 0:
+        return value
+    if decimals is None:
+        decimals = step_decimals(step)
+    units = value / step
+    if mode == "down":
+        units = math.floor(units + 1e-9)
+    elif mode == "up":
+        units = math.ceil(units - 1e-9)
+    else:
+        units = round(units)
+    return round(units * step, decimals)
+
+
+@dataclass
+class ContractSpec:
+    """Trading rules of one contract"""
+    symbol: str
+    tick_size: float = 0.0          # 0 = unknown, prices are not rounded
+    lot_step: float = DEFAULT_LOT_STEP
+    min_size: float = 0.0
+    min_notional: float = 0.0       # USDT
+    max_leverage: int = DEFAULT_MAX_LEVERAGE
+
+    def __post_init__(self):
+        self._price_decimals = step_decimals(self.tick_size)
+        self._size_decimals = step_decimals(self.lot_step)
+
+    def round_price(self, price: float, mode: str = "nearest") -> float:
+        return quantize(price, self.tick_size, self._price_decimals, mode)
+
+    def round_size(self, size: float, mode: str = "nearest") -> float:
+        return quantize(size, self.lot_step, self._size_decimals, mode)
+
+    def size_for_notional(self, notional: float, price: float, mode: str = "nearest") -> float:
+        """Contract quantity worth `notional` USDT at `price`, on the lot grid"""
+        if price <= 0:
+            return 0.0
+        return self.round_size(notional / price, mode)
+
+    def is_valid(self, size: float, price: float) -> bool:
+        """Whether an order of `size` at `price` meets the exchange minimums"""
+        return size > 0 and size >= self.min_size and size * price >= self.min_notional
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def _number(contract: Dict, *keys, default: float = None) -> Optional[float]:
+    for key in keys:
+        try:
+            value = contract.get(key)
+            if value not in (None, ''):
+                return float(value)
+        except (TypeError, ValueError):
+            continue
+    return default
+
+
+def parse_contract(contract: Dict) -> Optional[ContractSpec]:
+    """
+    ContractSpec from one /capi/v2/market/contracts entry
+
+    WEEX reports precision as decimal places: tick_size is the number of
+    price decimals (times priceEndStep, the step of the last digit) and
+    size_increment the number of size decimals. Missing fields fall back
+    to FALLBACK_LOT_STEPS / the defaults.
+    """
+    symbol = contract.get('symbol') if isinstance(contract, dict) else None
+    if not symbol:
+        return None
+
+    tick_size = 0.0
+    price_decimals = _number(contract, 'tick_size', 'pricePlace')
+    if price_decimals is not None:
+        end_step = _number(contract, 'priceEndStep', default=1.0) or 1.0
+        tick_size = end_step * 10 ** -int(price_decimals)
+
+    size_decimals = _number(contract, 'size_increment', 'volumePlace')
+    if size_decimals is not None:
+        lot_step = 10 ** -int(size_decimals)
+    else:
+        lot_step = FALLBACK_LOT_STEPS.get(symbol, DEFAULT_LOT_STEP)
+
+    return ContractSpec(
+        symbol=symbol,
+        tick_size=tick_size,
+        lot_step=lot_step,
+        min_size=_number(contract, 'minOrderSize', 'minTradeNum', default=0.0),
+        min_notional=_number(contract, 'minNotional', 'minTradeUSDT', default=0.0),
+        max_leverage=int(_number(contract, 'maxLeverage', default=DEFAULT_MAX_LEVERAGE)),
+    )
+
+
+class ContractRegistry:
+    """
+    O(1) lookup of contract rules by symbol
+
+    The contract list is fetched once per process (and at most once per
+    `ttl` across restarts thanks to the JSON cache); every lookup after
+    that is a dict access. If neither the exchange nor the cache answer,
+    unknown symbols get the fallback lot steps instead of failing.
+
+    Usage:
+        contracts = ContractRegistry(client)
+        size = contracts.round_size("cmt_dogeusdt", 1234.5)
+        spec = contracts.get("cmt_btcusdt")   # spec.tick_size, spec.max_leverage...
+    """
+
+    def __init__(self, client=None, cache_path: Optional[str] = CACHE_FILE,
+                 ttl: float = CACHE_TTL):
+        """
+        Args:
+            client: WeexClient (or anything with get_contracts()); None = fallback only
+            cache_path: JSON cache file (None disables the disk cache, e.g. backtests)
+            ttl: Seconds before the cache is refreshed from the exchange
+        """
+        self.client = client
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self._specs: Dict[str, ContractSpec] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    # ==================== LOADING ====================
+
+    def load(self, force: bool = False) -> int:
+        """
+        Load the contract list (fresh cache -> exchange -> stale cache)
+
+        Args:
+            force: Skip the cache and ask the exchange
+
+        Returns:
+            Number of contracts known
+        """
+        with self._lock:
+            specs = None if force else self._read_cache(fresh_only=True)
+            if specs is None:
+                specs = self._fetch()
+                if specs:
+                    self._write_cache(specs)
+                else:
+                    specs = self._read_cache(fresh_only=False) or {}
+            self._specs = specs
+            self._loaded = True
+            return len(specs)
+
+    def _fetch(self) -> Dict[str, ContractSpec]:
+        if self.client is None or not hasattr(self.client, 'get_contracts'):
+            return {}
+        try:
+            contracts = self.client.get_contracts()
+        except Exception as e:
+            print(f"⚠️ Contract list unavailable: {e}")
+            return {}
+        if isinstance(contracts, dict):
+            contracts = contracts.get('data', [])
+        specs = {}
+        for contract in contracts if isinstance(contracts, list) else []:
+            spec = parse_contract(contract)
+            if spec:
+                specs[spec.symbol] = spec
+        return specs
+
+    def _read_cache(self, fresh_only: bool) -> Optional[Dict[str, ContractSpec]]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, 'r') as f:
+                cached = json.load(f)
+            if fresh_only and time.time() - cached.get('fetched_at', 0) > self.ttl:
+                return None
+            return {s['symbol']: ContractSpec(**s) for s in cached.get('contracts', [])}
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+    def _write_cache(self, specs: Dict[str, ContractSpec]):
+        if not self.cache_path:
+            return
+        tmp = self.cache_path + ".tmp"
+        try:
+            with open(tmp, 'w') as f:
+                json.dump({'fetched_at': time.time(),
+                           'contracts': [s.to_dict() for s in specs.values()]}, f)
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            print(f"⚠️ Could not write contract cache: {e}")
+
+    # ==================== LOOKUPS ====================
+
+    def get(self, symbol: str) -> ContractSpec:
+        """Rules for `symbol` (fallback rules if the exchange doesn't list it)"""
+        if not self._loaded:
+            self.load()
+        spec = self._specs.get(symbol)
+        if spec is None:
+            spec = ContractSpec(symbol, lot_step=FALLBACK_LOT_STEPS.get(symbol, DEFAULT_LOT_STEP))
+            self._specs[symbol] = spec
+        return spec
+
+    def symbols(self) -> List[str]:
+        if not self._loaded:
+            self.load()
+        return list(self._specs)
+
+    def tick_size(self, symbol: str) -> float:
+        return self.get(symbol).tick_size
+
+    def lot_step(self, symbol: str) -> float:
+        return self.get(symbol).lot_step
+
+    def min_notional(self, symbol: str) -> float:
+        return self.get(symbol).min_notional
+
+    def max_leverage(self, symbol: str) -> int:
+        return self.get(symbol).max_leverage
+
+    def round_price(self, symbol: str, price: float, mode: str = "nearest") -> float:
+        return self.get(symbol).round_price(price, mode)
+
+    def round_size(self, symbol: str, size: float, mode: str = "nearest") -> float:
+        return self.get(symbol).round_size(size, mode)
@@ -0,0 +1,144 @@
+"""
+🧮 Grid Reconciler
+Moves a resting grid to new target levels by cancelling and placing only the difference
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class GridPlan:
+    """What a rebalance has to send to the exchange"""
+    keep: List[str] = field(default_factory=list)                       # Order ids left resting
+    cancel: List[str] = field(default_factory=list)                     # Order ids to cancel
+    place: List[Tuple[str, float, int]] = field(default_factory=list)   # (side, price, level)
+
+    @property
+    def requests(self) -> int:
+        return len(self.cancel) + len(self.place)
+
+
+class GridReconciler:
+    """
+    Diffs target grid levels against the resting grid orders
+
+    A resting order whose side and price match a target level (within
+    `tolerance`) is kept; the rest of the live orders are cancelled and
+    only the missing levels are placed. Cancels go out first (they free
+    margin for the new orders), each group as batch requests
+    (client.cancel_orders / client.place_orders), so a 20-level rebalance
+    costs about two round-trips.
+
+    Usage:
+        reconciler = GridReconciler(client, "cmt_btcusdt")
+        plan = reconciler.plan(strategy.grid_orders, levels, tolerance=0.5)
+        placed = reconciler.apply(plan, strategy.grid_orders, size="0.002")
+    """
+
+    def __init__(self, client, symbol: str, max_workers: int = 8):
+        """
+        Args:
+            client: WeexClient (or backtest.SimulatedWeexClient)
+            symbol: Trading pair of the grid
+            max_workers: Batch requests in flight at once (when a side needs several)
+        """
+        self.client = client
+        self.symbol = symbol
+        self.max_workers = max_workers
+
+    # ==================== PLAN ====================
+
+    def sync(self, grid_orders: Dict[str, Dict]) -> Optional[int]:
+        """
+        Drop orders that are no longer open on the exchange (filled or cancelled)
+
+        Returns:
+            Number of entries removed, or None if the open orders could not
+            be read. The book is then unknown: orders that filled since the
+            last sync still look resting, so callers must not plan a diff
+            against grid_orders that cycle.
+        """
+        try:
+            open_orders = self.client.get_open_orders(self.symbol)
+        except Exception:
+            return None
+        if isinstance(open_orders, dict):
+            open_orders = open_orders.get('data')
+        if not isinstance(open_orders, list):
+            return None
+        open_ids = {str(o.get('order_id') or o.get('orderId')) for o in open_orders}
+        gone = [oid for oid in grid_orders if str(oid) not in open_ids]
+        for oid in gone:
+            del grid_orders[oid]
+        return len(gone)
+
+    def plan(self, grid_orders: Dict[str, Dict], levels: Dict[str, List[float]],
+             tolerance: float = 0.0) -> GridPlan:
+        """
+        Match live orders to target levels
+
+        Args:
+            grid_orders: order_id -> {'type': 'buy'/'sell', 'price', 'level'}
+            levels: calculate_grid_levels output ('buy' / 'sell' price lists)
+            tolerance: Max price difference for a live order to count as a level
+        """
+        plan = GridPlan()
+        unmatched = dict(grid_orders)
+        for side in ('buy', 'sell'):
+            resting = sorted((info['price'], oid) for oid, info in unmatched.items()
+                             if info['type'] == side)
+            for level, price in enumerate(levels[side]):
+                match = next((oid for live_price, oid in resting
+                              if abs(live_price - price) <= tolerance), None)
+                if match is None:
+                    plan.place.append((side, price, level))
+                    continue
+                resting = [(p, oid) for p, oid in resting if oid != match]
+                del unmatched[match]
+                plan.keep.append(match)
+                grid_orders[match]['level'] = level
+        plan.cancel = list(unmatched)
+        return plan
+
+    # ==================== APPLY ====================
+
+    def apply(self, plan: GridPlan, grid_orders: Dict[str, Dict], size: str) -> Dict[str, List[Dict]]:
+        """
+        Send the plan: cancels first, then the new levels
+
+        Returns:
+            {'buy': [...], 'sell': [...]} placed orders, plus 'cancelled' and 'kept' counts
+        """
+        cancelled = 0
+        if plan.cancel:
+            results = self.client.cancel_orders(plan.cancel, max_workers=self.max_workers)
+            for order_id, result in zip(plan.cancel, results):
+                if result.get('result'):
+                    grid_orders.pop(order_id, None)
+                    cancelled += 1
+
+        placed = {'buy': [], 'sell': []}
+        if plan.place:
+            stamp = int(time.time() * 1000)
+            orders = [{
+                'symbol': self.symbol,
+                'side': side,
+                'order_type': 'limit',
+                'size': size,
+                'price': str(price),
+                'trade_side': 'open',
+                'client_oid': f"grid_{side}_{level}_{stamp}",
+            } for side, price, level in plan.place]
+            results = self.client.place_orders(orders, max_workers=self.max_workers)
+            for (side, price, level), result in zip(plan.place, results):
+                order_id = result.get('order_id') if result else None
+                if not order_id:
+                    continue
+                grid_orders[order_id] = {'type': side, 'price': price, 'level': level}
+                placed[side].append({'order_id': order_id, 'price': price, 'size': float(size), 'level': level})
+
+        placed['cancelled'] = cancelled
+        placed['kept'] = len(plan.keep)
+        return placed
@@ -0,0 +1,547 @@
+"""
+⚡ Incremental Indicators
+Stateful RSI / EMA / MACD / Bollinger / ATR that update in O(1) per bar
+
+Each indicator follows the same protocol:
+    update(...)   commit one closed bar, return the new value
+    preview(...)  value if the forming bar closed now (state is not touched)
+    snapshot()    JSON-serializable state
+    restore(s)    rebuild an indicator from a snapshot
+
+Values match the batch functions in utils.indicators when fed the same
+history (SMA-seeded EMA, 'sma' or 'wilder' RSI, population-std bands,
+simple-mean ATR). Against a batch call on a sliding window (the usual
+get_arrays(limit=50)) only the fixed-lookback ones still match - 'sma'
+RSI, Bollinger and ATR. EMA, MACD and 'wilder' RSI keep the seed of the
+first bar they saw, while the batch functions reseed on every window, so
+those values drift apart. Rolling sums are re-summed once per window so
+float drift never accumulates; that keeps updates amortized O(1).
+"""
+
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Tuple
+
+
+def _bar_fields(candle) -> Tuple[int, float, float, float]:
+    """(ts, high, low, close) of a [ts, o, h, l, c, v] row"""
+    return int(candle[0]), float(candle[2]), float(candle[3]), float(candle[4])
+
+
+def _rsi_value(avg_gain: float, avg_loss: float, flat: float) -> float:
+    if avg_loss <= 0:
+        return 100.0 if avg_gain > 0 else flat
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+class _RollingSum:
+    """Fixed-size window with a running sum, re-summed every `size` pushes"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.window: Deque[float] = deque(maxlen=size)
+        self.total = 0.0
+        self._pushes = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.window) == self.size
+
+    def push(self, value: float):
+        if self.full:
+            self.total -= self.window[0]
+        self.window.append(value)
+        self.total += value
+        self._pushes += 1
+        if self._pushes >= self.size:
+            self.total = sum(self.window)
+            self._pushes = 0
+
+    def peek_total(self, value: float) -> float:
+        """Sum the window would have after push(value)"""
+        return self.total - (self.window[0] if self.full else 0.0) + value
+
+    def snapshot(self) -> Dict:
+        return {'size': self.size, 'window': list(self.window)}
+
+    @classmethod
+    def restore(cls, state: Dict) -> "_RollingSum":
+        rolling = cls(state['size'])
+        rolling.window.extend(state['window'])
+        rolling.total = sum(rolling.window)
+        return rolling
+
+
+# ==================== SINGLE INDICATORS ====================
+
+class IncrementalEMA:
+    """
+    Exponential moving average seeded with the SMA of the first `period` values
+
+    value is None until `period` values have been seen.
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.count = 0
+        self.value: Optional[float] = None
+        self._seed_sum = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def update(self, x: float) -> Optional[float]:
+        x = float(x)
+        self.count += 1
+        if self.value is None:
+            self._seed_sum += x
+            if self.count == self.period:
+                self.value = self._seed_sum / self.period
+        else:
+            self.value = x * self.alpha + self.value * (1 - self.alpha)
+        return self.value
+
+    def preview(self, x: float) -> Optional[float]:
+        x = float(x)
+        if self.value is None:
+            if self.count + 1 == self.period:
+                return (self._seed_sum + x) / self.period
+            return None
+        return x * self.alpha + self.value * (1 - self.alpha)
+
+    def snapshot(self) -> Dict:
+        return {'period': self.period, 'count': self.count,
+                'value': self.value, 'seed_sum': self._seed_sum}
+
+    @classmethod
+    def restore(cls, state: Dict) -> "IncrementalEMA":
+        ema = cls(state['period'])
+        ema.count = state['count']
+        ema.value = state['value']
+        ema._seed_sum = state['seed_sum']
+        return ema
+
+
+class IncrementalRSI:
+    """
+    RSI over closes
+
+    method='wilder' uses Wilder smoothing seeded with the mean of the first
+    `period` moves; method='sma' averages the last `period` moves (the
+    formula the bots have always used).
+    """
+
+    def __init__(self, period: int = 14, method: str = "wilder", flat: float = 50.0):
+        """
+        Args:
+            period: Lookback
+            method: 'wilder' or 'sma'
+            flat: Value when there was no movement at all
+        """
+        if method not in ("wilder", "sma"):
+            raise ValueError(f"Unknown RSI method: {method}")
+        self.period = period
+        self.method = method
+        self.flat = flat
+        self.prev_close: Optional[float] = None
+        self.moves = 0
+        # wilder: running averages (sums while seeding); sma: rolling windows
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self._gains = _RollingSum(period)
+        self._losses = _RollingSum(period)
+        self.value = 50.0
+
+    @property
+    def ready(self) -> bool:
+        return self.moves >= self.period
+
+    def _averages(self, close: float, commit: bool) -> Tuple[float, float]:
+        change = close - self.prev_close
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        moves = self.moves + 1
+
+        if self.method == "sma":
+            if commit:
+                self._gains.push(gain)
+                self._losses.push(loss)
+                return self._gains.total / self.period, self._losses.total / self.period
+            return (self._gains.peek_total(gain) / self.period,
+                    self._losses.peek_total(loss) / self.period)
+
+        if moves <= self.period:
+            avg_gain, avg_loss = self.avg_gain + gain, self.avg_loss + loss
+            if moves == self.period:
+                avg_gain, avg_loss = avg_gain / self.period, avg_loss / self.period
+        else:
+            avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        if commit:
+            self.avg_gain, self.avg_loss = avg_gain, avg_loss
+        return avg_gain, avg_loss
+
+    def update(self, close: float) -> float:
+        close = float(close)
+        if self.prev_close is not None:
+            avg_gain, avg_loss = self._averages(close, commit=True)
+            self.moves += 1
+            if self.ready:
+                self.value = _rsi_value(avg_gain, avg_loss, self.flat)
+        self.prev_close = close
+        return self.value
+
+    def preview(self, close: float) -> float:
+        if self.prev_close is None or self.moves + 1 < self.period:
+            return 50.0
+        avg_gain, avg_loss = self._averages(float(close), commit=False)
+        return _rsi_value(avg_gain, avg_loss, self.flat)
+
+    def snapshot(self) -> Dict:
+        return {'period': self.period, 'method': self.method, 'flat': self.flat,
+                'prev_close': self.prev_close, 'moves': self.moves,
+                'avg_gain': self.avg_gain, 'avg_loss': self.avg_loss,
+                'gains': self._gains.snapshot(), 'losses': self._losses.snapshot(),
+                'value': self.value}
+
+    @classmethod
+    def restore(cls, state: Dict) -> "IncrementalRSI":
+        rsi = cls(state['period'], state['method'], state['flat'])
+        rsi.prev_close = state['prev_close']
+        rsi.moves = state['moves']
+        rsi.avg_gain = state['avg_gain']
+        rsi.avg_loss = state['avg_loss']
+        rsi._gains = _RollingSum.restore(state['gains'])
+        rsi._losses = _RollingSum.restore(state['losses'])
+        rsi.value = state['value']
+        return rsi
+
+
+class IncrementalMACD:
+    """MACD line (fast EMA - slow EMA), its signal EMA and the histogram"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = IncrementalEMA(fast)
+        self.slow = IncrementalEMA(slow)
+        self.signal = IncrementalEMA(signal)
+        self.macd: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.signal.ready
+
+    @property
+    def value(self) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+        """(macd, signal, histogram) of the last committed bar"""
+        return self._triple(self.macd, self.signal.value)
+
+    @staticmethod
+    def _triple(macd_value, signal_value):
+        if macd_value is None or signal_value is None:
+            return macd_value, signal_value, None
+        return macd_value, signal_value, macd_value - signal_value
+
+    def update(self, close: float):
+        fast = self.fast.update(close)
+        slow = self.slow.update(close)
+        if slow is not None:
+            self.macd = fast - slow
+            self.signal.update(self.macd)
+        return self.value
+
+    def preview(self, close: float):
+        slow = self.slow.preview(close)
+        if slow is None:
+            return None, None, None
+        macd_value = self.fast.preview(close) - slow
+        return self._triple(macd_value, self.signal.preview(macd_value))
+
+    def snapshot(self) -> Dict:
+        return {'fast': self.fast.snapshot(), 'slow': self.slow.snapshot(),
+                'signal': self.signal.snapshot(), 'macd': self.macd}
+
+    @classmethod
+    def restore(cls, state: Dict) -> "IncrementalMACD":
+        macd = cls.__new__(cls)
+        macd.fast = IncrementalEMA.restore(state['fast'])
+        macd.slow = IncrementalEMA.restore(state['slow'])
+        macd.signal = IncrementalEMA.restore(state['signal'])
+        macd.macd = state['macd']
+        return macd
+
+
+class RollingBollinger:
+    """
+    Bollinger Bands over the last `period` closes (population std)
+
+    Sums are kept relative to a shift close to the window mean so the
+    variance doesn't lose precision at large prices.
+    """
+
+    def __init__(self, period: int = 20, multiplier: float = 2.0):
+        self.period = period
+        self.multiplier = multiplier
+        self.window: Deque[float] = deque(maxlen=period)
+        self._shift = 0.0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._pushes = 0
+
+    @property
+    def ready(self) -> bool:
+        return len(self.window) == self.period
+
+    @property
+    def value(self) -> Tuple[float, float, float]:
+        """(upper, middle, lower), or (0, 0, 0) until the window is full"""
+        if not self.ready:
+            return 0, 0, 0
+        return self._bands(self._sum, self._sumsq)
+
+    def _bands(self, total: float, total_sq: float) -> Tuple[float, float, float]:
+        mean = total / self.period
+        variance = max(total_sq / self.period - mean * mean, 0.0)
+        middle = mean + self._shift
+        std_dev = variance ** 0.5
+        return middle + self.multiplier * std_dev, middle, middle - self.multiplier * std_dev
+
+    def _resync(self):
+        self._shift = sum(self.window) / len(self.window)
+        self._sum = sum(x - self._shift for x in self.window)
+        self._sumsq = sum((x - self._shift) ** 2 for x in self.window)
+        self._pushes = 0
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        close = float(close)
+        if self.ready:
+            old = self.window[0] - self._shift
+            self._sum -= old
+            self._sumsq -= old * old
+        self.window.append(close)
+        d = close - self._shift
+        self._sum += d
+        self._sumsq += d * d
+        self._pushes += 1
+        if self._pushes >= self.period:
+            self._resync()
+        return self.value
+
+    def preview(self, close: float) -> Tuple[float, float, float]:
+        if len(self.window) + 1 < self.period:
+            return 0, 0, 0
+        total, total_sq = self._sum, self._sumsq
+        if self.ready:
+            old = self.window[0] - self._shift
+            total -= old
+            total_sq -= old * old
+        d = float(close) - self._shift
+        return self._bands(total + d, total_sq + d * d)
+
+    def snapshot(self) -> Dict:
+        return {'period': self.period, 'multiplier': self.multiplier,
+                'window': list(self.window)}
+
+    @classmethod
+    def restore(cls, state: Dict) -> "RollingBollinger":
+        bands = cls(state['period'], state['multiplier'])
+        bands.window.extend(state['window'])
+        if bands.window:
+            bands._resync()
+        return bands
+
+
+class IncrementalATR:
+    """Average True Range: simple mean of the last `period` true ranges"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self._ranges = _RollingSum(period)
+
+    @property
+    def ready(self) -> bool:
+        return self._ranges.full
+
+    @property
+    def value(self) -> float:
+        """ATR, or 0.0 until `period` true ranges have been seen"""
+        return self._ranges.total / self.period if self.ready else 0.0
+
+    def _true_range(self, high: float, low: float) -> float:
+        return max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if self.prev_close is not None:
+            self._ranges.push(self._true_range(float(high), float(low)))
+        self.prev_close = float(close)
+        return self.value
+
+    def preview(self, high: float, low: float, close: float) -> float:
+        if self.prev_close is None or len(self._ranges.window) + 1 < self.period:
+            return 0.0
+        return self._ranges.peek_total(self._true_range(float(high), float(low))) / self.period
+
+    def snapshot(self) -> Dict:
+        return {'period': self.period, 'prev_close': self.prev_close,
+                'ranges': self._ranges.snapshot()}
+
+    @classmethod
+    def restore(cls, state: Dict) -> "IncrementalATR":
+        atr = cls(state['period'])
+        atr.prev_close = state['prev_close']
+        atr._ranges = _RollingSum.restore(state['ranges'])
+        return atr
+
+
+# ==================== BAR STREAM ====================
+
+class IndicatorStream:
+    """
+    RSI + MACD + Bollinger + ATR for one symbol/granularity
+
+    sync() takes the usual candle window ([ts, o, h, l, c, v], oldest
+    first, last bar possibly still forming), commits only the closed bars
+    it has not seen yet and previews the forming one. After the first call
+    each sync costs O(new bars), not O(window). tick() re-previews the
+    forming bar at a live price without touching committed state.
+
+    RSI ('sma'), Bollinger and ATR equal a batch call on the same window;
+    MACD (and 'wilder' RSI) follow the whole history the stream has seen
+    and differ from a batch call that reseeds on each window.
+
+    Usage:
+        stream = IndicatorStream()
+        values = stream.sync(store.get_arrays(symbol, "5m", 50))
+        values['rsi'], values['macd'], values['histogram'], values['atr']
+    """
+
+    def __init__(self, rsi_period: int = 14, rsi_method: str = "sma", rsi_flat: float = 50.0,
+                 macd_fast: int = 12, macd_slow: int = 26, macd_signal: int = 9,
+                 bb_period: int = 20, bb_multiplier: float = 2.0, atr_period: int = 14):
+        self.rsi = IncrementalRSI(rsi_period, rsi_method, rsi_flat)
+        self.macd = IncrementalMACD(macd_fast, macd_slow, macd_signal)
+        self.bollinger = RollingBollinger(bb_period, bb_multiplier)
+        self.atr = IncrementalATR(atr_period)
+        self.last_ts: Optional[int] = None
+        self.bars = 0
+        self._forming: Optional[list] = None  # [ts, high, low, close]
+
+    def update(self, ts: int, high: float, low: float, close: float):
+        """Commit one closed bar (ignored if it is not newer than the last one)"""
+        ts = int(ts)
+        if self.last_ts is not None and ts <= self.last_ts:
+            return
+        self.rsi.update(close)
+        self.macd.update(close)
+        self.bollinger.update(close)
+        self.atr.update(high, low, close)
+        self.last_ts = ts
+        self.bars += 1
+        if self._forming and self._forming[0] <= ts:
+            self._forming = None
+
+    def sync(self, candles: Iterable, closed: bool = False) -> Dict:
+        """
+        Feed a candle window and return the current values
+
+        Args:
+            candles: [[ts, open, high, low, close, volume], ...] oldest first,
+                     or an OHLCV of column arrays (utils.ohlcv)
+            closed: True if every bar in the window is final (no forming bar)
+
+        Returns:
+            Dict from values()
+        """
+        if hasattr(candles, 'close'):
+            return self._sync_columns(candles, closed)
+        candles = candles if isinstance(candles, list) else list(candles)
+        if not candles:
+            return self.values()
+
+        last = None if closed else candles[-1]
+        committed = candles if closed else candles[:-1]
+
+        # Walk back to the first bar we have not committed yet
+        start = len(committed)
+        while start > 0 and (self.last_ts is None or
+                             _bar_fields(committed[start - 1])[0] > self.last_ts):
+            start -= 1
+        for c in committed[start:]:
+            self.update(*_bar_fields(c))
+
+        if last is not None:
+            bar = _bar_fields(last)
+            if self.last_ts is None or bar[0] > self.last_ts:
+                self._forming = list(bar)
+        return self.values()
+
+    def _sync_columns(self, bars, closed: bool) -> Dict:
+        """sync() for OHLCV arrays: binary-search the first new bar"""
+        n = len(bars.ts)
+        if n == 0:
+            return self.values()
+        end = n if closed else n - 1
+        start = 0 if self.last_ts is None else int(bars.ts[:end].searchsorted(self.last_ts, 'right'))
+        for i in range(start, end):
+            self.update(bars.ts[i], bars.high[i], bars.low[i], bars.close[i])
+
+        if not closed and (self.last_ts is None or int(bars.ts[-1]) > self.last_ts):
+            self._forming = [int(bars.ts[-1]), float(bars.high[-1]),
+                             float(bars.low[-1]), float(bars.close[-1])]
+        return self.values()
+
+    def tick(self, price: float) -> Dict:
+        """Values with the forming bar closed at `price`"""
+        price = float(price)
+        if self._forming is None:
+            return self.values()
+        self._forming[1] = max(self._forming[1], price)
+        self._forming[2] = min(self._forming[2], price)
+        self._forming[3] = price
+        return self.values()
+
+    def values(self) -> Dict:
+        """Indicator values, including the forming bar when there is one"""
+        prev_histogram = self.macd.value[2]
+        if self._forming is None:
+            price = self.rsi.prev_close
+            rsi = self.rsi.value
+            macd, signal, histogram = self.macd.value
+            upper, middle, lower = self.bollinger.value
+            atr = self.atr.value
+        else:
+            _, high, low, price = self._forming
+            rsi = self.rsi.preview(price)
+            macd, signal, histogram = self.macd.preview(price)
+            upper, middle, lower = self.bollinger.preview(price)
+            atr = self.atr.preview(high, low, price)
+        return {
+            'ts': self._forming[0] if self._forming else self.last_ts,
+            'price': price,
+            'rsi': rsi,
+            'macd': macd,
+            'signal': signal,
+            'histogram': histogram,
+            'prev_histogram': prev_histogram,
+            'bb_upper': upper,
+            'bb_middle': middle,
+            'bb_lower': lower,
+            'atr': atr,
+        }
+
+    def snapshot(self) -> Dict:
+        return {'rsi': self.rsi.snapshot(), 'macd': self.macd.snapshot(),
+                'bollinger': self.bollinger.snapshot(), 'atr': self.atr.snapshot(),
+                'last_ts': self.last_ts, 'bars': self.bars, 'forming': self._forming}
+
+    @classmethod
+    def restore(cls, state: Dict) -> "IndicatorStream":
+        stream = cls.__new__(cls)
+        stream.rsi = IncrementalRSI.restore(state['rsi'])
+        stream.macd = IncrementalMACD.restore(state['macd'])
+        stream.bollinger = RollingBollinger.restore(state['bollinger'])
+        stream.atr = IncrementalATR.restore(state['atr'])
+        stream.last_ts = state['last_ts']
+        stream.bars = state['bars']
+        stream._forming = list(state['forming']) if state['forming'] else None
+        return stream
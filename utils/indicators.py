@@ -1,11 +1,263 @@
 """
 📊 Technical Indicators Module
 RSI, MACD, and other indicators for trading signals
+
+The module-level functions are the shared NumPy engine used by every bot;
+they accept lists or arrays (oldest value first) and return plain floats.
 """
 
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, Sequence, Union
 from dataclasses import dataclass
+import math
 import time
+from functools import lru_cache
+
+import numpy as np
+
+from .candle_store import CandleStore
+from .ohlcv import OHLCV
+from .incremental import IndicatorStream
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+
+# ==================== NUMPY ENGINE ====================
+
+def as_array(values: ArrayLike) -> np.ndarray:
+    """float64 view of `values` (no copy if it already is one)"""
+    return np.asarray(values, dtype=np.float64)
+
+
+@lru_cache(maxsize=64)
+def _decay_powers(alpha: float, block: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """d^0..d^block, d^-j and alpha * d^j for j < block, with d = 1 - alpha (read-only)"""
+    powers = (1.0 - alpha) ** np.arange(block + 1, dtype=np.float64)
+    inverse = 1.0 / powers[:block]
+    scaled = alpha * powers[:block]
+    for arr in (powers, inverse, scaled):
+        arr.flags.writeable = False
+    return powers, inverse, scaled
+
+
+def _ema_recursive(values: np.ndarray, alpha: float, seed: float) -> np.ndarray:
+    """
+    y[t] = alpha * x[t] + (1 - alpha) * y[t-1], with y[-1] = seed
+
+    Vectorized in blocks using the closed form
+    y[s+k] = d^(k+1) * y[s-1] + alpha * d^k * cumsum(x[s+j] / d^j),
+    where d = 1 - alpha. Blocks are sized so d^-k never overflows.
+    """
+    n = len(values)
+    out = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return out
+
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = values
+        return out
+
+    # Round the block up to a power of two so the powers cache stays small
+    max_block = max(1, int(500.0 / -math.log(decay)))
+    block = min(max_block, 1 << max(0, n - 1).bit_length())
+    powers, inverse, scaled = _decay_powers(alpha, block)
+
+    prev = seed
+    for start in range(0, n, block):
+        k = min(block, n - start)
+        view = out[start:start + k]
+        np.multiply(values[start:start + k], inverse[:k], out=view)
+        np.cumsum(view, out=view)
+        view *= scaled[:k]
+        view += prev * powers[1:k + 1]
+        prev = view[-1]
+    return out
+
+
+def ema_series(values: ArrayLike, period: int) -> np.ndarray:
+    """
+    EMA seeded with the SMA of the first `period` values
+
+    Returns:
+        Array of len(values) - period + 1 (first element is the seed SMA);
+        empty if there is not enough data
+    """
+    x = as_array(values)
+    if period <= 0 or len(x) < period:
+        return np.empty(0, dtype=np.float64)
+
+    seed = float(x[:period].sum()) / period
+    out = np.empty(len(x) - period + 1, dtype=np.float64)
+    out[0] = seed
+    out[1:] = _ema_recursive(x[period:], 2.0 / (period + 1), seed)
+    return out
+
+
+def ema(values: ArrayLike, period: int) -> float:
+    """Latest SMA-seeded EMA (last value if there are fewer than `period` values)"""
+    x = as_array(values)
+    if len(x) == 0:
+        return 0.0
+    if len(x) < period:
+        return float(x[-1])
+    return float(ema_series(x, period)[-1])
+
+
+def sma(values: ArrayLike, period: int) -> float:
+    """Mean of the last `period` values (last value if there are fewer)"""
+    x = as_array(values)
+    if len(x) == 0:
+        return 0.0
+    if len(x) < period:
+        return float(x[-1])
+    return float(x[-period:].mean())
+
+
+def rsi(closes: ArrayLike, period: int = 14, method: str = "sma",
+        flat: float = 50.0) -> float:
+    """
+    Relative Strength Index of the latest bar
+
+    Args:
+        closes: Close prices, oldest first
+        period: Lookback
+        method: 'sma' (mean gain/loss of the last `period` moves) or
+                'wilder' (Wilder smoothing seeded with the first `period` moves)
+        flat: Value returned when there was no movement at all
+
+    Returns:
+        RSI 0-100 (50 if there are fewer than period + 1 closes)
+    """
+    if len(closes) < period + 1:
+        return 50.0
+
+    if method == "wilder":
+        deltas = np.diff(as_array(closes))
+        gains = np.clip(deltas, 0.0, None)
+        losses = np.clip(-deltas, 0.0, None)
+        alpha = 1.0 / period
+        avg_gain = float(gains[:period].mean())
+        avg_loss = float(losses[:period].mean())
+        if len(deltas) > period:
+            avg_gain = float(_ema_recursive(gains[period:], alpha, avg_gain)[-1])
+            avg_loss = float(_ema_recursive(losses[period:], alpha, avg_loss)[-1])
+    else:
+        # Only the last `period` moves matter - slice before converting
+        deltas = np.diff(as_array(closes[-(period + 1):]))
+        avg_gain = float(deltas[deltas > 0].sum()) / period
+        avg_loss = float(-deltas[deltas < 0].sum()) / period
+
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else flat
+    rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+
+def macd(closes: ArrayLike, fast: int = 12, slow: int = 26,
+         signal: int = 9) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    MACD line (fast EMA - slow EMA) and its signal line
+
+    Returns:
+        (macd_line, signal_line); macd_line starts at bar `slow - 1`,
+        signal_line is empty if macd_line is shorter than `signal`
+    """
+    x = as_array(closes)
+    ema_slow = ema_series(x, slow)
+    if len(ema_slow) == 0:
+        empty = np.empty(0, dtype=np.float64)
+        return empty, empty
+    macd_line = ema_series(x, fast)[slow - fast:] - ema_slow
+    return macd_line, ema_series(macd_line, signal)
+
+
+def bollinger_bands(closes: ArrayLike, period: int = 20,
+                    multiplier: float = 2.0) -> Tuple[float, float, float]:
+    """
+    Bollinger Bands (population std) of the last `period` closes
+
+    Returns:
+        (upper, middle, lower), or (0, 0, 0) if there is not enough data
+    """
+    if len(closes) < period:
+        return 0, 0, 0
+    window = as_array(closes[-period:])
+    middle = float(window.mean())
+    std_dev = float(window.std())
+    return middle + multiplier * std_dev, middle, middle - multiplier * std_dev
+
+
+def true_range(highs: ArrayLike, lows: ArrayLike, closes: ArrayLike) -> np.ndarray:
+    """True range of every bar after the first"""
+    h, l, c = as_array(highs)[1:], as_array(lows)[1:], as_array(closes)
+    prev_close = c[:-1]
+    return np.maximum(h - l, np.maximum(np.abs(h - prev_close), np.abs(l - prev_close)))
+
+
+def atr(highs: ArrayLike, lows: ArrayLike, closes: ArrayLike, period: int = 14) -> float:
+    """
+    Average True Range: simple mean of the last `period` true ranges
+
+    Returns:
+        ATR, or 0.0 if there are fewer than period + 1 bars
+    """
+    if len(closes) < period + 1:
+        return 0.0
+    n = period + 1
+    tr = true_range(highs[-n:], lows[-n:], closes[-n:])
+    return float(tr.sum()) / period
+
+
+def volatility(closes: ArrayLike, period: int = 14, default: float = 0.01) -> float:
+    """
+    Mean absolute % change over the last `period` moves
+
+    Returns:
+        Volatility in percent, or `default` if there are fewer than `period` closes
+    """
+    if len(closes) < period:
+        return default
+    window = as_array(closes[-(period + 1):])
+    changes = np.abs(np.diff(window)) / window[:-1]
+    return float(changes.sum()) / period * 100
+
+
+def range_volatility(highs: ArrayLike, lows: ArrayLike, period: int = 10) -> float:
+    """Mean (high - low) / low in percent over the last `period` bars"""
+    h = as_array(highs[-period:])
+    l = as_array(lows[-period:])
+    valid = l > 0
+    if not valid.any():
+        return 0
+    return float(((h[valid] - l[valid]) / l[valid] * 100).mean())
+
+
+def volume_ratio(volumes: ArrayLike, period: int = 10, exclude_last: bool = False,
+                 default: float = 1.0) -> float:
+    """
+    Last volume relative to the average volume
+
+    Args:
+        volumes: Volumes, oldest first
+        period: Bars in the average
+        exclude_last: Average the `period` bars before the last one instead
+                      of the last `period` bars
+        default: Returned when the average is zero or data is missing
+
+    Returns:
+        current_volume / average_volume
+    """
+    v = as_array(volumes)
+    if len(v) == 0:
+        return default
+    window = v[-period - 1:-1] if exclude_last else v[-period:]
+    avg = float(window.sum()) / period
+    if avg <= 0:
+        return default
+    return float(v[-1]) / avg
+
+
+# ==================== SIGNALS ====================
 
 
 @dataclass
@@ -25,20 +277,26 @@ class TechnicalIndicators:
     Calculates RSI, MACD, and other indicators from price data
     """
     
-    def __init__(self, client, symbol: str = "cmt_btcusdt"):
+    def __init__(self, client, symbol: str = "cmt_btcusdt",
+                 candle_store: CandleStore = None, streaming: bool = False):
         """
         Initialize with WEEX client
         
         Args:
             client: WeexClient instance
             symbol: Trading pair
+            candle_store: Shared CandleStore (one on candles.db is created if not provided)
+            streaming: Keep RSI/MACD in an IndicatorStream so get_combined_signal
+                       only processes new bars instead of the whole window
         """
         self.client = client
         self.symbol = symbol
-        self.price_history: List[float] = []
+        self.candle_store = candle_store or CandleStore(client)
+        self.stream = IndicatorStream(rsi_flat=100.0) if streaming else None
+        self.price_history: ArrayLike = []
         self.max_history = 100  # Keep last 100 candles
     
-    def fetch_candles(self, granularity: str = "1m", limit: int = 50) -> List[Dict]:
+    def fetch_candles(self, granularity: str = "1m", limit: int = 50) -> Optional[OHLCV]:
         """
         Fetch candlestick data from WEEX
         
@@ -47,45 +305,22 @@ class TechnicalIndicators:
             limit: Number of candles to fetch
             
         Returns:
-            List of candle dicts with open, high, low, close, volume
+            OHLCV column arrays (ts, open, high, low, close, volume), oldest
+            first, or None if nothing could be loaded
         """
-        import requests
-        
         try:
-            # WEEX candle endpoint
-            url = f"{self.client.BASE_URL}/capi/v2/market/candles"
-            params = {
-                "symbol": self.symbol,
-                "granularity": granularity,
-                "limit": str(limit)
-            }
-            
-            resp = requests.get(url, params=params, timeout=10)
-            data = resp.json()
+            # Incremental: only bars newer than the last stored one are downloaded
+            bars = self.candle_store.get_arrays(self.symbol, granularity, limit)
+            if len(bars.ts) == 0:
+                return None
             
-            if isinstance(data, list) and len(data) > 0:
-                candles = []
-                for candle in data:
-                    # Format: [timestamp, open, high, low, close, volume]
-                    if isinstance(candle, list) and len(candle) >= 6:
-                        candles.append({
-                            'timestamp': candle[0],
-                            'open': float(candle[1]),
-                            'high': float(candle[2]),
-                            'low': float(candle[3]),
-                            'close': float(candle[4]),
-                            'volume': float(candle[5])
-                        })
-                
-                # Update price history
-                self.price_history = [c['close'] for c in candles]
-                return candles
-            
-            return []
+            # Update price history (a copy: the store's views change on the next sync)
+            self.price_history = bars.close.copy()
+            return bars
             
         except Exception as e:
             print(f"❌ Failed to fetch candles: {e}")
-            return []
+            return None
     
     def calculate_rsi(self, prices: List[float] = None, period: int = 14) -> IndicatorSignal:
         """
@@ -103,7 +338,8 @@ class TechnicalIndicators:
         Returns:
             IndicatorSignal with RSI value and signal
         """
-        prices = prices or self.price_history
+        if prices is None:
+            prices = self.price_history
         
         if len(prices) < period + 1:
             return IndicatorSignal(
@@ -114,41 +350,27 @@ class TechnicalIndicators:
                 message=f"Insufficient data ({len(prices)} < {period + 1})"
             )
         
-        # Calculate price changes
-        deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-        
-        # Separate gains and losses
-        gains = [d if d > 0 else 0 for d in deltas]
-        losses = [-d if d < 0 else 0 for d in deltas]
-        
-        # Calculate average gain/loss over period
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
-        
-        # Calculate RS and RSI
-        if avg_loss == 0:
-            rsi = 100.0
-        else:
-            rs = avg_gain / avg_loss
-            rsi = 100 - (100 / (1 + rs))
-        
+        return self._rsi_signal(rsi(prices, period, flat=100.0))
+    
+    def _rsi_signal(self, rsi_value: float) -> IndicatorSignal:
+        """Classify an RSI value"""
         # Determine signal
-        if rsi >= 70:
+        if rsi_value >= 70:
             signal = "sell"
-            strength = min((rsi - 70) * 3.33, 100)  # 70-100 maps to 0-100
-            message = f"🔴 Overbought ({rsi:.1f})"
-        elif rsi <= 30:
+            strength = min((rsi_value - 70) * 3.33, 100)  # 70-100 maps to 0-100
+            message = f"🔴 Overbought ({rsi_value:.1f})"
+        elif rsi_value <= 30:
             signal = "buy"
-            strength = min((30 - rsi) * 3.33, 100)  # 0-30 maps to 100-0
-            message = f"🟢 Oversold ({rsi:.1f})"
+            strength = min((30 - rsi_value) * 3.33, 100)  # 0-30 maps to 100-0
+            message = f"🟢 Oversold ({rsi_value:.1f})"
         else:
             signal = "neutral"
-            strength = 50 - abs(50 - rsi)  # Strongest at 50
-            message = f"⚪ Neutral ({rsi:.1f})"
+            strength = 50 - abs(50 - rsi_value)  # Strongest at 50
+            message = f"⚪ Neutral ({rsi_value:.1f})"
         
         return IndicatorSignal(
             name="RSI",
-            value=round(rsi, 2),
+            value=round(rsi_value, 2),
             signal=signal,
             strength=round(strength, 1),
             message=message
@@ -174,7 +396,8 @@ class TechnicalIndicators:
         Returns:
             IndicatorSignal with MACD value and signal
         """
-        prices = prices or self.price_history
+        if prices is None:
+            prices = self.price_history
         
         if len(prices) < slow + signal_period:
             return IndicatorSignal(
@@ -185,42 +408,25 @@ class TechnicalIndicators:
                 message=f"Insufficient data ({len(prices)} < {slow + signal_period})"
             )
         
-        def ema(data: List[float], period: int) -> List[float]:
-            """Calculate EMA"""
-            multiplier = 2 / (period + 1)
-            ema_values = [sum(data[:period]) / period]  # SMA for first value
-            
-            for price in data[period:]:
-                ema_values.append((price * multiplier) + (ema_values[-1] * (1 - multiplier)))
-            
-            return ema_values
-        
-        # Calculate EMAs
-        ema_fast = ema(prices, fast)
-        ema_slow = ema(prices, slow)
-        
-        # MACD line = Fast EMA - Slow EMA
-        # Align arrays (slow EMA starts later)
-        offset = slow - fast
-        macd_line = [ema_fast[i + offset] - ema_slow[i] for i in range(len(ema_slow))]
-        
-        # Signal line = EMA of MACD line
-        if len(macd_line) >= signal_period:
-            signal_line = ema(macd_line, signal_period)
-        else:
-            signal_line = [0]
+        macd_line, signal_line = macd(prices, fast, slow, signal_period)
         
         # Current values
-        macd_current = macd_line[-1] if macd_line else 0
-        signal_current = signal_line[-1] if signal_line else 0
-        histogram = macd_current - signal_current
+        macd_current = float(macd_line[-1]) if len(macd_line) else 0
+        signal_current = float(signal_line[-1]) if len(signal_line) else 0
         
         # Previous histogram for momentum
         if len(macd_line) > 1 and len(signal_line) > 1:
-            prev_histogram = macd_line[-2] - signal_line[-2]
-            momentum_increasing = histogram > prev_histogram
+            prev_histogram = float(macd_line[-2] - signal_line[-2])
         else:
-            momentum_increasing = False
+            prev_histogram = None
+        
+        return self._macd_signal(macd_current, signal_current, prev_histogram)
+    
+    def _macd_signal(self, macd_current: float, signal_current: float,
+                     prev_histogram: Optional[float]) -> IndicatorSignal:
+        """Classify MACD vs its signal line"""
+        histogram = macd_current - signal_current
+        momentum_increasing = prev_histogram is not None and histogram > prev_histogram
         
         # Determine signal
         if macd_current > signal_current:
@@ -248,24 +454,15 @@ class TechnicalIndicators:
     
     def calculate_sma(self, prices: List[float] = None, period: int = 20) -> float:
         """Calculate Simple Moving Average"""
-        prices = prices or self.price_history
-        if len(prices) < period:
-            return prices[-1] if prices else 0
-        return sum(prices[-period:]) / period
+        if prices is None:
+            prices = self.price_history
+        return sma(prices, period)
     
     def calculate_ema(self, prices: List[float] = None, period: int = 20) -> float:
         """Calculate Exponential Moving Average"""
-        prices = prices or self.price_history
-        if len(prices) < period:
-            return prices[-1] if prices else 0
-        
-        multiplier = 2 / (period + 1)
-        ema = sum(prices[:period]) / period
-        
-        for price in prices[period:]:
-            ema = (price * multiplier) + (ema * (1 - multiplier))
-        
-        return ema
+        if prices is None:
+            prices = self.price_history
+        return ema(prices, period)
     
     def get_trend(self) -> str:
         """
@@ -288,6 +485,22 @@ class TechnicalIndicators:
         else:
             return "sideways"
     
+    def _streaming_signals(self, candles: OHLCV) -> Tuple[IndicatorSignal, IndicatorSignal]:
+        """RSI and MACD signals from the incremental stream (only new bars are processed)"""
+        values = self.stream.sync(candles)
+        
+        if self.stream.bars < self.stream.rsi.period:
+            rsi_signal = self.calculate_rsi()  # "Insufficient data"
+        else:
+            rsi_signal = self._rsi_signal(values['rsi'])
+        
+        if values['signal'] is None:
+            macd_signal = self.calculate_macd()
+        else:
+            macd_signal = self._macd_signal(values['macd'], values['signal'],
+                                            values['prev_histogram'])
+        return rsi_signal, macd_signal
+    
     def get_combined_signal(self) -> Dict:
         """
         Get combined signal from RSI and MACD
@@ -296,10 +509,13 @@ class TechnicalIndicators:
             Dict with overall signal and individual indicators
         """
         # Fetch fresh data
-        self.fetch_candles(granularity="5m", limit=50)
+        candles = self.fetch_candles(granularity="5m", limit=50)
         
-        rsi = self.calculate_rsi()
-        macd = self.calculate_macd()
+        if self.stream is not None and candles is not None:
+            rsi, macd = self._streaming_signals(candles)
+        else:
+            rsi = self.calculate_rsi()
+            macd = self.calculate_macd()
         trend = self.get_trend()
         
         # Combine signals
@@ -339,7 +555,7 @@ class TechnicalIndicators:
             'trend': trend,
             'rsi': rsi,
             'macd': macd,
-            'price': self.price_history[-1] if self.price_history else 0
+            'price': float(self.price_history[-1]) if len(self.price_history) else 0
         }
 
 
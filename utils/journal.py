@@ -0,0 +1,233 @@
+"""
+📓 Decision Journal
+Append-only, size-rotated JSONL event log written by a background thread
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+from typing import Dict, List
+
+
+class DecisionJournal:
+    """
+    Non-blocking writer for bot decisions
+
+    record() only puts the event on a bounded queue; a daemon thread
+    drains it in batches and appends one JSON object per line. When the
+    file passes `max_bytes` it is rotated (path -> path.1 -> ... ->
+    path.<backups>), so history is kept up to a fixed disk budget instead
+    of being truncated on every write. If the queue is full the event is
+    dropped and counted (the trading thread never waits for the disk).
+
+    Usage:
+        journal = DecisionJournal("bot_signals.jsonl", text_path="bot_decisions.log")
+        journal.record("🎯 SIGNAL BUY cmt_btcusdt", {'price': 97000.0})
+        tail_events("bot_signals.jsonl", 20)
+    """
+
+    def __init__(self, path: str = "bot_signals.jsonl", text_path: str = None,
+                 max_bytes: int = 10_000_000, backups: int = 5,
+                 queue_size: int = 10_000, flush_interval: float = 1.0):
+        """
+        Args:
+            path: JSONL file for events that carry data
+            text_path: Optional plain-text log that gets every message as "[ts] message"
+            max_bytes: Rotate the JSONL file once it reaches this size
+            backups: Rotated files kept (path.1 is the newest)
+            queue_size: Events buffered in memory before new ones are dropped
+            flush_interval: Max seconds between the writer's flushes
+        """
+        self.path = path
+        self.text_path = text_path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self.written = 0
+        self.dropped = 0
+
+        self._thread = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ==================== PRODUCER ====================
+
+    def record(self, message: str, data: Dict = None, timestamp: str = None) -> bool:
+        """
+        Queue an event (never blocks)
+
+        Args:
+            message: Human-readable line
+            data: Structured fields; only events with data go to the JSONL file
+            timestamp: Already formatted time (caller's clock)
+
+        Returns:
+            False if the event was dropped (queue full or journal closed)
+        """
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait((timestamp, message, data))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def flush(self):
+        """Block until everything queued so far is on disk (shutdown/tests)"""
+        self._queue.join()
+
+    def close(self, timeout: float = 5.0):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    # ==================== WRITER THREAD ====================
+
+    def _run(self):
+        json_file = text_file = None
+        try:
+            json_file = open(self.path, 'a', encoding='utf-8')
+            if self.text_path:
+                text_file = open(self.text_path, 'a', encoding='utf-8')
+            while True:
+                try:
+                    batch = [self._queue.get(timeout=self.flush_interval)]
+                except queue.Empty:
+                    continue
+                while len(batch) < 1000:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                stop = False
+                try:
+                    for item in batch:
+                        if item is None:
+                            stop = True
+                            continue
+                        json_file = self._write(item, json_file, text_file)
+                    json_file.flush()
+                    if text_file:
+                        text_file.flush()
+                except Exception as e:
+                    print(f"⚠️ Journal write failed: {e}")
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                if stop:
+                    return
+        except Exception as e:
+            print(f"⚠️ Journal writer stopped: {e}")
+        finally:
+            for f in (json_file, text_file):
+                if f:
+                    f.close()
+
+    def _write(self, item, json_file, text_file):
+        timestamp, message, data = item
+        if text_file:
+            text_file.write(f"[{timestamp}] {message}\n")
+        if data:
+            entry = {'timestamp': timestamp, 'message': message, **data}
+            json_file.write(json.dumps(entry, default=str) + "\n")
+            self.written += 1
+            if json_file.tell() >= self.max_bytes:
+                json_file = self._rotate(json_file)
+        return json_file
+
+    def _rotate(self, json_file):
+        """path -> path.1, path.1 -> path.2, ...; the oldest beyond `backups` is deleted"""
+        json_file.close()
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        return open(self.path, 'a', encoding='utf-8')
+
+
+def migrate_json_log(old_path: str, new_path: str) -> int:
+    """
+    Copy a legacy JSON-array log into a new JSONL journal (once)
+
+    Does nothing if the journal already exists or the old file is missing
+    or unreadable.
+
+    Returns:
+        Number of events copied
+    """
+    if os.path.exists(new_path) or not os.path.exists(old_path):
+        return 0
+    try:
+        with open(old_path, 'r', encoding='utf-8') as f:
+            events = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    if not isinstance(events, list):
+        return 0
+    with open(new_path, 'w', encoding='utf-8') as f:
+        for event in events:
+            f.write(json.dumps(event, default=str) + "\n")
+    return len(events)
+
+
+# ==================== READER ====================
+
+def _tail_lines(path: str, n: int, block: int = 8192) -> List[bytes]:
+    """Last `n` complete lines of a file, reading backwards from the end"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        data = b''
+        while end > 0 and data.count(b'\n') <= n:
+            start = max(0, end - block)
+            f.seek(start)
+            data = f.read(end - start) + data
+            end = start
+    lines = data.split(b'\n')
+    if end > 0:
+        lines = lines[1:]  # first piece may be a partial line
+    return [line for line in lines if line.strip()][-n:]
+
+
+def tail_events(path: str = "bot_signals.jsonl", n: int = 50,
+                backups: int = 5) -> List[Dict]:
+    """
+    Last `n` journal events, oldest first
+
+    Reads only the end of the current file (and of the rotated ones if it
+    holds fewer than n), so cost depends on n, not on the journal size.
+    Lines that are not valid JSON (e.g. a write in progress) are skipped.
+    """
+    events: List[Dict] = []
+    files = [path] + [f"{path}.{i}" for i in range(1, backups + 1)]
+    for file in files:
+        if len(events) >= n:
+            break
+        if not os.path.exists(file):
+            if file == path:
+                continue
+            break
+        older = []
+        for line in _tail_lines(file, n - len(events)):
+            try:
+                older.append(json.loads(line))
+            except ValueError:
+                continue
+        events = older + events
+    return events[-n:]
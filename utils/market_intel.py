@@ -0,0 +1,283 @@
+"""
+🌡️ Market Intel Provider
+Shared Fear & Greed / CoinGecko global data, refreshed in the background
+and served from memory (stale-while-revalidate), persisted across restarts
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from .scheduler import TaskScheduler
+
+FEAR_GREED = 'fear_greed'
+GLOBAL = 'global'
+
+FEAR_GREED_URL = "https://api.alternative.me/fng/"
+COINGECKO_URL = "https://api.coingecko.com/api/v3"
+COINGECKO_PRO_URL = "https://pro-api.coingecko.com/api/v3"
+
+SNAPSHOT_FILE = "market_intel_cache.json"
+
+# Seconds a value counts as fresh (alternative.me updates once a day)
+REFRESH_INTERVALS = {
+    FEAR_GREED: 900,
+    GLOBAL: 120,
+}
+
+DEFAULTS = {
+    FEAR_GREED: {'value': 50, 'classification': 'Neutral', 'timestamp': ''},
+    GLOBAL: {
+        'total_market_cap_usd': 0,
+        'total_volume_24h': 0,
+        'btc_dominance': 0,
+        'eth_dominance': 0,
+        'market_cap_change_24h': 0,
+        'active_cryptocurrencies': 0,
+    },
+}
+
+
+@dataclass
+class IntelFeed:
+    """One slow-changing feed and its last good value"""
+    name: str
+    fetch: Callable[[], Optional[Dict]]
+    interval: float
+    value: Optional[Dict] = None
+    updated_at: float = 0.0         # Wall clock of the last good fetch (0 = never)
+    refreshing: bool = False
+    failures: int = 0
+    last_error: str = ""
+
+
+class MarketIntelProvider:
+    """
+    One process-wide source for Fear & Greed and CoinGecko global data
+
+    Readers never wait on HTTP: get() returns the last good value (or the
+    neutral default before the first fetch) and, when that value is older
+    than the feed's interval, starts a refresh on a background thread. Only
+    one refresh per feed is in flight at a time, and a failed refresh keeps
+    the previous value. start() also refreshes every feed on its own
+    cadence through a TaskScheduler, so the bots' hot paths normally find
+    fresh data. Each good fetch is written to a JSON snapshot that seeds
+    the next process, so a restart serves data without a round-trip.
+
+    Usage:
+        intel = get_market_intel()
+        fng = intel.fear_greed()['value']
+        change = intel.global_market()['market_cap_change_24h']
+    """
+
+    def __init__(self, fetchers: Dict[str, Callable[[], Optional[Dict]]] = None,
+                 intervals: Dict[str, float] = None,
+                 snapshot_path: Optional[str] = SNAPSHOT_FILE,
+                 api_key: str = None, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            fetchers: feed name -> callable returning the normalized dict
+                      (defaults to the alternative.me / CoinGecko fetchers)
+            intervals: feed name -> seconds a value stays fresh
+            snapshot_path: JSON snapshot file (None disables it, e.g. tests)
+            api_key: CoinGecko Pro key (defaults to COINGECKO_API_KEY)
+            clock: Wall-clock time source (injectable for tests)
+        """
+        self.api_key = api_key if api_key is not None else os.getenv("COINGECKO_API_KEY", "")
+        self.base_url = COINGECKO_PRO_URL if self.api_key else COINGECKO_URL
+        self.session = requests.Session()
+        if self.api_key:
+            self.session.headers.update({'x-cg-pro-api-key': self.api_key})
+        self.snapshot_path = snapshot_path
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._scheduler: Optional[TaskScheduler] = None
+
+        fetchers = fetchers or {FEAR_GREED: self._fetch_fear_greed, GLOBAL: self._fetch_global}
+        intervals = {**REFRESH_INTERVALS, **(intervals or {})}
+        self.feeds: Dict[str, IntelFeed] = {
+            name: IntelFeed(name, fetch, intervals.get(name, 300))
+            for name, fetch in fetchers.items()
+        }
+        self._load_snapshot()
+
+    # ==================== READ ====================
+
+    def get(self, name: str, default: Any = ...) -> Any:
+        """
+        Last good value of a feed, without waiting on the network
+
+        Args:
+            name: Feed name (FEAR_GREED, GLOBAL)
+            default: Returned before the first good fetch (feed default if omitted)
+        """
+        feed = self.feeds[name]
+        with self._lock:
+            value = feed.value
+            stale = self.clock() - feed.updated_at >= feed.interval
+        if stale:
+            self.refresh(name, wait=False)
+        if value is None:
+            return dict(DEFAULTS.get(name, {})) if default is ... else default
+        return dict(value)
+
+    def fear_greed(self) -> Dict:
+        """{'value', 'classification', 'timestamp'}"""
+        return self.get(FEAR_GREED)
+
+    def global_market(self) -> Dict:
+        """Total cap / volume, BTC & ETH dominance, 24h cap change, active coins"""
+        return self.get(GLOBAL)
+
+    def age(self, name: str) -> Optional[float]:
+        """Seconds since the last good fetch (None if never fetched)"""
+        feed = self.feeds[name]
+        return self.clock() - feed.updated_at if feed.value is not None else None
+
+    # ==================== REFRESH ====================
+
+    def refresh(self, name: str, wait: bool = True) -> bool:
+        """
+        Fetch a feed now
+
+        Args:
+            wait: Fetch on this thread; otherwise start a daemon thread and return
+
+        Returns:
+            True if a good value was stored (always False when not waiting)
+        """
+        feed = self.feeds[name]
+        with self._lock:
+            if feed.refreshing:
+                return False
+            feed.refreshing = True
+        if not wait:
+            threading.Thread(target=self._refresh, args=(feed,),
+                             name=f"intel-{name}", daemon=True).start()
+            return False
+        return self._refresh(feed)
+
+    def refresh_all(self) -> int:
+        """Fetch every feed on this thread; returns how many succeeded"""
+        return sum(self.refresh(name) for name in self.feeds)
+
+    def _refresh(self, feed: IntelFeed) -> bool:
+        try:
+            value = feed.fetch()
+        except Exception as e:
+            value = None
+            feed.last_error = str(e)
+        with self._lock:
+            feed.refreshing = False
+            if not value:
+                feed.failures += 1
+                return False
+            feed.value = value
+            feed.updated_at = self.clock()
+            feed.last_error = ""
+        self._write_snapshot()
+        return True
+
+    def start(self) -> TaskScheduler:
+        """Refresh every feed on its own cadence in the background"""
+        if self._scheduler is None:
+            self._scheduler = TaskScheduler(background_workers=len(self.feeds))
+            for name, feed in self.feeds.items():
+                # A fresh snapshot value waits out its remaining life
+                delay = max(0.0, feed.interval - (self.clock() - feed.updated_at))
+                self._scheduler.add(name, lambda name=name: self.refresh(name) or None,
+                                    feed.interval, background=True, delay=delay)
+            self._scheduler.start()
+        return self._scheduler
+
+    def stop(self):
+        if self._scheduler:
+            self._scheduler.stop()
+            self._scheduler = None
+
+    # ==================== FETCHERS ====================
+
+    def _fetch_fear_greed(self) -> Optional[Dict]:
+        resp = self.session.get(FEAR_GREED_URL, timeout=10)
+        if resp.status_code != 200:
+            return None
+        data = resp.json().get('data') or []
+        if not data:
+            return None
+        return {
+            'value': int(data[0].get('value', 50)),
+            'classification': data[0].get('value_classification', 'Neutral'),
+            'timestamp': data[0].get('timestamp', ''),
+        }
+
+    def _fetch_global(self) -> Optional[Dict]:
+        resp = self.session.get(f"{self.base_url}/global", timeout=10)
+        if resp.status_code != 200:
+            return None
+        d = resp.json().get('data')
+        if not d:
+            return None
+        return {
+            'total_market_cap_usd': d.get('total_market_cap', {}).get('usd', 0),
+            'total_volume_24h': d.get('total_volume', {}).get('usd', 0),
+            'btc_dominance': d.get('market_cap_percentage', {}).get('btc', 0),
+            'eth_dominance': d.get('market_cap_percentage', {}).get('eth', 0),
+            'market_cap_change_24h': d.get('market_cap_change_percentage_24h_usd', 0),
+            'active_cryptocurrencies': d.get('active_cryptocurrencies', 0),
+        }
+
+    # ==================== SNAPSHOT ====================
+
+    def _load_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                saved = json.load(f)
+            for name, entry in saved.get('feeds', {}).items():
+                if name in self.feeds and entry.get('value'):
+                    self.feeds[name].value = entry['value']
+                    self.feeds[name].updated_at = entry.get('updated_at', 0)
+        except Exception:
+            pass
+
+    def _write_snapshot(self):
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            feeds = {name: {'value': feed.value, 'updated_at': feed.updated_at}
+                     for name, feed in self.feeds.items() if feed.value is not None}
+        tmp = f"{self.snapshot_path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, 'w') as f:
+                json.dump({'saved_at': self.clock(), 'feeds': feeds}, f)
+            os.replace(tmp, self.snapshot_path)
+        except Exception as e:
+            print(f"⚠️ Could not write market intel snapshot: {e}")
+
+
+# ==================== SHARED INSTANCE ====================
+
+_shared_intel: Optional[MarketIntelProvider] = None
+_shared_lock = threading.Lock()
+
+
+def get_market_intel(start: bool = True) -> MarketIntelProvider:
+    """
+    Process-wide MarketIntelProvider
+
+    Args:
+        start: Begin the background refresh schedule (on first creation)
+    """
+    global _shared_intel
+    with _shared_lock:
+        if _shared_intel is None:
+            _shared_intel = MarketIntelProvider()
+            if start:
+                _shared_intel.start()
+        return _shared_intel
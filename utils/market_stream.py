@@ -0,0 +1,462 @@
+"""
+📡 WEEX Market Data Stream
+WebSocket ticker/kline feed with a thread-safe last-price and candle cache
+"""
+
+import json
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import websocket  # websocket-client
+except ImportError:  # pragma: no cover - optional dependency
+    websocket = None
+
+from .ohlcv import OHLCV, OHLCVBuffer
+
+
+class MarketDataCache:
+    """
+    Thread-safe cache of the latest ticker and a rolling candle window
+
+    Writers are the WebSocket thread (and REST seeding); readers are the
+    bots and WeexClient. Reads return copies, never live references.
+    Listeners registered with add_listener are called with
+    (symbol, last_price) on every ticker update, outside the lock.
+    """
+
+    def __init__(self, max_candles: int = 1000):
+        """
+        Args:
+            max_candles: Candles kept per (symbol, granularity)
+        """
+        self.max_candles = max_candles
+        self._lock = threading.Lock()
+        self._tickers: Dict[str, Tuple[Dict, float]] = {}
+        self._candles: Dict[Tuple[str, str], OHLCVBuffer] = {}
+        self._candle_updated: Dict[Tuple[str, str], float] = {}
+        self._listeners: List[Callable[[str, float], None]] = []
+
+    # ==================== LISTENERS ====================
+
+    def add_listener(self, callback: Callable[[str, float], None]):
+        """Call `callback(symbol, price)` on every ticker update"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str, float], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    # ==================== TICKERS ====================
+
+    def update_ticker(self, symbol: str, data: Dict) -> Optional[float]:
+        """
+        Store a ticker update
+
+        Args:
+            symbol: Trading pair (e.g., "cmt_btcusdt")
+            data: Ticker payload; the price may be under last/lastPrice/close
+
+        Returns:
+            Last price, or None if the payload had no price
+        """
+        price = _to_float(data.get('last', data.get('lastPrice', data.get('close'))))
+        if not price:
+            return None
+
+        ticker = dict(data)
+        ticker['symbol'] = symbol
+        ticker['last'] = price
+        for rest_key, ws_key in (('high_24h', 'high24h'), ('low_24h', 'low24h'),
+                                 ('volume_24h', 'volume24h')):
+            if rest_key not in ticker and ws_key in ticker:
+                ticker[rest_key] = ticker[ws_key]
+
+        with self._lock:
+            self._tickers[symbol] = (ticker, time.time())
+
+        for listener in list(self._listeners):
+            try:
+                listener(symbol, price)
+            except Exception as e:
+                print(f"❌ Tick listener error ({symbol}): {e}")
+        return price
+
+    def get_ticker(self, symbol: str, max_age: float = 2.0) -> Optional[Dict]:
+        """
+        Latest ticker if it is younger than `max_age` seconds, else None
+        """
+        with self._lock:
+            entry = self._tickers.get(symbol)
+        if not entry or time.time() - entry[1] > max_age:
+            return None
+        return dict(entry[0])
+
+    def get_price(self, symbol: str, max_age: float = 2.0) -> Optional[float]:
+        """Latest price if fresh, else None"""
+        ticker = self.get_ticker(symbol, max_age)
+        return ticker['last'] if ticker else None
+
+    def tickers(self, max_age: float = 60.0) -> Dict[str, Dict]:
+        """Every ticker younger than `max_age` seconds (symbol -> ticker copy)"""
+        now = time.time()
+        with self._lock:
+            entries = list(self._tickers.items())
+        return {symbol: dict(ticker) for symbol, (ticker, stamp) in entries if now - stamp <= max_age}
+
+    # ==================== CANDLES ====================
+
+    def update_candle(self, symbol: str, granularity: str, bar) -> bool:
+        """
+        Insert or replace one candle from the stream
+
+        Args:
+            symbol: Trading pair
+            granularity: Candle interval (1m, 5m, ...)
+            bar: [ts, open, high, low, close, volume] or a dict with those fields
+
+        Returns:
+            True if the bar was parsed and stored
+        """
+        parsed = _parse_bar(bar)
+        if parsed is None:
+            return False
+
+        key = (symbol, granularity)
+        with self._lock:
+            window = self._window(key)
+            if not window.append(*parsed):
+                window.extend([parsed])  # out-of-order bar: merge, newest data wins
+            self._candle_updated[key] = time.time()
+        return True
+
+    def seed_candles(self, symbol: str, granularity: str, candles: Iterable):
+        """
+        Merge REST history into the window without marking it fresh
+
+        Bars already received from the stream win over REST bars with the
+        same timestamp, since they are newer.
+        """
+        parsed = [b for b in (_parse_bar(c) for c in candles) if b is not None]
+        if not parsed:
+            return
+        with self._lock:
+            window = self._window((symbol, granularity))
+            if len(window):
+                streamed = set(window.window().ts.tolist())
+                parsed = [b for b in parsed if b[0] not in streamed]
+            window.extend(parsed)
+
+    def _window(self, key: Tuple[str, str]) -> OHLCVBuffer:
+        """Buffer for a key (caller holds the lock)"""
+        window = self._candles.get(key)
+        if window is None:
+            window = self._candles[key] = OHLCVBuffer(self.max_candles)
+        return window
+
+    def _fresh_window(self, key: Tuple[str, str], limit: int, max_age: float) -> Optional[OHLCV]:
+        """Last `limit` bars if fresh and complete (caller holds the lock)"""
+        updated = self._candle_updated.get(key)
+        window = self._candles.get(key)
+        if not updated or window is None or len(window) < limit:
+            return None
+        if time.time() - updated > max_age:
+            return None
+        return window.window(limit)
+
+    def get_candles(self, symbol: str, granularity: str, limit: int = 100,
+                    max_age: float = 10.0) -> Optional[List[List]]:
+        """
+        Last `limit` candles (oldest first) if the stream updated them within
+        `max_age` seconds and enough history is cached, else None
+        """
+        with self._lock:
+            bars = self._fresh_window((symbol, granularity), limit, max_age)
+            return bars.rows() if bars is not None else None
+
+    def get_arrays(self, symbol: str, granularity: str, limit: int = 100,
+                   max_age: float = 10.0) -> Optional[OHLCV]:
+        """Same as get_candles but as column arrays (copies, safe to keep)"""
+        with self._lock:
+            bars = self._fresh_window((symbol, granularity), limit, max_age)
+            return OHLCV(*(col.copy() for col in bars)) if bars is not None else None
+
+
+class TickDispatcher:
+    """
+    Runs a tick handler on its own worker thread
+
+    Use it as the on_tick callback: the WebSocket thread only enqueues
+    (symbol, price) and returns, so a handler that blocks on REST (closing
+    a position, moving a stop) never stalls tick delivery. Ticks are
+    handled one at a time and in arrival order, so two ticks of the same
+    position can never close it twice concurrently.
+
+    Usage:
+        dispatcher = TickDispatcher(bot.handle_tick)
+        stream = MarketStream(symbols, on_tick=dispatcher)
+    """
+
+    def __init__(self, handler: Callable[[str, float], None], name: str = "tick-dispatcher"):
+        """
+        Args:
+            handler: callback(symbol, price), run on the worker thread
+            name: Worker thread name
+        """
+        self.handler = handler
+        self.name = name
+        self._queue: "queue.Queue[Optional[Tuple[str, float]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def __call__(self, symbol: str, price: float):
+        self.submit(symbol, price)
+
+    def submit(self, symbol: str, price: float):
+        """Queue a tick (starts the worker on first use)"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        self._queue.put((symbol, price))
+
+    @property
+    def pending(self) -> int:
+        """Ticks queued or being handled"""
+        return self._queue.unfinished_tasks
+
+    def drain(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued tick was handled; False on timeout"""
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks:
+            if time.time() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self, timeout: float = 5.0):
+        """Handle what is queued, then end the worker"""
+        thread = self._thread
+        if thread and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self.handler(*item)
+            except Exception as e:
+                print(f"❌ Tick handler error ({item[0]}): {e}")
+            finally:
+                self._queue.task_done()
+
+
+class MarketStream:
+    """
+    WEEX public WebSocket subscriber
+
+    Runs websocket-client in a daemon thread, subscribes to ticker and
+    kline channels for the given symbols and feeds every push into a
+    MarketDataCache. Reconnects automatically until stop() is called.
+    """
+
+    WS_URL = "wss://ws-contract.weex.com/v2/ws/public"
+
+    # Granularity (REST naming) -> kline channel interval
+    KLINE_INTERVALS = {
+        '1m': 'MINUTE_1', '5m': 'MINUTE_5', '15m': 'MINUTE_15', '30m': 'MINUTE_30',
+        '1H': 'HOUR_1', '4H': 'HOUR_4', '1D': 'DAY_1', '1W': 'WEEK_1',
+    }
+
+    def __init__(self, symbols: Iterable[str], granularities: Iterable[str] = ('1m',),
+                 cache: MarketDataCache = None, url: str = None,
+                 on_tick: Callable[[str, float], None] = None,
+                 reconnect_delay: float = 3.0):
+        """
+        Args:
+            symbols: Trading pairs to subscribe (e.g., ["cmt_btcusdt"])
+            granularities: Kline intervals to subscribe
+            cache: Shared cache (a new one is created if not provided)
+            url: WebSocket endpoint (defaults to WEEX public contract stream)
+            on_tick: Optional callback(symbol, price) for every ticker update
+            reconnect_delay: Seconds to wait before reconnecting
+        """
+        self.symbols = list(dict.fromkeys(symbols))
+        self.granularities = [g for g in granularities if g in self.KLINE_INTERVALS]
+        self.cache = cache or MarketDataCache()
+        self.url = url or self.WS_URL
+        self.reconnect_delay = reconnect_delay
+
+        self._interval_to_gran = {v: k for k, v in self.KLINE_INTERVALS.items()}
+        self._ws = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.connected = threading.Event()
+        self.messages = 0
+
+        if on_tick:
+            self.cache.add_listener(on_tick)
+
+    @property
+    def available(self) -> bool:
+        """True if websocket-client is installed"""
+        return websocket is not None
+
+    # ==================== CHANNELS ====================
+
+    def ticker_channel(self, symbol: str) -> str:
+        return f"ticker.{symbol}"
+
+    def kline_channel(self, symbol: str, granularity: str) -> str:
+        return f"kline.LAST_PRICE.{symbol}.{self.KLINE_INTERVALS[granularity]}"
+
+    def subscriptions(self) -> List[Dict]:
+        """Subscribe messages sent on every (re)connect"""
+        channels = [self.ticker_channel(s) for s in self.symbols]
+        channels += [self.kline_channel(s, g) for s in self.symbols for g in self.granularities]
+        return [{"event": "subscribe", "channel": ch} for ch in channels]
+
+    # ==================== LIFECYCLE ====================
+
+    def start(self) -> bool:
+        """
+        Start the background connection
+
+        Returns:
+            False if websocket-client is not installed (callers keep polling REST)
+        """
+        if not self.available:
+            print("⚠️ websocket-client not installed. Market stream disabled (REST polling).")
+            return False
+        if self._thread and self._thread.is_alive():
+            return True
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run_forever, name="weex-market-stream",
+                                        daemon=True)
+        self._thread.start()
+        print(f"📡 Market stream starting: {len(self.symbols)} symbols")
+        return True
+
+    def stop(self, timeout: float = 5.0):
+        """Close the connection and stop reconnecting"""
+        self._stop.set()
+        if self._ws is not None:
+            try:
+                self._ws.close(timeout=1)
+            except Exception:
+                pass
+        if self._thread:
+            self._thread.join(timeout)
+        self.connected.clear()
+
+    def _run_forever(self):
+        while not self._stop.is_set():
+            self._ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close,
+            )
+            try:
+                self._ws.run_forever(ping_interval=20, ping_timeout=10)
+            except Exception as e:
+                print(f"❌ Market stream error: {e}")
+            self.connected.clear()
+            if self._stop.wait(self.reconnect_delay):
+                break
+
+    def _on_open(self, ws):
+        for message in self.subscriptions():
+            ws.send(json.dumps(message))
+        self.connected.set()
+
+    def _on_message(self, ws, raw):
+        if raw == "ping":
+            ws.send("pong")
+            return
+        self.handle_message(raw)
+
+    def _on_error(self, ws, error):
+        if not self._stop.is_set():
+            print(f"⚠️ Market stream: {error}")
+
+    def _on_close(self, ws, status_code=None, message=None):
+        self.connected.clear()
+
+    # ==================== PARSING ====================
+
+    def handle_message(self, raw) -> bool:
+        """
+        Route one push message into the cache
+
+        Returns:
+            True if the message carried ticker or kline data
+        """
+        try:
+            message = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+        except (ValueError, TypeError):
+            return False
+        if not isinstance(message, dict):
+            return False
+
+        if message.get('event') == 'ping':
+            if self._ws is not None:
+                try:
+                    self._ws.send(json.dumps({"event": "pong", "time": message.get('time')}))
+                except Exception:
+                    pass
+            return False
+
+        channel = message.get('channel') or (message.get('arg') or {}).get('channel', '')
+        data = message.get('data')
+        if not channel or data is None:
+            return False
+        items = data if isinstance(data, list) else [data]
+        self.messages += 1
+
+        if channel.startswith('ticker.'):
+            symbol = channel.split('.', 1)[1]
+            for item in items:
+                if isinstance(item, dict):
+                    self.cache.update_ticker(symbol, item)
+            return True
+
+        if channel.startswith('kline.'):
+            parts = channel.split('.')
+            granularity = self._interval_to_gran.get(parts[-1])
+            if granularity is None or len(parts) < 3:
+                return False
+            symbol = parts[-2]
+            for item in items:
+                self.cache.update_candle(symbol, granularity, item)
+            return True
+
+        return False
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _parse_bar(bar) -> Optional[List]:
+    """Normalize a candle to [ts:int, open, high, low, close, volume]"""
+    try:
+        if isinstance(bar, dict):
+            ts = bar.get('ts', bar.get('time', bar.get('startTime', bar.get('t'))))
+            values = [bar.get(k, bar.get(k[0])) for k in ('open', 'high', 'low', 'close', 'volume')]
+        else:
+            ts, values = bar[0], list(bar[1:6])
+        return [int(float(ts))] + [float(v) for v in values]
+    except (TypeError, ValueError, IndexError):
+        return None
@@ -0,0 +1,162 @@
+"""
+📦 OHLCV Ring Buffer
+Fixed-capacity columnar candle storage with zero-copy windows
+"""
+
+from typing import Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+FIELDS = ('ts', 'open', 'high', 'low', 'close', 'volume')
+
+
+class OHLCV(NamedTuple):
+    """
+    Candle columns, oldest first
+
+    Each field is a float64 NumPy array (timestamps in ms are exact in
+    float64). When it comes from OHLCVBuffer.window() the arrays are views
+    into the buffer: don't keep them across appends, copy() if needed.
+    """
+    ts: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def rows(self) -> List[List]:
+        """[[ts:int, open, high, low, close, volume], ...] (compatibility format)"""
+        return [[int(r[0])] + r[1:] for r in np.column_stack(self).tolist()]
+
+
+def parse_rows(rows: Iterable) -> np.ndarray:
+    """
+    Parse candle rows (numbers or numeric strings) into a (6, n) array sorted by ts
+
+    Rows that are short or not numeric are dropped.
+    """
+    rows = list(rows)
+    if not rows:
+        return np.empty((6, 0))
+    try:
+        data = np.array([r[:6] for r in rows], dtype=np.float64)
+    except (TypeError, ValueError, IndexError):
+        clean = []
+        for r in rows:
+            try:
+                clean.append([float(v) for v in r[:6]])
+            except (TypeError, ValueError, IndexError):
+                continue
+        if not clean:
+            return np.empty((6, 0))
+        data = np.array(clean, dtype=np.float64)
+    if data.ndim != 2 or data.shape[1] != 6:
+        return np.empty((6, 0))
+    data = data.T
+    if len(data[0]) > 1 and (np.diff(data[0]) < 0).any():
+        data = data[:, np.argsort(data[0], kind='stable')]
+    return data
+
+
+class OHLCVBuffer:
+    """
+    Ring buffer of candles stored as six float64 columns
+
+    Every value is written twice (at i and i + capacity), so the newest n
+    bars are always one contiguous slice and window(n) never copies.
+    Memory is fixed at 2 x 6 x 8 x capacity bytes (96 KB for 1000 bars).
+
+    Usage:
+        buf = OHLCVBuffer(1000)
+        buf.extend(client.get_candles("cmt_btcusdt", "5m", 100))
+        bars = buf.window(50)
+        indicators.rsi(bars.close)
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self._data = np.zeros((6, 2 * capacity), dtype=np.float64)
+        self._end = capacity  # one past the newest bar, in [capacity, 2 * capacity)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        return int(self._data[0, self._end - 1]) if self._size else None
+
+    def clear(self):
+        self._end = self.capacity
+        self._size = 0
+
+    def _write(self, column: np.ndarray):
+        """Append one bar (caller checked ordering)"""
+        pos = self._end - self.capacity
+        self._data[:, pos] = column
+        self._data[:, pos + self.capacity] = column
+        self._end += 1
+        if self._end == 2 * self.capacity:
+            self._end = self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def append(self, ts, open_, high, low, close, volume) -> bool:
+        """
+        Append a bar, or replace the newest one if it has the same timestamp
+
+        Returns:
+            False if the bar is older than the newest stored bar (use extend to merge)
+        """
+        column = np.array((ts, open_, high, low, close, volume), dtype=np.float64)
+        return self._push(column)
+
+    def _push(self, column: np.ndarray) -> bool:
+        if self._size:
+            last = self._data[0, self._end - 1]
+            if column[0] == last:
+                pos = self._end - 1 - self.capacity
+                self._data[:, pos] = column
+                self._data[:, pos + self.capacity] = column
+                return True
+            if column[0] < last:
+                return False
+        self._write(column)
+        return True
+
+    def extend(self, rows) -> int:
+        """
+        Merge candles (rows of 6 values, strings allowed, any order)
+
+        New bars are appended in place; bars older than the newest stored
+        one trigger a merge-rebuild (only happens when filling holes).
+
+        Returns:
+            Number of bars merged
+        """
+        data = rows if isinstance(rows, np.ndarray) else parse_rows(rows)
+        n = data.shape[1]
+        if n == 0:
+            return 0
+        if self._size and data[0, 0] < self._data[0, self._end - 1]:
+            self._rebuild(data)
+            return n
+        for i in range(n):
+            self._push(data[:, i])
+        return n
+
+    def _rebuild(self, data: np.ndarray):
+        current = np.vstack(self.window())
+        merged = np.concatenate([current, data], axis=1)
+        # Incoming bars win over stored ones with the same timestamp
+        _, last_idx = np.unique(merged[0][::-1], return_index=True)
+        merged = merged[:, len(merged[0]) - 1 - last_idx]
+        self.clear()
+        for i in range(max(0, merged.shape[1] - self.capacity), merged.shape[1]):
+            self._write(merged[:, i])
+
+    def window(self, n: Optional[int] = None) -> OHLCV:
+        """Newest `n` bars (all if None) as zero-copy column views"""
+        n = self._size if n is None else min(n, self._size)
+        block = self._data[:, self._end - n:self._end]
+        return OHLCV(*block)
@@ -0,0 +1,187 @@
+"""
+⏱️ Token-Bucket Rate Limiter
+Weighted, thread-safe request budgeting for the WEEX REST API
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+
+class TokenBucket:
+    """
+    Classic token bucket
+
+    Tokens refill continuously at `rate` per second up to `capacity`.
+    A request of weight `w` takes `w` tokens; when the bucket runs dry the
+    caller sleeps just long enough for the deficit to refill, so bursts go
+    out at full speed and sustained traffic settles at `rate`.
+    """
+
+    def __init__(self, rate: float, capacity: float = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size (defaults to one second of tokens)
+            clock: Monotonic time source (injectable for tests)
+            sleep: Sleep function (injectable for tests)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def reserve(self, weight: float = 1) -> float:
+        """
+        Take `weight` tokens, possibly going into debt
+
+        Returns:
+            Seconds the caller must wait before sending (0 if tokens were available)
+        """
+        weight = min(float(weight), self.capacity)
+        with self._lock:
+            self._refill()
+            self.tokens -= weight
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self, weight: float = 1) -> float:
+        """
+        Block until `weight` tokens are available
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self.reserve(weight)
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """
+    Per-endpoint rate limiter for WeexClient
+
+    Requests are split into three buckets - public market data, private
+    account data and order placement - and each endpoint costs a weight
+    from ENDPOINT_WEIGHTS. Defaults are conservative; pass `buckets` to
+    tune them to the limits on your API key.
+    """
+
+    # bucket -> (tokens per second, burst capacity)
+    DEFAULT_BUCKETS: Dict[str, Tuple[float, float]] = {
+        'public': (20, 20),
+        'private': (10, 10),
+        'trade': (10, 10),
+    }
+
+    # endpoint -> (bucket, weight)
+    ENDPOINT_WEIGHTS: Dict[str, Tuple[str, float]] = {
+        '/capi/v2/time': ('public', 1),
+        '/capi/v2/market/ticker': ('public', 1),
+        '/capi/v2/market/candles': ('public', 1),
+        '/capi/v2/market/contracts': ('public', 5),
+        '/capi/v2/account/assets': ('private', 1),
+        '/capi/v2/account/singleAccount': ('private', 1),
+        '/capi/v2/account/setLeverage': ('private', 2),
+        '/capi/v2/position/singlePosition': ('private', 1),
+        '/capi/v2/position/allPosition': ('private', 2),
+        '/capi/v2/order/current': ('private', 1),
+        '/capi/v2/order/detail': ('private', 1),
+        '/capi/v2/order/history': ('private', 2),
+        '/capi/v2/order/fills': ('private', 2),
+        '/capi/v2/order/placeOrder': ('trade', 1),
+        '/capi/v2/order/cancel_order': ('trade', 1),
+        '/capi/v2/order/cancel_all_order': ('trade', 5),
+        '/capi/v2/order/batchOrders': ('trade', 1),            # Per order in the batch
+        '/capi/v2/order/cancel_batch_orders': ('trade', 1),    # Per order id
+        '/capi/v2/order/placeTpSlOrder': ('trade', 1),
+        '/capi/v2/order/modifyTpSlOrder': ('trade', 1),
+        '/capi/v2/order/cancel_plan': ('trade', 1),
+        '/capi/v2/order/currentPlan': ('private', 1),
+    }
+
+    # Batch endpoint -> body list whose length multiplies the weight
+    BATCH_FIELDS: Dict[str, str] = {
+        '/capi/v2/order/batchOrders': 'orderDataList',
+        '/capi/v2/order/cancel_batch_orders': 'ids',
+    }
+
+    def __init__(self, buckets: Dict[str, Tuple[float, float]] = None,
+                 weights: Dict[str, Tuple[str, float]] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            buckets: Override bucket rates {name: (rate, capacity)}
+            weights: Extra/overridden endpoint weights {path: (bucket, weight)}
+            clock: Monotonic time source (injectable for tests)
+            sleep: Sleep function (injectable for tests)
+        """
+        config = dict(self.DEFAULT_BUCKETS)
+        config.update(buckets or {})
+        self.buckets = {
+            name: TokenBucket(rate, capacity, clock=clock, sleep=sleep)
+            for name, (rate, capacity) in config.items()
+        }
+        self.weights = dict(self.ENDPOINT_WEIGHTS)
+        self.weights.update(weights or {})
+
+        self.waited: Dict[str, float] = {name: 0.0 for name in self.buckets}
+        self._stats_lock = threading.Lock()
+
+    def classify(self, endpoint: str, method: str = "GET",
+                 data: Optional[Dict] = None) -> Tuple[str, float]:
+        """
+        Resolve the bucket and weight for an endpoint
+
+        Batch endpoints (BATCH_FIELDS) cost their weight once per item in
+        the request body. Unknown endpoints fall back by path: market data
+        is public, order POSTs are trade traffic and everything else is
+        private.
+        """
+        path = endpoint.split('?', 1)[0]
+        if path in self.weights:
+            bucket_name, weight = self.weights[path]
+            field = self.BATCH_FIELDS.get(path)
+            if field and isinstance(data, dict) and isinstance(data.get(field), list):
+                weight *= max(1, len(data[field]))
+            return bucket_name, weight
+        if path.startswith('/capi/v2/market') or path == '/capi/v2/time':
+            return 'public', 1
+        if path.startswith('/capi/v2/order') and method.upper() != "GET":
+            return 'trade', 1
+        return 'private', 1
+
+    def acquire(self, endpoint: str, method: str = "GET", data: Optional[Dict] = None) -> float:
+        """
+        Block until the endpoint's bucket has room for one request
+
+        Args:
+            endpoint: API path
+            method: HTTP method
+            data: Request body (sizes batch requests)
+
+        Returns:
+            Seconds spent waiting
+        """
+        bucket_name, weight = self.classify(endpoint, method, data)
+        waited = self.buckets[bucket_name].acquire(weight)
+        if waited:
+            with self._stats_lock:
+                self.waited[bucket_name] += waited
+        return waited
@@ -0,0 +1,171 @@
+"""
+🕯️ Timeframe Resampler
+Builds 5m/15m/1H/... OHLCV bars locally from a single 1m candle window
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .candle_store import GRANULARITY_MS
+from .ohlcv import OHLCV, parse_rows
+
+
+def resample(candles: Iterable, granularity: str) -> List[List]:
+    """
+    Aggregate base candles into `granularity` bars aligned to the interval
+
+    Args:
+        candles: [[ts, open, high, low, close, volume], ...] oldest first
+        granularity: Target interval (5m, 15m, 1H, ...)
+
+    Returns:
+        [[bucket_ts, open, high, low, close, volume], ...] oldest first;
+        the last bar is partial if the current interval hasn't closed
+    """
+    step = GRANULARITY_MS[granularity]
+    bars: List[List] = []
+    for c in candles:
+        ts = int(float(c[0]))
+        o, h, l, cl, v = float(c[1]), float(c[2]), float(c[3]), float(c[4]), float(c[5])
+        bucket = ts - ts % step
+        if bars and bars[-1][0] == bucket:
+            bar = bars[-1]
+            bar[2] = max(bar[2], h)
+            bar[3] = min(bar[3], l)
+            bar[4] = cl
+            bar[5] += v
+        else:
+            bars.append([bucket, o, h, l, cl, v])
+    return bars
+
+
+def resample_arrays(data: np.ndarray, granularity: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized resample() for column data (no per-bar Python loop)
+
+    Args:
+        data: (6, n) array [ts, open, high, low, close, volume] sorted by ts
+        granularity: Target interval (5m, 15m, 1H, ...)
+
+    Returns:
+        ((6, m) aggregated bars, (m,) index of the first base bar of each one)
+    """
+    data = np.asarray(data, dtype=np.float64)
+    if data.shape[1] == 0:
+        return np.empty((6, 0)), np.empty(0, dtype=np.intp)
+    ts = data[0].astype(np.int64)
+    bucket = ts - ts % GRANULARITY_MS[granularity]
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(bucket)) + 1))
+    ends = np.append(starts[1:], len(ts)) - 1
+    bars = np.vstack([
+        bucket[starts].astype(np.float64),
+        data[1, starts],
+        np.maximum.reduceat(data[2], starts),
+        np.minimum.reduceat(data[3], starts),
+        data[4, ends],
+        np.add.reduceat(data[5], starts),
+    ])
+    return bars, starts
+
+
+class MultiTimeframeView:
+    """
+    Every timeframe of one symbol derived from the same 1m snapshot
+
+    All bars share the same last close, so the timeframes can't disagree
+    the way separately fetched windows (taken a few hundred ms apart) can.
+    The first bucket of a timeframe is dropped when the 1m window starts
+    in the middle of it, since its open/high/low would be wrong.
+    """
+
+    def __init__(self, candles, base: str = "1m"):
+        """
+        Args:
+            candles: Base-interval candles, oldest first ([[ts, o, h, l, c, v], ...] or OHLCV)
+            base: Interval of `candles`
+        """
+        self.base = base
+        if isinstance(candles, (OHLCV, np.ndarray)):
+            self._data = np.array(candles, dtype=np.float64).reshape(6, -1)
+        else:
+            self._data = parse_rows(candles)
+        self._bars: Dict[str, np.ndarray] = {}
+
+    @property
+    def candles(self) -> List[List]:
+        return _rows(self._data)
+
+    def get(self, granularity: str, limit: Optional[int] = None) -> List[List]:
+        """Last `limit` bars of `granularity` (the current one may be partial)"""
+        return _rows(self.get_arrays(granularity, limit))
+
+    def get_arrays(self, granularity: str, limit: Optional[int] = None) -> OHLCV:
+        """Like get() but as column arrays"""
+        if granularity == self.base:
+            bars = self._data
+        else:
+            bars = self._bars.get(granularity)
+            if bars is None:
+                bars, _ = resample_arrays(self._data, granularity)
+                if bars.shape[1] and self._data[0, 0] > bars[0, 0]:
+                    bars = bars[:, 1:]
+                self._bars[granularity] = bars
+        return OHLCV(*(bars[:, -limit:] if limit else bars))
+
+    def is_partial(self, granularity: str) -> bool:
+        """True if the newest `granularity` bar hasn't closed yet"""
+        if not self._data.shape[1] or granularity == self.base:
+            return False
+        step = GRANULARITY_MS[granularity]
+        last_ts = int(self._data[0, -1])
+        return (last_ts + GRANULARITY_MS[self.base]) % step != 0
+
+
+def _rows(data) -> List[List]:
+    return [[int(r[0])] + r[1:] for r in np.column_stack(data).tolist()] if len(data[0]) else []
+
+
+class Resampler:
+    """
+    Multi-timeframe candles from one base-interval request per symbol
+
+    Usage:
+        resampler = Resampler(candle_store)
+        view = resampler.view("cmt_btcusdt", {'1m': 20, '5m': 20, '15m': 12, '1H': 6})
+        view.get('15m', 12)
+    """
+
+    def __init__(self, source, base: str = "1m"):
+        """
+        Args:
+            source: CandleStore or WeexClient (get_arrays is used when available, else get_candles)
+            base: Interval fetched and aggregated from
+        """
+        self.source = source
+        self.base = base
+
+    def bars_needed(self, limits: Dict[str, int]) -> int:
+        """Base bars covering `limit` bars of every timeframe (plus one for alignment)"""
+        base_step = GRANULARITY_MS[self.base]
+        needed = 0
+        for granularity, limit in limits.items():
+            ratio = GRANULARITY_MS[granularity] // base_step
+            needed = max(needed, limit if ratio == 1 else (limit + 1) * ratio)
+        return needed
+
+    def view(self, symbol: str, limits: Dict[str, int]) -> MultiTimeframeView:
+        """
+        Fetch the base window once and expose every timeframe from it
+
+        Args:
+            symbol: Trading pair
+            limits: Bars wanted per timeframe, e.g. {'5m': 20, '1H': 6}
+        """
+        needed = self.bars_needed(limits)
+        if hasattr(self.source, 'get_arrays'):
+            return MultiTimeframeView(self.source.get_arrays(symbol, self.base, needed), self.base)
+        candles = self.source.get_candles(symbol, self.base, needed)
+        if isinstance(candles, dict):
+            candles = candles.get('data', [])
+        return MultiTimeframeView(candles if isinstance(candles, list) else [], self.base)
@@ -0,0 +1,230 @@
+"""
+⏱️ Task Scheduler
+Per-task cadence for bot main loops: critical tasks on the loop thread,
+slow ones on background workers
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+
+@dataclass
+class ScheduledTask:
+    """One recurring job and its run statistics"""
+    name: str
+    fn: Callable[[], Optional[bool]]
+    interval: float                 # Seconds between starts
+    priority: int = 10              # Lower runs first when several are due
+    deadline: Optional[float] = None  # Max seconds a run should take (overruns are reported)
+    background: bool = False        # Run on a worker thread instead of the loop thread
+    next_run: float = 0.0
+    running: bool = False
+    runs: int = 0
+    failures: int = 0
+    overruns: int = 0
+    skipped: int = 0                # Due while the previous run was still going
+    last_duration: float = 0.0
+    max_duration: float = 0.0
+    last_error: str = ""
+
+    def stats(self) -> Dict:
+        return {
+            'runs': self.runs,
+            'failures': self.failures,
+            'overruns': self.overruns,
+            'skipped': self.skipped,
+            'last_duration': round(self.last_duration, 4),
+            'max_duration': round(self.max_duration, 4),
+            'last_error': self.last_error,
+        }
+
+
+class TaskScheduler:
+    """
+    Runs each task on its own cadence instead of one sleep-driven loop
+
+    Foreground tasks (position protection) run on the scheduler thread in
+    priority order, so their timing only depends on each other. Background
+    tasks (signal scans, CoinGecko/DeepSeek refreshes, status prints) are
+    handed to a small worker pool: a slow HTTP call there delays the next
+    run of that task only. A background task that is still running when it
+    comes due again is skipped rather than queued. A task that returns
+    False stops the scheduler (e.g. daily loss limit hit). When run()
+    ends, it waits (up to `shutdown_timeout`) for background runs still
+    in progress, so the caller's cleanup never races a half-finished scan.
+
+    Usage:
+        scheduler = TaskScheduler()
+        scheduler.add("positions", bot.check_positions, 5, priority=0, deadline=2)
+        scheduler.add("scan", bot.scan_and_trade, 20, background=True)
+        scheduler.run()          # until stop() or a task returns False
+    """
+
+    def __init__(self, background_workers: int = 3, clock: Callable[[], float] = time.monotonic,
+                 shutdown_timeout: float = 30.0):
+        """
+        Args:
+            background_workers: Threads for background tasks
+            clock: Monotonic time source (injectable for tests)
+            shutdown_timeout: Seconds run() waits for running background tasks on exit
+        """
+        self.clock = clock
+        self.shutdown_timeout = shutdown_timeout
+        self.tasks: Dict[str, ScheduledTask] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max(1, background_workers),
+                                            thread_name_prefix="sched")
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    # ==================== SETUP ====================
+
+    def add(self, name: str, fn: Callable[[], Optional[bool]], interval: float,
+            priority: int = 10, deadline: float = None, background: bool = False,
+            delay: float = 0.0) -> ScheduledTask:
+        """
+        Register a recurring task
+
+        Args:
+            name: Unique task name
+            fn: Callable without arguments; returning False stops the scheduler
+            interval: Seconds between runs
+            priority: Lower numbers run first among due foreground tasks
+            deadline: Seconds a run may take before it is reported as an overrun
+            background: Run on the worker pool (never blocks foreground tasks)
+            delay: Seconds before the first run
+        """
+        task = ScheduledTask(name, fn, interval, priority, deadline, background,
+                             next_run=self.clock() + delay)
+        with self._lock:
+            self.tasks[name] = task
+        self._wake.set()
+        return task
+
+    def trigger(self, name: str):
+        """Make a task due now (e.g. scan right after a position closes)"""
+        with self._lock:
+            task = self.tasks.get(name)
+            if task:
+                task.next_run = self.clock()
+        self._wake.set()
+
+    # ==================== EXECUTION ====================
+
+    def _execute(self, task: ScheduledTask):
+        started = self.clock()
+        try:
+            if task.fn() is False:
+                self._stop.set()
+                self._wake.set()
+        except Exception as e:
+            task.failures += 1
+            task.last_error = str(e)
+            print(f"❌ Task {task.name} failed: {e}")
+        finally:
+            duration = self.clock() - started
+            task.runs += 1
+            task.last_duration = duration
+            task.max_duration = max(task.max_duration, duration)
+            if task.deadline is not None and duration > task.deadline:
+                task.overruns += 1
+                print(f"⚠️ Task {task.name} took {duration:.2f}s (deadline {task.deadline}s)")
+            task.running = False
+
+    def run_pending(self, now: float = None) -> float:
+        """
+        Start every due task once
+
+        Foreground tasks run here, highest priority first; background ones
+        are submitted to the pool.
+
+        Returns:
+            Clock time of the next due task
+        """
+        now = self.clock() if now is None else now
+        to_start = []
+        with self._lock:
+            due = sorted((t for t in self.tasks.values() if t.next_run <= now),
+                         key=lambda t: (t.priority, t.next_run))
+            for task in due:
+                # Keep the cadence, but don't replay runs missed while busy
+                task.next_run += task.interval
+                if task.next_run <= now:
+                    task.next_run = now + task.interval
+                if task.running:
+                    task.skipped += 1
+                    continue
+                task.running = True
+                to_start.append(task)
+
+        for task in to_start:
+            if self._stop.is_set():
+                task.running = False
+            elif task.background:
+                self._executor.submit(self._execute, task)
+            else:
+                self._execute(task)
+
+        with self._lock:
+            return min((t.next_run for t in self.tasks.values()), default=now + 1.0)
+
+    def run(self, max_sleep: float = 1.0):
+        """Loop until stop() is called or a task returns False"""
+        self._stop.clear()
+        try:
+            while not self._stop.is_set():
+                self._wake.clear()
+                next_due = self.run_pending()
+                wait = min(max_sleep, max(0.0, next_due - self.clock()))
+                if wait > 0:
+                    self._wake.wait(wait)
+        finally:
+            self.shutdown(self.shutdown_timeout)
+
+    def shutdown(self, timeout: float = None) -> bool:
+        """
+        Stop, then wait for background runs still in progress
+
+        Args:
+            timeout: Max seconds to wait (None = shutdown_timeout)
+
+        Returns:
+            True if no background task was still running when it returned
+        """
+        self._stop.set()
+        self._wake.set()
+        deadline = time.monotonic() + (self.shutdown_timeout if timeout is None else timeout)
+        while True:
+            with self._lock:
+                busy = [t.name for t in self.tasks.values() if t.background and t.running]
+            if not busy or time.monotonic() >= deadline:
+                break
+            time.sleep(0.05)
+        if busy:
+            print(f"⚠️ Background tasks still running at shutdown: {', '.join(busy)}")
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        return not busy
+
+    def start(self) -> threading.Thread:
+        """Run the loop on a daemon thread"""
+        thread = threading.Thread(target=self.run, name="scheduler", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {name: task.stats() for name, task in self.tasks.items()}
+
+    def names(self) -> List[str]:
+        return list(self.tasks)
@@ -5,14 +5,21 @@ Analyzes crypto news and social sentiment for trading signals
 
 import os
 import json
-from typing import Dict, Any, List, Optional
-from dataclasses import dataclass
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, List, Optional
+from dataclasses import asdict, dataclass
 from datetime import datetime
 import requests
 from dotenv import load_dotenv
 
 load_dotenv()
 
+API_URL = "https://api.deepseek.com/v1/chat/completions"
+CACHE_FILE = "sentiment_cache.json"
+BATCH_SIZE = 10          # Symbols per batched completion
+
 
 @dataclass
 class SentimentResult:
@@ -25,6 +32,120 @@ class SentimentResult:
     timestamp: datetime
 
 
+def _strip_code_fence(response: str) -> str:
+    """JSON body of a reply that may be wrapped in a markdown code block"""
+    if "```json" in response:
+        response = response.split("```json")[1].split("```")[0]
+    elif "```" in response:
+        response = response.split("```")[1].split("```")[0]
+    return response.strip()
+
+
+def _result_from(data: Dict) -> SentimentResult:
+    return SentimentResult(
+        sentiment=data.get('sentiment', 'neutral'),
+        score=float(data.get('score', 0)),
+        confidence=float(data.get('confidence', 50)),
+        summary=data.get('summary', 'Analysis unavailable'),
+        factors=data.get('factors', []),
+        timestamp=datetime.now()
+    )
+
+
+def _neutral_result() -> SentimentResult:
+    return SentimentResult(
+        sentiment="neutral",
+        score=0,
+        confidence=0,
+        summary="Unable to analyze sentiment",
+        factors=["API error or no data"],
+        timestamp=datetime.now()
+    )
+
+
+class SentimentCache:
+    """
+    Size-capped LRU of SentimentResult per symbol, with a TTL
+    
+    Expired entries are kept (up to the cap) so callers that must not
+    block can still read the last known sentiment with allow_stale=True.
+    Entries are saved to a JSON file and reloaded on start. Thread-safe.
+    """
+    
+    def __init__(self, max_entries: int = 256, ttl: float = 300,
+                 path: Optional[str] = CACHE_FILE, clock=time.time):
+        """
+        Args:
+            max_entries: Least recently used entries beyond this are dropped
+            ttl: Seconds an entry counts as fresh
+            path: JSON persistence file (None keeps the cache in memory only)
+            clock: Wall-clock time source (injectable for tests)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()   # key -> (result, stored_at)
+        self._lock = threading.Lock()
+        self.load()
+    
+    def get(self, key: str, allow_stale: bool = False) -> Optional[SentimentResult]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not allow_stale and self.clock() - entry[1] >= self.ttl:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+    
+    def is_fresh(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and self.clock() - entry[1] < self.ttl
+    
+    def put(self, key: str, result: SentimentResult):
+        with self._lock:
+            self._entries[key] = (result, self.clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+    
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                saved = json.load(f)
+            for item in saved[-self.max_entries:]:
+                data = dict(item['result'])
+                data['timestamp'] = datetime.fromisoformat(data['timestamp'])
+                self._entries[item['key']] = (SentimentResult(**data), item['stored_at'])
+        except Exception:
+            pass
+    
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            items = [{'key': key, 'stored_at': stored_at,
+                      'result': {**asdict(result), 'timestamp': result.timestamp.isoformat()}}
+                     for key, (result, stored_at) in self._entries.items()]
+        tmp = f"{self.path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(items, f)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"⚠️ Could not write sentiment cache: {e}")
+
+
 class DeepSeekSentiment:
     """
     DeepSeek AI Sentiment Analyzer
@@ -33,18 +154,32 @@ class DeepSeekSentiment:
     - Crypto news headlines
     - Market conditions
     - Trading recommendations
+    
+    Results are cached per symbol (SentimentCache). analyze_batch asks
+    for a whole symbol list in one completion; get_signal(wait=False)
+    serves the cached value and refreshes it in the background.
     """
     
-    API_URL = "https://api.deepseek.com/v1/chat/completions"
+    API_URL = API_URL
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, api_url: str = None, cache_size: int = 256,
+                 cache_ttl: float = 300, cache_path: Optional[str] = CACHE_FILE,
+                 timeout: float = 30):
         """
         Initialize DeepSeek client
         
         Args:
             api_key: DeepSeek API key (loads from .env if not provided)
+            api_url: Chat completions endpoint (e.g. a local stand-in for tests)
+            cache_size: Max symbols kept in the sentiment cache
+            cache_ttl: Seconds a sentiment result stays fresh
+            cache_path: Sentiment cache file (None: memory only)
+            timeout: HTTP timeout per completion
         """
         self.api_key = api_key or os.getenv("DEEPSEEK_API_KEY")
+        self.api_url = api_url or self.API_URL
+        self.timeout = timeout
+        self.session = requests.Session()
         
         if not self.api_key:
             print("⚠️ DeepSeek API key not found. Sentiment analysis disabled.")
@@ -56,16 +191,26 @@ class DeepSeekSentiment:
         # Cache for rate limiting
         self.last_call = None
         self.min_interval = 2  # Minimum seconds between calls
-        self.cache: Dict[str, SentimentResult] = {}
-        self.cache_ttl = 300  # 5 minutes cache
+        self.cache = SentimentCache(cache_size, cache_ttl, cache_path)
+        self.cache_ttl = cache_ttl
+        self._call_lock = threading.Lock()
+        
+        # Background batch refresh (get_signal(wait=False))
+        self.retry_interval = 60        # Seconds before a failed symbol is asked again
+        self._pending: set = set()
+        self._requested_at: Dict[str, float] = {}
+        self._refreshing = False
+        self._refresh_lock = threading.Lock()
     
-    def _call_api(self, prompt: str, system_prompt: str = None) -> Optional[str]:
+    def _call_api(self, prompt: str, system_prompt: str = None,
+                  max_tokens: int = 500) -> Optional[str]:
         """
         Call DeepSeek API
         
         Args:
             prompt: User prompt
             system_prompt: System instructions
+            max_tokens: Completion length limit
             
         Returns:
             AI response text or None on error
@@ -73,8 +218,11 @@ class DeepSeekSentiment:
         if not self.enabled:
             return None
         
+        with self._call_lock:
+            return self._post_completion(prompt, system_prompt, max_tokens)
+    
+    def _post_completion(self, prompt: str, system_prompt: str, max_tokens: int) -> Optional[str]:
         # Rate limiting
-        import time
         if self.last_call:
             elapsed = time.time() - self.last_call
             if elapsed < self.min_interval:
@@ -94,15 +242,15 @@ class DeepSeekSentiment:
             "model": "deepseek-chat",
             "messages": messages,
             "temperature": 0.3,  # Lower for more consistent analysis
-            "max_tokens": 500
+            "max_tokens": max_tokens
         }
         
         try:
-            response = requests.post(
-                self.API_URL,
+            response = self.session.post(
+                self.api_url,
                 headers=headers,
                 json=payload,
-                timeout=30
+                timeout=self.timeout
             )
             
             self.last_call = time.time()
@@ -132,9 +280,10 @@ class DeepSeekSentiment:
             SentimentResult with analysis
         """
         # Check cache
-        cache_key = f"{symbol}_{datetime.now().strftime('%Y%m%d_%H%M')}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cache_key = symbol.upper()
+        cached = self.cache.get(cache_key)
+        if cached:
+            return cached
         
         system_prompt = """You are a crypto market analyst AI. Analyze market sentiment and provide trading signals.
         
@@ -162,26 +311,12 @@ Provide your sentiment analysis in JSON format."""
         
         if response:
             try:
-                # Parse JSON from response
-                # Handle markdown code blocks
-                if "```json" in response:
-                    response = response.split("```json")[1].split("```")[0]
-                elif "```" in response:
-                    response = response.split("```")[1].split("```")[0]
-                
-                data = json.loads(response.strip())
-                
-                result = SentimentResult(
-                    sentiment=data.get('sentiment', 'neutral'),
-                    score=float(data.get('score', 0)),
-                    confidence=float(data.get('confidence', 50)),
-                    summary=data.get('summary', 'Analysis unavailable'),
-                    factors=data.get('factors', []),
-                    timestamp=datetime.now()
-                )
+                # Parse JSON from response (handles markdown code blocks)
+                result = _result_from(json.loads(_strip_code_fence(response)))
                 
                 # Cache result
-                self.cache[cache_key] = result
+                self.cache.put(cache_key, result)
+                self.cache.save()
                 return result
                 
             except json.JSONDecodeError as e:
@@ -189,14 +324,127 @@ Provide your sentiment analysis in JSON format."""
                 print(f"   Raw response: {response[:200]}")
         
         # Default neutral response
-        return SentimentResult(
-            sentiment="neutral",
-            score=0,
-            confidence=0,
-            summary="Unable to analyze sentiment",
-            factors=["API error or no data"],
-            timestamp=datetime.now()
-        )
+        return _neutral_result()
+    
+    def analyze_batch(self, symbols: Iterable[str], context: str = None) -> Dict[str, SentimentResult]:
+        """
+        Sentiment for several symbols from one completion
+        
+        Symbols with a fresh cached result are not asked again; the rest
+        go out BATCH_SIZE at a time and each parsed result is cached.
+        
+        Args:
+            symbols: Crypto symbols (BTC, ETH, etc.)
+            context: Additional context shared by all symbols
+            
+        Returns:
+            symbol -> SentimentResult (neutral for symbols the reply missed)
+        """
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        results = {s: self.cache.get(s) for s in symbols}
+        missing = [s for s in symbols if results[s] is None]
+        
+        system_prompt = """You are a crypto market analyst AI. Analyze market sentiment and provide trading signals.
+        
+Your response MUST be a valid JSON object with one key per requested symbol, each value in this exact format:
+{
+    "sentiment": "bullish" | "bearish" | "neutral",
+    "score": -100 to 100,
+    "confidence": 0 to 100,
+    "summary": "Brief 1-2 sentence summary",
+    "factors": ["factor1", "factor2", "factor3"]
+}
+
+Be concise and data-driven. Consider technical and fundamental factors."""
+        
+        for start in range(0, len(missing), BATCH_SIZE):
+            batch = missing[start:start + BATCH_SIZE]
+            prompt = f"""Analyze the current market sentiment for each of: {', '.join(f'{s}/USDT' for s in batch)}.
+
+Current context:
+- Date: {datetime.now().strftime('%Y-%m-%d %H:%M UTC')}
+- Market: Crypto futures trading
+{f'- Additional info: {context}' if context else ''}
+
+Answer with a JSON object keyed by symbol ({', '.join(batch)})."""
+            
+            response = self._call_api(prompt, system_prompt, max_tokens=200 + 150 * len(batch))
+            for symbol, result in self._parse_batch(response, batch).items():
+                self.cache.put(symbol, result)
+                results[symbol] = result
+        
+        if missing:
+            self.cache.save()
+        return {s: results[s] or _neutral_result() for s in symbols}
+    
+    def _parse_batch(self, response: Optional[str], symbols: List[str]) -> Dict[str, SentimentResult]:
+        """Per-symbol results of a batched reply (symbols it does not cover are left out)"""
+        if not response:
+            return {}
+        try:
+            data = json.loads(_strip_code_fence(response))
+        except json.JSONDecodeError as e:
+            print(f"⚠️ Failed to parse AI response: {e}")
+            print(f"   Raw response: {response[:200]}")
+            return {}
+        
+        # {"BTC": {...}} or [{"symbol": "BTC", ...}] / {"results": [...]}
+        if isinstance(data, dict) and isinstance(data.get('results'), list):
+            data = data['results']
+        if isinstance(data, list):
+            data = {str(item.get('symbol', '')): item for item in data if isinstance(item, dict)}
+        if not isinstance(data, dict):
+            return {}
+        
+        by_symbol = {str(key).upper().replace('/USDT', ''): value for key, value in data.items()}
+        results = {}
+        for symbol in symbols:
+            item = by_symbol.get(symbol)
+            if isinstance(item, dict):
+                try:
+                    results[symbol] = _result_from(item)
+                except (TypeError, ValueError):
+                    continue
+        return results
+    
+    # ═══════════════════════════════════════════════════════════════
+    # BACKGROUND REFRESH
+    # ═══════════════════════════════════════════════════════════════
+    
+    def refresh_async(self, symbols: Iterable[str]):
+        """
+        Queue symbols for a batched refresh on a background thread
+        
+        Fresh symbols and symbols asked within retry_interval are skipped;
+        one worker drains the queue, so concurrent callers share batches.
+        """
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._refresh_lock:
+            for symbol in symbols:
+                symbol = symbol.upper()
+                if self.cache.is_fresh(symbol) or now - self._requested_at.get(symbol, 0) < self.retry_interval:
+                    continue
+                self._requested_at[symbol] = now
+                self._pending.add(symbol)
+            if self._refreshing or not self._pending:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._drain, name="sentiment", daemon=True).start()
+    
+    def _drain(self):
+        while True:
+            with self._refresh_lock:
+                batch = sorted(self._pending)[:BATCH_SIZE]
+                self._pending.difference_update(batch)
+                if not batch:
+                    self._refreshing = False
+                    return
+            try:
+                self.analyze_batch(batch)
+            except Exception as e:
+                print(f"❌ Sentiment refresh failed: {e}")
     
     def analyze_trade_opportunity(self, symbol: str, current_price: float,
                                   rsi: float = None, macd_signal: str = None,
@@ -242,12 +490,7 @@ Should I enter a trade? Provide JSON recommendation."""
         
         if response:
             try:
-                if "```json" in response:
-                    response = response.split("```json")[1].split("```")[0]
-                elif "```" in response:
-                    response = response.split("```")[1].split("```")[0]
-                
-                return json.loads(response.strip())
+                return json.loads(_strip_code_fence(response))
                 
             except json.JSONDecodeError:
                 pass
@@ -262,17 +505,27 @@ Should I enter a trade? Provide JSON recommendation."""
             "suggested_tp_percent": 3.0
         }
     
-    def get_signal(self, symbol: str = "BTC") -> Dict[str, Any]:
+    def get_signal(self, symbol: str = "BTC", wait: bool = True) -> Dict[str, Any]:
         """
         Get a quick trading signal based on sentiment
         
         Args:
             symbol: Crypto symbol
+            wait: Call the API if the cache has nothing fresh; otherwise
+                  return the last known sentiment (neutral if none) at once
+                  and refresh it in the background
             
         Returns:
             Dict with signal info
         """
-        sentiment = self.analyze_market_sentiment(symbol)
+        if wait:
+            sentiment = self.analyze_market_sentiment(symbol)
+        else:
+            sentiment = self.cache.get(symbol.upper(), allow_stale=True)
+            if not self.cache.is_fresh(symbol.upper()):
+                self.refresh_async([symbol])
+            if sentiment is None:
+                sentiment = SentimentResult("neutral", 0, 50, "Sentiment pending", [], datetime.now())
         
         # Convert sentiment to trading signal
         if sentiment.sentiment == "bullish" and sentiment.confidence >= 60:
@@ -0,0 +1,170 @@
+"""
+🗂️ State Store
+Bots publish their state (balance, positions, prices, signals) to a local
+snapshot; the dashboard and any number of viewers render from it
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+STATE_DIR_NAME = "weex_state"
+STALE_AFTER = 120           # Seconds before a publisher's snapshot is ignored
+
+
+def default_state_dir() -> str:
+    """Shared-memory tmpfs (/dev/shm) when available, else the temp directory"""
+    base = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else tempfile.gettempdir()
+    return os.path.join(base, STATE_DIR_NAME)
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def ticker_prices(tickers: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Price section from tickers (MarketDataCache.tickers() or REST payloads)"""
+    return {
+        symbol: {
+            'last': _number(t.get('last')),
+            'high_24h': _number(t.get('high_24h')),
+            'low_24h': _number(t.get('low_24h')),
+            'change': _number(t.get('chgUTC', t.get('change_24h'))),
+        }
+        for symbol, t in tickers.items()
+    }
+
+
+@dataclass
+class StateSnapshot:
+    """What one bot last published (sections use the exchange's field names)"""
+    source: str
+    updated_at: float = 0.0
+    balance: Dict[str, float] = field(default_factory=dict)     # equity / available / frozen
+    positions: List[Dict] = field(default_factory=list)         # symbol / holdSide / total / averageOpenPrice / unrealizedPL
+    prices: Dict[str, Dict] = field(default_factory=dict)       # symbol -> last / high_24h / low_24h / change
+    signals: List[Dict] = field(default_factory=list)
+    orders: List[Dict] = field(default_factory=list)
+    trades: List[Dict] = field(default_factory=list)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.updated_at
+
+
+class StateStore:
+    """
+    One small JSON snapshot per publishing bot, in a shared-memory directory
+
+    Each bot overwrites its own file atomically (write + rename), so readers
+    never see a torn snapshot and publishers never contend. Reading is a
+    handful of local file reads: a dashboard refresh costs no exchange
+    request, however many viewers are open. merged() combines the fresh
+    snapshots: the newest balance, the positions and signals of every bot,
+    and the newest price per symbol.
+
+    Usage:
+        store = StateStore()
+        store.publish("smart_scalper", balance={...}, positions=[...], prices={...})
+        state = store.merged()
+    """
+
+    def __init__(self, directory: str = None, stale_after: float = STALE_AFTER):
+        """
+        Args:
+            directory: Snapshot directory (default: /dev/shm/weex_state or the temp dir)
+            stale_after: Seconds after which a publisher's snapshot is ignored
+        """
+        self.directory = directory or default_state_dir()
+        self.stale_after = stale_after
+        self._lock = threading.Lock()
+
+    def _path(self, source: str) -> str:
+        return os.path.join(self.directory, f"{source}.json")
+
+    # ==================== PUBLISH ====================
+
+    def publish(self, source: str, balance: Dict = None, positions: List[Dict] = None,
+                prices: Dict[str, Dict] = None, signals: List[Dict] = None,
+                orders: List[Dict] = None, trades: List[Dict] = None) -> bool:
+        """
+        Replace the snapshot of `source` (sections left as None are kept)
+
+        Returns:
+            True if the snapshot was written
+        """
+        with self._lock:
+            snapshot = self.get(source) or StateSnapshot(source)
+            for name, value in (('balance', balance), ('positions', positions), ('prices', prices),
+                                ('signals', signals), ('orders', orders), ('trades', trades)):
+                if value is not None:
+                    setattr(snapshot, name, value)
+            snapshot.updated_at = time.time()
+
+            tmp = f"{self._path(source)}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(tmp, 'w') as f:
+                    json.dump(asdict(snapshot), f, default=str)
+                os.replace(tmp, self._path(source))
+                return True
+            except Exception as e:
+                print(f"⚠️ Could not publish state ({source}): {e}")
+                return False
+
+    def clear(self, source: str):
+        """Remove a publisher's snapshot (e.g. on shutdown)"""
+        try:
+            os.remove(self._path(source))
+        except OSError:
+            pass
+
+    # ==================== READ ====================
+
+    def get(self, source: str) -> Optional[StateSnapshot]:
+        try:
+            with open(self._path(source), 'r') as f:
+                return StateSnapshot(**json.load(f))
+        except Exception:
+            return None
+
+    def read(self, max_age: float = None) -> Dict[str, StateSnapshot]:
+        """Snapshots of every publisher younger than `max_age` (default stale_after)"""
+        max_age = self.stale_after if max_age is None else max_age
+        try:
+            names = [n[:-5] for n in os.listdir(self.directory) if n.endswith('.json')]
+        except OSError:
+            return {}
+        snapshots = {}
+        for name in names:
+            snapshot = self.get(name)
+            if snapshot and snapshot.age <= max_age:
+                snapshots[name] = snapshot
+        return snapshots
+
+    def merged(self, max_age: float = None, exclude: Iterable[str] = ()) -> Dict[str, Any]:
+        """
+        All fresh snapshots combined (except the `exclude` sources)
+
+        Returns:
+            {'balance', 'positions', 'prices', 'signals', 'orders', 'trades',
+             'sources': {source: age in seconds}} (empty sections if nobody publishes)
+        """
+        state = {'balance': {}, 'positions': [], 'prices': {}, 'signals': [],
+                 'orders': [], 'trades': [], 'sources': {}}
+        snapshots = [s for s in self.read(max_age).values() if s.source not in exclude]
+        for snapshot in sorted(snapshots, key=lambda s: s.updated_at):
+            state['sources'][snapshot.source] = round(snapshot.age, 1)
+            if snapshot.balance:
+                state['balance'] = snapshot.balance
+            state['prices'].update(snapshot.prices)
+            for name in ('positions', 'signals', 'orders', 'trades'):
+                state[name].extend(dict(item, source=snapshot.source) for item in getattr(snapshot, name))
+        return state
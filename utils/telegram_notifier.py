@@ -12,57 +12,247 @@ SETUP:
    TELEGRAM_CHAT_ID=your_chat_id_here
 """
 
+import atexit
 import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional
+
 import requests
 from datetime import datetime
 from dotenv import load_dotenv
 
 load_dotenv()
 
+API_URL = "https://api.telegram.org"
+
+MAX_MESSAGE_LENGTH = 4096   # Telegram limit per message
+MIN_SEND_INTERVAL = 1.0     # Telegram allows about one message per second per chat
+COALESCE_WINDOW = 0.5       # Seconds a message waits for others to merge with
+DIGEST_MAX_LINES = 20       # Fill lines shown in one digest
+
+
+@dataclass
+class Notification:
+    """One queued message; `line` is its one-line form for digests"""
+    text: str
+    parse_mode: str = "HTML"
+    kind: str = "info"          # fill | info | warning | error
+    line: str = ""
+    queued_at: float = 0.0
+
+    @property
+    def droppable(self) -> bool:
+        return self.kind not in ('warning', 'error')
+
 
 class TelegramNotifier:
     """
     Send trading alerts via Telegram
+    
+    By default send() only queues the message: a background thread sends
+    it, at most one message per MIN_SEND_INTERVAL (and waiting out a 429's
+    retry_after), so a slow or unreachable Telegram API never delays the
+    caller. Messages queued within COALESCE_WINDOW of each other, or while
+    the sender waits on the rate limit, are merged: a
+    burst of fills becomes one digest, anything else is joined into as
+    few messages as Telegram's length limit allows. When the queue is
+    full the oldest fill/info message is dropped (warnings and errors are
+    kept) and the next message reports how many were lost. Whatever is
+    still queued when the script ends is flushed at exit.
     """
     
-    def __init__(self, token: str = None, chat_id: str = None):
+    def __init__(self, token: str = None, chat_id: str = None, async_send: bool = True,
+                 max_queue: int = 200, min_interval: float = MIN_SEND_INTERVAL,
+                 coalesce_window: float = COALESCE_WINDOW, api_url: str = API_URL):
+        """
+        Args:
+            token: Bot token (TELEGRAM_BOT_TOKEN if not provided)
+            chat_id: Target chat (TELEGRAM_CHAT_ID if not provided)
+            async_send: Queue messages for the background sender (False: send inline)
+            max_queue: Messages kept waiting before the oldest ones are dropped
+            min_interval: Minimum seconds between two messages to the chat
+            coalesce_window: Seconds the first queued message waits for a burst
+            api_url: Bot API base URL (e.g. a local stand-in for tests)
+        """
         self.token = token or os.getenv("TELEGRAM_BOT_TOKEN")
         self.chat_id = chat_id or os.getenv("TELEGRAM_CHAT_ID")
         self.enabled = bool(self.token and self.chat_id)
+        self.async_send = async_send
+        self.max_queue = max_queue
+        self.min_interval = min_interval
+        self.coalesce_window = coalesce_window
+        self.api_url = api_url
+        self.session = requests.Session()
+        
+        self._queue: Deque[Notification] = deque()
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._busy = False
+        self._next_send = 0.0
+        self.dropped = 0
+        self.sent = 0
+        self.failed = 0
         
         if self.enabled:
             print("✅ Telegram notifications enabled")
         else:
             print("⚠️ Telegram not configured (optional)")
     
-    def send(self, message: str, parse_mode: str = "HTML") -> bool:
+    def send(self, message: str, parse_mode: str = "HTML", kind: str = "info",
+             line: str = None) -> bool:
         """
         Send a message via Telegram
         
         Args:
             message: Message text (supports HTML formatting)
             parse_mode: "HTML" or "Markdown"
+            kind: fill | info | warning | error (fills are merged into digests;
+                  warnings and errors are never dropped)
+            line: One-line form of the message for digests
             
         Returns:
-            True if sent successfully
+            True if sent successfully (queued, when sending asynchronously)
         """
+        if not self.enabled:
+            return False
+        if not self.async_send:
+            return self.send_now(message, parse_mode)
+        
+        note = Notification(message, parse_mode, kind, line or "", time.time())
+        with self._cond:
+            if len(self._queue) >= self.max_queue and not self._drop_one(note):
+                self.dropped += 1
+                return False
+            self._queue.append(note)
+            self._cond.notify()
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="telegram", daemon=True)
+                self._worker.start()
+                # The sender is a daemon: drain the queue before the interpreter exits
+                atexit.register(self.flush)
+        return True
+    
+    def send_now(self, message: str, parse_mode: str = "HTML") -> bool:
+        """Send on this thread (respects the rate limit; retries once after a 429)"""
         if not self.enabled:
             return False
         
-        try:
-            url = f"https://api.telegram.org/bot{self.token}/sendMessage"
-            payload = {
-                "chat_id": self.chat_id,
-                "text": message,
-                "parse_mode": parse_mode
-            }
+        for _ in range(2):
+            wait = self._next_send - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            self._next_send = time.time() + self.min_interval
+            try:
+                url = f"{self.api_url}/bot{self.token}/sendMessage"
+                payload = {
+                    "chat_id": self.chat_id,
+                    "text": message,
+                    "parse_mode": parse_mode
+                }
+                
+                response = self.session.post(url, json=payload, timeout=10)
+                if response.status_code == 429:
+                    retry_after = response.json().get('parameters', {}).get('retry_after', 1)
+                    self._next_send = time.time() + float(retry_after)
+                    continue
+                return response.status_code == 200
+                
+            except Exception as e:
+                print(f"❌ Telegram error: {e}")
+                return False
+        return False
+    
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every queued message went out (True if drained in time)"""
+        deadline = time.time() + timeout
+        with self._cond:
+            while self._queue or self._busy:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+    
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+    
+    # ==================== Background Sender ====================
+    
+    def _drop_one(self, incoming: Notification) -> bool:
+        """Make room under backpressure: drop the oldest droppable message"""
+        for i, note in enumerate(self._queue):
+            if note.droppable:
+                del self._queue[i]
+                self.dropped += 1
+                return True
+        if incoming.droppable:
+            return False
+        self._queue.popleft()
+        self.dropped += 1
+        return True
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._busy = False
+                    self._cond.notify_all()
+                    self._cond.wait()
+                self._busy = True
+                first = self._queue[0].queued_at
             
-            response = requests.post(url, json=payload, timeout=10)
-            return response.status_code == 200
+            # Let a burst accumulate (and the rate limit clear) before draining
+            wait = max(self._next_send, first + self.coalesce_window) - time.time()
+            if wait > 0:
+                time.sleep(wait)
             
-        except Exception as e:
-            print(f"❌ Telegram error: {e}")
-            return False
+            with self._cond:
+                batch = list(self._queue)
+                self._queue.clear()
+                dropped, self.dropped = self.dropped, 0
+            
+            try:
+                for text, parse_mode in self._compose(batch, dropped):
+                    if self.send_now(text, parse_mode):
+                        self.sent += 1
+                    else:
+                        self.failed += 1
+            except Exception as e:
+                print(f"❌ Telegram sender error: {e}")
+    
+    def _compose(self, batch: List[Notification], dropped: int = 0) -> List[tuple]:
+        """Merge queued notifications into as few messages as possible"""
+        parts = {}   # parse_mode -> texts
+        fills = [n for n in batch if n.kind == 'fill']
+        if len(fills) > 1:
+            lines = [n.line or n.text.strip().splitlines()[0] for n in fills]
+            shown = lines[:DIGEST_MAX_LINES]
+            more = f"\n… and {len(lines) - len(shown)} more" if len(lines) > len(shown) else ""
+            digest = (f"\n📦 <b>{len(fills)} ORDERS FILLED</b>\n\n" + "\n".join(shown) + more +
+                      f"\n⏰ {datetime.now().strftime('%H:%M:%S')}\n")
+            batch = [Notification(digest, "HTML", "fill")] + [n for n in batch if n.kind != 'fill']
+        for note in batch:
+            parts.setdefault(note.parse_mode, []).append(note.text)
+        if dropped:
+            parts.setdefault("HTML", []).append(f"⚠️ {dropped} notifications dropped (queue full)")
+        
+        messages = []
+        separator = "\n────────\n"
+        for parse_mode, texts in parts.items():
+            current = ""
+            for text in texts:
+                text = text[:MAX_MESSAGE_LENGTH]
+                if current and len(current) + len(separator) + len(text) > MAX_MESSAGE_LENGTH:
+                    messages.append((current, parse_mode))
+                    current = ""
+                current = f"{current}{separator}{text}" if current else text
+            if current:
+                messages.append((current, parse_mode))
+        return messages
     
     # ==================== Pre-formatted Messages ====================
     
@@ -97,7 +287,8 @@ class TelegramNotifier:
 📦 Size: {size}
 ⏰ Time: {datetime.now().strftime('%H:%M:%S')}{pnl_text}
 """
-        return self.send(msg)
+        line = f"{emoji} {symbol.upper()} {side.upper()} {size} @ ${price:,.2f}" + (f" (${pnl:+,.2f})" if pnl else "")
+        return self.send(msg, kind="fill", line=line)
     
     def notify_balance_update(self, equity: float, pnl: float, pnl_percent: float):
         """Notify balance update"""
@@ -121,7 +312,7 @@ class TelegramNotifier:
 
 ⏰ {datetime.now().strftime('%H:%M:%S')}
 """
-        return self.send(msg)
+        return self.send(msg, kind="warning")
     
     def notify_error(self, error: str):
         """Send error notification"""
@@ -132,7 +323,7 @@ class TelegramNotifier:
 
 ⏰ {datetime.now().strftime('%H:%M:%S')}
 """
-        return self.send(msg)
+        return self.send(msg, kind="error")
     
     def notify_daily_summary(self, equity: float, pnl: float, trades: int, 
                             win_rate: float):
@@ -165,7 +356,7 @@ class TelegramNotifier:
 
 Your trading alerts will appear here.
 """
-        success = self.send(msg)
+        success = self.send_now(msg)
         if success:
             print("✅ Telegram test message sent!")
         else:
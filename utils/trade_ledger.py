@@ -0,0 +1,195 @@
+"""
+📒 Trade Ledger
+SQLite (WAL) store of executed trades, indexed by day and symbol
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List
+
+
+# Trade fields, in PeakHunterAuto.Trade order
+COLUMNS = (
+    'id', 'timestamp', 'symbol', 'action', 'entry_price', 'size', 'size_usd',
+    'leverage', 'stop_loss', 'take_profit', 'signal_strength', 'rsi', 'status',
+    'pnl', 'exit_price', 'closed_at',
+)
+
+
+class TradeLedger:
+    """
+    Append-only trade history with per-day aggregates
+
+    Each trade is one INSERT (no rewrite of the history) and the day/symbol
+    indexes keep "today's trades" and "today's PnL" independent of how many
+    months are stored. Safe to read from another process (the dashboard)
+    while a bot writes, thanks to WAL.
+
+    Usage:
+        ledger = TradeLedger("peak_trades.db")
+        ledger.record(asdict(trade))
+        ledger.daily_pnl("2026-01-21")
+    """
+
+    def __init__(self, path: str = "peak_trades.db"):
+        """
+        Args:
+            path: SQLite file (":memory:" for a throwaway ledger)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS trades (
+                id TEXT PRIMARY KEY,
+                day TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                action TEXT,
+                entry_price REAL,
+                size REAL,
+                size_usd REAL,
+                leverage INTEGER,
+                stop_loss REAL,
+                take_profit REAL,
+                signal_strength REAL,
+                rsi REAL,
+                status TEXT,
+                pnl REAL DEFAULT 0,
+                exit_price REAL DEFAULT 0,
+                closed_at TEXT DEFAULT ''
+            );
+            CREATE INDEX IF NOT EXISTS idx_trades_day ON trades (day, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_trades_symbol_day ON trades (symbol, day);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        self._conn.commit()
+
+    # ==================== WRITES ====================
+
+    def record(self, trade: Dict) -> bool:
+        """
+        Insert a trade (a Trade as dict; the day comes from its ISO timestamp)
+
+        Returns:
+            False if a trade with the same id is already stored
+        """
+        row = [trade.get(c) for c in COLUMNS]
+        with self._lock:
+            cur = self._conn.execute(
+                f"INSERT OR IGNORE INTO trades (day, {', '.join(COLUMNS)}) "
+                f"VALUES (?, {', '.join('?' * len(COLUMNS))})",
+                [str(trade.get('timestamp', ''))[:10]] + row
+            )
+            self._conn.commit()
+        return cur.rowcount > 0
+
+    def update(self, trade_id: str, **fields) -> bool:
+        """Update fields of a stored trade (e.g. status, pnl, exit_price, closed_at on close)"""
+        fields = {k: v for k, v in fields.items() if k in COLUMNS and k != 'id'}
+        if not fields:
+            return False
+        with self._lock:
+            cur = self._conn.execute(
+                f"UPDATE trades SET {', '.join(f'{k} = ?' for k in fields)} WHERE id = ?",
+                list(fields.values()) + [trade_id]
+            )
+            self._conn.commit()
+        return cur.rowcount > 0
+
+    # ==================== READS ====================
+
+    def trades(self, day: str = None, symbol: str = None, limit: int = None) -> List[Dict]:
+        """
+        Stored trades, oldest first
+
+        Args:
+            day: "YYYY-MM-DD" (local date of the trade timestamp)
+            symbol: Trading pair (e.g., "cmt_solusdt")
+            limit: Only the most recent `limit` trades
+        """
+        where, args = [], []
+        if day:
+            where.append("day = ?")
+            args.append(day)
+        if symbol:
+            where.append("symbol = ?")
+            args.append(symbol)
+        sql = f"SELECT {', '.join(COLUMNS)} FROM trades"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY timestamp DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [dict(r) for r in reversed(rows)]
+
+    def daily_pnl(self, day: str, symbol: str = None) -> float:
+        """Sum of recorded PnL for a day (optionally one symbol)"""
+        return self.daily_summary(day, symbol)['daily_pnl']
+
+    def daily_summary(self, day: str, symbol: str = None) -> Dict:
+        """
+        Aggregates for a day
+
+        Returns:
+            {'day', 'total_trades', 'daily_pnl', 'wins', 'losses', 'open', 'updated'}
+        """
+        sql = ("SELECT COUNT(*), COALESCE(SUM(pnl), 0), "
+               "SUM(CASE WHEN pnl > 0 THEN 1 ELSE 0 END), "
+               "SUM(CASE WHEN pnl < 0 THEN 1 ELSE 0 END), "
+               "SUM(CASE WHEN status = 'open' THEN 1 ELSE 0 END), "
+               "MAX(COALESCE(NULLIF(closed_at, ''), timestamp)) "
+               "FROM trades WHERE day = ?")
+        args = [day]
+        if symbol:
+            sql += " AND symbol = ?"
+            args.append(symbol)
+        with self._lock:
+            count, pnl, wins, losses, open_, updated = self._conn.execute(sql, args).fetchone()
+        return {
+            'day': day,
+            'total_trades': count,
+            'daily_pnl': pnl,
+            'wins': wins or 0,
+            'losses': losses or 0,
+            'open': open_ or 0,
+            'updated': updated or '',
+        }
+
+    # ==================== MIGRATION ====================
+
+    def import_json(self, path: str) -> int:
+        """
+        Import a legacy peak_trades.json once (tracked in the meta table)
+
+        Returns:
+            Number of trades inserted
+        """
+        key = f"imported:{os.path.abspath(path)}"
+        with self._lock:
+            done = self._conn.execute("SELECT 1 FROM meta WHERE key = ?", (key,)).fetchone()
+        if done or not os.path.exists(path):
+            return 0
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+
+        inserted = sum(self.record(t) for t in data.get('trades', []) if t.get('id'))
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                               (key, str(inserted)))
+            self._conn.commit()
+        return inserted
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,234 @@
+"""
+🎯 Trigger Index
+Per-symbol sorted stop / target / trailing levels, evaluated on each tick
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional, Tuple
+
+STOP = 'stop'
+TARGET = 'target'
+TRAIL = 'trail'
+ACTIVATION = 'activation'
+RATCHET = 'ratchet'     # New best price: the trailing stop moved
+
+# When several exits cross on the same tick the first one wins
+EXIT_PRIORITY = (TRAIL, TARGET, STOP)
+
+_INF = float('inf')
+
+
+@dataclass
+class TriggerHit:
+    """One trigger crossed by a tick"""
+    key: Hashable
+    symbol: str
+    kind: str           # stop | target | trail | activation | ratchet
+    level: float        # Crossed level (activation / ratchet: the new trailing stop)
+    price: float
+
+    @property
+    def is_exit(self) -> bool:
+        return self.kind not in (ACTIVATION, RATCHET)
+
+
+@dataclass
+class TrackedPosition:
+    """Levels of one position; `extreme` is the best price since trailing activated"""
+    key: Hashable
+    symbol: str
+    long: bool
+    stop: Optional[float] = None
+    target: Optional[float] = None
+    trail_pct: Optional[float] = None
+    activation: Optional[float] = None
+    keep_armed: bool = True             # Keep stop/target once the trailing stop is active
+    trailing_active: bool = False
+    extreme: float = 0.0
+    entries: Dict[str, tuple] = field(default_factory=dict)
+
+    @property
+    def trail_stop(self) -> Optional[float]:
+        if not self.trailing_active or not self.trail_pct:
+            return None
+        if self.long:
+            return self.extreme * (1 - self.trail_pct / 100)
+        return self.extreme * (1 + self.trail_pct / 100)
+
+    def level(self, kind: str) -> Optional[float]:
+        if kind == TRAIL:
+            return self.trail_stop
+        if kind in (STOP, TARGET) and self.trailing_active and not self.keep_armed:
+            return None
+        return getattr(self, kind)
+
+    def fires_below(self, kind: str) -> bool:
+        """True if the trigger fires when price falls to the level"""
+        return self.long == (kind in (STOP, TRAIL))
+
+    def crossed(self, kind: str, price: float) -> bool:
+        level = self.level(kind)
+        if level is None:
+            return False
+        return price <= level if self.fires_below(kind) else price >= level
+
+
+class TriggerIndex:
+    """
+    Stop, target and trailing levels of every open position, sorted per symbol
+
+    Each symbol keeps two sorted lists: levels that fire when the price
+    falls to them (long stops and trailing stops, short targets) and levels
+    that fire when it rises to them. A tick bisects both lists, so its cost
+    depends on the triggers it crosses, not on how many positions are open.
+    Trailing stops move in place: once a position's activation level is
+    crossed, its best price is itself a trigger that re-inserts the
+    trailing stop when a tick beats it.
+
+    Exit triggers stay armed after firing; the bot calls remove(key) once
+    the close order went through, so a failed close is retried on the next
+    tick. Activation and ratchet hits carry the new trailing stop, for
+    callers that mirror it in an exchange-side stop. Not thread-safe:
+    callers that tick from a stream thread hold their own lock.
+
+    Usage:
+        triggers = TriggerIndex()
+        triggers.add(order_id, 'cmt_solusdt', 'long', stop=98, target=104,
+                     trail_pct=1.5, activation=101)
+        for hit in triggers.tick('cmt_solusdt', price):
+            if hit.is_exit and close(hit.key):
+                triggers.remove(hit.key)
+    """
+
+    def __init__(self):
+        self.positions: Dict[Hashable, TrackedPosition] = {}
+        self._books: Dict[str, Tuple[list, list]] = {}   # symbol -> (below, above)
+        self._seq = 0
+
+    # ==================== POSITIONS ====================
+
+    def add(self, key: Hashable, symbol: str, side: str, stop: float = None,
+            target: float = None, trail_pct: float = None, activation: float = None,
+            keep_armed: bool = True, price: float = None) -> TrackedPosition:
+        """
+        Track a position (replaces an existing one with the same key)
+
+        Args:
+            key: Position id (order id, or symbol for one position per symbol)
+            symbol: Contract symbol the ticks arrive for
+            side: 'long'/'buy' or 'short'/'sell'
+            stop: Absolute stop-loss price
+            target: Absolute take-profit price
+            trail_pct: Trailing distance in % from the best price
+            activation: Price that arms the trailing stop
+            keep_armed: Keep stop/target armed once the trailing stop is active
+            price: With trail_pct and no activation, trail from this price right away
+        """
+        self.remove(key)
+        pos = TrackedPosition(key, symbol, side in ('long', 'buy'), stop, target,
+                              trail_pct, activation, keep_armed)
+        self.positions[key] = pos
+        self._arm(pos, STOP, stop)
+        self._arm(pos, TARGET, target)
+        if trail_pct:
+            if activation is not None:
+                self._arm(pos, ACTIVATION, activation)
+            elif price:
+                self._activate(pos, price)
+        return pos
+
+    def remove(self, key: Hashable) -> Optional[TrackedPosition]:
+        pos = self.positions.pop(key, None)
+        if pos:
+            for kind in list(pos.entries):
+                self._disarm(pos, kind)
+            if not any(self._books.get(pos.symbol, ((), ()))):
+                self._books.pop(pos.symbol, None)
+        return pos
+
+    def get(self, key: Hashable) -> Optional[TrackedPosition]:
+        return self.positions.get(key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.positions
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def symbols(self) -> List[str]:
+        return list(self._books)
+
+    # ==================== TICKS ====================
+
+    def tick(self, symbol: str, price: float) -> List[TriggerHit]:
+        """
+        Apply a trade price to the positions of `symbol`
+
+        Returns:
+            Activation / ratchet hits (trailing stop armed or moved) and at
+            most one exit hit per position, in the order the positions
+            were crossed
+        """
+        book = self._books.get(symbol)
+        if not book or price <= 0:
+            return []
+        below, above = book
+        crossed = below[bisect_left(below, (price,)):] + above[:bisect_right(above, (price, _INF))]
+        if not crossed:
+            return []
+
+        hits = []
+        for key in dict.fromkeys(entry[2] for entry in crossed):
+            pos = self.positions.get(key)
+            if pos is None:
+                continue
+            if not pos.trailing_active and ACTIVATION in pos.entries and pos.crossed(ACTIVATION, price):
+                self._activate(pos, price)
+                hits.append(TriggerHit(key, symbol, ACTIVATION, pos.trail_stop, price))
+            elif pos.trailing_active and (price > pos.extreme if pos.long else price < pos.extreme):
+                self._ratchet(pos, price)
+                hits.append(TriggerHit(key, symbol, RATCHET, pos.trail_stop, price))
+
+            for kind in EXIT_PRIORITY:
+                if pos.crossed(kind, price):
+                    hits.append(TriggerHit(key, symbol, kind, pos.level(kind), price))
+                    break
+        return hits
+
+    # ==================== INTERNAL ====================
+
+    def _activate(self, pos: TrackedPosition, price: float):
+        self._disarm(pos, ACTIVATION)
+        pos.trailing_active = True
+        if not pos.keep_armed:
+            self._disarm(pos, STOP)
+            self._disarm(pos, TARGET)
+        self._ratchet(pos, price)
+
+    def _ratchet(self, pos: TrackedPosition, price: float):
+        pos.extreme = price
+        self._arm(pos, RATCHET, price)
+        self._arm(pos, TRAIL, pos.trail_stop)
+
+    def _arm(self, pos: TrackedPosition, kind: str, level: Optional[float]):
+        self._disarm(pos, kind)
+        if level is None:
+            return
+        self._seq += 1
+        entry = (level, self._seq, pos.key, kind)
+        below, above = self._books.setdefault(pos.symbol, ([], []))
+        # The best price fires when beaten, like a target
+        insort(below if pos.fires_below(TARGET if kind == RATCHET else kind) else above, entry)
+        pos.entries[kind] = entry
+
+    def _disarm(self, pos: TrackedPosition, kind: str):
+        entry = pos.entries.pop(kind, None)
+        book = self._books.get(pos.symbol)
+        if entry is None or book is None:
+            return
+        for levels in book:
+            i = bisect_left(levels, entry)
+            if i < len(levels) and levels[i] == entry:
+                del levels[i]
+                return
@@ -10,10 +10,107 @@ import hmac
 import hashlib
 import base64
 import json
+import asyncio
+import threading
 import requests
-from typing import Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, List, Iterable
 from dotenv import load_dotenv
 
+from utils.rate_limiter import RateLimiter
+
+
+# Keep-alive connections per host kept by each WeexClient session
+DEFAULT_POOL_SIZE = 10
+
+# Max items per batchOrders / cancel_batch_orders request (larger lists are chunked)
+BATCH_ORDER_LIMIT = 20
+
+# placeOrder "type": 1 = open_long, 2 = open_short, 3 = close_long, 4 = close_short
+ORDER_TYPES = {
+    'open_long': '1',
+    'open_short': '2',
+    'close_long': '3',
+    'close_short': '4',
+}
+
+
+MISSING_CREDENTIALS = (
+    "Missing API credentials. Please set WEEX_API_KEY, "
+    "WEEX_SECRET_KEY, and WEEX_PASSPHRASE in your .env file"
+)
+
+
+# placeTpSlOrder "planType" per bracket leg
+PLAN_TYPES = {
+    'take_profit': 'profit_plan',
+    'stop_loss': 'loss_plan',
+}
+
+
+def _order_id(result: Any) -> Optional[str]:
+    """Order id from a placeOrder / placeTpSlOrder response (dict, list or wrapped in data)"""
+    if isinstance(result, dict) and isinstance(result.get('data'), (dict, list)):
+        result = result['data']
+    if isinstance(result, list):
+        result = result[0] if result else None
+    if not isinstance(result, dict):
+        return None
+    order_id = result.get('order_id') or result.get('orderId')
+    return str(order_id) if order_id else None
+
+
+def _accepted(result: Any) -> bool:
+    """True unless the response carries an error or a non-success code"""
+    if not isinstance(result, dict):
+        return bool(result)
+    return 'error' not in result and str(result.get('code', '00000')) in ('0', '200', '00000')
+
+
+@dataclass
+class Bracket:
+    """
+    An entry plus its exchange-side TP / SL plan orders
+    
+    The stop leg is also what a trailing stop amends (see trail_bracket).
+    """
+    symbol: str
+    side: str                       # 'long' or 'short'
+    size: float
+    entry_order_id: Optional[str] = None
+    tp_order_id: Optional[str] = None
+    sl_order_id: Optional[str] = None
+    take_profit: Optional[float] = None
+    stop_loss: Optional[float] = None
+    
+    @property
+    def protected(self) -> bool:
+        """True if the exchange holds a stop for the position"""
+        return self.sl_order_id is not None
+
+
+def order_type_code(side: str, trade_side: str = "open") -> str:
+    """
+    WEEX placeOrder type for a side
+    
+    Args:
+        side: "open_long", "open_short", "close_long", "close_short",
+              or "buy"/"sell" combined with trade_side
+        trade_side: "open" or "close" (only used with buy/sell)
+        
+    Returns:
+        "1".."4" (buy+open = open_long, sell+open = open_short,
+        sell+close = close_long, buy+close = close_short)
+    """
+    if side in ORDER_TYPES:
+        return ORDER_TYPES[side]
+    closing = str(trade_side).lower() == "close"
+    if side == "sell":
+        return ORDER_TYPES['close_long' if closing else 'open_short']
+    return ORDER_TYPES['close_short' if closing else 'open_long']
+
 
 class WeexClient:
     """
@@ -24,7 +121,9 @@ class WeexClient:
     # WEEX API Base URL for Contract Trading
     BASE_URL = "https://api-contract.weex.com"
     
-    def __init__(self, api_key: str = None, secret_key: str = None, passphrase: str = None):
+    def __init__(self, api_key: str = None, secret_key: str = None, passphrase: str = None,
+                 rate_limiter: RateLimiter = None, pool_size: int = DEFAULT_POOL_SIZE,
+                 require_auth: bool = True):
         """
         Initialize WEEX Client with API credentials
         
@@ -32,6 +131,10 @@ class WeexClient:
             api_key: WEEX API Key (loads from .env if not provided)
             secret_key: WEEX Secret Key (loads from .env if not provided)
             passphrase: WEEX Passphrase (loads from .env if not provided)
+            rate_limiter: Shared token-bucket limiter (a default one is created if not provided)
+            pool_size: Keep-alive connections to keep open (>= concurrent requests)
+            require_auth: Raise if credentials are missing (False: public endpoints only
+                          until credentials are set; signed calls raise ValueError)
         """
         # Load environment variables
         load_dotenv()
@@ -41,11 +144,8 @@ class WeexClient:
         self.passphrase = passphrase or os.getenv("WEEX_PASSPHRASE")
         
         # Validate credentials
-        if not all([self.api_key, self.secret_key, self.passphrase]):
-            raise ValueError(
-                "Missing API credentials. Please set WEEX_API_KEY, "
-                "WEEX_SECRET_KEY, and WEEX_PASSPHRASE in your .env file"
-            )
+        if require_auth and not self.has_credentials:
+            raise ValueError(MISSING_CREDENTIALS)
         
         # Session for connection pooling
         self.session = requests.Session()
@@ -54,9 +154,91 @@ class WeexClient:
             "locale": "en-US",
             "User-Agent": "WEEX-Hackathon-Bot/1.0",
         })
+        self.pool_size = 0
+        self._pool_lock = threading.Lock()
+        self.ensure_pool(pool_size)
+        
+        # Token buckets for public / private / order traffic
+        self.rate_limiter = rate_limiter or RateLimiter()
+        
+        # Optional streaming cache (see attach_market_cache)
+        self.market_cache = None
+        self.ticker_max_age = 2.0
+        self.candle_max_age = 10.0
         
         print("✅ WeexClient initialized successfully")
     
+    @property
+    def has_credentials(self) -> bool:
+        return all([self.api_key, self.secret_key, self.passphrase])
+    
+    # ==================== TRANSPORT ====================
+    
+    def ensure_pool(self, size: int):
+        """
+        Make the session keep at least `size` keep-alive connections per host
+        
+        Without this, requests keeps 10 and closes (then re-handshakes) any
+        extra connection opened by concurrent callers. Only grows the pool;
+        mounting a new adapter drops the idle connections of the old one.
+        """
+        with self._pool_lock:
+            if size <= self.pool_size:
+                return
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=size)
+            self.session.mount("https://", adapter)
+            self.pool_size = size
+    
+    def warm_up(self, connections: int = None, timeout: float = 5.0) -> int:
+        """
+        Open `connections` keep-alive connections up front (TCP + TLS handshakes)
+        
+        Sends that many concurrent server-time requests so the first real
+        calls reuse warm sockets instead of paying the handshake.
+        
+        Args:
+            connections: Connections to open (default: the pool size)
+            timeout: Seconds to wait for the warm-up requests
+            
+        Returns:
+            Number of connections that answered
+        """
+        connections = min(connections or self.pool_size, self.pool_size)
+        
+        def ping(_):
+            try:
+                self.session.get(f"{self.BASE_URL}/capi/v2/time", timeout=timeout)
+                return True
+            except requests.exceptions.RequestException:
+                return False
+        
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=connections) as pool:
+            warmed = sum(pool.map(ping, range(connections)))
+        print(f"🔥 Warmed {warmed}/{connections} connections in {(time.time() - started) * 1000:.0f}ms")
+        return warmed
+    
+    def request(self, method: str, endpoint: str, params: Dict = None,
+                data: Dict = None, signed: bool = True) -> Any:
+        """
+        Call any endpoint through the shared, rate-limited session
+        
+        For endpoints without a dedicated method (e.g. plan orders).
+        
+        Args:
+            method: HTTP method (GET, POST, DELETE)
+            endpoint: API endpoint (e.g., /capi/v2/position/singlePosition)
+            params: Query parameters
+            data: JSON body (POST)
+            signed: False for public market-data endpoints (GET only)
+            
+        Returns:
+            JSON response from API
+        """
+        if not signed:
+            return self._public_get(endpoint, params)
+        return self._request(method, endpoint, params, data)
+    
     def _get_timestamp(self) -> str:
         """Get current timestamp in milliseconds"""
         return str(int(time.time() * 1000))
@@ -110,6 +292,12 @@ class WeexClient:
         Returns:
             JSON response from API
         """
+        if not self.has_credentials:
+            raise ValueError(MISSING_CREDENTIALS)
+        
+        # Wait for the endpoint's bucket before signing so the timestamp is fresh
+        self.rate_limiter.acquire(endpoint, method, data)
+        
         timestamp = self._get_timestamp()
         
         # Build query string for GET requests
@@ -170,6 +358,39 @@ class WeexClient:
                 print(f"Response: {e.response.text}")
             raise
     
+    def _public_get(self, endpoint: str, params: Dict = None) -> Any:
+        """
+        Rate-limited GET for public (unsigned) endpoints
+        
+        Args:
+            endpoint: API endpoint (e.g., /capi/v2/market/ticker)
+            params: Query parameters
+            
+        Returns:
+            JSON response from API
+        """
+        self.rate_limiter.acquire(endpoint)
+        response = self.session.get(
+            f"{self.BASE_URL}{endpoint}",
+            params=params,
+            timeout=10
+        )
+        return response.json()
+    
+    def attach_market_cache(self, cache, ticker_max_age: float = 2.0,
+                            candle_max_age: float = 10.0):
+        """
+        Serve get_ticker/get_candles from a streaming MarketDataCache when fresh
+        
+        Args:
+            cache: utils.market_stream.MarketDataCache fed by a MarketStream
+            ticker_max_age: Max age (s) of a cached ticker before falling back to REST
+            candle_max_age: Max age (s) of cached candles before falling back to REST
+        """
+        self.market_cache = cache
+        self.ticker_max_age = ticker_max_age
+        self.candle_max_age = candle_max_age
+    
     # ==================== PUBLIC ENDPOINTS ====================
     
     def get_server_time(self) -> Dict[str, Any]:
@@ -180,11 +401,7 @@ class WeexClient:
             Server time response
         """
         try:
-            response = self.session.get(
-                f"{self.BASE_URL}/capi/v2/time",
-                timeout=10
-            )
-            return response.json()
+            return self._public_get("/capi/v2/time")
         except Exception as e:
             print(f"❌ Failed to get server time: {e}")
             raise
@@ -199,12 +416,13 @@ class WeexClient:
         Returns:
             Ticker data with price info
         """
+        if self.market_cache is not None:
+            cached = self.market_cache.get_ticker(symbol, self.ticker_max_age)
+            if cached is not None:
+                return cached
+        
         try:
-            response = self.session.get(
-                f"{self.BASE_URL}/capi/v2/market/ticker?symbol={symbol}",
-                timeout=10
-            )
-            return response.json()
+            return self._public_get("/capi/v2/market/ticker", {"symbol": symbol})
         except Exception as e:
             print(f"❌ Failed to get ticker: {e}")
             raise
@@ -221,17 +439,22 @@ class WeexClient:
         Returns:
             Candlestick data with [timestamp, open, high, low, close, volume]
         """
+        if self.market_cache is not None:
+            cached = self.market_cache.get_candles(symbol, granularity, limit,
+                                                   self.candle_max_age)
+            if cached is not None:
+                return cached
+        
         try:
-            response = self.session.get(
-                f"{self.BASE_URL}/capi/v2/market/candles",
-                params={
-                    "symbol": symbol,
-                    "granularity": granularity,
-                    "limit": limit
-                },
-                timeout=10
-            )
-            return response.json()
+            candles = self._public_get("/capi/v2/market/candles", {
+                "symbol": symbol,
+                "granularity": granularity,
+                "limit": limit
+            })
+            # Give the stream enough history to serve the next call
+            if self.market_cache is not None and isinstance(candles, list):
+                self.market_cache.seed_candles(symbol, granularity, candles)
+            return candles
         except Exception as e:
             print(f"❌ Failed to get candles: {e}")
             raise
@@ -244,11 +467,7 @@ class WeexClient:
             List of available contracts
         """
         try:
-            response = self.session.get(
-                f"{self.BASE_URL}/capi/v2/market/contracts",
-                timeout=10
-            )
-            return response.json()
+            return self._public_get("/capi/v2/market/contracts")
         except Exception as e:
             print(f"❌ Failed to get contracts: {e}")
             raise
@@ -346,33 +565,33 @@ class WeexClient:
         Returns:
             Order response with order ID
         """
-        import uuid
-        import time
+        order_data = self._order_payload(symbol, side, order_type, size, price,
+                                         trade_side, client_oid)
         
+        return self._request("POST", "/capi/v2/order/placeOrder", data=order_data)
+    
+    def _order_payload(self, symbol: str, side: str, order_type: str, size: str,
+                       price: str = None, trade_side: str = "open",
+                       client_oid: str = None) -> Dict[str, Any]:
+        """placeOrder body (also one item of a batchOrders list)"""
         # Generar client_oid si no se proporciona (requerido por WEEX)
         if not client_oid:
             client_oid = f"scalper_{int(time.time())}"
         
-        # Mapear side a type numérico
-        # 1 = open_long, 2 = open_short, 3 = close_long, 4 = close_short
-        type_map = {
-            'open_long': '1',
-            'open_short': '2', 
-            'close_long': '3',
-            'close_short': '4',
-        }
-        order_type_num = type_map.get(side, '1')
-        
         order_data = {
             "symbol": symbol,
             "client_oid": client_oid,
-            "size": size,
-            "type": order_type_num,
+            "size": str(size),
+            "type": order_type_code(side, trade_side),
             "order_type": "0",     # Normal order
             "match_price": "1",    # Market order (1 = use market price)
         }
         
-        return self._request("POST", "/capi/v2/order/placeOrder", data=order_data)
+        if order_type == "limit" and price is not None:
+            order_data["match_price"] = "0"
+            order_data["price"] = str(price)
+        
+        return order_data
     
     def cancel_order(self, symbol: str, order_id: str = None,
                      client_oid: str = None,
@@ -418,6 +637,113 @@ class WeexClient:
             "marginCoin": margin_coin,
         })
     
+    # ==================== BATCH ORDERS ====================
+    
+    def _run_chunks(self, chunks: List[list], send, max_workers: int) -> List[Any]:
+        """send(chunk) for every chunk, concurrently; an exception becomes the chunk's result"""
+        def guarded(chunk):
+            try:
+                return send(chunk)
+            except Exception as e:
+                return e
+        
+        if len(chunks) <= 1 or max_workers <= 1:
+            return [guarded(chunk) for chunk in chunks]
+        self.ensure_pool(min(max_workers, len(chunks)))
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+            return list(pool.map(guarded, chunks))
+    
+    def place_orders(self, orders: List[Dict[str, Any]], max_workers: int = 4) -> List[Dict[str, Any]]:
+        """
+        Place many orders with batchOrders (one request per symbol and 20 orders)
+        
+        Args:
+            orders: place_order keyword arguments per order (symbol, side,
+                    order_type, size, price, trade_side, client_oid)
+            max_workers: Batch requests sent concurrently
+            
+        Returns:
+            One result per order, in input order:
+            {'order_id', 'client_oid', 'result', 'err_msg'}
+        """
+        stamp = int(time.time() * 1000)
+        payloads = []
+        for i, order in enumerate(orders):
+            order = dict(order)
+            order.setdefault('client_oid', f"batch_{stamp}_{i}")
+            order.pop('margin_coin', None)
+            payloads.append(self._order_payload(**order))
+        
+        # batchOrders takes one symbol per request
+        chunks = []
+        by_symbol: Dict[str, List[int]] = {}
+        for i, payload in enumerate(payloads):
+            by_symbol.setdefault(payload['symbol'], []).append(i)
+        for symbol, indexes in by_symbol.items():
+            for start in range(0, len(indexes), BATCH_ORDER_LIMIT):
+                chunks.append(indexes[start:start + BATCH_ORDER_LIMIT])
+        
+        def send(indexes):
+            items = [dict(payloads[i]) for i in indexes]
+            symbol = items[0].pop('symbol')
+            for item in items[1:]:
+                item.pop('symbol')
+            return self._request("POST", "/capi/v2/order/batchOrders", data={
+                "symbol": symbol,
+                "orderDataList": items,
+            })
+        
+        results: List[Dict[str, Any]] = [None] * len(orders)
+        for indexes, response in zip(chunks, self._run_chunks(chunks, send, max_workers)):
+            infos = response.get('order_info') if isinstance(response, dict) else None
+            by_oid = {str(info.get('client_oid')): info for info in infos or []}
+            for position, i in enumerate(indexes):
+                oid = payloads[i]['client_oid']
+                info = by_oid.get(oid) or (infos[position] if infos and position < len(infos) else None)
+                if info is None:
+                    results[i] = {'order_id': None, 'client_oid': oid, 'result': False,
+                                  'err_msg': str(response)}
+                else:
+                    results[i] = {
+                        'order_id': info.get('order_id') or info.get('orderId'),
+                        'client_oid': oid,
+                        'result': bool(info.get('result', info.get('order_id'))),
+                        'err_msg': info.get('error_message') or info.get('err_msg'),
+                    }
+        return results
+    
+    def cancel_orders(self, order_ids: List[str], max_workers: int = 4) -> List[Dict[str, Any]]:
+        """
+        Cancel many orders by id with cancel_batch_orders (20 ids per request)
+        
+        Args:
+            order_ids: Order IDs to cancel (any symbol)
+            max_workers: Batch requests sent concurrently
+            
+        Returns:
+            One result per id, in input order: {'order_id', 'result', 'err_msg'}
+        """
+        order_ids = [str(oid) for oid in order_ids]
+        chunks = [order_ids[i:i + BATCH_ORDER_LIMIT] for i in range(0, len(order_ids), BATCH_ORDER_LIMIT)]
+        
+        def send(ids):
+            return self._request("POST", "/capi/v2/order/cancel_batch_orders", data={"ids": ids})
+        
+        results = []
+        for ids, response in zip(chunks, self._run_chunks(chunks, send, max_workers)):
+            items = response.get('cancelOrderResultList') if isinstance(response, dict) else None
+            by_id = {str(item.get('order_id') or item.get('orderId')): item for item in items or []}
+            for oid in ids:
+                item = by_id.get(oid)
+                if item is None:
+                    cancelled = isinstance(response, dict) and oid in map(str, response.get('orderIds') or [])
+                    results.append({'order_id': oid, 'result': cancelled,
+                                    'err_msg': None if cancelled else str(response)})
+                else:
+                    results.append({'order_id': oid, 'result': bool(item.get('result')),
+                                    'err_msg': item.get('err_msg') or item.get('error_message')})
+        return results
+    
     def get_open_orders(self, symbol: str = None) -> Dict[str, Any]:
         """
         Get all open/pending orders
@@ -493,6 +819,223 @@ class WeexClient:
             params["endTime"] = end_time
         return self._request("GET", "/capi/v2/order/fills", params)
     
+    # ==================== PLAN ORDERS (TP/SL) ====================
+    
+    def place_tp_sl(self, symbol: str, plan_type: str, trigger_price: float,
+                    size: float, position_side: str, execute_price: float = 0,
+                    client_oid: str = None) -> Dict[str, Any]:
+        """
+        Place a TP or SL plan order on an open position
+        
+        Args:
+            symbol: Trading pair
+            plan_type: "profit_plan" or "loss_plan"
+            trigger_price: Price that triggers the close
+            size: Size to close
+            position_side: "long" or "short"
+            execute_price: Limit price once triggered (0 = market)
+            client_oid: Client order ID (optional)
+            
+        Returns:
+            Plan order response with order ID
+        """
+        return self._request("POST", "/capi/v2/order/placeTpSlOrder", data={
+            "symbol": symbol,
+            "clientOrderId": client_oid or f"{plan_type}_{int(time.time() * 1000)}",
+            "planType": plan_type,
+            "triggerPrice": str(trigger_price),
+            "executePrice": str(execute_price),
+            "size": str(size),
+            "positionSide": position_side,
+        })
+    
+    def modify_tp_sl(self, order_id: str, trigger_price: float,
+                     execute_price: float = 0) -> Dict[str, Any]:
+        """
+        Move the trigger of an existing TP/SL plan order
+        
+        Args:
+            order_id: Plan order ID
+            trigger_price: New trigger price
+            execute_price: Limit price once triggered (0 = market)
+            
+        Returns:
+            Modification response
+        """
+        return self._request("POST", "/capi/v2/order/modifyTpSlOrder", data={
+            "orderId": order_id,
+            "triggerPrice": str(trigger_price),
+            "executePrice": str(execute_price),
+        })
+    
+    def cancel_plan_order(self, symbol: str, order_id: str) -> Dict[str, Any]:
+        """
+        Cancel a plan (trigger / TP / SL) order
+        
+        Args:
+            symbol: Trading pair
+            order_id: Plan order ID
+            
+        Returns:
+            Cancellation response
+        """
+        return self._request("POST", "/capi/v2/order/cancel_plan", data={
+            "symbol": symbol,
+            "orderId": order_id,
+        })
+    
+    def get_plan_orders(self, symbol: str = None) -> Dict[str, Any]:
+        """
+        Get open plan orders
+        
+        Args:
+            symbol: Trading pair (optional)
+            
+        Returns:
+            List of open plan orders
+        """
+        params = {}
+        if symbol:
+            params["symbol"] = symbol
+        return self._request("GET", "/capi/v2/order/currentPlan", params)
+    
+    # ==================== BRACKETS ====================
+    
+    def place_bracket(self, symbol: str, side: str, size: float,
+                      take_profit: float = None, stop_loss: float = None,
+                      order_type: str = "market", price: float = None,
+                      client_oid: str = None) -> Optional[Bracket]:
+        """
+        Open a position and hand its TP / SL to the exchange
+        
+        The entry is placed first; the plan orders follow once it was
+        accepted. A leg that fails is left empty (check `protected`) so the
+        caller can keep its own stop for that position.
+        
+        Args:
+            symbol: Trading pair
+            side: "long"/"buy" or "short"/"sell"
+            size: Position size
+            take_profit: TP trigger price (None = no TP leg)
+            stop_loss: SL trigger price (None = no SL leg)
+            order_type: Entry type ("market" or "limit")
+            price: Entry price for limit orders
+            client_oid: Client order ID for the entry
+            
+        Returns:
+            Bracket, or None if the entry was rejected
+        """
+        side = 'long' if side in ('long', 'buy', 'open_long') else 'short'
+        result = self.place_order(symbol, 'buy' if side == 'long' else 'sell', order_type,
+                                  str(size), price=price, client_oid=client_oid)
+        entry_id = _order_id(result)
+        if not entry_id:
+            print(f"❌ Bracket entry rejected for {symbol}: {result}")
+            return None
+        
+        bracket = Bracket(symbol, side, size, entry_order_id=entry_id)
+        self.amend_bracket(bracket, take_profit=take_profit, stop_loss=stop_loss)
+        return bracket
+    
+    def amend_bracket(self, bracket: Bracket, take_profit: float = None,
+                      stop_loss: float = None) -> bool:
+        """
+        Move (or add) the TP and/or SL legs of a bracket
+        
+        Returns:
+            True if every requested leg is now on the exchange
+        """
+        ok = True
+        for leg, trigger in (('take_profit', take_profit), ('stop_loss', stop_loss)):
+            if trigger is None:
+                continue
+            id_field = 'tp_order_id' if leg == 'take_profit' else 'sl_order_id'
+            try:
+                order_id = getattr(bracket, id_field)
+                if order_id:
+                    placed = _accepted(self.modify_tp_sl(order_id, trigger))
+                else:
+                    order_id = _order_id(self.place_tp_sl(bracket.symbol, PLAN_TYPES[leg], trigger,
+                                                          bracket.size, bracket.side))
+                    placed = order_id is not None
+                if placed:
+                    setattr(bracket, id_field, order_id)
+                    setattr(bracket, leg, trigger)
+                else:
+                    ok = False
+            except Exception as e:
+                print(f"⚠️ Bracket {leg} for {bracket.symbol} failed: {e}")
+                ok = False
+        return ok
+    
+    def trail_bracket(self, bracket: Bracket, stop: float, min_step_pct: float = 0.0) -> bool:
+        """
+        Ratchet the SL leg to a trailing level (never loosens it)
+        
+        Args:
+            bracket: Bracket to move
+            stop: New trailing stop price
+            min_step_pct: Skip moves smaller than this (% of the current stop)
+            
+        Returns:
+            True if the leg was moved
+        """
+        current = bracket.stop_loss
+        if current:
+            improvement = (stop - current) if bracket.side == 'long' else (current - stop)
+            if improvement <= current * min_step_pct / 100:
+                return False
+        return self.amend_bracket(bracket, stop_loss=stop)
+    
+    def cancel_bracket(self, bracket: Bracket, take_profit: bool = True,
+                       stop_loss: bool = True) -> bool:
+        """
+        Cancel the plan legs of a bracket (the position itself stays open)
+        
+        Returns:
+            True if every requested leg was cancelled
+        """
+        ok = True
+        for wanted, id_field in ((take_profit, 'tp_order_id'), (stop_loss, 'sl_order_id')):
+            order_id = getattr(bracket, id_field)
+            if not wanted or not order_id:
+                continue
+            try:
+                self.cancel_plan_order(bracket.symbol, order_id)
+                setattr(bracket, id_field, None)
+            except Exception as e:
+                print(f"⚠️ Cancel {id_field} for {bracket.symbol} failed: {e}")
+                ok = False
+        return ok
+    
+    def close_bracket(self, bracket: Bracket) -> Dict[str, Any]:
+        """
+        Close a bracketed position at market and drop its plan legs
+        
+        If the exchange already closed the position (a leg triggered), no
+        order is sent and the response has `closed_by_plan`.
+        
+        Returns:
+            Close order response, or {'closed_by_plan': True}
+        """
+        self.cancel_bracket(bracket)
+        if not self.has_open_position(bracket.symbol, bracket.side):
+            return {'closed_by_plan': True}
+        return self.place_order(bracket.symbol, 'sell' if bracket.side == 'long' else 'buy',
+                                "market", str(bracket.size), trade_side="close")
+    
+    def has_open_position(self, symbol: str, side: str) -> bool:
+        """True if the account holds a `side` ('long'/'short') position on `symbol`"""
+        positions = self.get_positions(symbol)
+        if isinstance(positions, dict):
+            positions = positions.get('data') or []
+        for pos in positions if isinstance(positions, list) else []:
+            held = str(pos.get('holdSide') or pos.get('side') or '').lower()
+            size = float(pos.get('total') or pos.get('size') or 0)
+            if held == side and size > 0:
+                return True
+        return False
+    
     # ==================== CONNECTIVITY TEST ====================
     
     def test_connectivity(self) -> bool:
@@ -568,5 +1111,184 @@ class WeexClient:
         return True
 
 
+# ==================== ASYNC CLIENT ====================
+
+# Endpoints mirrored one-to-one as coroutines on AsyncWeexClient
+ASYNC_ENDPOINTS = (
+    "get_server_time", "get_ticker", "get_candles", "get_contracts",
+    "get_account_assets", "get_single_account", "get_positions",
+    "get_all_positions", "set_leverage", "place_order", "cancel_order",
+    "cancel_all_orders", "place_orders", "cancel_orders",
+    "get_open_orders", "get_order_detail",
+    "get_order_history", "get_trade_fills",
+)
+
+
+class AsyncWeexClient:
+    """
+    Asyncio front-end for WeexClient
+
+    Every coroutine runs the matching WeexClient method on a worker thread,
+    so signing stays in WeexClient._generate_signature and the endpoint
+    surface is the same. A semaphore caps the number of requests in flight,
+    which lets a whole symbol universe be scanned in about one round-trip.
+
+    Example:
+        async with AsyncWeexClient(max_in_flight=8) as aclient:
+            tickers = await aclient.gather_tickers(["cmt_btcusdt", "cmt_ethusdt"])
+    """
+
+    def __init__(self, client: WeexClient = None, max_in_flight: int = 8,
+                 **credentials):
+        """
+        Initialize async client
+
+        Args:
+            client: Existing WeexClient to wrap (created from .env if not provided)
+            max_in_flight: Maximum concurrent requests
+            **credentials: api_key / secret_key / passphrase for a new WeexClient
+        """
+        self.client = client or WeexClient(**credentials)
+        self.max_in_flight = max(1, int(max_in_flight))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_in_flight, thread_name_prefix="weex-async"
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+
+        # Keep one pooled connection per in-flight request
+        if hasattr(self.client, "ensure_pool"):
+            self.client.ensure_pool(self.max_in_flight)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Semaphore bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _call(self, name: str, *args, **kwargs) -> Any:
+        """Run a WeexClient method on the worker pool under the in-flight cap"""
+        method = getattr(self.client, name)
+        async with self._get_semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, lambda: method(*args, **kwargs)
+            )
+
+    async def _gather(self, name: str, symbols: Iterable[str],
+                      *args, **kwargs) -> Dict[str, Any]:
+        """
+        Call one endpoint for many symbols concurrently
+
+        Returns:
+            Dict symbol -> response (None for symbols whose request failed)
+        """
+        symbols = list(dict.fromkeys(symbols))
+        results = await asyncio.gather(
+            *(self._call(name, symbol, *args, **kwargs) for symbol in symbols),
+            return_exceptions=True
+        )
+
+        gathered = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                print(f"❌ {name} failed for {symbol}: {result}")
+                result = None
+            gathered[symbol] = result
+        return gathered
+
+    async def gather_tickers(self, symbols: Iterable[str]) -> Dict[str, Any]:
+        """
+        Fetch tickers for many symbols concurrently
+
+        Args:
+            symbols: Trading pairs (e.g., ["cmt_btcusdt", "cmt_ethusdt"])
+
+        Returns:
+            Dict symbol -> ticker response (None on failure)
+        """
+        return await self._gather("get_ticker", symbols)
+
+    async def gather_candles(self, symbols: Iterable[str], granularity: str = "1m",
+                             limit: int = 100) -> Dict[str, Any]:
+        """
+        Fetch candles for many symbols concurrently
+
+        Args:
+            symbols: Trading pairs
+            granularity: Candle interval (1m, 5m, 15m, 30m, 1H, 4H, 1D, 1W)
+            limit: Number of candles per symbol
+
+        Returns:
+            Dict symbol -> candle response (None on failure)
+        """
+        return await self._gather("get_candles", symbols, granularity, limit)
+
+    def close(self):
+        """Shut down the worker pool"""
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> "AsyncWeexClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _async_endpoint(name: str):
+    """Build a coroutine that proxies WeexClient.<name>"""
+    async def endpoint(self, *args, **kwargs):
+        return await self._call(name, *args, **kwargs)
+
+    endpoint.__name__ = name
+    endpoint.__qualname__ = f"AsyncWeexClient.{name}"
+    endpoint.__doc__ = f"Async version of WeexClient.{name}"
+    return endpoint
+
+
+for _name in ASYNC_ENDPOINTS:
+    setattr(AsyncWeexClient, _name, _async_endpoint(_name))
+
+
+# ==================== SHARED CLIENT ====================
+
+_shared_client: Optional[WeexClient] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_client(require_auth: bool = True, pool_size: int = None,
+                      warm: bool = False) -> WeexClient:
+    """
+    Process-wide WeexClient: one session, one keep-alive pool, one rate limiter
+    
+    Scripts and bots that used to sign and send their own requests share
+    this instance, so connections are reused across all of them.
+    
+    Args:
+        require_auth: Raise ValueError if no credentials are configured
+        pool_size: Grow the keep-alive pool to at least this many connections
+        warm: Pre-open the pool's connections (only on first creation)
+        
+    Returns:
+        The shared WeexClient
+    """
+    global _shared_client
+    with _shared_lock:
+        created = _shared_client is None
+        if created:
+            _shared_client = WeexClient(require_auth=False,
+                                        pool_size=pool_size or DEFAULT_POOL_SIZE)
+        client = _shared_client
+    if require_auth and not client.has_credentials:
+        raise ValueError(MISSING_CREDENTIALS)
+    if pool_size:
+        client.ensure_pool(pool_size)
+    if warm and created:
+        client.warm_up()
+    return client
+
+
 # Alias for convenience
 Client = WeexClient